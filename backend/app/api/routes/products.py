@@ -2,15 +2,20 @@
 
 from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 
 from app.database import get_db
+from app.log import get_logger
 from app.models.schemas import (
     ProductResponse,
     ProductSearchParams,
     ProductCreate,
 )
 from app.services.ebay_service import EbayService
+from app.services.platform_snapshots import get_platform_snapshot_store
+from app.services.translation_cache import get_translation_cache
+
+logger = get_logger(__name__)
 
 router = APIRouter()
 
@@ -148,6 +153,7 @@ async def get_product(
 
 @router.post("/fetch")
 async def fetch_products_from_platform(
+    background_tasks: BackgroundTasks,
     keyword: str = Query(..., min_length=1),
     platform: str = Query(..., regex="^(ebay_au|ebay_nz)$"),
     limit: int = Query(50, ge=1, le=100),
@@ -156,11 +162,16 @@ async def fetch_products_from_platform(
     """
     Fetch products from external platform and save to database.
     Currently supports: eBay AU, eBay NZ
+
+    Saved titles are pre-translated for 1688 matching in the background,
+    and eBay's total result count and the page's prices are kept as a
+    platform snapshot.
     """
     if platform in ["ebay_au", "ebay_nz"]:
         service = EbayService()
         region = "AU" if platform == "ebay_au" else "NZ"
-        products = await service.search_products(keyword, region=region, limit=limit)
+        result = await service.search_results(keyword, region=region, limit=limit)
+        products = result["products"]
         
         # Save to database
         saved_count = 0
@@ -173,7 +184,13 @@ async def fetch_products_from_platform(
                 ).execute()
                 saved_count += 1
             except Exception as e:
-                print(f"Error saving product: {e}")
+                logger.warning("Error saving product: %s", e)
+
+        titles = [p["title"] for p in products if p.get("title")]
+        if titles:
+            background_tasks.add_task(get_translation_cache().get_many, titles)
+        if products:
+            background_tasks.add_task(get_platform_snapshot_store().record, "ebay", region, keyword, result)
         
         return {
             "message": f"Fetched and saved {saved_count} products",
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Query, BackgroundTasks
 from typing import Optional, List
 from datetime import datetime
 
-from app.services.ranking_service import RankingService
+from app.services.ranking_service import RankingService, get_ranking_service
 
 router = APIRouter(prefix="/ranking", tags=["ranking"])
 
@@ -33,7 +33,7 @@ async def calculate_rankings(
     Returns:
         Complete ranking results with detailed scores
     """
-    ranking_service = RankingService()
+    ranking_service = get_ranking_service()
 
     try:
         # Parse categories if provided
@@ -60,8 +60,6 @@ async def calculate_rankings(
             "success": False,
             "error": str(e),
         }
-    finally:
-        await ranking_service.close()
 
 
 @router.get("/latest")
@@ -95,8 +93,6 @@ async def get_available_categories():
     """
     Get list of available product categories for ranking.
     """
-    from app.services.ranking_service import RankingService
-
     return {
         "categories": RankingService.CATEGORIES,
         "weights": RankingService.WEIGHTS,
@@ -128,6 +124,7 @@ async def debug_supplier_query(
     Debug endpoint to test 1688 supplier query.
     """
     from app.database import get_db
+    from app.services.supplier_search import search_cached_suppliers
 
     db = get_db()
     results = {
@@ -165,4 +162,17 @@ async def debug_supplier_query(
     except Exception as e:
         results["queries"]["ilike_query"] = {"error": str(e)}
 
+    # Test 4: indexed keyword search (migration 005)
+    try:
+        indexed = search_cached_suppliers(db, keyword, limit=5)
+        results["queries"]["indexed_query"] = {
+            "count": len(indexed),
+            "sample": [
+                {"title": d.get("title", "")[:30], "price": d.get("price"), "relevance": d.get("relevance")}
+                for d in indexed[:3]
+            ],
+        }
+    except Exception as e:
+        results["queries"]["indexed_query"] = {"error": str(e)}
+
     return results
@@ -2,9 +2,10 @@
 
 from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 
 from app.database import get_db
+from app.log import get_logger
 from app.models.schemas import (
     Supplier1688Response,
     Supplier1688Detail,
@@ -16,11 +17,18 @@ from app.models.schemas import (
 from app.services.alibaba1688_service import (
     Alibaba1688Scraper,
     match_suppliers_for_products,
-    extract_keywords,
-    translate_to_chinese,
     calculate_profit_estimate,
+    filter_by_size,
+    supplier_from_row,
+    tier_price,
     EXCHANGE_RATES,
 )
+from app.services.supplier_search import get_cache_stats as get_supplier_cache_stats, search_cached_suppliers
+from app.services.selector_cache import get_selector_cache
+from app.services.supplier_enrichment import get_cached_offer, get_supplier_enricher, is_fresh
+from app.services.translation_cache import get_translation_cache, pretranslate_products
+
+logger = get_logger(__name__)
 
 router = APIRouter()
 
@@ -87,26 +95,15 @@ async def search_1688_suppliers(
     # 首先尝试从数据库缓存查询
     if use_cache:
         try:
-            query = db.table("suppliers_1688").select("*")
-
-            # 关键词匹配（精确匹配或模糊匹配）
-            query = query.or_(
-                f"search_keyword.eq.{keyword},title.ilike.%{keyword}%"
+            # 关键词匹配（精确匹配或标题双字索引），按相关度排序
+            rows = search_cached_suppliers(
+                db, keyword, max_price=max_price if max_price > 0 else None, limit=limit,
             )
 
-            # 价格过滤
-            if max_price > 0:
-                query = query.lte("price", max_price)
-
-            # 排序和限制
-            query = query.order("sold_count", desc=True).limit(limit)
-
-            result = query.execute()
-
-            if result.data:
-                print(f"[1688] Found {len(result.data)} cached suppliers for '{keyword}'")
+            if rows:
+                logger.info("Found %d cached suppliers for %r", len(rows), keyword)
                 suppliers = []
-                for s in result.data:
+                for s in rows:
                     # Extract offer_id from product_url
                     product_url = s.get("product_url", "")
                     offer_id = ""
@@ -120,22 +117,24 @@ async def search_1688_suppliers(
                         offer_id=offer_id or str(s.get("id", "")),
                         title=s["title"],
                         price=float(s["price"]),
-                        moq=s.get("moq", 1),
+                        moq=s.get("moq") or 1,
                         sold_count=s.get("sold_count", 0),
                         image_url=s.get("image_url"),
                         product_url=product_url,
                         supplier_name=s.get("supplier_name") or "Unknown",
                         location=s.get("location"),
-                        is_small_medium=s.get("is_small_medium", True),
+                        weight=s.get("weight_kg"),
+                        dimensions=s.get("dimensions"),
+                        is_small_medium=filter_by_size(supplier_from_row(s)),
                         id=offer_id or str(s.get("id", "")),
                     ))
                 return suppliers
         except Exception as e:
-            print(f"[1688] Cache query error: {e}")
+            logger.warning("Cache query error: %s", e)
             # 继续尝试实时爬取
 
     # 如果缓存没有数据，尝试实时爬取（可能被验证码拦截）
-    print(f"[1688] No cache found, attempting live scrape for '{keyword}'")
+    logger.info("No cache found, attempting live scrape for %r", keyword)
     scraper = Alibaba1688Scraper()
 
     try:
@@ -149,7 +148,7 @@ async def search_1688_suppliers(
 
         if not suppliers:
             # 返回提示信息
-            print(f"[1688] No suppliers found. Run: python tools/scrape_1688.py \"{keyword}\"")
+            logger.info('No suppliers found. Run: python tools/scrape_1688.py "%s"', keyword)
 
         return [
             Supplier1688Response(
@@ -173,55 +172,66 @@ async def translate_keywords(
 
     - **title**: Product title in English
     """
-    keywords = extract_keywords(title)
-    chinese_keywords = translate_to_chinese(keywords)
+    translation = get_translation_cache().get(title)
 
     return {
         "original_title": title,
-        "extracted_keywords": keywords,
-        "chinese_keywords": chinese_keywords,
+        "extracted_keywords": translation["keywords"],
+        "chinese_keywords": translation["chinese_keywords"],
     }
 
 
+@router.post("/translations/pretranslate")
+async def pretranslate_all_products(background_tasks: BackgroundTasks):
+    """
+    Pre-translate every product title in the background.
+
+    Later match requests for these products skip keyword extraction.
+    """
+    background_tasks.add_task(pretranslate_products)
+    return {"message": "Pre-translation started"}
+
+
+@router.get("/translations/stats")
+async def get_translation_stats():
+    """Get hit counters for the keyword translation cache."""
+    return get_translation_cache().stats()
+
+
 @router.get("/cache-stats")
 async def get_cache_stats(db=Depends(get_db)):
     """
     获取 1688 供应商缓存统计信息。
 
-    返回缓存的关键词列表、总数量和最后更新时间。
+    返回缓存的关键词列表、总数量和最后更新时间，以及每个关键词的
+    最早/最新抓取时间和价格分位数（读取 suppliers_1688_keyword_stats 汇总表）。
     """
     try:
-        # 获取总数
-        count_result = db.table("suppliers_1688").select("id", count="exact").execute()
-        total_count = count_result.count if hasattr(count_result, 'count') else len(count_result.data)
-
-        # 获取关键词统计
-        keywords_result = db.table("suppliers_1688").select("search_keyword").execute()
-        keyword_counts = {}
-        for row in keywords_result.data:
-            kw = row.get("search_keyword", "unknown")
-            keyword_counts[kw] = keyword_counts.get(kw, 0) + 1
-
-        # 获取最后更新时间
-        latest_result = db.table("suppliers_1688").select("scraped_at").order("scraped_at", desc=True).limit(1).execute()
-        last_updated = latest_result.data[0]["scraped_at"] if latest_result.data else None
-
-        return {
-            "total_cached": total_count,
-            "keywords": keyword_counts,
-            "last_updated": last_updated,
-            "note": "使用 tools/scrape_1688.py 脚本更新缓存数据",
-        }
+        stats = get_supplier_cache_stats(db)
+        stats["note"] = "使用 tools/scrape_1688.py 脚本更新缓存数据"
+        return stats
     except Exception as e:
         return {
             "total_cached": 0,
             "keywords": {},
+            "keyword_stats": {},
             "last_updated": None,
             "error": str(e),
-            "note": "请先运行数据库迁移: supabase/migrations/002_suppliers_1688.sql",
+            "note": "请先运行数据库迁移: supabase/migrations/002_suppliers_1688.sql, 006_suppliers_1688_keyword_stats.sql",
         }
 
 
+@router.get("/selector-stats")
+async def get_selector_stats():
+    """
+    Scraper selector metrics.
+
+    Winning CSS selector per site and page type with its hit rate and how
+    often the candidate list had to be re-probed (a layout change).
+    """
+    return get_selector_cache().stats()
+
+
 @router.get("/exchange-rates")
 async def get_exchange_rates():
     """
@@ -243,8 +253,27 @@ async def get_supplier_details(
     """
     Get detailed information for a 1688 product.
 
+    Served from the enriched suppliers_1688 row while it is fresh; otherwise
+    the detail page is scraped and the row updated.
+
     - **offer_id**: 1688 product/offer ID
     """
+    enricher = get_supplier_enricher()
+    row = enricher.cached_offer(offer_id)
+    if row and is_fresh(row, enricher.ttl_hours) and not row.get("details_error"):
+        return Supplier1688Detail(
+            offer_id=offer_id,
+            title=row.get("title") or "",
+            price=float(row.get("price") or 0),
+            product_url=row.get("product_url") or "",
+            supplier_name=row.get("supplier_name") or "",
+            moq=row.get("moq") or 1,
+            specifications=row.get("specifications") or {},
+            price_tiers=row.get("price_tiers") or [],
+            weight=row.get("weight_kg"),
+            dimensions=row.get("dimensions"),
+        )
+
     scraper = Alibaba1688Scraper()
 
     try:
@@ -253,14 +282,18 @@ async def get_supplier_details(
         if not details:
             raise HTTPException(status_code=404, detail="Supplier product not found")
 
+        if row:
+            enricher.save_details(offer_id, details)
+
         return Supplier1688Detail(
             offer_id=details.get("offer_id", offer_id),
             title=details.get("title", ""),
-            price=0,  # Would need to parse from details
+            price=float((row or {}).get("price") or 0),
             product_url=details.get("url", ""),
-            supplier_name="",
+            supplier_name=(row or {}).get("supplier_name") or "",
             moq=details.get("moq", 1),
             specifications=details.get("specifications", {}),
+            price_tiers=details.get("price_tiers", []),
             images=details.get("images", []),
             weight=details.get("weight"),
             dimensions=details.get("dimensions"),
@@ -277,6 +310,10 @@ async def estimate_profit(
     """
     Calculate profit estimation for a product-supplier combination.
 
+    Uses the cached offer price (the matching quantity tier when detail
+    data is available); offers without fresh details are queued for
+    background enrichment rather than scraped in the request.
+
     - **source_product_id**: UUID of the AU/NZ product
     - **supplier_offer_id**: 1688 offer ID
     - **quantity**: Purchase quantity (default: 100)
@@ -289,37 +326,51 @@ async def estimate_profit(
 
     product = result.data[0]
 
-    # Get supplier details (from cache or fresh scrape)
-    # For MVP, we'll use the offer_id to get basic info
-    scraper = Alibaba1688Scraper()
+    # Get supplier price from the cache
+    enricher = get_supplier_enricher()
+    row = get_cached_offer(db, request.supplier_offer_id)
+    if row is None or not is_fresh(row, enricher.ttl_hours):
+        enricher.submit([request.supplier_offer_id])
+
+    if row is None:
+        supplier_price = 50  # Default fallback
+    else:
+        supplier_price = tier_price(row.get("price_tiers"), request.quantity, float(row.get("price") or 50))
+
+    # Calculate shipping cost based on method
+    shipping_per_unit = 15 if request.shipping_method == "standard" else 25
+
+    # Calculate profit
+    estimate = calculate_profit_estimate(
+        source_price=float(product.get("price", 0)),
+        source_currency=product.get("currency", "AUD"),
+        supplier_price=supplier_price,
+        quantity=request.quantity,
+        shipping_per_unit=shipping_per_unit,
+    )
 
-    try:
-        # Try to get supplier details
-        details = await scraper.get_product_details(request.supplier_offer_id)
+    return ProfitEstimateResponse(**estimate)
 
-        if not details:
-            # Use a default supplier price if we can't fetch
-            supplier_price = 50  # Default fallback
-        else:
-            # Extract price from details (would need parsing)
-            supplier_price = 50  # Placeholder
-
-        # Calculate shipping cost based on method
-        shipping_per_unit = 15 if request.shipping_method == "standard" else 25
-
-        # Calculate profit
-        estimate = calculate_profit_estimate(
-            source_price=float(product.get("price", 0)),
-            source_currency=product.get("currency", "AUD"),
-            supplier_price=supplier_price,
-            quantity=request.quantity,
-            shipping_per_unit=shipping_per_unit,
-        )
 
-        return ProfitEstimateResponse(**estimate)
+@router.post("/enrich")
+async def enrich_suppliers(
+    background_tasks: BackgroundTasks,
+    limit: int = Query(100, ge=1, le=1000, description="Offers to refresh"),
+):
+    """
+    Refresh detail-page data (weight, dimensions, MOQ, price tiers) for
+    cached offers that have none or whose data is older than the TTL.
+    Runs in the background.
+    """
+    enricher = get_supplier_enricher()
+    background_tasks.add_task(enricher.run, limit)
+    return {"status": "scheduled", "limit": limit, **enricher.stats()}
 
-    finally:
-        await scraper.close()
+
+@router.get("/enrich/stats")
+async def get_enrichment_stats():
+    """Detail-page enrichment queue and counters."""
+    return get_supplier_enricher().stats()
 
 
 @router.post("/batch-match")
@@ -1,10 +1,25 @@
 """Trends API routes - Google Trends integration."""
 
+import asyncio
 from typing import List, Optional
 from fastapi import APIRouter, Query, HTTPException
 
 from app.models.schemas import TrendQuery, TrendData
 from app.services.google_trends_service import GoogleTrendsService
+from app.services.trends_analytics import (
+    WINDOW_TIMEFRAMES,
+    WINDOWS,
+    analyze_series,
+    get_trends_analytics,
+)
+from app.services.trends_batch import get_trends_batch_engine
+from app.services.trends_store import (
+    FREQ_MONTHLY,
+    FREQ_WEEKLY,
+    date_strings,
+    get_trends_store,
+    rows_with_nulls,
+)
 
 router = APIRouter()
 
@@ -39,6 +54,162 @@ async def get_interest_over_time(
         raise HTTPException(status_code=500, detail=f"Failed to fetch trends: {str(e)}")
 
 
+@router.get("/batch")
+async def get_batch_interest(
+    keywords: str = Query(..., description="Comma-separated keywords (no limit)"),
+    region: str = Query("AU", regex="^(AU|NZ)$"),
+    timeframe: str = Query("today 12-m", description="Timeframe for trends"),
+    anchor: Optional[str] = Query(None, description="Anchor keyword shared by every payload"),
+):
+    """
+    Get interest over time for any number of keywords on one scale.
+
+    Keywords are packed into 5-keyword payloads that share an anchor keyword,
+    so values are comparable across payloads.
+
+    - **keywords**: Comma-separated list of keywords
+    - **region**: AU or NZ
+    - **timeframe**: Time range
+    - **anchor**: Optional anchor keyword (defaults to the first keyword)
+    """
+    keyword_list = [k.strip() for k in keywords.split(",") if k.strip()]
+
+    if not keyword_list:
+        raise HTTPException(status_code=400, detail="At least one keyword required")
+
+    engine = get_trends_batch_engine()
+    try:
+        return await engine.fetch(
+            keywords=keyword_list,
+            region=region,
+            timeframe=timeframe,
+            anchor=anchor,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch trends: {str(e)}")
+
+
+@router.get("/series")
+async def get_stored_series(
+    keywords: str = Query(..., description="Comma-separated keywords"),
+    region: str = Query("AU", regex="^(AU|NZ)$"),
+    start: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    freq: str = Query(FREQ_WEEKLY, regex=f"^({FREQ_WEEKLY}|{FREQ_MONTHLY})$"),
+):
+    """
+    Get stored interest series aligned on one date grid.
+
+    Only series already fetched from Google Trends are returned; nothing is
+    fetched here. Missing points are null.
+
+    - **keywords**: Comma-separated list of keywords
+    - **region**: AU or NZ
+    - **start** / **end**: Optional inclusive date range
+    - **freq**: W (as stored) or M (monthly means)
+    """
+    keyword_list = [k.strip() for k in keywords.split(",") if k.strip()]
+
+    if not keyword_list:
+        raise HTTPException(status_code=400, detail="At least one keyword required")
+
+    store = get_trends_store()
+    try:
+        store.load(keyword_list, region)
+        dates, matrix, found = store.matrix(keyword_list, region, start, end, freq)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "dates": date_strings(dates),
+        "series": dict(zip(found, rows_with_nulls(matrix))),
+        "missing": [kw for kw in keyword_list if kw not in found],
+        "region": region,
+        "freq": freq,
+    }
+
+
+@router.get("/series/aggregates")
+async def get_series_aggregates(
+    keywords: str = Query(..., description="Comma-separated keywords"),
+    region: str = Query("AU", regex="^(AU|NZ)$"),
+    start: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+):
+    """
+    Get mean interest, weekly slope and seasonality strength per keyword.
+
+    - **keywords**: Comma-separated list of keywords
+    - **region**: AU or NZ
+    - **start** / **end**: Optional inclusive date range
+    """
+    keyword_list = [k.strip() for k in keywords.split(",") if k.strip()]
+
+    if not keyword_list:
+        raise HTTPException(status_code=400, detail="At least one keyword required")
+
+    store = get_trends_store()
+    try:
+        store.load(keyword_list, region)
+        aggregates = store.aggregates(keyword_list, region, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "aggregates": aggregates,
+        "missing": [kw for kw in keyword_list if kw not in aggregates],
+        "region": region,
+    }
+
+
+@router.get("/analytics")
+async def get_trend_analytics(
+    keywords: str = Query(..., description="Comma-separated keywords"),
+    region: str = Query("AU", regex="^(AU|NZ)$"),
+    window: str = Query("12m", regex=f"^({'|'.join(WINDOWS)})$"),
+):
+    """
+    Get slope, momentum, year-over-year change and seasonality per keyword.
+
+    Keywords without stored series are fetched through the batch engine and
+    analyzed from the fetched window.
+
+    - **keywords**: Comma-separated list of keywords
+    - **region**: AU or NZ
+    - **window**: 1m, 3m, 12m or 5y
+    """
+    keyword_list = [k.strip() for k in keywords.split(",") if k.strip()]
+
+    if not keyword_list:
+        raise HTTPException(status_code=400, detail="At least one keyword required")
+
+    # Loading stored series hits the database
+    results = await asyncio.to_thread(
+        get_trends_analytics().analyze, keyword_list, region, window
+    )
+
+    missing = [kw for kw in keyword_list if kw not in results]
+    if missing:
+        try:
+            result = await get_trends_batch_engine().fetch(
+                keywords=missing,
+                region=region,
+                timeframe=WINDOW_TIMEFRAMES[window],
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to fetch trends: {str(e)}")
+        # The series are stored in the background, so analyze the fetched window
+        fetched = {kw: values for kw, values in result.get("series", {}).items() if kw in missing}
+        results.update(analyze_series(result.get("dates", []), fetched, window=window))
+
+    return {
+        "analytics": results,
+        "missing": [kw for kw in keyword_list if kw not in results],
+        "region": region,
+        "window": window,
+    }
+
+
 @router.get("/related-queries")
 async def get_related_queries(
     keyword: str = Query(..., min_length=1),
@@ -87,8 +258,12 @@ async def get_regional_interest(
     """
     service = GoogleTrendsService()
     try:
-        au_data = await service.get_interest_over_time([keyword], region="AU")
-        nz_data = await service.get_interest_over_time([keyword], region="NZ")
+        # pytrends takes one geo per payload, so AU and NZ can't share a
+        # request; issue both at once instead of back to back
+        au_data, nz_data = await asyncio.gather(
+            service.get_interest_over_time([keyword], region="AU"),
+            service.get_interest_over_time([keyword], region="NZ"),
+        )
         
         return {
             "keyword": keyword,
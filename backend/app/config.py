@@ -23,6 +23,9 @@ class Settings(BaseSettings):
     trademe_oauth_token: str = ""
     trademe_oauth_token_secret: str = ""
     trademe_sandbox: bool = False  # Set to True for testing
+    trademe_max_concurrency: int = 4  # Parallel requests (and pooled connections) to the TradeMe API
+    trademe_category_cache_path: str = ".cache/trademe_categories.json"  # Local copy of the category tree
+    trademe_category_ttl_hours: float = 24.0  # Revalidate the category tree (ETag) after this long
 
     # AI APIs (optional)
     openai_api_key: str = ""
@@ -30,6 +33,55 @@ class Settings(BaseSettings):
 
     # 1688 Scraping
     alibaba_1688_cookies: str = ""  # JSON string of cookies from logged-in browser
+    alibaba_1688_max_pages: int = 3  # Result pages a live search may walk before giving up
+    product_keyword_map_path: str = ""  # English -> Chinese keyword JSON (defaults to bundled map)
+    supplier_details_ttl_hours: float = 336.0  # Re-fetch offer detail pages after two weeks
+    supplier_enrichment_concurrency: int = 3  # Detail pages fetched in parallel (browser tabs)
+    supplier_index_path: str = ".cache/supplier_index.npz"  # Built by python -m app.services.supplier_index
+    supplier_index_refresh_hours: float = 24.0  # Rebuild from the database in the background after this long (0 = never)
+    supplier_index_retry_seconds: float = 300.0  # Wait after a failed load/build before trying again
+
+    # Platform demand collection
+    platform_adapters: list[str] = ["trademe", "ebay"]  # Enabled marketplaces; "amazon"/"temu" scrape with Playwright
+    platform_concurrency: dict[str, int] = {"trademe": 4, "ebay": 4, "amazon": 1, "temu": 1}  # Parallel calls per adapter
+    platform_timeouts: dict[str, float] = {"trademe": 20.0, "ebay": 20.0, "amazon": 60.0, "temu": 60.0}  # Seconds per call
+    platform_probe_mode: bool = True  # Rankings fetch counts + a price sample instead of full result pages
+    platform_probe_sample_size: int = 10  # Listings sampled for prices per probe
+
+    # Platform demand snapshots (listing counts and prices per keyword)
+    platform_snapshot_max_age_hours: float = 168.0  # Older snapshots are flagged stale in rankings
+    platform_snapshot_drop_after_hours: float = 0.0  # Ignore snapshots older than this (0 = always serve)
+
+    # Outbound resilience, per upstream host (see app/services/resilience.py)
+    resilience_rate_per_second: float = 0.0  # Default pacing per host (0 = unlimited)
+    resilience_burst: int = 5  # Requests allowed back-to-back before pacing kicks in
+    resilience_failure_threshold: int = 5  # Consecutive transient failures that open a host's circuit
+    resilience_reset_seconds: float = 30.0  # How long an open circuit fails fast before a half-open probe
+    resilience_max_retries: int = 3  # Attempts per call on transient errors
+    resilience_retry_ratio: float = 0.2  # Retries earned per request once the reserve is spent
+    resilience_retry_reserve: float = 10.0  # Retries available before the ratio applies
+    resilience_hosts: dict[str, dict] = {"s.1688.com": {"rate_per_second": 0.5, "burst": 2}}  # Per-host overrides
+    ranking_deadline_seconds: float = 60.0  # Budget for one ranking's platform calls (0 = none)
+
+    # Tracing and metrics (see app/services/tracing.py)
+    tracing_enabled: bool = True  # Per-request traces; /metrics histograms are always collected
+    tracing_debug_header: str = "X-Debug-Trace"  # Send "1" to get a Server-Timing span breakdown back
+    tracing_max_spans: int = 5000  # Spans kept per request trace
+    otel_exporter_endpoint: str = ""  # OTLP/HTTP traces endpoint, e.g. http://localhost:4318/v1/traces
+    otel_service_name: str = "aunz-product-finder-api"
+    otel_export_interval_seconds: float = 5.0  # Batch finished traces this long before exporting
+
+    # Logging (see app/log.py)
+    log_level: str = "INFO"  # DEBUG adds the per-item scraper/ranking lines (sampled)
+    log_format: str = "json"  # "json" (one object per line) or "text"
+    log_queue_size: int = 10000  # Records buffered for the writer thread; beyond this they are dropped
+    log_sample_every: int = 50  # Keep the first and every Nth per-item debug line per call site
+
+    # Google Trends request scheduler
+    trends_max_workers: int = 2  # Dedicated threads for blocking pytrends calls
+    trends_requests_per_minute: float = 10.0  # Global rate across all callers
+    trends_burst: int = 2  # Requests allowed back-to-back before pacing kicks in
+    trends_max_retries: int = 3  # Attempts per request on 429 responses
 
     # Server
     host: str = "0.0.0.0"
@@ -1,29 +1,43 @@
 """Supabase database connection."""
 
-from typing import Optional
-from supabase import create_client, Client
+from typing import TYPE_CHECKING, Optional
 from app.config import settings
+from app.services.tracing import instrument_httpx, postgrest_span_name
 
+if TYPE_CHECKING:
+    # supabase (auth, storage, realtime clients) is imported on first connection
+    from supabase import Client
 
-def get_supabase_client() -> Client:
+
+def _traced(client: "Client") -> "Client":
+    """Time every PostgREST request as a "db <table>" span."""
+    instrument_httpx(client.postgrest.session, postgrest_span_name)
+    return client
+
+
+def get_supabase_client() -> "Client":
     """Get Supabase client instance."""
     if not settings.supabase_url or not settings.supabase_key:
         raise ValueError("Supabase URL and Key must be configured")
-    return create_client(settings.supabase_url, settings.supabase_key)
+    from supabase import create_client
 
+    return _traced(create_client(settings.supabase_url, settings.supabase_key))
 
-def get_supabase_admin_client() -> Client:
+
+def get_supabase_admin_client() -> "Client":
     """Get Supabase client with service role key for admin operations."""
     if not settings.supabase_url or not settings.supabase_service_key:
         raise ValueError("Supabase URL and Service Key must be configured")
-    return create_client(settings.supabase_url, settings.supabase_service_key)
+    from supabase import create_client
+
+    return _traced(create_client(settings.supabase_url, settings.supabase_service_key))
 
 
 # Singleton client instance
-_client: Optional[Client] = None
+_client: Optional["Client"] = None
 
 
-def get_db() -> Client:
+def get_db() -> "Client":
     """Get database client (dependency injection)."""
     global _client
     if _client is None:
@@ -0,0 +1,191 @@
+"""
+Application logging.
+
+Modules log through ``get_logger(__name__)`` with %-style arguments, so a
+record below the configured level costs one level check and is never
+formatted. ``setup_logging()`` (called by ``app.main``) attaches one handler
+to the ``app`` logger:
+
+- Records go on a bounded queue with ``put_nowait``; a listener thread
+  formats and writes them. The event loop never waits on stdout, and when
+  the writer falls behind records are dropped and counted instead of
+  buffering without limit.
+- Per-item lines (selector probes, per-supplier parse errors, page samples)
+  pass ``extra=SAMPLED``: the first and every ``log_sample_every``-th record
+  per call site is kept, before anything is queued.
+- ``log_format="json"`` writes one object per line with the level, logger,
+  message, request trace id (see ``app.services.tracing``) and any
+  ``extra`` fields; ``"text"`` is for reading in a terminal.
+
+Before ``setup_logging()`` runs (scripts, tests), records fall through to
+Python's default handling.
+"""
+
+import atexit
+import copy
+import itertools
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, Dict, Optional, Tuple
+
+from app.config import settings
+
+ROOT = "app"
+
+# ``logger.debug("...", extra=SAMPLED)`` marks a per-item line for sampling
+SAMPLED = {"sampled": True}
+
+# LogRecord attributes that aren't ``extra`` fields
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "trace_id", "sampled"}
+
+_listener: Optional[QueueListener] = None
+_handler: Optional["NonBlockingQueueHandler"] = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger under the ``app`` namespace (module ``__name__`` is already there)."""
+    if name != ROOT and not name.startswith(ROOT + "."):
+        name = f"{ROOT}.{name}"
+    return logging.getLogger(name)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps the first and every ``every``-th sampled record per call site."""
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = max(1, every)
+        self._counters: Dict[Tuple[str, int], "itertools.count"] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False) or self.every == 1:
+            return True
+        # count() and setdefault() are atomic, so scraper threads can share this
+        counter = self._counters.setdefault((record.pathname, record.lineno), itertools.count())
+        seen = next(counter)
+        if seen % self.every:
+            return False
+        record.sample_every = self.every
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """``QueueHandler`` that drops records when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue, trace_id: Optional[Callable[[], Optional[str]]] = None):
+        super().__init__(log_queue)
+        self.trace_id = trace_id
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Runs in the caller: resolve everything that depends on its state
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg, record.args, record.exc_info = record.message, None, None
+        record.trace_id = self.trace_id() if self.trace_id else None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id:
+            entry["trace_id"] = trace_id
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s", datefmt="%H:%M:%S")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        trace_id = getattr(record, "trace_id", None)
+        return f"{line} [trace {trace_id}]" if trace_id else line
+
+
+class _Stdout:
+    """``sys.stdout`` as of each write (it can be swapped, e.g. by test capture)."""
+
+    def write(self, text: str) -> int:
+        return sys.stdout.write(text)
+
+    def flush(self) -> None:
+        sys.stdout.flush()
+
+
+def setup_logging(
+    level: Optional[str] = None,
+    fmt: Optional[str] = None,
+    stream=None,
+    queue_size: Optional[int] = None,
+    sample_every: Optional[int] = None,
+) -> NonBlockingQueueHandler:
+    """Route the ``app`` loggers through the queue; calling again reconfigures."""
+    global _listener, _handler
+    from app.services.tracing import current_trace_id
+
+    shutdown_logging()
+
+    writer = logging.StreamHandler(stream or _Stdout())
+    writer.setFormatter(JsonFormatter() if (fmt or settings.log_format) == "json" else TextFormatter())
+
+    handler = NonBlockingQueueHandler(queue.Queue(max(1, queue_size or settings.log_queue_size)), current_trace_id)
+    handler.addFilter(SamplingFilter(sample_every or settings.log_sample_every))
+
+    logger = logging.getLogger(ROOT)
+    logger.setLevel((level or settings.log_level).upper())
+    logger.addHandler(handler)
+    logger.propagate = False
+
+    _listener = QueueListener(handler.queue, writer)
+    _listener.start()
+    _handler = handler
+    return handler
+
+
+def shutdown_logging() -> None:
+    """Write out queued records and detach the handler."""
+    global _listener, _handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _handler is not None:
+        logger = logging.getLogger(ROOT)
+        logger.removeHandler(_handler)
+        logger.propagate = True
+        if _handler.dropped:
+            print(f"[Logging] Dropped {_handler.dropped} records (queue full)", file=sys.stderr)
+        _handler = None
+
+
+def dropped_records() -> int:
+    return _handler.dropped if _handler is not None else 0
+
+
+atexit.register(shutdown_logging)
@@ -1,10 +1,48 @@
 """FastAPI application entry point."""
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from app.config import settings
+from app.log import dropped_records, setup_logging, shutdown_logging
 from app.api.routes import products, reports, trends, suppliers, ranking
+from app.services.platform_registry import close_platform_registry
+from app.services.ranking_service import get_ranking_service
+from app.services.resilience import prometheus_lines, resilience_stats
+from app.services.supplier_index import start_supplier_index
+from app.services.tracing import METRICS, TracingMiddleware, get_otlp_exporter
+from app.services.trends_scheduler import shutdown_trends_scheduler
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Build the shared services once the server starts, release them on shutdown.
+
+    Importing the app stays cheap (pandas, pytrends, supabase and Playwright
+    load on first use); the singletons behind rankings - platform registry,
+    Trends scheduler, batch engine - are created here instead of by the
+    first request, and the supplier index starts loading in the background.
+    """
+    # Queued, non-blocking log output (JSON lines by default)
+    setup_logging()
+    get_ranking_service()
+    # Load (or build) the supplier similarity index off the event loop
+    start_supplier_index()
+    get_otlp_exporter()
+    try:
+        yield
+    finally:
+        await close_platform_registry()
+        shutdown_trends_scheduler()
+        exporter = get_otlp_exporter()
+        if exporter is not None:
+            await exporter.flush()
+        shutdown_logging()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -13,6 +51,7 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -22,8 +61,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Trace-Id", "Server-Timing"],
 )
 
+# Per-request traces (X-Trace-Id, Server-Timing with the debug header)
+app.add_middleware(TracingMiddleware)
+
 # Include routers
 app.include_router(products.router, prefix="/api/products", tags=["Products"])
 app.include_router(reports.router, prefix="/api/reports", tags=["Reports"])
@@ -48,6 +91,27 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: span durations, upstream resilience counters and dropped log records."""
+    lines = METRICS.render() + prometheus_lines()
+    lines += [
+        "# TYPE app_log_records_dropped_total counter",
+        f"app_log_records_dropped_total {dropped_records()}",
+    ]
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
+
+
+@app.get("/health/upstreams")
+async def upstream_health():
+    """Circuit breaker state, retry budgets and call counters per upstream host."""
+    hosts = resilience_stats()
+    return {
+        "status": "degraded" if any(h["state"] != "closed" for h in hosts.values()) else "healthy",
+        "hosts": hosts,
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -1,34 +1,35 @@
 """1688.com supplier scraper using Playwright."""
 
 import asyncio
+import importlib.util
 import re
 import math
 import json
-from typing import List, Optional, Tuple, Dict, Any, TYPE_CHECKING
+import logging
+from urllib.parse import urlsplit
+from typing import AsyncIterator, List, Optional, Tuple, Dict, Any, TYPE_CHECKING
 from pydantic import BaseModel
 
 from app.config import settings
+from app.log import SAMPLED, get_logger
+from app.services.keyword_index import get_keyword_index, normalize_phrase
+from app.services.resilience import get_host_guard
+from app.services.tracing import instrument_page
+from app.services.selector_cache import SelectorCache, get_selector_cache
+from app.services.supplier_index import get_supplier_index
 
-# Playwright is optional - only required for actual scraping
-# In production without Playwright, the service returns mock/empty results
-PLAYWRIGHT_AVAILABLE = False
-STEALTH_AVAILABLE = False
-try:
-    from playwright.async_api import async_playwright, Browser, Page
-    PLAYWRIGHT_AVAILABLE = True
-except ImportError:
-    # Playwright not installed - scraping will be disabled
-    async_playwright = None
-    Browser = None
-    Page = None
+logger = get_logger(__name__)
 
+# Playwright is optional - only required for actual scraping
+# In production without Playwright, the service returns mock/empty results.
+# Availability is checked without importing: the import is slow and only
+# happens once a browser is launched.
+PLAYWRIGHT_AVAILABLE = importlib.util.find_spec("playwright") is not None
 # Stealth plugin to bypass bot detection
-try:
-    from playwright_stealth import stealth_async
-    STEALTH_AVAILABLE = True
-except ImportError:
-    stealth_async = None
-    print("[1688] Warning: playwright-stealth not installed, bot detection bypass disabled")
+STEALTH_AVAILABLE = importlib.util.find_spec("playwright_stealth") is not None
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
 
 
 # ============ Data Models ============
@@ -81,77 +82,24 @@ SIZE_LIMITS = {
     "max_volume_cm3": 50000,
 }
 
-# Common product keywords mapping (English -> Chinese)
-PRODUCT_KEYWORD_MAP = {
-    # Electronics
-    "wireless earbuds": ["无线耳机", "蓝牙耳机", "TWS耳机"],
-    "bluetooth earbuds": ["蓝牙耳机", "无线蓝牙耳机"],
-    "headphones": ["耳机", "头戴式耳机"],
-    "speaker": ["音箱", "蓝牙音箱", "音响"],
-    "charger": ["充电器", "快充充电器"],
-    "power bank": ["充电宝", "移动电源"],
-    "phone case": ["手机壳", "手机保护套"],
-    "screen protector": ["钢化膜", "屏幕保护膜"],
-    "cable": ["数据线", "充电线"],
-    "usb cable": ["USB数据线", "充电线"],
-    "smart watch": ["智能手表", "运动手表"],
-    "fitness tracker": ["运动手环", "智能手环"],
-
-    # Home & Garden
-    "led light": ["LED灯", "灯带", "LED灯条"],
-    "lamp": ["台灯", "灯具"],
-    "storage box": ["收纳箱", "收纳盒"],
-    "organizer": ["收纳架", "收纳盒"],
-    "kitchen tool": ["厨房用品", "厨具"],
-    "water bottle": ["水杯", "保温杯", "水壶"],
-    "pillow": ["枕头", "靠枕"],
-    "blanket": ["毛毯", "毯子"],
-    "curtain": ["窗帘"],
-    "rug": ["地毯", "地垫"],
-
-    # Fashion
-    "watch": ["手表", "石英表"],
-    "sunglasses": ["太阳镜", "墨镜"],
-    "bag": ["包", "背包", "手提包"],
-    "backpack": ["背包", "双肩包"],
-    "wallet": ["钱包", "皮夹"],
-    "belt": ["皮带", "腰带"],
-    "hat": ["帽子", "鸭舌帽"],
-    "scarf": ["围巾", "丝巾"],
-    "jewelry": ["首饰", "饰品"],
-    "necklace": ["项链"],
-    "bracelet": ["手链", "手镯"],
-    "ring": ["戒指"],
-    "earrings": ["耳环", "耳饰"],
-
-    # Toys & Games
-    "toy": ["玩具"],
-    "puzzle": ["拼图", "益智玩具"],
-    "board game": ["桌游", "棋牌游戏"],
-    "drone": ["无人机", "遥控飞机"],
-    "rc car": ["遥控车", "RC汽车"],
-    "plush toy": ["毛绒玩具", "公仔"],
-
-    # Sports
-    "yoga mat": ["瑜伽垫"],
-    "resistance band": ["弹力带", "拉力带"],
-    "dumbbell": ["哑铃"],
-    "sports bottle": ["运动水壶"],
-    "gym bag": ["健身包", "运动包"],
-
-    # Beauty
-    "makeup brush": ["化妆刷", "刷子套装"],
-    "makeup": ["化妆品", "彩妆"],
-    "skincare": ["护肤品"],
-    "hair tool": ["美发工具"],
-    "nail art": ["美甲", "指甲油"],
-
-    # Pet
-    "pet toy": ["宠物玩具", "狗玩具", "猫玩具"],
-    "pet bed": ["宠物窝", "狗窝", "猫窝"],
-    "pet collar": ["宠物项圈", "狗项圈"],
-    "pet bowl": ["宠物碗", "狗碗", "猫碗"],
-}
+# Common product keywords mapping (English -> Chinese), loaded from
+# app/data/product_keywords.json
+PRODUCT_KEYWORD_MAP = get_keyword_index().mapping
+
+# Words that never carry product meaning in a title
+NOISE_WORDS = frozenset({
+    'for', 'with', 'and', 'the', 'a', 'an', 'of', 'in', 'on', 'at',
+    'new', 'hot', 'best', 'sale', 'free', 'shipping', 'pack', 'pcs',
+    'set', 'kit', 'piece', 'pieces', 'lot', '2024', '2025', '2026'
+})
+
+# Brand names (common patterns)
+BRAND_PATTERNS = (
+    re.compile(r'\b[A-Z][a-z]+\s+(?:brand|official)\b', re.IGNORECASE),
+    re.compile(r'\b(?:genuine|original|authentic)\b', re.IGNORECASE),
+)
+
+WORD_PATTERN = re.compile(r'\b[a-z]+\b')
 
 
 # ============ Utility Functions ============
@@ -169,43 +117,27 @@ def extract_keywords(product_title: str) -> List[str]:
     # Normalize
     title = product_title.lower()
 
-    # Remove common noise words
-    noise_words = [
-        'for', 'with', 'and', 'the', 'a', 'an', 'of', 'in', 'on', 'at',
-        'new', 'hot', 'best', 'sale', 'free', 'shipping', 'pack', 'pcs',
-        'set', 'kit', 'piece', 'pieces', 'lot', '2024', '2025', '2026'
-    ]
-
-    # Remove brand names (common patterns)
-    brand_patterns = [
-        r'\b[A-Z][a-z]+\s+(?:brand|official)\b',
-        r'\b(?:genuine|original|authentic)\b',
-    ]
-    for pattern in brand_patterns:
-        title = re.sub(pattern, '', title, flags=re.IGNORECASE)
-
-    # Split into words
-    words = re.findall(r'\b[a-z]+\b', title)
+    # Remove brand names
+    for pattern in BRAND_PATTERNS:
+        title = pattern.sub('', title)
 
-    # Filter noise words
-    words = [w for w in words if w not in noise_words and len(w) > 2]
+    # Split into words and filter noise words
+    words = [w for w in WORD_PATTERN.findall(title) if w not in NOISE_WORDS and len(w) > 2]
 
     # Generate keyword combinations
     keywords = []
+    first_words = set()
 
-    # Single important words
-    important_words = words[:5]  # First 5 significant words
+    # Multi-word phrases from the keyword map
+    for phrase in get_keyword_index().find_phrases(words, min_tokens=2):
+        keywords.append(phrase)
+        first_words.add(phrase.split(' ', 1)[0])
 
-    # Two-word combinations
-    for i in range(len(words) - 1):
-        two_word = f"{words[i]} {words[i+1]}"
-        if two_word in PRODUCT_KEYWORD_MAP:
-            keywords.append(two_word)
-
-    # Add single words as fallback
-    for word in important_words:
-        if word not in [k.split()[0] for k in keywords]:
+    # Add single words (first 5 significant words) as fallback
+    for word in words[:5]:
+        if word not in first_words:
             keywords.append(word)
+            first_words.add(word)
 
     # Limit to top 3 keywords
     return keywords[:3] if keywords else words[:3]
@@ -215,8 +147,9 @@ def translate_to_chinese(keywords: List[str]) -> List[str]:
     """
     Translate English keywords to Chinese.
 
-    Uses local keyword mapping for common product terms.
-    Falls back to simple word combinations if no match found.
+    Uses the local keyword index for common product terms. Keywords without
+    an exact entry take the first translation of the best-ranked phrase
+    they contain or are part of.
 
     Args:
         keywords: List of English keywords
@@ -224,28 +157,24 @@ def translate_to_chinese(keywords: List[str]) -> List[str]:
     Returns:
         List of Chinese keywords
     """
+    index = get_keyword_index()
     chinese_keywords = []
 
     for keyword in keywords:
-        keyword_lower = keyword.lower().strip()
+        keyword_lower = normalize_phrase(keyword)
 
         # Check exact match in mapping
-        if keyword_lower in PRODUCT_KEYWORD_MAP:
-            chinese_keywords.extend(PRODUCT_KEYWORD_MAP[keyword_lower])
+        exact = index.lookup(keyword_lower)
+        if exact is not None:
+            chinese_keywords.extend(exact)
         else:
             # Try partial match
-            for eng, chi_list in PRODUCT_KEYWORD_MAP.items():
-                if keyword_lower in eng or eng in keyword_lower:
-                    chinese_keywords.extend(chi_list[:1])  # Add first match only
-                    break
+            phrase = index.best_match(keyword_lower)
+            if phrase is not None:
+                chinese_keywords.append(index.mapping[phrase][0])  # Add first match only
 
     # Remove duplicates while preserving order
-    seen = set()
-    unique_keywords = []
-    for k in chinese_keywords:
-        if k not in seen:
-            seen.add(k)
-            unique_keywords.append(k)
+    unique_keywords = list(dict.fromkeys(chinese_keywords))
 
     return unique_keywords[:5] if unique_keywords else ["产品"]  # Fallback
 
@@ -276,6 +205,67 @@ def parse_dimensions(dim_str: str) -> Optional[Tuple[float, float, float]]:
     return None
 
 
+WEIGHT_SPEC_KEYS = ("重量", "weight", "净重", "毛重")
+DIMENSION_SPEC_KEYS = ("尺寸", "size", "dimension", "规格")
+WEIGHT_PATTERN = re.compile(r"([\d.]+)\s*(kg|千克|公斤|g|克)", re.IGNORECASE)
+TIER_PRICE_PATTERN = re.compile(r"[¥￥]\s*([\d.]+)|(\d+\.\d+)")
+TIER_QTY_PATTERN = re.compile(r"(?:≥|>=)?\s*(\d+)\s*(?:[-~～]\s*\d+\s*)?(?:件|个|套|只|双|条|台|把|张|包|盒|pcs)", re.IGNORECASE)
+MOQ_PATTERN = re.compile(r"(\d+)")
+
+
+def parse_weight_kg(specs: Dict[str, str]) -> Optional[float]:
+    """Weight in kg from a detail page's specification table."""
+    for key, value in specs.items():
+        if any(p in key.lower() for p in WEIGHT_SPEC_KEYS):
+            match = WEIGHT_PATTERN.search(value)
+            if match:
+                weight = float(match.group(1))
+                unit = match.group(2).lower()
+                return weight / 1000 if unit in ("g", "克") else weight
+    return None
+
+
+def parse_dimensions_spec(specs: Dict[str, str]) -> Optional[str]:
+    """Raw dimensions text from a specification table (first size-like entry)."""
+    for key, value in specs.items():
+        if any(p in key.lower() for p in DIMENSION_SPEC_KEYS):
+            return value[:100]
+    return None
+
+
+def parse_price_tiers(tier_texts: List[str]) -> List[Dict[str, Any]]:
+    """
+    Quantity price tiers from detail page text.
+
+    Args:
+        tier_texts: One text per tier, e.g. "¥12.50 2-99件" or "≥100个 ¥10.00"
+
+    Returns:
+        [{"min_qty": int, "price": float}, ...] sorted by quantity
+    """
+    tiers = []
+    for text in tier_texts:
+        price_match = TIER_PRICE_PATTERN.search(text)
+        if not price_match:
+            continue
+        qty_match = TIER_QTY_PATTERN.search(text)
+        tiers.append({
+            "min_qty": int(qty_match.group(1)) if qty_match else 1,
+            "price": float(price_match.group(1) or price_match.group(2)),
+        })
+    tiers.sort(key=lambda t: t["min_qty"])
+    return tiers
+
+
+def tier_price(price_tiers: Optional[List[Dict[str, Any]]], quantity: int, default: float) -> float:
+    """Unit price for ``quantity`` from price tiers (``default`` without tiers)."""
+    price = None
+    for tier in price_tiers or []:
+        if tier["min_qty"] <= quantity or price is None:
+            price = tier["price"]
+    return float(price) if price is not None else default
+
+
 def filter_by_price(supplier: Supplier1688, max_price: float = 500) -> bool:
     """Filter supplier by price."""
     return supplier.price <= max_price
@@ -310,6 +300,7 @@ def calculate_supplier_score(
     supplier: Supplier1688,
     source_price: float,
     source_currency: str = "AUD",
+    relevance: Optional[float] = None,
 ) -> float:
     """
     Calculate comprehensive supplier score.
@@ -325,6 +316,7 @@ def calculate_supplier_score(
         supplier: Supplier data
         source_price: Source product price
         source_currency: Source currency (AUD/NZD)
+        relevance: Title similarity to the source product (0-1), if known
 
     Returns:
         Score from 0-100
@@ -364,8 +356,8 @@ def calculate_supplier_score(
     if supplier.is_small_medium:
         logistics_score += 30
 
-    # 5. Match relevance (assumed good from search ranking)
-    match_score = 80
+    # 5. Match relevance (assumed good from search ranking when unknown)
+    match_score = 80 if relevance is None else max(0.0, min(relevance, 1.0)) * 100
 
     # Calculate weighted final score
     final_score = (
@@ -379,6 +371,24 @@ def calculate_supplier_score(
     return round(final_score, 2)
 
 
+def supplier_from_row(row: dict) -> Supplier1688:
+    """Build a supplier from a cached suppliers_1688 row."""
+    offer_id = str(row.get("offer_id") or "")
+    return Supplier1688(
+        offer_id=offer_id,
+        title=row.get("title") or "",
+        price=float(row.get("price") or 0),
+        sold_count=int(row.get("sold_count") or 0),
+        image_url=row.get("image_url"),
+        product_url=row.get("product_url") or f"https://detail.1688.com/offer/{offer_id}.html",
+        supplier_name=row.get("supplier_name") or "Unknown",
+        location=row.get("location"),
+        moq=int(row.get("moq") or 1),
+        weight=float(row["weight_kg"]) if row.get("weight_kg") is not None else None,
+        dimensions=row.get("dimensions"),
+    )
+
+
 def calculate_profit_estimate(
     source_price: float,
     source_currency: str,
@@ -448,6 +458,180 @@ def calculate_profit_estimate(
     }
 
 
+# ============ Offer JSON Capture ============
+
+# Search data arrives as JSON/JSONP from 1688.com and its subdomains
+# (mtop gateway h5api.m.1688.com, search service)
+OFFER_RESPONSE_DOMAIN = "1688.com"
+OFFER_RESPONSE_TYPES = frozenset({"xhr", "fetch", "script"})
+OFFER_ID_KEYS = ("offerId", "id")
+# Outside ``offerList``, a list only counts as offers when its items carry a
+# title, a price and either an offerId or a detail-page URL
+OFFER_TITLE_KEYS = ("subject", "title")
+OFFER_PRICE_KEYS = ("price", "priceInfo")
+OFFER_URL_KEYS = ("detailUrl", "offerUrl", "linkUrl", "url")
+JSONP_PATTERN = re.compile(r"^\s*[\w$.]+\s*\((.*)\)\s*;?\s*$", re.DOTALL)
+OFFER_LIST_MARKER = re.compile(r'"offerList"\s*:\s*\[')
+MAX_OFFER_SEARCH_DEPTH = 8
+
+
+def parse_json_body(text: str) -> Optional[Any]:
+    """Parse a JSON or JSONP response body; None if it's neither."""
+    text = (text or "").strip()
+    if not text:
+        return None
+    if text[0] not in "[{":
+        match = JSONP_PATTERN.match(text)
+        if not match:
+            return None
+        text = match.group(1)
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+def _is_offer(item: Any) -> bool:
+    if not isinstance(item, dict) or not any(item.get(key) for key in OFFER_ID_KEYS):
+        return False
+    if not any(item.get(key) for key in OFFER_TITLE_KEYS) or not any(item.get(key) for key in OFFER_PRICE_KEYS):
+        return False
+    return bool(item.get("offerId")) or any("/offer/" in str(item.get(key) or "") for key in OFFER_URL_KEYS)
+
+
+def find_offers(payload: Any, depth: int = 0) -> List[dict]:
+    """
+    Offer dicts anywhere in a search API payload.
+
+    Looks for ``offerList`` first, then any list whose items look like
+    offers (see ``_is_offer``), without descending past
+    ``MAX_OFFER_SEARCH_DEPTH`` levels.
+    """
+    if depth > MAX_OFFER_SEARCH_DEPTH:
+        return []
+    if isinstance(payload, dict):
+        offer_list = payload.get("offerList")
+        if isinstance(offer_list, list):
+            return [offer for offer in offer_list if isinstance(offer, dict)]
+        for value in payload.values():
+            if isinstance(value, (dict, list)):
+                found = find_offers(value, depth + 1)
+                if found:
+                    return found
+    elif isinstance(payload, list):
+        if payload and all(_is_offer(item) for item in payload[:3]):
+            return [item for item in payload if isinstance(item, dict)]
+        for value in payload:
+            if isinstance(value, (dict, list)):
+                found = find_offers(value, depth + 1)
+                if found:
+                    return found
+    return []
+
+
+def extract_offer_list(script: str) -> List[dict]:
+    """Decode the ``"offerList": [...]`` array embedded in a script."""
+    match = OFFER_LIST_MARKER.search(script or "")
+    if not match:
+        return []
+    try:
+        offers, _ = json.JSONDecoder().raw_decode(script, match.end() - 1)
+    except ValueError:
+        return []
+    return [offer for offer in offers if isinstance(offer, dict)]
+
+
+class OfferCapture:
+    """
+    Collects offer JSON from a page's search API responses.
+
+    Attach once per page; call ``reset`` before each navigation and
+    ``offers`` after it to get the offers seen in the meantime.
+    """
+
+    def __init__(self):
+        self._offers: Dict[str, dict] = {}
+        self._pending: set = set()
+
+    def attach(self, page) -> None:
+        page.on("response", self._on_response)
+
+    def reset(self) -> None:
+        # Reads still pending belong to the previous navigation
+        for task in self._pending:
+            task.cancel()
+        self._pending.clear()
+        self._offers.clear()
+
+    @staticmethod
+    def is_candidate(url: str, resource_type: str, content_type: str) -> bool:
+        try:
+            host = (urlsplit(url).hostname or "").lower()
+        except ValueError:
+            return False
+        return (
+            (host == OFFER_RESPONSE_DOMAIN or host.endswith("." + OFFER_RESPONSE_DOMAIN))
+            and resource_type in OFFER_RESPONSE_TYPES
+            and ("json" in content_type or "javascript" in content_type)
+        )
+
+    def _on_response(self, response) -> None:
+        headers = response.headers or {}
+        if not self.is_candidate(response.url, response.request.resource_type, headers.get("content-type", "")):
+            return
+        task = asyncio.ensure_future(self._read(response))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _read(self, response) -> None:
+        try:
+            text = await response.text()
+        except Exception:
+            return
+        self.add_payload(parse_json_body(text))
+
+    def add_payload(self, payload: Any) -> int:
+        """Record the offers found in one decoded payload."""
+        added = 0
+        for offer in find_offers(payload) if payload is not None else []:
+            offer_id = str(offer.get("offerId") or offer.get("id") or "")
+            if offer_id and offer_id not in self._offers:
+                self._offers[offer_id] = offer
+                added += 1
+        return added
+
+    async def offers(self) -> List[dict]:
+        """Offers captured since the last reset, once pending reads finish."""
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+        return list(self._offers.values())
+
+
+# Search result item selectors (updated 2026), in preference order.
+# Each is scoped to the main results list, so similar/recommended sections
+# never become the cached winner.
+SEARCH_ITEM_SELECTORS = (
+    ".sm-offer-list .sm-offer-item",  # Standard offer list
+    ".offer-list .offer-list-row",  # Offer list rows
+    "#sm-offer-list .search-offer-item",  # ID-based selector
+    ".app-offer-list .space-offer-card-box",  # App offer list
+)
+
+# Only tried when none of the above match, and never cached as the winning
+# selector: outside the result list these also match similar/recommended
+# offers, then any product card
+SEARCH_ITEM_FALLBACK_SELECTORS = (
+    ".sm-offer-item",
+    ".offer-list-row",
+    ".search-offer-item:not([class*='similar']):not([class*='recommend'])",
+    "[data-offer-id]",  # Elements with offer ID attribute
+    ".card",
+    "[class*='offer']",
+    "[class*='product']",
+    "a[href*='detail']",
+)
+
+
 # ============ Scraper Class ============
 
 class Alibaba1688Scraper:
@@ -456,11 +640,12 @@ class Alibaba1688Scraper:
     BASE_URL = "https://s.1688.com"
     DETAIL_URL = "https://detail.1688.com"
 
-    def __init__(self):
+    def __init__(self, selector_cache: Optional[SelectorCache] = None):
         self._browser = None
         self._playwright = None
         self._request_count = 0
         self._max_requests_per_session = 50
+        self._selectors = selector_cache or get_selector_cache()
 
     async def _get_browser(self):
         """Get or create browser instance."""
@@ -473,6 +658,10 @@ class Alibaba1688Scraper:
             if self._playwright:
                 await self._playwright.stop()
             try:
+                from playwright.async_api import async_playwright
+
+                if not STEALTH_AVAILABLE:
+                    logger.warning("playwright-stealth not installed, bot detection bypass disabled")
                 self._playwright = await async_playwright().start()
                 self._browser = await self._playwright.chromium.launch(
                     headless=True,
@@ -485,8 +674,7 @@ class Alibaba1688Scraper:
                 self._request_count = 0
             except Exception as e:
                 # Browser binary not found or launch failed
-                print(f"Failed to launch browser: {e}")
-                print("Playwright browsers may not be installed. Run: playwright install chromium")
+                logger.error("Failed to launch browser: %s (are the browsers installed? playwright install chromium)", e)
                 self._playwright = None
                 self._browser = None
                 return None
@@ -508,29 +696,149 @@ class Alibaba1688Scraper:
         limit: int = 20,
         source_price: float = 0,
         source_currency: str = "AUD",
+        max_pages: Optional[int] = None,
     ) -> List[Supplier1688]:
         """
         Search suppliers on 1688.
 
+        Walks result pages only until ``limit`` suppliers have passed the
+        price and size filters; the last page is always taken whole, so the
+        best-scored offers on it are ranked, not just the first ones.
+
         Args:
             keyword: Chinese search keyword
             max_price: Maximum price in CNY
             limit: Number of results to return
             source_price: Source product price for scoring
             source_currency: Source currency
+            max_pages: Result pages to walk at most (default: settings)
 
         Returns:
             List of supplier data
         """
+        suppliers = []
+        pages = self.iter_supplier_pages(
+            keyword,
+            max_price=max_price,
+            per_page=limit * 2,  # Get extra for filtering
+            source_price=source_price,
+            source_currency=source_currency,
+            max_pages=max_pages,
+        )
+        try:
+            async for page_suppliers in pages:
+                suppliers.extend(page_suppliers)
+                if len(suppliers) >= limit:
+                    break
+        except Exception as e:
+            logger.error("1688 scraping error: %s", e)
+        finally:
+            await pages.aclose()
+
+        # Sort by score
+        suppliers.sort(key=lambda x: x.match_score or 0, reverse=True)
+
+        return suppliers[:limit]
+
+    async def iter_suppliers(
+        self,
+        keyword: str,
+        max_price: float = 500,
+        per_page: int = 40,
+        source_price: float = 0,
+        source_currency: str = "AUD",
+        max_pages: Optional[int] = None,
+    ) -> AsyncIterator[Supplier1688]:
+        """
+        Yield suppliers that pass ``filter_by_price``/``filter_by_size``,
+        page by page (``beginPage``).
+
+        The next page is only requested when the consumer keeps iterating,
+        so breaking out early saves the remaining navigations. See
+        ``iter_supplier_pages`` for when the walk stops.
+        """
+        pages = self.iter_supplier_pages(
+            keyword,
+            max_price=max_price,
+            per_page=per_page,
+            source_price=source_price,
+            source_currency=source_currency,
+            max_pages=max_pages,
+        )
+        try:
+            async for suppliers in pages:
+                for supplier in suppliers:
+                    yield supplier
+        finally:
+            await pages.aclose()
+
+    async def iter_supplier_pages(
+        self,
+        keyword: str,
+        max_price: float = 500,
+        per_page: int = 40,
+        source_price: float = 0,
+        source_currency: str = "AUD",
+        max_pages: Optional[int] = None,
+    ) -> AsyncIterator[List[Supplier1688]]:
+        """
+        Yield the suppliers of each results page that pass the filters
+        (possibly an empty list when the page had only rejects). Stops at
+        ``max_pages``, on an empty page, or when a page repeats offers
+        already seen (1688 serves the last page again past the end).
+
+        Args:
+            keyword: Chinese search keyword
+            max_price: Maximum price in CNY
+            per_page: Items to parse per results page
+            source_price: Source product price for scoring
+            source_currency: Source currency
+            max_pages: Result pages to walk at most (default: settings)
+        """
         # Check if Playwright is available
         if not PLAYWRIGHT_AVAILABLE:
-            print("Playwright not available - scraping disabled. Returning empty results.")
-            return []
+            logger.warning("Playwright not available - scraping disabled. Returning empty results.")
+            return
 
         browser = await self._get_browser()
         if browser is None:
-            return []
+            return
+
+        max_pages = max_pages or settings.alibaba_1688_max_pages
+        context = await self.new_context(browser)
+        page = await self.new_page(context)
+        capture = OfferCapture()
+        capture.attach(page)
+
+        seen: set = set()
+        try:
+            for page_no in range(1, max_pages + 1):
+                capture.reset()
+                if not await self._load_search_page(page, keyword, max_price, page_no):
+                    return
+
+                # Offers from the search API responses; DOM parsing only when none came through.
+                # Capped at per_page // 2 like the DOM path
+                suppliers = self._parse_json_offers(
+                    await capture.offers(), max(1, per_page // 2), source_price, source_currency,
+                )
+                if suppliers:
+                    logger.info("Captured %d offers from search API responses", len(suppliers))
+                else:
+                    suppliers = await self._extract_suppliers(page, per_page // 2, source_price, source_currency)
+                fresh = [s for s in suppliers if s.offer_id not in seen]
+                logger.info("Page %d: extracted %d suppliers (%d new)", page_no, len(suppliers), len(fresh))
+                if not fresh:
+                    return
+
+                seen.update(s.offer_id for s in fresh)
+                yield [s for s in fresh if filter_by_price(s, max_price) and filter_by_size(s)]
+        finally:
+            await page.close()
+            await context.close()
 
+    async def new_context(self, browser):
+        """Browser context with the configured 1688 cookies."""
         context = await browser.new_context(
             user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             viewport={"width": 1920, "height": 1080},
@@ -557,94 +865,79 @@ class Alibaba1688Scraper:
                         formatted_cookie["secure"] = cookie["secure"]
                     formatted_cookies.append(formatted_cookie)
                 await context.add_cookies(formatted_cookies)
-                print(f"[1688] Added {len(formatted_cookies)} cookies from config")
+                logger.info("Added %d cookies from config", len(formatted_cookies))
             except json.JSONDecodeError as e:
-                print(f"[1688] Warning: Failed to parse cookies JSON: {e}")
+                logger.warning("Failed to parse cookies JSON: %s", e)
             except Exception as e:
-                print(f"[1688] Warning: Failed to add cookies: {e}")
+                logger.warning("Failed to add cookies: %s", e)
 
+        return context
+
+    async def new_page(self, context) -> "Page":
+        """New tab with stealth applied to bypass bot detection."""
         page = await context.new_page()
+        if STEALTH_AVAILABLE:
+            from playwright_stealth import stealth_async
 
-        # Apply stealth to bypass bot detection
-        if STEALTH_AVAILABLE and stealth_async:
             await stealth_async(page)
-            print("[1688] Stealth mode applied")
-
-        try:
-            # Build search URL with price filter
-            search_url = f"{self.BASE_URL}/selloffer/offer_search.htm"
-            params = {
-                "keywords": keyword,
-                "n": "y",
-                "spm": "a26352.13672862.searchbox.input",
-            }
-
-            # Add price filter
-            if max_price > 0:
-                params["e_price"] = str(int(max_price))
-
-            url = f"{search_url}?{'&'.join(f'{k}={v}' for k, v in params.items())}"
-
-            # Navigate with retry
-            for attempt in range(3):
-                try:
-                    await page.goto(url, wait_until="networkidle", timeout=30000)
-                    break
-                except Exception as e:
-                    if attempt == 2:
-                        raise
-                    await asyncio.sleep(2)
-
-            self._request_count += 1
-
-            # Wait for content
-            await asyncio.sleep(2)
-
-            # Debug: Log current URL and page title
-            current_url = page.url
-            page_title = await page.title()
-            print(f"[1688] Current URL: {current_url}")
-            print(f"[1688] Page title: {page_title}")
-
-            # Get page content sample for debugging
-            body_sample = await page.evaluate("() => document.body ? document.body.innerText.slice(0, 300) : 'No body'")
-            print(f"[1688] Page content sample: {body_sample[:200]}...")
-
-            # Check for CAPTCHA/verification page
-            if "验证码" in page_title or "滑块" in body_sample or "验证" in body_sample[:100]:
-                print("[1688] CAPTCHA/verification page detected - stealth may not be working")
-                return []
+        return instrument_page(page, "1688")
+
+    def search_url(self, keyword: str, max_price: float = 500, page_no: int = 1) -> str:
+        """Search results URL for one page."""
+        params = {
+            "keywords": keyword,
+            "n": "y",
+            "spm": "a26352.13672862.searchbox.input",
+        }
+
+        # Add price filter
+        if max_price > 0:
+            params["e_price"] = str(int(max_price))
+        if page_no > 1:
+            params["beginPage"] = str(page_no)
+
+        return f"{self.BASE_URL}/selloffer/offer_search.htm?{'&'.join(f'{k}={v}' for k, v in params.items())}"
+
+    async def _load_search_page(self, page: "Page", keyword: str, max_price: float, page_no: int) -> bool:
+        """Navigate to a results page; False when blocked by CAPTCHA or login."""
+        url = self.search_url(keyword, max_price, page_no)
+
+        # Navigate through the 1688 host guard: paced, retried within the
+        # retry budget and skipped outright while the circuit is open
+        await get_host_guard("s.1688.com").call(
+            lambda: page.goto(url, wait_until="networkidle", timeout=30000),
+            retryable=lambda e: True,
+        )
 
-            # Check if redirected to login
-            if "login" in current_url.lower() or "passport" in current_url.lower():
-                print("[1688] Warning: Redirected to login page - cookies may have expired")
-                return []
+        self._request_count += 1
 
-            # Extract suppliers
-            suppliers = await self._extract_suppliers(page, limit, source_price, source_currency)
-            print(f"[1688] Extracted {len(suppliers)} suppliers")
+        # Wait for content
+        await asyncio.sleep(2)
 
-            # Filter by price
-            suppliers = [s for s in suppliers if filter_by_price(s, max_price)]
+        current_url = page.url
+        page_title = await page.title()
 
-            # Filter by size
-            suppliers = [s for s in suppliers if filter_by_size(s)]
+        # Page content sample (also used for the CAPTCHA check below)
+        body_sample = await page.evaluate("() => document.body ? document.body.innerText.slice(0, 300) : 'No body'")
+        logger.debug(
+            "Loaded %s (title %r): %s...", current_url, page_title, body_sample[:200], extra=SAMPLED
+        )
 
-            # Sort by score
-            suppliers.sort(key=lambda x: x.match_score or 0, reverse=True)
+        # Check for CAPTCHA/verification page
+        if "验证码" in page_title or "滑块" in body_sample or "验证" in body_sample[:100]:
+            logger.warning("CAPTCHA/verification page detected - stealth may not be working")
+            return False
 
-            return suppliers[:limit]
+        # Check if redirected to login
+        if "login" in current_url.lower() or "passport" in current_url.lower():
+            logger.warning("Redirected to login page - cookies may have expired")
+            return False
 
-        except Exception as e:
-            print(f"1688 scraping error: {e}")
-            return []
-        finally:
-            await page.close()
-            await context.close()
+        return True
 
     async def _extract_suppliers(
         self,
-        page: Page,
+        page: "Page",
         limit: int,
         source_price: float,
         source_currency: str,
@@ -652,55 +945,18 @@ class Alibaba1688Scraper:
         """Extract supplier data from search results page."""
         suppliers = []
 
-        # Try different selectors for 1688 search results (updated 2026)
-        # Focus on main search results area, exclude similar/recommended sections
-        selectors = [
-            # Main search result containers - more specific selectors first
-            ".sm-offer-list .sm-offer-item",  # Standard offer list
-            ".offer-list .offer-list-row",  # Offer list rows
-            "#sm-offer-list .search-offer-item",  # ID-based selector
-            ".app-offer-list .space-offer-card-box",  # App offer list
-            # Fallback to broader selectors
-            ".sm-offer-item",
-            ".offer-list-row",
-            ".search-offer-item:not([class*='similar']):not([class*='recommend'])",
-            "[data-offer-id]",  # Elements with offer ID attribute
-        ]
-
-        items = []
-        used_selector = None
-
-        # Simple approach: use first selector that finds items
-        for selector in selectors:
-            try:
-                found_items = await page.query_selector_all(selector)
-                print(f"[1688] Selector '{selector}': found {len(found_items)} items")
-                if found_items:
-                    items = found_items
-                    used_selector = selector
-                    print(f"[1688] Using selector '{selector}'")
-                    break
-            except Exception as e:
-                print(f"[1688] Selector '{selector}' error: {e}")
-                continue
-
-        # Additional fallback: try to find any product cards
-        if not items:
-            fallback_selectors = [".card", "[class*='offer']", "[class*='product']", "a[href*='detail']"]
-            for selector in fallback_selectors:
-                try:
-                    items = await page.query_selector_all(selector)
-                    if items:
-                        used_selector = selector
-                        print(f"[1688] Fallback: using '{selector}' with {len(items)} items")
-                        break
-                except:
-                    continue
+        # Last winning selector first; the full list is only re-probed when it stops matching
+        used_selector, items = await self._selectors.query_all(
+            page, "1688", "search", SEARCH_ITEM_SELECTORS, SEARCH_ITEM_FALLBACK_SELECTORS,
+        )
+        if used_selector:
+            logger.debug("Using selector %r (%d items)", used_selector, len(items), extra=SAMPLED)
 
         if not items:
-            # Log page content sample for debugging
-            body_text = await page.evaluate("() => document.body ? document.body.innerText.slice(0, 500) : 'No body'")
-            print(f"[1688] No items found. Page content sample: {body_text[:200]}...")
+            if logger.isEnabledFor(logging.DEBUG):
+                # Page content sample for debugging; skip the round trip otherwise
+                body_text = await page.evaluate("() => document.body ? document.body.innerText.slice(0, 500) : 'No body'")
+                logger.debug("No items found. Page content sample: %s...", body_text[:200], extra=SAMPLED)
             # Try to extract from page content directly
             return await self._extract_from_json(page, limit, source_price, source_currency)
 
@@ -710,14 +966,14 @@ class Alibaba1688Scraper:
                 if supplier:
                     suppliers.append(supplier)
             except Exception as e:
-                print(f"Error parsing supplier item: {e}")
+                logger.debug("Error parsing supplier item: %s", e, extra=SAMPLED)
                 continue
 
         return suppliers
 
     async def _extract_from_json(
         self,
-        page: Page,
+        page: "Page",
         limit: int,
         source_price: float,
         source_currency: str,
@@ -740,21 +996,30 @@ class Alibaba1688Scraper:
             """)
 
             if script_content:
-                # Parse JSON from script
-                match = re.search(r'"offerList"\s*:\s*(\[.*?\])', script_content, re.DOTALL)
-                if match:
-                    import json
-                    offers = json.loads(match.group(1))
-                    for offer in offers[:limit]:
-                        supplier = self._parse_json_offer(offer, source_price, source_currency)
-                        if supplier:
-                            suppliers.append(supplier)
+                suppliers = self._parse_json_offers(
+                    extract_offer_list(script_content), limit, source_price, source_currency
+                )
 
         except Exception as e:
-            print(f"Error extracting JSON data: {e}")
+            logger.warning("Error extracting JSON data: %s", e)
 
         return suppliers
 
+    def _parse_json_offers(
+        self,
+        offers: List[dict],
+        limit: int,
+        source_price: float,
+        source_currency: str,
+    ) -> List[Supplier1688]:
+        """Parse up to ``limit`` suppliers from JSON offers."""
+        suppliers = []
+        for offer in offers[:limit]:
+            supplier = self._parse_json_offer(offer, source_price, source_currency)
+            if supplier and supplier.offer_id:
+                suppliers.append(supplier)
+        return suppliers
+
     async def _parse_supplier_item(
         self,
         item,
@@ -788,7 +1053,7 @@ class Alibaba1688Scraper:
 
             # Log URLs for debugging (temporarily allowing all)
             if "similar_search" in url or "recommend" in url:
-                print(f"[1688] Warning: Non-standard URL: {url[:80]}...")
+                logger.debug("Non-standard URL: %s...", url[:80], extra=SAMPLED)
 
             if url and not url.startswith("http"):
                 url = f"https:{url}" if url.startswith("//") else f"https://detail.1688.com{url}"
@@ -804,9 +1069,9 @@ class Alibaba1688Scraper:
                     # Use hash of URL as fallback identifier
                     import hashlib
                     offer_id = hashlib.md5(url.encode()).hexdigest()[:12]
-                    print(f"[1688] Using hash as offer_id for: {url[:60]}...")
+                    logger.debug("Using hash as offer_id for: %s...", url[:60], extra=SAMPLED)
                 else:
-                    print(f"[1688] No valid identifier found")
+                    logger.debug("No valid identifier found", extra=SAMPLED)
                     return None
 
             # Extract image
@@ -856,7 +1121,7 @@ class Alibaba1688Scraper:
             return supplier
 
         except Exception as e:
-            print(f"Error parsing supplier: {e}")
+            logger.debug("Error parsing supplier: %s", e, extra=SAMPLED)
             return None
 
     def _parse_json_offer(
@@ -890,7 +1155,7 @@ class Alibaba1688Scraper:
             return supplier
 
         except Exception as e:
-            print(f"Error parsing JSON offer: {e}")
+            logger.debug("Error parsing JSON offer: %s", e, extra=SAMPLED)
             return None
 
     def _parse_price(self, price_text: str) -> float:
@@ -926,6 +1191,76 @@ class Alibaba1688Scraper:
             return match.group(1)
         return url.split("/")[-1].replace(".html", "")
 
+    async def read_detail_page(self, page: "Page", offer_id: str) -> dict:
+        """
+        Load an offer's detail page in ``page`` and parse it.
+
+        Returns:
+            Details dict with title, price_tiers, moq, specifications,
+            images, weight (kg) and dimensions when found
+        """
+        url = f"{self.DETAIL_URL}/offer/{offer_id}.html"
+        await page.goto(url, wait_until="networkidle", timeout=30000)
+        self._request_count += 1
+
+        await asyncio.sleep(2)
+
+        # Extract detailed information
+        details = {
+            "offer_id": offer_id,
+            "url": url,
+        }
+
+        # Title
+        title_elem = await page.query_selector("h1, .mod-detail-title")
+        if title_elem:
+            details["title"] = await title_elem.inner_text()
+
+        # Price tiers
+        tier_elems = await page.query_selector_all(".price-tier, .ladder-price-item")
+        details["price_tiers"] = parse_price_tiers([await tier.inner_text() for tier in tier_elems])
+
+        # MOQ (first price tier when the page has no explicit minimum)
+        moq_elem = await page.query_selector("[class*='min-order'], .unit-price")
+        moq_match = MOQ_PATTERN.search(await moq_elem.inner_text()) if moq_elem else None
+        if moq_match:
+            details["moq"] = int(moq_match.group(1))
+        elif details["price_tiers"]:
+            details["moq"] = details["price_tiers"][0]["min_qty"]
+
+        # Specifications
+        specs = {}
+        spec_rows = await page.query_selector_all(".obj-content tr, .attribute-item")
+        for row in spec_rows:
+            try:
+                cells = await row.query_selector_all("td, span")
+                if len(cells) >= 2:
+                    key = await cells[0].inner_text()
+                    value = await cells[1].inner_text()
+                    specs[key.strip()] = value.strip()
+            except:
+                pass
+        details["specifications"] = specs
+
+        # Images
+        images = []
+        img_elems = await page.query_selector_all(".detail-gallery img, .detail-pictures img")
+        for img in img_elems[:10]:
+            src = await img.get_attribute("src")
+            if src:
+                images.append(src if src.startswith("http") else f"https:{src}")
+        details["images"] = images
+
+        # Weight and dimensions from the specification table
+        weight = parse_weight_kg(specs)
+        if weight is not None:
+            details["weight"] = weight
+        dimensions = parse_dimensions_spec(specs)
+        if dimensions:
+            details["dimensions"] = dimensions
+
+        return details
+
     async def get_product_details(self, offer_id: str) -> Optional[dict]:
         """
         Get detailed product information.
@@ -938,103 +1273,21 @@ class Alibaba1688Scraper:
         """
         # Check if Playwright is available
         if not PLAYWRIGHT_AVAILABLE:
-            print("Playwright not available - returning None for product details.")
+            logger.warning("Playwright not available - returning None for product details.")
             return None
 
         browser = await self._get_browser()
         if browser is None:
             return None
 
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
-            viewport={"width": 1920, "height": 1080},
-            locale="zh-CN",
-        )
-        page = await context.new_page()
-
-        # Apply stealth to bypass bot detection
-        if STEALTH_AVAILABLE and stealth_async:
-            await stealth_async(page)
+        context = await self.new_context(browser)
+        page = await self.new_page(context)
 
         try:
-            url = f"{self.DETAIL_URL}/offer/{offer_id}.html"
-            await page.goto(url, wait_until="networkidle", timeout=30000)
-            self._request_count += 1
-
-            await asyncio.sleep(2)
-
-            # Extract detailed information
-            details = {
-                "offer_id": offer_id,
-                "url": url,
-            }
-
-            # Title
-            title_elem = await page.query_selector("h1, .mod-detail-title")
-            if title_elem:
-                details["title"] = await title_elem.inner_text()
-
-            # Price tiers
-            price_tiers = []
-            tier_elems = await page.query_selector_all(".price-tier, .ladder-price-item")
-            for tier in tier_elems:
-                tier_text = await tier.inner_text()
-                price_tiers.append(tier_text)
-            details["price_tiers"] = price_tiers
-
-            # MOQ
-            moq_elem = await page.query_selector("[class*='min-order'], .unit-price")
-            if moq_elem:
-                moq_text = await moq_elem.inner_text()
-                moq_match = re.search(r"(\d+)", moq_text)
-                details["moq"] = int(moq_match.group(1)) if moq_match else 1
-
-            # Specifications
-            specs = {}
-            spec_rows = await page.query_selector_all(".obj-content tr, .attribute-item")
-            for row in spec_rows:
-                try:
-                    cells = await row.query_selector_all("td, span")
-                    if len(cells) >= 2:
-                        key = await cells[0].inner_text()
-                        value = await cells[1].inner_text()
-                        specs[key.strip()] = value.strip()
-                except:
-                    pass
-            details["specifications"] = specs
-
-            # Images
-            images = []
-            img_elems = await page.query_selector_all(".detail-gallery img, .detail-pictures img")
-            for img in img_elems[:10]:
-                src = await img.get_attribute("src")
-                if src:
-                    images.append(src if src.startswith("http") else f"https:{src}")
-            details["images"] = images
-
-            # Weight (try to extract from specs)
-            weight_patterns = ["重量", "weight", "净重"]
-            for key, value in specs.items():
-                if any(p in key.lower() for p in weight_patterns):
-                    weight_match = re.search(r"([\d.]+)\s*(?:kg|g|千克|克)", value.lower())
-                    if weight_match:
-                        weight = float(weight_match.group(1))
-                        if "g" in value.lower() or "克" in value:
-                            weight /= 1000
-                        details["weight"] = weight
-                        break
-
-            # Dimensions
-            dim_patterns = ["尺寸", "size", "dimension", "规格"]
-            for key, value in specs.items():
-                if any(p in key.lower() for p in dim_patterns):
-                    details["dimensions"] = value
-                    break
-
-            return details
+            return await self.read_detail_page(page, offer_id)
 
         except Exception as e:
-            print(f"Error getting product details: {e}")
+            logger.error("Error getting product details: %s", e)
             return None
         finally:
             await page.close()
@@ -1048,6 +1301,7 @@ async def match_suppliers_for_products(
     max_price: float = 500,
     limit_per_product: int = 10,
     include_large: bool = False,
+    scraper: Optional[Alibaba1688Scraper] = None,
 ) -> List[dict]:
     """
     Match 1688 suppliers for multiple AU/NZ products.
@@ -1057,34 +1311,72 @@ async def match_suppliers_for_products(
         max_price: Max supplier price in CNY
         limit_per_product: Number of suppliers per product
         include_large: Include large items
+        scraper: Scraper for live searches (default: a new one, closed
+            afterwards; a passed-in scraper is left open)
 
     Returns:
         List of match results
     """
-    scraper = Alibaba1688Scraper()
+    # Imported here: the translation cache and enricher build on this module
+    from app.services.supplier_enrichment import get_supplier_enricher
+    from app.services.translation_cache import get_translation_cache
+
+    owns_scraper = scraper is None
+    scraper = scraper or Alibaba1688Scraper()
     results = []
 
+    # Known titles skip keyword extraction entirely
+    translations = get_translation_cache().get_many(
+        [product.get("title", "") for product in products]
+    )
+
+    index = get_supplier_index()
+    enricher = get_supplier_enricher()
+
     try:
         for product in products:
-            # Extract keywords
-            keywords = extract_keywords(product.get("title", ""))
-            chinese_keywords = translate_to_chinese(keywords)
+            title = product.get("title", "")
+            chinese_keywords = translations[title]["chinese_keywords"]
+            source_price = float(product.get("price", 0))
+            source_currency = product.get("currency", "AUD")
+            # English words share Latin n-grams with unrelated offers ("LED",
+            # "case"), so the title is only the query when nothing translated
+            query = " ".join(chinese_keywords) or title
 
             all_suppliers = []
 
-            # Search with each keyword
-            for keyword in chinese_keywords[:2]:  # Try top 2 keywords
-                suppliers = await scraper.search_suppliers(
-                    keyword=keyword,
-                    max_price=max_price,
-                    limit=limit_per_product * 2,
-                    source_price=float(product.get("price", 0)),
-                    source_currency=product.get("currency", "AUD"),
-                )
-                all_suppliers.extend(suppliers)
-
-                # Small delay between requests
-                await asyncio.sleep(1)
+            # Answer from the local similarity index first
+            if index is not None:
+                matches = index.search(query, limit=limit_per_product * 2, max_price=max_price)
+                # Offers without current detail data get weight/size fetched in the background
+                enricher.submit(row["offer_id"] for row, _ in matches if enricher.needs_details(row))
+                for row, similarity in matches:
+                    supplier = supplier_from_row(row)
+                    supplier.match_score = calculate_supplier_score(
+                        supplier, source_price, source_currency, relevance=similarity,
+                    )
+                    all_suppliers.append(supplier)
+
+            # Only scrape live when the index can't fill the request
+            if len(all_suppliers) < limit_per_product:
+                for keyword in chinese_keywords[:2]:  # Try top 2 keywords
+                    suppliers = await scraper.search_suppliers(
+                        keyword=keyword,
+                        max_price=max_price,
+                        limit=limit_per_product * 2,
+                        source_price=source_price,
+                        source_currency=source_currency,
+                    )
+                    for supplier in suppliers:
+                        if index is not None:
+                            supplier.match_score = calculate_supplier_score(
+                                supplier, source_price, source_currency,
+                                relevance=index.similarity(query, supplier.title),
+                            )
+                    all_suppliers.extend(suppliers)
+
+                    # Small delay between requests
+                    await asyncio.sleep(1)
 
             # Deduplicate by offer_id
             seen_ids = set()
@@ -1111,6 +1403,7 @@ async def match_suppliers_for_products(
             })
 
     finally:
-        await scraper.close()
+        if owns_scraper:
+            await scraper.close()
 
     return results
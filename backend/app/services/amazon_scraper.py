@@ -5,11 +5,18 @@ import re
 from typing import List, Optional
 from playwright.async_api import async_playwright, Browser, Page
 
+from app.log import SAMPLED, get_logger
+from app.services.platforms import block_heavy_resources, probe_result, probe_sample_size
+from app.services.tracing import instrument_page
+
+logger = get_logger(__name__)
+
 
 class AmazonScraper:
     """Scraper for Amazon Australia (serves both AU and NZ markets)."""
 
     BASE_URL = "https://www.amazon.com.au"
+    USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 
     def __init__(self):
         self._browser: Optional[Browser] = None
@@ -48,12 +55,12 @@ class AmazonScraper:
             Dictionary with products and stats
         """
         browser = await self._get_browser()
-        page = await browser.new_page()
+        page = instrument_page(await browser.new_page(), "amazon")
 
         try:
             # Set user agent to avoid bot detection
             await page.set_extra_http_headers({
-                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+                "User-Agent": self.USER_AGENT
             })
 
             # Build search URL
@@ -87,7 +94,7 @@ class AmazonScraper:
             }
 
         except Exception as e:
-            print(f"Amazon scraping error: {e}")
+            logger.error("Amazon scraping error: %s", e)
             return {
                 "platform": "amazon_au",
                 "region": region,
@@ -101,6 +108,39 @@ class AmazonScraper:
         finally:
             await page.close()
 
+    async def probe(self, keyword: str, region: str = "AU", sample_size: Optional[int] = None) -> dict:
+        """
+        Result count from the results header plus a few card prices.
+
+        Images, fonts and stylesheets are blocked and cards aren't parsed one
+        by one: the price sample is read in a single page evaluation.
+
+        Returns:
+            ``probe_result`` dict (with ``error`` on failure)
+        """
+        browser = await self._get_browser()
+        page = instrument_page(await browser.new_page(), "amazon")
+
+        try:
+            await block_heavy_resources(page)
+            await page.set_extra_http_headers({"User-Agent": self.USER_AGENT})
+            await page.goto(f"{self.BASE_URL}/s?k={keyword}", wait_until="domcontentloaded", timeout=30000)
+
+            total_results = await self._get_results_count(page)
+            price_texts = await page.eval_on_selector_all(
+                "[data-component-type='s-search-result'] .a-price .a-offscreen",
+                "(els, n) => els.slice(0, n).map(e => e.textContent)",
+                probe_sample_size(sample_size),
+            )
+
+            return probe_result(total_results, [self._parse_price(t) for t in price_texts], "AUD")
+
+        except Exception as e:
+            logger.error("Amazon probe error: %s", e)
+            return {**probe_result(0, [], "AUD"), "error": str(e)}
+        finally:
+            await page.close()
+
     async def _get_results_count(self, page: Page) -> int:
         """Extract total results count from page."""
         try:
@@ -177,7 +217,7 @@ class AmazonScraper:
                 })
 
             except Exception as e:
-                print(f"Error extracting Amazon product: {e}")
+                logger.debug("Error extracting Amazon product: %s", e, extra=SAMPLED)
                 continue
 
         return products
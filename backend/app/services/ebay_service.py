@@ -3,8 +3,11 @@
 import httpx
 from typing import List, Optional
 from datetime import datetime
+from urllib.parse import urlsplit
 
 from app.config import settings
+from app.services.platforms import probe_result, probe_sample_size
+from app.services.resilience import ServerError, get_host_guard, raise_for_retryable_status
 
 
 class EbayService:
@@ -19,12 +22,26 @@ class EbayService:
         "NZ": "EBAY_AU",  # NZ uses AU marketplace
     }
     
-    def __init__(self, sandbox: bool = False):
+    def __init__(self, sandbox: bool = False, transport: Optional[httpx.AsyncBaseTransport] = None):
         self.base_url = self.SANDBOX_URL if sandbox else self.BASE_URL
         self.app_id = settings.ebay_app_id
         self.cert_id = settings.ebay_cert_id
         self._access_token: Optional[str] = None
         self._token_expires: Optional[datetime] = None
+        self._transport = transport
+        self.guard = get_host_guard(urlsplit(self.base_url).hostname)
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """One HTTP call through the eBay host guard (retries 429/5xx and network errors)."""
+        async def attempt() -> httpx.Response:
+            async with httpx.AsyncClient(transport=self._transport) as client:
+                return raise_for_retryable_status(await client.request(method, url, **kwargs))
+
+        try:
+            return await self.guard.call(attempt)
+        except ServerError as e:
+            # Counted against the host; callers still see the response
+            return e.response
     
     async def _get_access_token(self) -> str:
         """Get OAuth access token from eBay."""
@@ -34,27 +51,27 @@ class EbayService:
         # Client credentials grant
         auth_url = f"{self.base_url}/identity/v1/oauth2/token"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                auth_url,
-                data={
-                    "grant_type": "client_credentials",
-                    "scope": "https://api.ebay.com/oauth/api_scope",
-                },
-                auth=(self.app_id, self.cert_id),
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"Failed to get eBay access token: {response.text}")
-            
-            data = response.json()
-            self._access_token = data["access_token"]
-            # Token expires in seconds, subtract 60 for safety margin
-            expires_in = data.get("expires_in", 7200) - 60
-            self._token_expires = datetime.utcnow()
-            
-            return self._access_token
+        response = await self._request(
+            "POST",
+            auth_url,
+            data={
+                "grant_type": "client_credentials",
+                "scope": "https://api.ebay.com/oauth/api_scope",
+            },
+            auth=(self.app_id, self.cert_id),
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
+
+        if response.status_code != 200:
+            raise Exception(f"Failed to get eBay access token: {response.text}")
+
+        data = response.json()
+        self._access_token = data["access_token"]
+        # Token expires in seconds, subtract 60 for safety margin
+        expires_in = data.get("expires_in", 7200) - 60
+        self._token_expires = datetime.utcnow()
+
+        return self._access_token
     
     async def search_products(
         self,
@@ -76,44 +93,92 @@ class EbayService:
             offset: Pagination offset
             sort: Sort order (BEST_MATCH, PRICE, -PRICE, NEWLY_LISTED)
         """
+        data = await self.search_results(keyword, region, category_id, limit, offset, sort)
+        return data["products"]
+
+    async def search_results(
+        self,
+        keyword: str,
+        region: str = "AU",
+        category_id: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+        sort: str = "BEST_MATCH",
+    ) -> dict:
+        """
+        One page of products with the Browse API's ``total`` for the query.
+
+        Takes the same arguments as ``search_products``.
+
+        Returns:
+            Dict with total_results (every match, not just this page),
+            products and currency
+        """
+        data = await self._browse_search(keyword, region, category_id, limit, offset, sort)
+        items = data.get("itemSummaries", [])
+
+        # Transform to our product format
+        products = [self._transform_item(item, region) for item in items]
+        return {
+            "total_results": int(data.get("total", len(items))),
+            "products": products,
+            "currency": products[0]["currency"] if products else None,
+        }
+
+    async def probe(self, keyword: str, region: str = "AU", sample_size: Optional[int] = None) -> dict:
+        """
+        Total match count and a small price sample for a keyword.
+
+        One Browse API call with a tiny ``limit``; ``total`` in the response
+        counts every match, not just the returned page.
+
+        Returns:
+            ``probe_result`` dict
+        """
+        data = await self._browse_search(keyword, region, limit=probe_sample_size(sample_size))
+        items = data.get("itemSummaries", [])
+        prices = [item.get("price", {}).get("value") for item in items]
+        currency = items[0].get("price", {}).get("currency", "AUD") if items else "AUD"
+        return probe_result(data.get("total", len(items)), prices, currency)
+
+    async def _browse_search(
+        self,
+        keyword: str,
+        region: str = "AU",
+        category_id: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+        sort: str = "BEST_MATCH",
+    ) -> dict:
+        """Raw ``item_summary/search`` response."""
         token = await self._get_access_token()
         marketplace_id = self.MARKETPLACE_IDS.get(region, "EBAY_AU")
-        
+
         search_url = f"{self.base_url}/buy/browse/v1/item_summary/search"
-        
+
         params = {
             "q": keyword,
             "limit": min(limit, 200),
             "offset": offset,
             "sort": sort,
         }
-        
+
         if category_id:
             params["category_ids"] = category_id
-        
+
         headers = {
             "Authorization": f"Bearer {token}",
             "X-EBAY-C-MARKETPLACE-ID": marketplace_id,
             "X-EBAY-C-ENDUSERCTX": f"contextualLocation=country={region}",
         }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(search_url, params=params, headers=headers)
-            
-            if response.status_code != 200:
-                raise Exception(f"eBay search failed: {response.text}")
-            
-            data = response.json()
-            items = data.get("itemSummaries", [])
-            
-            # Transform to our product format
-            products = []
-            for item in items:
-                product = self._transform_item(item, region)
-                products.append(product)
-            
-            return products
-    
+
+        response = await self._request("GET", search_url, params=params, headers=headers)
+
+        if response.status_code != 200:
+            raise Exception(f"eBay search failed: {response.text}")
+
+        return response.json()
+
     def _transform_item(self, item: dict, region: str) -> dict:
         """Transform eBay item to our product format."""
         price_info = item.get("price", {})
@@ -144,13 +209,12 @@ class EbayService:
             "X-EBAY-C-MARKETPLACE-ID": "EBAY_AU",
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers)
-            
-            if response.status_code != 200:
-                raise Exception(f"Failed to get item details: {response.text}")
-            
-            return response.json()
+        response = await self._request("GET", url, headers=headers)
+
+        if response.status_code != 200:
+            raise Exception(f"Failed to get item details: {response.text}")
+
+        return response.json()
     
     async def get_trending_items(self, category_id: str, region: str = "AU") -> List[dict]:
         """Get trending items in a category."""
@@ -1,12 +1,28 @@
 """Google Trends service for search trend analysis."""
 
 import asyncio
-import time
 import random
-from typing import List, Optional
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple
 from datetime import datetime, timedelta
-from pytrends.request import TrendReq
-import pandas as pd
+
+from app.log import get_logger
+from app.services.trends_scheduler import (
+    PRIORITY_INTERACTIVE,
+    TrendsScheduler,
+    get_trends_scheduler,
+)
+from app.services.trends_store import TrendsSeriesStore, get_trends_store
+
+if TYPE_CHECKING:
+    # pytrends pulls in pandas; both are imported on the first real request
+    import numpy as np
+    import pandas as pd
+    from pytrends.request import TrendReq
+
+# (dates, keyword -> values) of one real payload, for the series store
+Columns = Tuple["np.ndarray", Dict[str, "np.ndarray"]]
+
+logger = get_logger(__name__)
 
 # Flag to enable mock data when Google Trends is unavailable
 USE_MOCK_DATA_ON_FAILURE = True
@@ -14,6 +30,12 @@ USE_MOCK_DATA_ON_FAILURE = True
 ALWAYS_USE_MOCK_DATA = False  # Set to True for testing without Google access
 
 
+def _create_trend_req(kwargs: dict) -> "TrendReq":
+    from pytrends.request import TrendReq
+
+    return TrendReq(**kwargs)
+
+
 class GoogleTrendsService:
     """Service for fetching Google Trends data."""
 
@@ -22,32 +44,27 @@ class GoogleTrendsService:
         "NZ": {"geo": "NZ", "hl": "en-NZ", "tz": 720},
     }
 
-    def __init__(self):
-        self._pytrends: Optional[TrendReq] = None
+    def __init__(
+        self,
+        scheduler: Optional[TrendsScheduler] = None,
+        store: Optional[TrendsSeriesStore] = None,
+        client_factory: Optional[Callable[[dict], "TrendReq"]] = None,
+    ):
+        self._pytrends: Optional["TrendReq"] = None
+        # Builds the pytrends client from TrendReq kwargs (record/replay harness)
+        self._client_factory = client_factory or _create_trend_req
+        self._scheduler = scheduler or get_trends_scheduler()
+        self._store = store or get_trends_store()
+        self._store_tasks: Set[asyncio.Task] = set()
 
-    def _get_client(self, region: str = "AU") -> TrendReq:
+    def _get_client(self, region: str = "AU") -> "TrendReq":
         """Get pytrends client for region with short timeout for faster fallback."""
         config = self.REGION_CONFIG.get(region, self.REGION_CONFIG["AU"])
-        return TrendReq(
-            hl=config["hl"],
-            tz=config["tz"],
-            timeout=(3, 5),  # (connect timeout, read timeout) - short for faster mock fallback
-        )
-
-    def _fetch_with_retry(self, func, max_retries=3):
-        """Execute function with retry logic for rate limiting."""
-        for attempt in range(max_retries):
-            try:
-                return func()
-            except Exception as e:
-                error_str = str(e)
-                if "429" in error_str or "Too Many Requests" in error_str:
-                    if attempt < max_retries - 1:
-                        sleep_time = (attempt + 1) * 2 + random.uniform(0, 1)
-                        time.sleep(sleep_time)
-                        continue
-                raise e
-        return None
+        return self._client_factory({
+            "hl": config["hl"],
+            "tz": config["tz"],
+            "timeout": (3, 5),  # (connect timeout, read timeout) - short for faster mock fallback
+        })
 
     def _generate_mock_data(self, keywords: List[str], region: str, timeframe: str) -> dict:
         """Generate mock trend data for testing when API is unavailable."""
@@ -74,6 +91,18 @@ class GoogleTrendsService:
             "is_mock": True,  # Flag to indicate mock data
         }
 
+    def _generate_mock_series(self, keywords: List[str], region: str, timeframe: str) -> dict:
+        """Generate mock trend data in columnar form."""
+        records = self._generate_mock_data(keywords, region, timeframe)["data"]
+        return {
+            "dates": [r["date"] for r in records],
+            "series": {kw: [r[kw] for r in records] for kw in keywords},
+            "keywords": keywords,
+            "region": region,
+            "timeframe": timeframe,
+            "is_mock": True,
+        }
+
     def _generate_mock_related_queries(self, keyword: str, region: str) -> dict:
         """Generate mock related queries for testing."""
         # Sample related queries based on common e-commerce patterns
@@ -98,11 +127,59 @@ class GoogleTrendsService:
             "is_mock": True,
         }
     
+    def _fetch_interest_frame(
+        self,
+        keywords: List[str],
+        region: str,
+        timeframe: str,
+    ) -> Optional["pd.DataFrame"]:
+        """Blocking pytrends request for interest over time (max 5 keywords)."""
+        pytrends = self._get_client(region)
+        geo = self.REGION_CONFIG[region]["geo"]
+
+        pytrends.build_payload(
+            kw_list=keywords[:5],
+            timeframe=timeframe,
+            geo=geo,
+        )
+
+        return pytrends.interest_over_time()
+
+    @staticmethod
+    def _frame_columns(df: Optional["pd.DataFrame"], keywords: List[str]) -> Optional[Columns]:
+        """A real (non-mock) payload's dates and columns; None when it's empty."""
+        if df is None or df.empty:
+            return None
+        return (
+            df.index.values.astype("datetime64[D]"),
+            {kw: df[kw].to_numpy() for kw in keywords if kw in df.columns},
+        )
+
+    def _store_later(self, columns: Optional[Columns], region: str) -> None:
+        """
+        Write a payload to the columnar store in the background.
+
+        Called once the scheduled request has returned, so the store's
+        database writes never hold a Trends worker or scheduler slot.
+        """
+        if columns is None:
+            return
+        task = asyncio.get_running_loop().create_task(asyncio.to_thread(self._store_columns, columns, region))
+        self._store_tasks.add(task)
+        task.add_done_callback(self._store_tasks.discard)
+
+    def _store_columns(self, columns: Columns, region: str) -> None:
+        try:
+            self._store.ingest(columns[0], columns[1], region)
+        except Exception as e:
+            logger.warning("Failed to store series: %s", e)
+
     async def get_interest_over_time(
         self,
         keywords: List[str],
         region: str = "AU",
         timeframe: str = "today 12-m",
+        priority: int = PRIORITY_INTERACTIVE,
     ) -> dict:
         """
         Get interest over time for keywords.
@@ -111,27 +188,17 @@ class GoogleTrendsService:
             keywords: List of keywords (max 5)
             region: AU or NZ
             timeframe: Time range (e.g., 'today 12-m', 'today 3-m')
+            priority: Scheduler priority (batch jobs pass PRIORITY_BATCH)
 
         Returns:
             Dictionary with interest data
         """
         def _fetch():
-            def _do_fetch():
-                pytrends = self._get_client(region)
-                geo = self.REGION_CONFIG[region]["geo"]
-
-                pytrends.build_payload(
-                    kw_list=keywords[:5],
-                    timeframe=timeframe,
-                    geo=geo,
-                )
-
-                return pytrends.interest_over_time()
+            df = self._fetch_interest_frame(keywords, region, timeframe)
+            columns = self._frame_columns(df, keywords)
 
-            df = self._fetch_with_retry(_do_fetch)
-
-            if df is None or df.empty:
-                return {"data": [], "keywords": keywords}
+            if columns is None:
+                return {"data": [], "keywords": keywords}, None
 
             # Convert to list of dicts
             df = df.reset_index()
@@ -146,26 +213,74 @@ class GoogleTrendsService:
                 "keywords": keywords,
                 "region": region,
                 "timeframe": timeframe,
-            }
+            }, columns
 
         # Return mock data directly if configured
         if ALWAYS_USE_MOCK_DATA:
             return self._generate_mock_data(keywords, region, timeframe)
 
-        # Run in thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
+        # Run on the Trends scheduler's own executor to avoid blocking
         try:
-            return await loop.run_in_executor(None, _fetch)
+            result, columns = await self._scheduler.run(_fetch, priority=priority)
         except Exception as e:
             if USE_MOCK_DATA_ON_FAILURE:
                 # Return mock data when API fails
                 return self._generate_mock_data(keywords, region, timeframe)
             raise e
+        self._store_later(columns, region)
+        return result
     
+    async def get_interest_series(
+        self,
+        keywords: List[str],
+        region: str = "AU",
+        timeframe: str = "today 12-m",
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> dict:
+        """
+        Get interest over time as columns instead of per-date records.
+
+        Args:
+            keywords: List of keywords (max 5)
+            region: AU or NZ
+            timeframe: Time range (e.g., 'today 12-m', 'today 3-m')
+            priority: Scheduler priority
+
+        Returns:
+            Dictionary with ``dates`` and one value list per keyword in ``series``
+        """
+        def _fetch():
+            df = self._fetch_interest_frame(keywords, region, timeframe)
+            columns = self._frame_columns(df, keywords)
+
+            if columns is None:
+                return {"dates": [], "series": {}, "keywords": keywords}, None
+
+            return {
+                "dates": df.index.strftime("%Y-%m-%d").tolist(),
+                "series": {kw: df[kw].tolist() for kw in keywords if kw in df.columns},
+                "keywords": keywords,
+                "region": region,
+                "timeframe": timeframe,
+            }, columns
+
+        if ALWAYS_USE_MOCK_DATA:
+            return self._generate_mock_series(keywords, region, timeframe)
+
+        try:
+            result, columns = await self._scheduler.run(_fetch, priority=priority)
+        except Exception as e:
+            if USE_MOCK_DATA_ON_FAILURE:
+                return self._generate_mock_series(keywords, region, timeframe)
+            raise e
+        self._store_later(columns, region)
+        return result
+
     async def get_related_queries(
         self,
         keyword: str,
         region: str = "AU",
+        priority: int = PRIORITY_INTERACTIVE,
     ) -> dict:
         """
         Get related queries for a keyword.
@@ -207,9 +322,8 @@ class GoogleTrendsService:
         if ALWAYS_USE_MOCK_DATA:
             return self._generate_mock_related_queries(keyword, region)
 
-        loop = asyncio.get_event_loop()
         try:
-            return await loop.run_in_executor(None, _fetch)
+            return await self._scheduler.run(_fetch, priority=priority)
         except Exception as e:
             if USE_MOCK_DATA_ON_FAILURE:
                 return self._generate_mock_related_queries(keyword, region)
@@ -219,6 +333,7 @@ class GoogleTrendsService:
         self,
         keywords: List[str],
         region: str = "AU",
+        priority: int = PRIORITY_INTERACTIVE,
     ) -> dict:
         """Compare interest between multiple keywords."""
         def _fetch():
@@ -257,23 +372,26 @@ class GoogleTrendsService:
                 "region": region,
             }
         
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, _fetch)
+        return await self._scheduler.run(_fetch, priority=priority)
     
-    async def get_suggestions(self, keyword: str) -> List[dict]:
+    async def get_suggestions(
+        self,
+        keyword: str,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> List[dict]:
         """Get keyword suggestions from Google Trends."""
         def _fetch():
             pytrends = self._get_client("AU")
             suggestions = pytrends.suggestions(keyword)
             return suggestions
         
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, _fetch)
+        return await self._scheduler.run(_fetch, priority=priority)
     
     async def get_interest_by_region(
         self,
         keyword: str,
         resolution: str = "COUNTRY",
+        priority: int = PRIORITY_INTERACTIVE,
     ) -> dict:
         """
         Get interest by region/country.
@@ -306,5 +424,4 @@ class GoogleTrendsService:
                 "resolution": resolution,
             }
         
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, _fetch)
+        return await self._scheduler.run(_fetch, priority=priority)
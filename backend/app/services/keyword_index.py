@@ -0,0 +1,141 @@
+"""Precompiled English -> Chinese product keyword index.
+
+The keyword map lives in ``app/data/product_keywords.json`` (grouped by
+category) so it can grow to tens of thousands of terms. Lookups go through
+a token trie instead of scanning every entry:
+
+- phrases *inside* a title or keyword are found by walking the trie from
+  each token, so cost depends on title length, not map size
+- keywords that are a fragment of a longer phrase (``"wireless"`` in
+  ``"wireless earbuds"``) are resolved through a table of every contiguous
+  token run of every phrase
+
+When several phrases match, the one listed first in the data file wins.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.config import settings
+
+DEFAULT_KEYWORD_MAP_PATH = Path(__file__).resolve().parent.parent / "data" / "product_keywords.json"
+
+# Trie node key marking the end of a phrase
+_END = ""
+
+
+def normalize_phrase(text: str) -> str:
+    """Lowercase and collapse whitespace."""
+    return " ".join(text.lower().split())
+
+
+def load_keyword_map(path: Optional[Path] = None) -> Dict[str, List[str]]:
+    """
+    Load the keyword map from a JSON file.
+
+    The file may be flat (``{"phrase": ["中文", ...]}``) or grouped by
+    category (``{"Electronics": {"phrase": [...]}}``). Order is preserved.
+
+    Args:
+        path: JSON file (defaults to the bundled map)
+
+    Returns:
+        Flat dict of normalised English phrase -> Chinese keywords
+    """
+    with open(path or DEFAULT_KEYWORD_MAP_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+
+    mapping: Dict[str, List[str]] = {}
+    for key, value in data.items():
+        entries = value.items() if isinstance(value, dict) else [(key, value)]
+        for phrase, chinese in entries:
+            mapping.setdefault(normalize_phrase(phrase), list(chinese))
+    return mapping
+
+
+class KeywordIndex:
+    """Token trie and fragment table over a keyword map."""
+
+    def __init__(self, mapping: Dict[str, List[str]]):
+        self.mapping = {normalize_phrase(k): v for k, v in mapping.items()}
+        self._rank = {phrase: i for i, phrase in enumerate(self.mapping)}
+        # Changes whenever the map does, so cached translations can be invalidated
+        self.version = hashlib.sha1(
+            json.dumps(self.mapping, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        self._trie: dict = {}
+        # Contiguous token run -> best-ranked phrase containing it
+        self._fragments: Dict[Tuple[str, ...], str] = {}
+
+        for phrase in self.mapping:
+            tokens = phrase.split()
+            node = self._trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node[_END] = phrase
+
+            for start in range(len(tokens)):
+                for end in range(start + 1, len(tokens) + 1):
+                    self._fragments.setdefault(tuple(tokens[start:end]), phrase)
+
+    def __len__(self) -> int:
+        return len(self.mapping)
+
+    def lookup(self, keyword: str) -> Optional[List[str]]:
+        """Exact match for an already normalised keyword."""
+        return self.mapping.get(keyword)
+
+    def find_phrases(self, tokens: List[str], min_tokens: int = 1) -> Iterator[str]:
+        """
+        Yield every phrase occurring as a run of ``tokens``, left to right.
+
+        Args:
+            tokens: Lowercase tokens
+            min_tokens: Skip phrases shorter than this
+        """
+        for start in range(len(tokens)):
+            node = self._trie
+            for pos in range(start, len(tokens)):
+                node = node.get(tokens[pos])
+                if node is None:
+                    break
+                phrase = node.get(_END)
+                if phrase is not None and pos - start + 1 >= min_tokens:
+                    yield phrase
+
+    def best_match(self, keyword: str) -> Optional[str]:
+        """
+        Best-ranked phrase that contains, or is contained in, the keyword.
+
+        Args:
+            keyword: Normalised keyword
+
+        Returns:
+            Phrase from the map, or None
+        """
+        tokens = keyword.split()
+        if not tokens:
+            return None
+
+        candidates = list(self.find_phrases(tokens))
+        containing = self._fragments.get(tuple(tokens))
+        if containing is not None:
+            candidates.append(containing)
+        if not candidates:
+            return None
+        return min(candidates, key=self._rank.__getitem__)
+
+
+# Singleton index built from the configured (or bundled) data file
+_index: Optional[KeywordIndex] = None
+
+
+def get_keyword_index() -> KeywordIndex:
+    """Get the process-wide keyword index."""
+    global _index
+    if _index is None:
+        path = Path(settings.product_keyword_map_path) if settings.product_keyword_map_path else None
+        _index = KeywordIndex(load_keyword_map(path))
+    return _index
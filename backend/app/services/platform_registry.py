@@ -0,0 +1,324 @@
+"""Marketplace adapters and the registry that fans out over them.
+
+Each marketplace client keeps its own API (``TradeMeAPIService`` returns a
+dict, ``EbayService.search_products`` a bare list, the scrapers their own
+dicts). The adapters here put them behind ``PlatformAdapter`` so callers
+only ever see ``PlatformResult``. ``PlatformRegistry`` holds the adapters
+enabled in ``settings.platform_adapters`` and runs a call per (keyword,
+adapter) concurrently, bounded by each adapter's semaphore and timeout and
+by any ``resilience.deadline`` the caller set.
+
+Live results are saved as platform snapshots, unless their count is only the
+size of the returned page. Keywords a platform couldn't answer (not
+configured, failed, timed out) fall back to the latest snapshot.
+"""
+
+import asyncio
+import importlib.util
+from typing import Dict, Iterable, List, Optional
+
+from app.config import settings
+from app.log import get_logger
+from app.services.ebay_service import EbayService
+from app.services.platform_snapshots import get_platform_snapshot_store, snapshot_row
+from app.services.platforms import PlatformAdapter, PlatformResult
+from app.services.resilience import DeadlineExceeded, bounded_timeout
+from app.services.tracing import span
+from app.services.trademe_api_service import get_trademe_api_service, is_trademe_api_configured
+from app.services.trademe_categories import get_trademe_category_cache
+
+logger = get_logger(__name__)
+
+PLAYWRIGHT_INSTALLED = importlib.util.find_spec("playwright") is not None
+
+
+class TradeMeAdapter(PlatformAdapter):
+    """TradeMe official API, scoped to the keyword's best category."""
+
+    name = "trademe"
+    markets = frozenset({"NZ"})
+    demand_scale = 100.0  # 10000 listings = 100 score
+
+    def __init__(self, api=None, categories=None, **kwargs):
+        super().__init__(**kwargs)
+        self._api = api
+        self._categories = categories
+
+    def is_available(self) -> bool:
+        return self._api is not None or is_trademe_api_configured()
+
+    @property
+    def api(self):
+        if self._api is None:
+            self._api = get_trademe_api_service()
+        return self._api
+
+    @property
+    def categories(self):
+        if self._categories is None:
+            self._categories = get_trademe_category_cache()
+        return self._categories
+
+    async def close(self) -> None:
+        if self._api is not None:
+            await self._api.close()
+
+    async def _scoped(self, keyword: str, fetch) -> dict:
+        """
+        Run ``fetch(category_number)`` inside the keyword's best category.
+
+        A category-scoped query returns fewer unrelated listings and a
+        tighter ``TotalCount``. Falls back to a site-wide query when no
+        category matches or the scoped query finds nothing.
+        """
+        category = await self.categories.resolve(keyword)
+        if category:
+            data = await fetch(category["number"])
+            if data.get("total_results"):
+                data["category"] = {"number": category["number"], "path": category["path"]}
+                return data
+        return await fetch("")
+
+    async def search(self, keyword: str, market: str, limit: int = 50) -> PlatformResult:
+        data = await self._scoped(keyword, lambda c: self.api.search_products(keyword, limit=limit, category=c))
+        return self.result(market, keyword, data)
+
+    async def probe(self, keyword: str, market: str) -> PlatformResult:
+        data = await self._scoped(keyword, lambda c: self.api.probe(keyword, category=c))
+        return self.result(market, keyword, data)
+
+    async def details(self, item_id: str, market: str) -> dict:
+        return await self.api.get_listing_details(int(item_id))
+
+
+class EbayAdapter(PlatformAdapter):
+    """eBay Browse API (NZ searches the AU marketplace)."""
+
+    name = "ebay"
+    demand_scale = 50.0
+
+    def __init__(self, service: Optional[EbayService] = None, **kwargs):
+        super().__init__(**kwargs)
+        self._service = service
+
+    def is_available(self) -> bool:
+        return self._service is not None or bool(settings.ebay_app_id and settings.ebay_cert_id)
+
+    @property
+    def service(self) -> EbayService:
+        if self._service is None:
+            self._service = EbayService()
+        return self._service
+
+    async def search(self, keyword: str, market: str, limit: int = 50) -> PlatformResult:
+        return self.result(market, keyword, await self.service.search_results(keyword, market, limit=limit))
+
+    async def probe(self, keyword: str, market: str) -> PlatformResult:
+        return self.result(market, keyword, await self.service.probe(keyword, market))
+
+    async def details(self, item_id: str, market: str) -> dict:
+        return await self.service.get_product_details(item_id)
+
+
+class ScraperAdapter(PlatformAdapter):
+    """Playwright scraper with ``search_products`` and ``probe`` (imported on first use)."""
+
+    source = "scraper"
+
+    def __init__(self, scraper=None, **kwargs):
+        super().__init__(**kwargs)
+        self._scraper = scraper
+
+    def is_available(self) -> bool:
+        return self._scraper is not None or PLAYWRIGHT_INSTALLED
+
+    def _create_scraper(self):
+        raise NotImplementedError
+
+    @property
+    def scraper(self):
+        if self._scraper is None:
+            self._scraper = self._create_scraper()
+        return self._scraper
+
+    async def search(self, keyword: str, market: str, limit: int = 50) -> PlatformResult:
+        return self.result(market, keyword, await self.scraper.search_products(keyword, market, limit=limit))
+
+    async def probe(self, keyword: str, market: str) -> PlatformResult:
+        return self.result(market, keyword, await self.scraper.probe(keyword, market))
+
+    async def close(self) -> None:
+        if self._scraper is not None:
+            await self._scraper.close()
+
+
+class AmazonAdapter(ScraperAdapter):
+    """Amazon AU (serves both markets)."""
+
+    name = "amazon"
+    demand_scale = 100.0
+
+    def _create_scraper(self):
+        from app.services.amazon_scraper import AmazonScraper
+        return AmazonScraper()
+
+
+class TemuAdapter(ScraperAdapter):
+    name = "temu"
+    demand_scale = 50.0
+
+    def _create_scraper(self):
+        from app.services.temu_scraper import TemuScraper
+        return TemuScraper()
+
+
+ADAPTER_TYPES = {
+    TradeMeAdapter.name: TradeMeAdapter,
+    EbayAdapter.name: EbayAdapter,
+    AmazonAdapter.name: AmazonAdapter,
+    TemuAdapter.name: TemuAdapter,
+}
+
+
+class PlatformRegistry:
+    """Enabled adapters, looked up by name and fanned out over per market."""
+
+    def __init__(self, adapters: Optional[Iterable[PlatformAdapter]] = None, snapshots=None):
+        if adapters is None:
+            adapters = [ADAPTER_TYPES[name]() for name in settings.platform_adapters if name in ADAPTER_TYPES]
+        self._adapters: Dict[str, PlatformAdapter] = {}
+        for adapter in adapters:
+            self.register(adapter)
+        self._snapshots = snapshots
+
+    def register(self, adapter: PlatformAdapter) -> None:
+        self._adapters[adapter.name] = adapter
+
+    def get(self, name: str) -> Optional[PlatformAdapter]:
+        return self._adapters.get(name)
+
+    def names(self) -> List[str]:
+        return list(self._adapters)
+
+    def for_market(self, market: str, live: bool = True) -> List[PlatformAdapter]:
+        """Adapters serving a market; ``live`` keeps only those able to make calls."""
+        return [
+            adapter for adapter in self._adapters.values()
+            if adapter.supports(market) and (not live or adapter.is_available())
+        ]
+
+    @property
+    def snapshots(self):
+        if self._snapshots is None:
+            self._snapshots = get_platform_snapshot_store()
+        return self._snapshots
+
+    async def call(self, adapter: PlatformAdapter, method: str, keyword: str, market: str, **kwargs) -> PlatformResult:
+        """
+        One adapter call under its concurrency limit and timeout.
+
+        The timeout is cut short by the caller's deadline, if any. Never
+        raises: failures (including an open circuit) come back as a
+        ``PlatformResult`` with ``error``.
+        """
+        try:
+            async with adapter.limiter():
+                timeout = bounded_timeout(adapter.timeout)
+                with span(f"platform {adapter.name}.{method}", keyword=keyword, market=market):
+                    return await asyncio.wait_for(getattr(adapter, method)(keyword, market, **kwargs), timeout)
+        except DeadlineExceeded:
+            error = "deadline exceeded"
+        except asyncio.TimeoutError:
+            error = f"timed out after {adapter.timeout:g}s"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        logger.warning("%s %s failed for %r: %s", adapter.name, method, keyword, error)
+        return PlatformResult(adapter.name, market, keyword, source=adapter.source, error=error)
+
+    async def _latest_snapshots(self, platforms: List[str], market: str, keywords: List[str]) -> Dict[str, Dict[str, dict]]:
+        """Latest snapshots per platform, one query each, run concurrently."""
+        if not platforms or not keywords:
+            return {}
+        found = await asyncio.gather(*(
+            asyncio.to_thread(self.snapshots.latest, name, market, keywords) for name in platforms
+        ))
+        return dict(zip(platforms, found))
+
+    async def collect(
+        self,
+        keywords: List[str],
+        market: str,
+        mode: Optional[str] = None,
+        limit: int = 50,
+    ) -> Dict[str, Dict[str, PlatformResult]]:
+        """
+        Results from every enabled platform for every keyword.
+
+        Args:
+            keywords: Search keywords
+            market: "AU" or "NZ"
+            mode: "probe" or "search" (default from ``settings.platform_probe_mode``)
+            limit: Listings per search in "search" mode
+
+        Returns:
+            Dict keyword -> platform name -> PlatformResult. Platforms with
+            neither a live result nor a snapshot are left out.
+        """
+        mode = mode or ("probe" if settings.platform_probe_mode else "search")
+        kwargs = {"limit": limit} if mode == "search" else {}
+        calls = [(keyword, adapter) for keyword in keywords for adapter in self.for_market(market)]
+        snapshot_platforms = [adapter.name for adapter in self.for_market(market, live=False)]
+
+        results, snapshots = await asyncio.gather(
+            asyncio.gather(*(self.call(adapter, mode, keyword, market, **kwargs) for keyword, adapter in calls)),
+            self._latest_snapshots(snapshot_platforms, market, keywords),
+        )
+
+        data: Dict[str, Dict[str, PlatformResult]] = {keyword: {} for keyword in keywords}
+        fresh = []
+        for (keyword, adapter), result in zip(calls, results):
+            if result.ok:
+                data[keyword][adapter.name] = result
+                if not result.total_known:
+                    # A page-sized count would overwrite the platform's real total
+                    continue
+                fresh.append(snapshot_row(adapter.name, market, keyword, result.to_dict(), adapter.source))
+
+        # Platforms that couldn't answer live fall back to their latest snapshot
+        for name, by_keyword in snapshots.items():
+            for keyword, snapshot in by_keyword.items():
+                if name not in data[keyword]:
+                    data[keyword][name] = PlatformResult.from_data(name, market, keyword, snapshot, "snapshot")
+
+        if fresh:
+            await asyncio.to_thread(self.snapshots.record_many, fresh)
+        return data
+
+    async def details(self, platform: str, item_id: str, market: str) -> dict:
+        """Item details from one platform, under its limit and timeout."""
+        adapter = self._adapters.get(platform)
+        if adapter is None:
+            raise KeyError(f"Unknown platform: {platform}")
+        async with adapter.limiter():
+            return await asyncio.wait_for(adapter.details(item_id, market), bounded_timeout(adapter.timeout))
+
+    async def close(self) -> None:
+        for adapter in self._adapters.values():
+            await adapter.close()
+
+
+_registry: Optional[PlatformRegistry] = None
+
+
+def get_platform_registry() -> PlatformRegistry:
+    """Process-wide registry of the enabled platform adapters."""
+    global _registry
+    if _registry is None:
+        _registry = PlatformRegistry()
+    return _registry
+
+
+async def close_platform_registry() -> None:
+    """Release the registry's connections and browsers (app shutdown); they reopen on next use."""
+    if _registry is not None:
+        await _registry.close()
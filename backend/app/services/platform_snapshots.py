@@ -0,0 +1,203 @@
+"""Latest listing count and price stats per (platform, market, keyword).
+
+Rankings need a demand signal for every keyword even when a platform API
+isn't configured or a live call fails. Collectors - every adapter call
+made through the platform registry and the ``/products/fetch`` route -
+upsert what they saw into ``platform_snapshots`` (migration 009), and
+ranking reads the snapshots for all its keywords in one query per platform.
+
+Staleness policy:
+
+- snapshots older than ``settings.platform_snapshot_max_age_hours`` are
+  still served but flagged ``stale``
+- snapshots older than ``settings.platform_snapshot_drop_after_hours`` are
+  ignored (0 keeps every snapshot)
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from app.config import settings
+from app.log import get_logger
+from app.database import get_db
+from app.services.keyword_index import normalize_phrase
+
+logger = get_logger(__name__)
+
+TABLE = "platform_snapshots"
+
+
+def _parse_time(value) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _median(values: List[float]) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    mid = len(values) // 2
+    return values[mid] if len(values) % 2 else (values[mid - 1] + values[mid]) / 2
+
+
+def snapshot_row(
+    platform: str,
+    market: str,
+    keyword: str,
+    result: dict,
+    source: str = "api",
+) -> dict:
+    """
+    platform_snapshots row for a collector result.
+
+    Args:
+        platform: "trademe", "ebay", "amazon" or "temu" (the ranking keys)
+        market: "AU" or "NZ"
+        keyword: Search keyword
+        result: Dict with total_results and optionally price_stats (else
+            derived from products), products, currency and category
+            ({number, path} or a string)
+        source: "api", "scraper" or "seed"
+    """
+    prices = [float(p["price"]) for p in result.get("products") or [] if p.get("price")]
+    stats = result.get("price_stats") or ({
+        "min": min(prices),
+        "max": max(prices),
+        "avg": sum(prices) / len(prices),
+    } if prices else {})
+    category = result.get("category")
+    if isinstance(category, dict):
+        category = category.get("path") or category.get("number")
+    return {
+        "platform": platform,
+        "market": market,
+        "keyword": normalize_phrase(keyword),
+        "total_results": int(result.get("total_results") or 0),
+        "min_price": stats.get("min"),
+        "max_price": stats.get("max"),
+        "avg_price": stats.get("avg"),
+        "median_price": stats.get("median", _median(prices)),
+        "currency": result.get("currency"),
+        "category": category,
+        "source": source,
+        "fetched_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def row_to_result(row: dict, max_age_hours: float, now: Optional[datetime] = None) -> dict:
+    """Snapshot row in the shape ranking expects from a live platform call."""
+    fetched_at = _parse_time(row.get("fetched_at"))
+    now = now or datetime.now(timezone.utc)
+    age_hours = (now - fetched_at).total_seconds() / 3600 if fetched_at else None
+    return {
+        "total_results": row.get("total_results") or 0,
+        "price_stats": {
+            "min": float(row.get("min_price") or 0),
+            "max": float(row.get("max_price") or 0),
+            "avg": float(row.get("avg_price") or 0),
+            "median": float(row["median_price"]) if row.get("median_price") is not None else None,
+        },
+        "currency": row.get("currency"),
+        "category": row.get("category"),
+        "source": row.get("source"),
+        "fetched_at": row.get("fetched_at"),
+        "stale": age_hours is None or age_hours >= max_age_hours,
+    }
+
+
+class PlatformSnapshotStore:
+    """Reads and writes ``platform_snapshots``."""
+
+    def __init__(
+        self,
+        db=None,
+        max_age_hours: Optional[float] = None,
+        drop_after_hours: Optional[float] = None,
+    ):
+        self._db = db
+        self.max_age_hours = max_age_hours if max_age_hours is not None else settings.platform_snapshot_max_age_hours
+        self.drop_after_hours = (
+            drop_after_hours if drop_after_hours is not None else settings.platform_snapshot_drop_after_hours
+        )
+
+    def _get_db(self):
+        """Resolve the database lazily; None when Supabase isn't configured."""
+        if self._db is None:
+            try:
+                self._db = get_db()
+            except Exception:
+                self._db = False
+        return self._db or None
+
+    def record_many(self, rows: Iterable[dict]) -> int:
+        """Upsert snapshot rows (see ``snapshot_row``); returns how many were written."""
+        rows = list({(r["platform"], r["market"], r["keyword"]): r for r in rows}.values())
+        db = self._get_db()
+        if db is None or not rows:
+            return 0
+        try:
+            db.table(TABLE).upsert(rows, on_conflict="platform,market,keyword").execute()
+        except Exception as e:
+            logger.warning("Failed to save %d snapshots: %s", len(rows), e)
+            return 0
+        return len(rows)
+
+    def record(self, platform: str, market: str, keyword: str, result: Optional[dict], source: str = "api") -> int:
+        """Save one collector result; results without a count are skipped."""
+        if not result or result.get("error") or result.get("total_results") is None:
+            return 0
+        return self.record_many([snapshot_row(platform, market, keyword, result, source)])
+
+    def latest(self, platform: str, market: str, keywords: List[str]) -> Dict[str, dict]:
+        """
+        Snapshots for many keywords in one query.
+
+        Returns:
+            Dict keyword (as passed in) -> result dict with total_results,
+            price_stats, fetched_at and a ``stale`` flag; keywords without a
+            usable snapshot are left out
+        """
+        db = self._get_db()
+        by_normalized = {normalize_phrase(k): k for k in keywords}
+        if db is None or not by_normalized:
+            return {}
+        try:
+            result = db.table(TABLE)\
+                .select("*")\
+                .eq("platform", platform)\
+                .eq("market", market)\
+                .in_("keyword", list(by_normalized))\
+                .execute()
+        except Exception as e:
+            logger.warning("Failed to read %s/%s snapshots: %s", platform, market, e)
+            return {}
+
+        now = datetime.now(timezone.utc)
+        snapshots = {}
+        for row in result.data or []:
+            keyword = by_normalized.get(row.get("keyword"))
+            if keyword is None:
+                continue
+            fetched_at = _parse_time(row.get("fetched_at"))
+            if self.drop_after_hours and (
+                fetched_at is None or (now - fetched_at).total_seconds() >= self.drop_after_hours * 3600
+            ):
+                continue
+            snapshots[keyword] = row_to_result(row, self.max_age_hours, now)
+        return snapshots
+
+
+_snapshot_store: Optional[PlatformSnapshotStore] = None
+
+
+def get_platform_snapshot_store() -> PlatformSnapshotStore:
+    """Process-wide snapshot store shared by ranking and the collectors."""
+    global _snapshot_store
+    if _snapshot_store is None:
+        _snapshot_store = PlatformSnapshotStore()
+    return _snapshot_store
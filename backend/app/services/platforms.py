@@ -0,0 +1,226 @@
+"""Common result type, adapter interface and helpers for marketplaces.
+
+Ranking only uses a keyword's total result count and a rough price level
+from each marketplace. Every collector therefore offers ``probe(keyword)``
+next to its full search: one request for the platform's own result counter
+plus a small price sample (``settings.platform_probe_sample_size``
+listings), returned in the shape built by ``probe_result``.
+
+``PlatformAdapter`` wraps one marketplace client behind ``search``,
+``probe`` and ``details``, and every adapter returns a ``PlatformResult``.
+The concrete adapters and the registry that fans out over them live in
+``platform_registry``.
+"""
+
+import asyncio
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+from app.config import settings
+
+# Resource types a count-only page load never needs
+HEAVY_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet"})
+
+
+def probe_sample_size(sample_size: Optional[int] = None) -> int:
+    """Listings to sample for prices (at least 1, as the APIs need a page size)."""
+    return max(1, sample_size if sample_size is not None else settings.platform_probe_sample_size)
+
+
+def summarize_prices(prices: Iterable[Optional[float]]) -> Dict[str, float]:
+    """min/max/avg/median over positive prices (zeros when there are none)."""
+    prices = sorted(float(p) for p in prices if p)
+    if not prices:
+        return {"min": 0, "max": 0, "avg": 0, "median": 0}
+    mid = len(prices) // 2
+    return {
+        "min": prices[0],
+        "max": prices[-1],
+        "avg": sum(prices) / len(prices),
+        "median": prices[mid] if len(prices) % 2 else (prices[mid - 1] + prices[mid]) / 2,
+    }
+
+
+def probe_result(total_results: int, prices: Iterable[Optional[float]], currency: Optional[str] = None) -> dict:
+    """
+    Probe payload in the same shape as a full search result.
+
+    Args:
+        total_results: The platform's own total for the query
+        prices: Sampled listing prices (None/zero entries are skipped)
+        currency: Price currency
+
+    Returns:
+        Dict with total_results, price_stats (min/max/avg/median over the
+        sample), sample_size, an empty products list and ``probe: True``
+    """
+    prices = [float(p) for p in prices if p]
+    return {
+        "total_results": int(total_results or 0),
+        "products": [],
+        "price_stats": summarize_prices(prices),
+        "sample_size": len(prices),
+        "currency": currency,
+        "probe": True,
+    }
+
+
+async def block_heavy_resources(page) -> None:
+    """Abort image, media, font and stylesheet requests on a Playwright page."""
+    async def handle(route):
+        if route.request.resource_type in HEAVY_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await page.route("**/*", handle)
+
+
+class PlatformResult:
+    """One platform's answer for a keyword in one market."""
+
+    __slots__ = (
+        "platform", "market", "keyword", "total_results", "price_stats", "products",
+        "currency", "sample_size", "category", "source", "fetched_at", "stale", "error", "total_known",
+    )
+
+    def __init__(
+        self,
+        platform: str,
+        market: str,
+        keyword: str,
+        total_results: int = 0,
+        price_stats: Optional[Dict[str, float]] = None,
+        products: Optional[List[dict]] = None,
+        currency: Optional[str] = None,
+        sample_size: int = 0,
+        category: Any = None,
+        source: str = "api",
+        fetched_at: Optional[str] = None,
+        stale: bool = False,
+        error: Optional[str] = None,
+        total_known: bool = True,
+    ):
+        self.platform = platform
+        self.market = market
+        self.keyword = keyword
+        self.total_results = total_results
+        self.price_stats = price_stats or {}
+        self.products = products or []
+        self.currency = currency
+        self.sample_size = sample_size
+        self.category = category
+        self.source = source
+        self.fetched_at = fetched_at
+        self.stale = stale
+        self.error = error
+        # False when total_results only counts the returned page, not the platform's matches
+        self.total_known = total_known
+
+    @classmethod
+    def from_data(cls, platform: str, market: str, keyword: str, data: Any, source: str = "api") -> "PlatformResult":
+        """
+        Normalise whatever a client returned.
+
+        Accepts a result dict (``total_results``, ``price_stats``, ...), a
+        bare list of products (counted and priced here, ``total_known`` False)
+        or None.
+        """
+        if data is None:
+            return cls(platform, market, keyword, source=source, error="no data")
+        if isinstance(data, list):
+            prices = [p.get("price") for p in data]
+            return cls(
+                platform, market, keyword,
+                total_results=len(data),
+                price_stats=summarize_prices(prices),
+                products=data,
+                sample_size=len(data),
+                source=source,
+                total_known=False,
+            )
+        stats = data.get("price_stats") or summarize_prices(p.get("price") for p in data.get("products") or [])
+        return cls(
+            platform, market, keyword,
+            total_results=int(data.get("total_results") or 0),
+            price_stats=stats,
+            products=data.get("products") or [],
+            currency=data.get("currency"),
+            sample_size=data.get("sample_size", len(data.get("products") or [])),
+            category=data.get("category"),
+            source=source,
+            fetched_at=data.get("fetched_at"),
+            stale=bool(data.get("stale")),
+            error=data.get("error"),
+        )
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def stats(self) -> dict:
+        """``platform_stats`` entry for rankings."""
+        stats = {"listings": self.total_results, "price_range": self.price_stats}
+        for name in ("category", "fetched_at"):
+            if getattr(self, name) is not None:
+                stats[name] = getattr(self, name)
+        if self.source == "snapshot":
+            stats["stale"] = self.stale
+        return stats
+
+    def __repr__(self) -> str:
+        return f"PlatformResult({self.platform}/{self.market} {self.keyword!r}: {self.total_results}{' error' if self.error else ''})"
+
+
+class PlatformAdapter:
+    """
+    One marketplace behind the common async interface.
+
+    Subclasses set ``name`` and ``markets`` and implement ``search`` and
+    ``probe``; ``details`` is optional. ``demand_scale`` is the listing
+    count that earns a full demand score. Concurrency and timeout come from
+    ``settings.platform_concurrency`` / ``settings.platform_timeouts``.
+    """
+
+    name: str = ""
+    markets: FrozenSet[str] = frozenset({"AU", "NZ"})
+    demand_scale: float = 100.0
+    source: str = "api"
+
+    def __init__(self, concurrency: Optional[int] = None, timeout: Optional[float] = None):
+        self.concurrency = max(1, concurrency or settings.platform_concurrency.get(self.name, 2))
+        self.timeout = timeout or settings.platform_timeouts.get(self.name, 30.0)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop = None
+
+    def is_available(self) -> bool:
+        """Whether credentials/dependencies for live calls are present."""
+        return True
+
+    def supports(self, market: str) -> bool:
+        return market in self.markets
+
+    def limiter(self) -> asyncio.Semaphore:
+        """Per-adapter semaphore, recreated if the event loop changed."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    def result(self, market: str, keyword: str, data: Any) -> PlatformResult:
+        return PlatformResult.from_data(self.name, market, keyword, data, self.source)
+
+    async def search(self, keyword: str, market: str, limit: int = 50) -> PlatformResult:
+        raise NotImplementedError
+
+    async def probe(self, keyword: str, market: str) -> PlatformResult:
+        raise NotImplementedError
+
+    async def details(self, item_id: str, market: str) -> dict:
+        raise NotImplementedError(f"{self.name} has no details lookup")
+
+    async def close(self) -> None:
+        pass
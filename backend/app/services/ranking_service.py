@@ -1,24 +1,27 @@
 """Ranking service for product selection - combines all data sources."""
 
-import asyncio
 import os
 from typing import List, Dict, Optional
 from datetime import datetime
 
 from app.services.google_trends_service import GoogleTrendsService
+from app.services.supplier_index import get_supplier_index
+from app.services.supplier_search import empty_price_summary, summarize_rows, summarize_supplier_prices
+from app.services.trends_analytics import analyze_series, get_trends_analytics
+from app.services.trends_batch import get_trends_batch_engine
+from app.services.trends_scheduler import PRIORITY_BATCH
 from app.database import get_db
 from app.config import settings
+from app.log import SAMPLED, get_logger
 
 # Import official API services
-from app.services.trademe_api_service import TradeMeAPIService, is_trademe_api_configured
-from app.services.ebay_service import EbayService
+from app.services.trademe_api_service import is_trademe_api_configured
+from app.services.platform_registry import get_platform_registry
+from app.services.platforms import PlatformResult
+from app.services.resilience import deadline
+from app.services.tracing import span
 
-# Check if official APIs are configured
-HAS_TRADEME_API = is_trademe_api_configured()
-HAS_EBAY_API = bool(settings.ebay_app_id and settings.ebay_cert_id)
-
-print(f"[RankingService] TradeMe API: {'configured' if HAS_TRADEME_API else 'not configured'}")
-print(f"[RankingService] eBay API: {'configured' if HAS_EBAY_API else 'not configured'}")
+logger = get_logger(__name__)
 
 
 class RankingService:
@@ -59,12 +62,20 @@ class RankingService:
 
     def __init__(self):
         self.google_trends = GoogleTrendsService()
+        self.trends_batch = get_trends_batch_engine()
+        self.trends_analytics = get_trends_analytics()
 
         # Initialize official API services
-        self.trademe_api = TradeMeAPIService() if HAS_TRADEME_API else None
-        self.ebay_service = EbayService() if HAS_EBAY_API else None
-
-        print(f"[RankingService] Initialized with TradeMe API: {self.trademe_api is not None}, eBay API: {self.ebay_service is not None}")
+        self.platforms = get_platform_registry()
+        self.trademe_configured = is_trademe_api_configured()
+        self.ebay_configured = bool(settings.ebay_app_id and settings.ebay_cert_id)
+
+        logger.info(
+            "Initialized with platforms: %s (TradeMe API %s, eBay API %s)",
+            ", ".join(self.platforms.names()) or "none",
+            "configured" if self.trademe_configured else "not configured",
+            "configured" if self.ebay_configured else "not configured",
+        )
 
     async def calculate_rankings(
         self,
@@ -87,25 +98,29 @@ class RankingService:
         cats_to_analyze = categories or [c["keyword"] for c in self.CATEGORIES]
 
         # Collect data from all sources
-        platform_data = await self._collect_platform_data(cats_to_analyze, market)
+        with span("ranking.platforms", keywords=len(cats_to_analyze), market=market):
+            platform_data = await self._collect_platform_data(cats_to_analyze, market)
 
         # Get Google Trends data
-        trends_data = await self._collect_trends_data(cats_to_analyze, market)
+        with span("ranking.trends"):
+            trends_data = await self._collect_trends_data(cats_to_analyze, market)
 
         # Get 1688 supplier prices
-        supplier_data = await self._get_supplier_data(cats_to_analyze)
+        with span("ranking.suppliers"):
+            supplier_data = await self._get_supplier_data(cats_to_analyze)
 
         # Calculate scores for each category
         rankings = []
-        for keyword in cats_to_analyze:
-            score_data = self._calculate_category_score(
-                keyword=keyword,
-                platform_data=platform_data.get(keyword, {}),
-                trends_data=trends_data.get(keyword, {}),
-                supplier_data=supplier_data.get(keyword, {}),
-                market=market,
-            )
-            rankings.append(score_data)
+        with span("ranking.scoring"):
+            for keyword in cats_to_analyze:
+                score_data = self._calculate_category_score(
+                    keyword=keyword,
+                    platform_data=platform_data.get(keyword, {}),
+                    trends_data=trends_data.get(keyword, {}),
+                    supplier_data=supplier_data.get(keyword, {}),
+                    market=market,
+                )
+                rankings.append(score_data)
 
         # Sort by total score (descending)
         rankings.sort(key=lambda x: x["total_score"], reverse=True)
@@ -122,16 +137,17 @@ class RankingService:
             "generated_at": datetime.now().isoformat(),
             "elapsed_seconds": elapsed_time,
             "version": self.VERSION,
+            "platforms": [adapter.name for adapter in self.platforms.for_market(market)],
             "data_sources": {
-                "trademe_api": HAS_TRADEME_API and market == "NZ",
-                "trademe_cached": not HAS_TRADEME_API and market == "NZ",
-                "ebay_api": HAS_EBAY_API,
+                "trademe_api": self.trademe_configured and market == "NZ",
+                "trademe_cached": not self.trademe_configured and market == "NZ",
+                "ebay_api": self.ebay_configured,
                 "google_trends": True,
                 "suppliers_1688": True,
             },
             "api_status": {
-                "trademe_configured": HAS_TRADEME_API,
-                "ebay_configured": HAS_EBAY_API,
+                "trademe_configured": self.trademe_configured,
+                "ebay_configured": self.ebay_configured,
             },
         }
 
@@ -139,221 +155,104 @@ class RankingService:
         self,
         keywords: List[str],
         market: str,
-    ) -> Dict[str, Dict]:
-        """Collect data from all e-commerce platforms using official APIs.
+    ) -> Dict[str, Dict[str, PlatformResult]]:
+        """Collect data from every enabled platform adapter.
 
-        Uses TradeMe API and eBay API when configured.
-        Falls back to cached data when APIs are not available.
+        Returns:
+            Dict keyword -> platform name -> PlatformResult (live, or the
+            latest snapshot when a platform couldn't answer). Live calls
+            share ``settings.ranking_deadline_seconds``; a platform that
+            runs out of time falls back to its snapshot.
         """
-        platform_data = {}
-
-        for keyword in keywords:
-            data = {
-                "trademe": None,
-                "amazon": None,
-                "ebay": None,
-                "temu": None,
-            }
-
-            try:
-                tasks = []
-
-                # TradeMe API (NZ only)
-                if market == "NZ" and self.trademe_api:
-                    tasks.append(self._safe_call(
-                        self.trademe_api.search_products(keyword, limit=50),
-                        "trademe"
-                    ))
-                elif market == "NZ":
-                    # Use cached data if API not configured
-                    cached = await self._get_cached_trademe_data(keyword)
-                    data["trademe"] = cached
-
-                # eBay API
-                if self.ebay_service:
-                    tasks.append(self._safe_call(
-                        self._fetch_ebay_data(keyword, market),
-                        "ebay"
-                    ))
-
-                # Execute API calls in parallel
-                if tasks:
-                    results = await asyncio.gather(*tasks, return_exceptions=True)
-
-                    for result in results:
-                        if isinstance(result, tuple) and len(result) == 2:
-                            name, res = result
-                            if not isinstance(res, Exception) and res is not None:
-                                data[name] = res
-
-            except Exception as e:
-                print(f"[Platform] Error collecting data for {keyword}: {e}")
-
-            platform_data[keyword] = data
-
-        return platform_data
-
-    async def _fetch_ebay_data(self, keyword: str, market: str) -> Dict:
-        """Fetch eBay data and transform to standard format."""
-        try:
-            products = await self.ebay_service.search_products(keyword, market, limit=50)
-            if products:
-                prices = [p["price"] for p in products if p.get("price")]
-                return {
-                    "total_results": len(products),
-                    "products": products,
-                    "price_stats": {
-                        "min": min(prices) if prices else 0,
-                        "max": max(prices) if prices else 0,
-                        "avg": sum(prices) / len(prices) if prices else 0,
-                    },
-                }
-        except Exception as e:
-            print(f"[eBay API] Error for {keyword}: {e}")
-        return None
-
-    async def _get_cached_trademe_data(self, keyword: str) -> Dict:
-        """Get cached TradeMe data when API is not configured."""
-        # Cached data from earlier scraping
-        TRADEME_CACHED_DATA = {
-            "sunglasses sport": {"listings": 20648, "avg_price": 35.0},
-            "smart watch": {"listings": 17319, "avg_price": 89.0},
-            "solar garden light": {"listings": 9391, "avg_price": 45.0},
-            "bluetooth earbuds": {"listings": 4060, "avg_price": 55.0},
-            "yoga mat": {"listings": 1165, "avg_price": 35.0},
-            "power bank": {"listings": 923, "avg_price": 45.0},
-            "phone case": {"listings": 3500, "avg_price": 20.0},
-            "LED strip light": {"listings": 5200, "avg_price": 30.0},
-            "backpack": {"listings": 8500, "avg_price": 65.0},
-            "storage organizer": {"listings": 4200, "avg_price": 25.0},
-        }
-
-        if keyword in TRADEME_CACHED_DATA:
-            cached = TRADEME_CACHED_DATA[keyword]
-            return {
-                "total_results": cached["listings"],
-                "price_stats": {
-                    "min": cached["avg_price"] * 0.5,
-                    "max": cached["avg_price"] * 2.0,
-                    "avg": cached["avg_price"],
-                },
-            }
-        return None
-
-    async def _safe_call(self, coro, name: str):
-        """Safely call an async function and return (name, result)."""
-        try:
-            result = await coro
-            return (name, result)
-        except Exception as e:
-            print(f"Error in {name}: {e}")
-            return (name, None)
+        with deadline(settings.ranking_deadline_seconds):
+            return await self.platforms.collect(keywords, market)
 
     async def _collect_trends_data(
         self,
         keywords: List[str],
         market: str,
     ) -> Dict[str, Dict]:
-        """Collect Google Trends data for keywords."""
+        """Collect Google Trends data for keywords.
+
+        Keywords are fetched through the batch engine, so every category is
+        scaled against the same anchor keyword and scores are comparable.
+        Direction and momentum come from the analytics engine over stored
+        series, falling back to the fetched window when nothing is stored.
+        """
         trends_data = {}
 
         try:
-            # Process in batches of 5 (Google Trends limit)
-            for i in range(0, len(keywords), 5):
-                batch = keywords[i:i+5]
-                result = await self.google_trends.get_interest_over_time(
-                    keywords=batch,
-                    region=market,
-                    timeframe="today 3-m",
-                )
-
-                # Calculate average interest for each keyword
-                if result.get("data"):
-                    for kw in batch:
-                        values = [d.get(kw, 0) for d in result["data"]]
-                        avg_interest = sum(values) / len(values) if values else 0
-                        current = values[-1] if values else 0
-                        trend = "up" if len(values) > 1 and values[-1] > values[0] else "down"
-
-                        trends_data[kw] = {
-                            "average_interest": avg_interest,
-                            "current_interest": current,
-                            "trend_direction": trend,
-                            "is_mock": result.get("is_mock", False),
-                        }
+            result = await self.trends_batch.fetch(
+                keywords=keywords,
+                region=market,
+                timeframe="today 3-m",
+                priority=PRIORITY_BATCH,
+            )
+            series = {kw: values for kw, values in result.get("series", {}).items() if values}
+
+            analytics = self.trends_analytics.analyze(list(series), market, window="3m")
+            unstored = {kw: values for kw, values in series.items() if kw not in analytics}
+            if unstored:
+                analytics.update(analyze_series(result["dates"], unstored, window="3m"))
+
+            for kw, values in series.items():
+                metrics = analytics.get(kw, {})
+                trends_data[kw] = {
+                    # Batch-normalised values, comparable across categories
+                    "average_interest": sum(values) / len(values),
+                    "current_interest": values[-1],
+                    "trend_direction": metrics.get("direction", "stable"),
+                    "slope_per_week": metrics.get("slope_per_week"),
+                    "momentum_z": metrics.get("momentum_z"),
+                    "yoy_change": metrics.get("yoy_change"),
+                    "seasonality": metrics.get("seasonality"),
+                    "is_mock": result.get("is_mock", False),
+                }
 
         except Exception as e:
-            print(f"Error collecting trends data: {e}")
+            logger.error("Error collecting trends data: %s", e)
 
         return trends_data
 
     async def _get_supplier_data(self, keywords: List[str]) -> Dict[str, Dict]:
-        """Get 1688 supplier data from Supabase."""
-        supplier_data = {}
-
+        """Get 1688 supplier data from Supabase (one aggregate query for all keywords)."""
         # Map English keywords to Chinese
         keyword_map = {c["keyword"]: c["zh"] for c in self.CATEGORIES}
+        zh_keywords = {keyword: keyword_map.get(keyword, keyword) for keyword in keywords}
 
-        db = get_db()
-
-        for keyword in keywords:
-            try:
-                zh_keyword = keyword_map.get(keyword, keyword)
-                print(f"[1688] Querying suppliers for '{keyword}' -> '{zh_keyword}'")
-
-                # Query Supabase for cached supplier data
-                result = db.table("suppliers_1688")\
-                    .select("*")\
-                    .eq("search_keyword", zh_keyword)\
-                    .order("price", desc=False)\
-                    .limit(20)\
-                    .execute()
-
-                if result.data:
-                    # Fix: Use 'price' in item instead of item.get("price") to include 0 values
-                    prices = [
-                        float(item["price"])
-                        for item in result.data
-                        if "price" in item and item["price"] is not None
-                    ]
-                    # Filter out zero prices for average calculation
-                    valid_prices = [p for p in prices if p > 0]
-
-                    print(f"[1688] Found {len(result.data)} suppliers for '{zh_keyword}', valid prices: {len(valid_prices)}")
-
-                    supplier_data[keyword] = {
-                        "count": len(result.data),
-                        "min_price": min(valid_prices) if valid_prices else 0,
-                        "max_price": max(valid_prices) if valid_prices else 0,
-                        "avg_price": sum(valid_prices) / len(valid_prices) if valid_prices else 0,
-                        "products": result.data[:5],  # Top 5 cheapest
-                    }
-                else:
-                    print(f"[1688] No suppliers found for '{zh_keyword}'")
-                    supplier_data[keyword] = {
-                        "count": 0,
-                        "min_price": 0,
-                        "max_price": 0,
-                        "avg_price": 0,
-                        "products": [],
-                    }
-
-            except Exception as e:
-                print(f"[1688] Error getting supplier data for {keyword}: {e}")
-                supplier_data[keyword] = {
-                    "count": 0,
-                    "min_price": 0,
-                    "max_price": 0,
-                    "avg_price": 0,
-                    "products": [],
-                }
+        try:
+            summaries = summarize_supplier_prices(get_db(), list(zh_keywords.values()))
+        except Exception as e:
+            logger.error("Error getting supplier data: %s", e)
+            summaries = {}
+
+        supplier_data = {}
+        for keyword, zh_keyword in zh_keywords.items():
+            summary = summaries.get(zh_keyword) or empty_price_summary()
+            relevance = 1.0
+
+            if not summary["count"]:
+                # No suppliers scraped under this keyword; use similar titles
+                index = get_supplier_index()
+                matches = index.search(zh_keyword, limit=20) if index is not None else []
+                rows = sorted((row for row, _ in matches), key=lambda r: float(r.get("price") or 0))
+                summary = summarize_rows(rows)
+                relevance = sum(sim for _, sim in matches) / len(matches) if matches else 0.0
+
+            if summary["count"]:
+                logger.debug("Found %d suppliers for %r", summary["count"], zh_keyword, extra=SAMPLED)
+            else:
+                logger.debug("No suppliers found for %r", zh_keyword, extra=SAMPLED)
+                relevance = 0.0
+
+            supplier_data[keyword] = {**summary, "relevance": round(relevance, 3)}
 
         return supplier_data
 
     def _calculate_category_score(
         self,
         keyword: str,
-        platform_data: Dict,
+        platform_data: Dict[str, PlatformResult],
         trends_data: Dict,
         supplier_data: Dict,
         market: str,
@@ -369,71 +268,11 @@ class RankingService:
         demand_scores = []
         platform_stats = {}
 
-        # TradeMe (NZ only)
-        if market == "NZ" and platform_data.get("trademe"):
-            trademe = platform_data["trademe"]
-            if isinstance(trademe, dict):
-                count = trademe.get("total_results", 0)
-                price_stats = trademe.get("price_stats", {})
-            elif isinstance(trademe, list):
-                count = len(trademe)
-                prices = [p.get("price", 0) for p in trademe if p.get("price")]
-                price_stats = {
-                    "min": min(prices) if prices else 0,
-                    "max": max(prices) if prices else 0,
-                    "avg": sum(prices) / len(prices) if prices else 0,
-                }
-            else:
-                count = 0
-                price_stats = {}
-            demand_scores.append(min(100, count / 100))  # Scale: 10000 listings = 100 score
-            platform_stats["trademe"] = {
-                "listings": count,
-                "price_range": price_stats,
-            }
-
-        # Amazon
-        if platform_data.get("amazon"):
-            amazon = platform_data["amazon"]
-            count = amazon.get("total_results", 0)
-            demand_scores.append(min(100, count / 100))
-            platform_stats["amazon"] = {
-                "listings": count,
-                "price_range": amazon.get("price_stats", {}),
-            }
-
-        # eBay
-        if platform_data.get("ebay"):
-            ebay = platform_data["ebay"]
-            if isinstance(ebay, dict):
-                count = ebay.get("total_results", 0)
-                price_stats = ebay.get("price_stats", {})
-            elif isinstance(ebay, list):
-                count = len(ebay)
-                prices = [p.get("price", 0) for p in ebay if p.get("price")]
-                price_stats = {
-                    "min": min(prices) if prices else 0,
-                    "max": max(prices) if prices else 0,
-                    "avg": sum(prices) / len(prices) if prices else 0,
-                }
-            else:
-                count = 0
-                price_stats = {}
-            demand_scores.append(min(100, count / 50))
-            platform_stats["ebay"] = {
-                "listings": count,
-                "price_range": price_stats,
-            }
-
-        # Temu
-        if platform_data.get("temu"):
-            temu = platform_data["temu"]
-            count = temu.get("total_results", 0)
-            demand_scores.append(min(100, count / 50))
-            platform_stats["temu"] = {
-                "listings": count,
-                "price_range": temu.get("price_stats", {}),
-            }
+        for name, result in platform_data.items():
+            adapter = self.platforms.get(name)
+            scale = adapter.demand_scale if adapter else 100.0
+            demand_scores.append(min(100, result.total_results / scale))  # Scale: demand_scale * 100 listings = 100
+            platform_stats[name] = result.stats()
 
         demand_score = sum(demand_scores) / len(demand_scores) if demand_scores else 50
 
@@ -451,15 +290,9 @@ class RankingService:
         cost_price = supplier_data.get("avg_price", 0) or supplier_data.get("min_price", 0)
 
         # Get market price (average from platforms)
-        market_prices = []
-        if platform_stats.get("amazon", {}).get("price_range", {}).get("avg"):
-            market_prices.append(platform_stats["amazon"]["price_range"]["avg"])
-        if platform_stats.get("ebay", {}).get("price_range", {}).get("avg"):
-            market_prices.append(platform_stats["ebay"]["price_range"]["avg"])
-        if platform_stats.get("temu", {}).get("price_range", {}).get("avg"):
-            market_prices.append(platform_stats["temu"]["price_range"]["avg"])
-        if platform_stats.get("trademe", {}).get("price_range", {}).get("avg"):
-            market_prices.append(platform_stats["trademe"]["price_range"]["avg"])
+        market_prices = [
+            result.price_stats["avg"] for result in platform_data.values() if result.price_stats.get("avg")
+        ]
 
         market_price = sum(market_prices) / len(market_prices) if market_prices else 0
 
@@ -469,18 +302,18 @@ class RankingService:
             cost_in_local = cost_price * 0.21
             profit_margin = (market_price - cost_in_local) / cost_in_local * 100
             profit_score = min(100, max(0, profit_margin))  # Cap at 100
+            # Costs from similar titles (not this keyword's own suppliers) count
+            # only as far as they match; the rest stays at the no-data default
+            relevance = supplier_data.get("relevance")
+            if relevance is not None:
+                profit_score = 50 + (profit_score - 50) * min(1.0, max(0.0, relevance))
         else:
             profit_margin = 0
             profit_score = 50  # Default if no data
 
         # === Calculate Competition Score (15%) ===
         # Lower competition = higher score
-        total_listings = sum([
-            platform_stats.get("trademe", {}).get("listings", 0),
-            platform_stats.get("amazon", {}).get("listings", 0),
-            platform_stats.get("ebay", {}).get("listings", 0),
-            platform_stats.get("temu", {}).get("listings", 0),
-        ])
+        total_listings = sum(result.total_results for result in platform_data.values())
 
         # Inverse scale: fewer listings = less competition = higher score
         if total_listings > 50000:
@@ -518,11 +351,16 @@ class RankingService:
             "trend_info": {
                 "direction": trend_direction,
                 "current_interest": trends_data.get("current_interest", 0),
+                "momentum_z": trends_data.get("momentum_z"),
+                "yoy_change": trends_data.get("yoy_change"),
+                "seasonality": trends_data.get("seasonality"),
             },
             "supplier_info": {
                 "cost_price_cny": cost_price,
+                "median_price_cny": supplier_data.get("median_price", 0),
                 "product_count": supplier_data.get("count", 0),
                 "top_product": supplier_data.get("products", [{}])[0] if supplier_data.get("products") else None,
+                "relevance": supplier_data.get("relevance"),
             },
             "profit_analysis": {
                 "cost_cny": cost_price,
@@ -535,3 +373,14 @@ class RankingService:
         """Cleanup resources (no-op for API-based services)."""
         # API services don't need explicit cleanup
         pass
+
+
+_ranking_service: Optional[RankingService] = None
+
+
+def get_ranking_service() -> RankingService:
+    """Process-wide ranking service (built in the app lifespan)."""
+    global _ranking_service
+    if _ranking_service is None:
+        _ranking_service = RankingService()
+    return _ranking_service
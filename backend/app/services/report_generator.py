@@ -1,24 +1,29 @@
 """Report generation service."""
 
 import asyncio
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from datetime import datetime
 from uuid import UUID
 import json
 from decimal import Decimal
 
-from supabase import Client
-
-from app.services.ebay_service import EbayService
+from app.log import get_logger
 from app.services.google_trends_service import GoogleTrendsService
+from app.services.platform_registry import get_platform_registry
+from app.services.trends_scheduler import PRIORITY_BATCH
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+logger = get_logger(__name__)
 
 
 class ReportGenerator:
     """Service for generating product selection reports."""
     
-    def __init__(self, db: Client):
+    def __init__(self, db: "Client"):
         self.db = db
-        self.ebay_service = EbayService()
+        self.platforms = get_platform_registry()
         self.trends_service = GoogleTrendsService()
     
     async def generate_report(
@@ -99,7 +104,7 @@ class ReportGenerator:
             }).eq("id", report_id).execute()
             
         except Exception as e:
-            print(f"Report generation failed: {e}")
+            logger.exception("Report generation failed: %s", e)
             self.db.table("reports").update({
                 "status": "failed",
                 "summary": {"error": str(e)},
@@ -124,24 +129,13 @@ class ReportGenerator:
         products = []
         
         if target_type == "keyword":
-            # Search eBay AU
-            try:
-                ebay_au = await self.ebay_service.search_products(
-                    target_value, region="AU", limit=50
-                )
-                products.extend(ebay_au)
-            except Exception as e:
-                print(f"eBay AU fetch error: {e}")
-            
-            # Search eBay NZ
-            try:
-                ebay_nz = await self.ebay_service.search_products(
-                    target_value, region="NZ", limit=50
-                )
-                products.extend(ebay_nz)
-            except Exception as e:
-                print(f"eBay NZ fetch error: {e}")
-        
+            # Search every enabled platform in both markets
+            for market in ("AU", "NZ"):
+                results = await self.platforms.collect([target_value], market, mode="search")
+                for name, result in results[target_value].items():
+                    for product in result.products:
+                        products.append({"platform": f"{name}_{market.lower()}", **product})
+
         elif target_type == "product":
             # Get specific product
             result = self.db.table("products")\
@@ -178,17 +172,18 @@ class ReportGenerator:
             return {"available": False}
         
         try:
-            # Get interest over time
-            interest = await self.trends_service.get_interest_over_time(
-                [keyword], region="AU"
-            )
-            
-            # Get related queries
-            related = await self.trends_service.get_related_queries(keyword, region="AU")
-            
-            # Get NZ comparison
-            nz_interest = await self.trends_service.get_interest_over_time(
-                [keyword], region="NZ"
+            # AU interest, related queries and NZ comparison are independent,
+            # so queue them together and let the Trends scheduler pace them
+            interest, related, nz_interest = await asyncio.gather(
+                self.trends_service.get_interest_over_time(
+                    [keyword], region="AU", priority=PRIORITY_BATCH
+                ),
+                self.trends_service.get_related_queries(
+                    keyword, region="AU", priority=PRIORITY_BATCH
+                ),
+                self.trends_service.get_interest_over_time(
+                    [keyword], region="NZ", priority=PRIORITY_BATCH
+                ),
             )
             
             return {
@@ -199,7 +194,7 @@ class ReportGenerator:
                 "related_queries": related,
             }
         except Exception as e:
-            print(f"Trends fetch error: {e}")
+            logger.warning("Trends fetch error: %s", e)
             return {"available": False, "error": str(e)}
     
     async def _analyze_competition(
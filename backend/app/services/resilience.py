@@ -0,0 +1,548 @@
+"""Shared resilience layer for outbound calls.
+
+Every upstream host (TradeMe, eBay, Google Trends, 1688) gets one
+``HostGuard`` from ``get_host_guard``. A guard combines:
+
+- a token bucket pacing requests to the host (optional, off by default)
+- a circuit breaker: after ``failure_threshold`` consecutive transient
+  failures or 5xx answers the host is skipped for ``reset_seconds``, then a limited number
+  of half-open probes decide whether to close it again
+- a retry budget: retries are allowed only as a fraction of recent
+  requests, so a failing host isn't hit with ``max_retries`` times the load
+- deadlines: ``with deadline(seconds):`` bounds every guarded call and
+  backoff sleep awaited inside it, including in tasks it spawns
+
+A host that is down therefore fails fast with ``CircuitOpenError`` instead
+of making every caller wait out its own timeouts. ``resilience_stats()``
+feeds the ``/health/upstreams`` endpoint.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+import httpx
+import requests
+
+from app.config import settings
+from app.log import get_logger
+from app.services.tracing import format_metric, span
+
+logger = get_logger(__name__)
+
+# Status codes worth retrying; other 5xx still count against the host
+RETRYABLE_STATUS = frozenset({429, 502, 503, 504})
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the host while its circuit is open."""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"{host} circuit open, retrying in {retry_in:.0f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class DeadlineExceeded(TimeoutError):
+    """The surrounding ``deadline()`` ran out before the call could finish."""
+
+
+class RetryableError(Exception):
+    """Transient upstream failure; ``retry_after`` overrides the backoff."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None, response: Any = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.response = response
+
+
+class ServerError(Exception):
+    """Upstream answered 5xx; held against the host but not retried."""
+
+    def __init__(self, message: str, response: Any = None):
+        super().__init__(message)
+        self.response = response
+
+
+def is_transient(error: BaseException) -> bool:
+    """Errors that say more about the host than the request."""
+    if isinstance(error, (RetryableError, ConnectionError, TimeoutError, httpx.TransportError)):
+        return True
+    # pytrends goes through requests, whose errors don't subclass the builtins
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    # Playwright's TimeoutError doesn't subclass the builtin one
+    return type(error).__name__ == "TimeoutError"
+
+
+def is_server_error(error: BaseException) -> bool:
+    """Errors carrying a 5xx response (``ServerError``, pytrends, httpx)."""
+    if isinstance(error, ServerError):
+        return True
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return isinstance(status, int) and status >= 500
+
+
+def retry_after_seconds(headers, default: Optional[float] = None) -> Optional[float]:
+    """``Retry-After`` in seconds (HTTP dates are not used by our upstreams)."""
+    try:
+        return max(0.0, float(headers.get("Retry-After", "")))
+    except (TypeError, ValueError):
+        return default
+
+
+def raise_for_retryable_status(response: httpx.Response) -> httpx.Response:
+    """Raise ``RetryableError`` for 429/502/503/504, ``ServerError`` for other 5xx."""
+    if response.status_code in RETRYABLE_STATUS:
+        raise RetryableError(
+            f"{response.request.url.host} returned {response.status_code}",
+            retry_after=retry_after_seconds(response.headers),
+            response=response,
+        )
+    if response.is_server_error:
+        raise ServerError(f"{response.request.url.host} returned {response.status_code}", response)
+    return response
+
+
+# ---------- deadlines ----------
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline", default=None)
+
+
+@contextlib.contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Bound guarded calls made inside the block to ``seconds`` from now.
+
+    Nested deadlines can only shorten the outer one. ``None`` or a
+    non-positive value leaves the current deadline unchanged.
+    """
+    if not seconds or seconds <= 0:
+        yield
+        return
+    current = _deadline.get()
+    expires = time.monotonic() + seconds
+    token = _deadline.set(expires if current is None else min(current, expires))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None without one."""
+    expires = _deadline.get()
+    return None if expires is None else expires - time.monotonic()
+
+
+def bounded_timeout(timeout: Optional[float]) -> Optional[float]:
+    """``timeout`` shortened to the current deadline; raises once it has passed."""
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded("deadline exceeded")
+    return left if timeout is None else min(timeout, left)
+
+
+async def sleep_within_deadline(seconds: float) -> None:
+    """Sleep, or fail right away if the deadline would pass first."""
+    left = remaining()
+    if left is not None and seconds >= left:
+        raise DeadlineExceeded(f"deadline exceeded (backoff {seconds:.1f}s, {max(left, 0):.1f}s left)")
+    if seconds > 0:
+        await asyncio.sleep(seconds)
+
+
+# ---------- building blocks ----------
+
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+
+    Tokens are reserved synchronously and the caller sleeps for the returned
+    delay, so no lock is needed as long as all callers share one event loop.
+    The balance may go negative, which queues reservations in arrival order.
+    """
+
+    def __init__(self, rate_per_second: float, burst: int = 1):
+        self.rate = rate_per_second
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds to wait before using it."""
+        self._refill()
+        self._tokens -= 1
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self.rate
+
+    def penalize(self, seconds: float) -> None:
+        """Delay every future reservation by ``seconds`` (e.g. after a 429)."""
+        self._refill()
+        self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+    async def acquire(self) -> None:
+        """Wait until a token is available."""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed -> open after ``failure_threshold`` failures in a row; open ->
+    half-open once ``reset_seconds`` have passed; half-open admits
+    ``half_open_probes`` calls, closing on a success and re-opening on a
+    failure. A probe that gets no verdict within ``reset_seconds`` (its
+    caller vanished without ``release()``) counts as a failure, so the
+    circuit can't stay half-open with every slot taken.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+        half_open_probes: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.half_open_probes = max(1, half_open_probes)
+        self._clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_at = 0.0
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        now = self._clock()
+        if self._state == self.OPEN and now - self._opened_at >= self.reset_seconds:
+            self._state = self.HALF_OPEN
+            self._probes = 0
+        elif (
+            self._state == self.HALF_OPEN
+            and self._probes >= self.half_open_probes
+            and now - self._probe_at >= self.reset_seconds
+        ):
+            # The probe never reported back; treat it as failed
+            self._open()
+        return self._state
+
+    def retry_in(self) -> float:
+        """Seconds until the next half-open probe (0 unless open)."""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_seconds - self._clock())
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; half-open calls use up a probe slot."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and self._probes < self.half_open_probes:
+            self._probes += 1
+            self._probe_at = self._clock()
+            return True
+        return False
+
+    def release(self) -> None:
+        """Give back a probe slot for a call that ended without a verdict."""
+        if self._state == self.HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def record_success(self) -> None:
+        self._state = self.CLOSED
+        self._failures = 0
+        self._probes = 0
+
+    def record_failure(self) -> None:
+        if self.state == self.HALF_OPEN:
+            self._open()
+            return
+        self._failures += 1
+        if self._state == self.CLOSED and self._failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = self._clock()
+        self._probes = 0
+        self.trips += 1
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "retry_in": round(self.retry_in(), 1),
+            "trips": self.trips,
+        }
+
+
+class RetryBudget:
+    """
+    Retries as a fraction of requests.
+
+    Each request deposits ``ratio`` tokens and each retry spends one. The
+    balance starts at, and is capped by, ``reserve`` so isolated failures
+    always get retried while a host failing everything only sees about
+    ``ratio`` extra load.
+    """
+
+    def __init__(self, ratio: float = 0.2, reserve: float = 10.0):
+        self.ratio = max(0.0, ratio)
+        self.reserve = max(0.0, reserve)
+        self._balance = self.reserve
+
+    def record_request(self) -> None:
+        self._balance = min(self.reserve, self._balance + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self._balance < 1:
+            return False
+        self._balance -= 1
+        return True
+
+    @property
+    def balance(self) -> float:
+        return self._balance
+
+
+# ---------- per-host guard ----------
+
+class HostGuard:
+    """Rate limit, circuit breaker and retry budget for one upstream host."""
+
+    def __init__(
+        self,
+        host: str,
+        rate_per_second: float = 0.0,
+        burst: int = 1,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+        half_open_probes: int = 1,
+        max_retries: int = 3,
+        retry_ratio: float = 0.2,
+        retry_reserve: float = 10.0,
+        backoff_base: float = 0.5,
+        backoff_max: float = 10.0,
+        bucket: Optional[TokenBucket] = None,
+    ):
+        self.host = host
+        self.bucket = bucket or (TokenBucket(rate_per_second, burst) if rate_per_second > 0 else None)
+        self.breaker = CircuitBreaker(failure_threshold, reset_seconds, half_open_probes)
+        self.budget = RetryBudget(retry_ratio, retry_reserve)
+        self.max_retries = max(1, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.counters = dict.fromkeys(
+            ("requests", "successes", "failures", "retries", "rejected", "budget_exhausted", "deadline_exceeded"),
+            0,
+        )
+
+    # Building blocks for callers that run their own attempt loop
+
+    def before_attempt(self) -> None:
+        """Raise ``CircuitOpenError`` if the host may not be called now."""
+        if not self.breaker.allow():
+            self.counters["rejected"] += 1
+            raise CircuitOpenError(self.host, self.breaker.retry_in())
+        self.counters["requests"] += 1
+        self.budget.record_request()
+
+    def on_success(self) -> None:
+        self.counters["successes"] += 1
+        self.breaker.record_success()
+
+    def on_failure(self) -> None:
+        self.counters["failures"] += 1
+        self.breaker.record_failure()
+
+    def can_retry(self) -> bool:
+        """Spend a retry from the budget; False once it's exhausted."""
+        if self.budget.try_spend():
+            self.counters["retries"] += 1
+            return True
+        self.counters["budget_exhausted"] += 1
+        return False
+
+    def backoff(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """``Retry-After`` when the error carries one, else capped exponential with jitter."""
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None:
+            return retry_after
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay + random.uniform(0, delay / 2)
+
+    async def pace(self) -> None:
+        """Wait for a rate-limit token, within the current deadline."""
+        if self.bucket is not None:
+            await sleep_within_deadline(self.bucket.reserve())
+
+    async def call(
+        self,
+        func: Callable[[], Awaitable[Any]],
+        *,
+        retryable: Callable[[BaseException], bool] = is_transient,
+        backoff: Optional[Callable[[int, BaseException], float]] = None,
+        max_retries: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Await ``func()`` with pacing, circuit breaking and retries.
+
+        Args:
+            func: Zero-argument coroutine function making one attempt
+            retryable: Which errors count against the host and get retried;
+                5xx answers count against it without a retry, other errors
+                close a half-open circuit (the host answered) and propagate
+                immediately
+            backoff: ``(attempt, error) -> seconds`` (default ``self.backoff``)
+            max_retries: Attempts in total (default from settings)
+            timeout: Per-attempt timeout, further bounded by the deadline
+
+        Raises:
+            CircuitOpenError: The host is failing; nothing was sent
+            DeadlineExceeded: The deadline ran out before an answer
+        """
+        with span(f"upstream {self.host}", "client") as current:
+            retries = self.counters["retries"]
+            try:
+                return await self._call(func, retryable, backoff or self.backoff, max_retries, timeout)
+            finally:
+                current.set(retries=self.counters["retries"] - retries)
+
+    async def _call(self, func, retryable, backoff, max_retries, timeout) -> Any:
+        attempts = max(1, max_retries or self.max_retries)
+
+        for attempt in range(attempts):
+            try:
+                limit = bounded_timeout(timeout)
+            except DeadlineExceeded:
+                self.counters["deadline_exceeded"] += 1
+                raise
+            self.before_attempt()
+            try:
+                await self.pace()
+                result = await asyncio.wait_for(func(), limit) if limit is not None else await func()
+            except DeadlineExceeded:
+                self.breaker.release()
+                self.counters["deadline_exceeded"] += 1
+                raise
+            except asyncio.CancelledError:
+                # Cancelled by the caller (wait_for, task cancel): no verdict on the host
+                self.breaker.release()
+                raise
+            except Exception as e:
+                left = remaining()
+                if isinstance(e, asyncio.TimeoutError) and left is not None and left <= 0:
+                    # The caller's deadline ran out, not the host's patience
+                    self.breaker.release()
+                    self.counters["deadline_exceeded"] += 1
+                    raise DeadlineExceeded("deadline exceeded") from e
+                if not retryable(e):
+                    if is_server_error(e):
+                        self.on_failure()
+                    else:
+                        self.breaker.record_success()
+                    raise
+                self.on_failure()
+                if attempt == attempts - 1 or not self.can_retry():
+                    raise
+                delay = backoff(attempt, e)
+                logger.info("%s: %s; retry %d in %.1fs", self.host, e or type(e).__name__, attempt + 1, delay)
+                try:
+                    await sleep_within_deadline(delay)
+                except DeadlineExceeded:
+                    self.counters["deadline_exceeded"] += 1
+                    raise
+                continue
+            self.on_success()
+            return result
+
+    def stats(self) -> dict:
+        return {
+            **self.breaker.stats(),
+            **self.counters,
+            "retry_budget": round(self.budget.balance, 2),
+            "rate_per_second": self.bucket.rate if self.bucket is not None else None,
+        }
+
+
+# ---------- registry ----------
+
+_guards: Dict[str, HostGuard] = {}
+
+
+def host_options(host: str) -> dict:
+    """``HostGuard`` keyword arguments for a host: defaults plus its overrides."""
+    return {
+        "rate_per_second": settings.resilience_rate_per_second,
+        "burst": settings.resilience_burst,
+        "failure_threshold": settings.resilience_failure_threshold,
+        "reset_seconds": settings.resilience_reset_seconds,
+        "max_retries": settings.resilience_max_retries,
+        "retry_ratio": settings.resilience_retry_ratio,
+        "retry_reserve": settings.resilience_retry_reserve,
+        **settings.resilience_hosts.get(host, {}),
+    }
+
+
+def get_host_guard(host: str, **overrides) -> HostGuard:
+    """
+    Process-wide guard for a host, created on first use.
+
+    ``overrides`` only apply when the guard is created (e.g. the Trends
+    scheduler handing over its own token bucket).
+    """
+    guard = _guards.get(host)
+    if guard is None:
+        guard = _guards[host] = HostGuard(host, **{**host_options(host), **overrides})
+    return guard
+
+
+def resilience_stats() -> Dict[str, dict]:
+    """Breaker state and counters for every host called so far."""
+    return {host: guard.stats() for host, guard in sorted(_guards.items())}
+
+
+def prometheus_lines() -> List[str]:
+    """Upstream breaker state and counters in Prometheus exposition format."""
+    stats = resilience_stats()
+    lines = [
+        "# HELP app_upstream_circuit_open Whether calls to the host currently fail fast (1 = open or half-open).",
+        "# TYPE app_upstream_circuit_open gauge",
+    ]
+    lines += [format_metric("app_upstream_circuit_open", {"host": h}, int(s["state"] != "closed")) for h, s in stats.items()]
+    lines += [
+        "# HELP app_upstream_calls_total Guarded upstream calls by outcome.",
+        "# TYPE app_upstream_calls_total counter",
+    ]
+    for host, host_stats in stats.items():
+        for outcome in ("requests", "successes", "failures", "retries", "rejected", "budget_exhausted", "deadline_exceeded"):
+            lines.append(format_metric("app_upstream_calls_total", {"host": host, "outcome": outcome}, host_stats[outcome]))
+    return lines
+
+
+def reset_host_guards() -> None:
+    """Forget every guard (tests, and config reloads)."""
+    _guards.clear()
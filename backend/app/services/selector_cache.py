@@ -0,0 +1,196 @@
+"""Adaptive CSS selector choice for scraped pages.
+
+Scrapers keep an ordered list of candidate selectors per page type because
+site layouts drift. Trying them all on every page costs one
+``query_selector_all`` round trip each, yet the same selector wins on almost
+every run. ``SelectorCache`` remembers the last winner per (site, page
+type), tries it first and only re-probes the full list when it stops
+matching. Tries and hits are counted per selector so a layout change shows
+up as a falling hit rate and a re-probe count in ``stats()``.
+
+Broad fallback selectors (any card, any element with "offer" in its class)
+are passed separately and only tried after every specific candidate missed.
+They never become the winner, so one odd page can't pin a catch-all
+selector that keeps matching ahead of the specific ones.
+
+Winners can optionally be persisted to a JSON file so short-lived
+processes (the local scrape tools) start from the last known layout.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.log import get_logger
+
+logger = get_logger(__name__)
+
+Key = Tuple[str, str]
+
+
+class SelectorCache:
+    """Last-winning selector per (site, page type) with hit-rate counters."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._winners: Dict[Key, str] = {}
+        self._counts: Dict[Key, Dict[str, List[int]]] = {}  # selector -> [tries, hits]
+        self._lookups: Dict[Key, int] = {}
+        self._winner_hits: Dict[Key, int] = {}
+        self._reprobes: Dict[Key, int] = {}
+        self._load()
+
+    # ---------- persistence ----------
+
+    def _load(self) -> None:
+        if not self.path or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable %s: %s", self.path, e)
+            return
+        for entry in data.get("winners", []):
+            self._winners[(entry["site"], entry["page_type"])] = entry["selector"]
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        winners = [
+            {"site": site, "page_type": page_type, "selector": selector}
+            for (site, page_type), selector in self._winners.items()
+        ]
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"winners": winners}, ensure_ascii=False, indent=2), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning("Failed to save %s: %s", self.path, e)
+
+    # ---------- bookkeeping ----------
+
+    def winner(self, site: str, page_type: str) -> Optional[str]:
+        return self._winners.get((site, page_type))
+
+    def order(self, site: str, page_type: str, selectors: Sequence[str]) -> List[str]:
+        """Candidates with the remembered winner first."""
+        winner = self._winners.get((site, page_type))
+        if winner not in selectors:
+            return list(selectors)
+        return [winner] + [s for s in selectors if s != winner]
+
+    def record(self, site: str, page_type: str, selector: str, hit: bool, remember: bool = True) -> None:
+        """Count one try of ``selector``; a hit makes it the winner unless ``remember`` is False."""
+        key = (site, page_type)
+        with self._lock:
+            counts = self._counts.setdefault(key, {}).setdefault(selector, [0, 0])
+            counts[0] += 1
+            if not hit:
+                return
+            if not remember:
+                counts[1] += 1
+                return
+            counts[1] += 1
+            changed = self._winners.get(key) != selector
+            self._winners[key] = selector
+        if changed:
+            logger.info("%s/%s: now using %r", site, page_type, selector)
+            self._save()
+
+    # ---------- querying ----------
+
+    async def _query(self, page, selector: str) -> list:
+        try:
+            return await page.query_selector_all(selector)
+        except Exception as e:
+            logger.debug("%r error: %s", selector, e)
+            return []
+
+    async def query_all(
+        self,
+        page,
+        site: str,
+        page_type: str,
+        selectors: Sequence[str],
+        fallbacks: Sequence[str] = (),
+    ) -> Tuple[Optional[str], list]:
+        """
+        Elements for the first candidate selector that matches.
+
+        Args:
+            page: Playwright page (or element handle)
+            site: Site name, e.g. "1688"
+            page_type: Page kind, e.g. "search"
+            selectors: Candidates in preference order
+            fallbacks: Broad selectors tried in order when no candidate
+                matches; never remembered as the winner
+
+        Returns:
+            (selector, elements), or (None, []) when nothing matched
+        """
+        key = (site, page_type)
+        winner = self._winners.get(key)
+        with self._lock:
+            self._lookups[key] = self._lookups.get(key, 0) + 1
+
+        for selector in self.order(site, page_type, selectors):
+            items = await self._query(page, selector)
+            self.record(site, page_type, selector, bool(items))
+            if items:
+                with self._lock:
+                    if selector == winner:
+                        self._winner_hits[key] = self._winner_hits.get(key, 0) + 1
+                    elif winner is not None:
+                        self._reprobes[key] = self._reprobes.get(key, 0) + 1
+                return selector, items
+            if selector == winner:
+                logger.info("%s/%s: %r stopped matching, re-probing", site, page_type, selector)
+
+        if winner is not None:
+            with self._lock:
+                self._reprobes[key] = self._reprobes.get(key, 0) + 1
+
+        for selector in fallbacks:
+            items = await self._query(page, selector)
+            self.record(site, page_type, selector, bool(items), remember=False)
+            if items:
+                logger.info("%s/%s: no specific selector matched, using fallback %r", site, page_type, selector)
+                return selector, items
+        return None, []
+
+    def stats(self) -> Dict[str, Any]:
+        """Per (site, page type): winner, its hit rate, re-probes and per-selector counts."""
+        with self._lock:
+            result = {}
+            for key in set(self._counts) | set(self._winners):
+                lookups = self._lookups.get(key, 0)
+                result[f"{key[0]}/{key[1]}"] = {
+                    "winner": self._winners.get(key),
+                    "lookups": lookups,
+                    "winner_hit_rate": round(self._winner_hits.get(key, 0) / lookups, 3) if lookups else None,
+                    "reprobes": self._reprobes.get(key, 0),
+                    "selectors": {
+                        selector: {
+                            "tries": tries,
+                            "hits": hits,
+                            "hit_rate": round(hits / tries, 3) if tries else None,
+                        }
+                        for selector, (tries, hits) in self._counts.get(key, {}).items()
+                    },
+                }
+            return result
+
+
+_selector_cache: Optional[SelectorCache] = None
+
+
+def get_selector_cache() -> SelectorCache:
+    """Process-wide selector cache for the backend scrapers."""
+    global _selector_cache
+    if _selector_cache is None:
+        _selector_cache = SelectorCache()
+    return _selector_cache
@@ -0,0 +1,256 @@
+"""Background enrichment of cached 1688 offers from their detail pages.
+
+Search results only carry title, price and sales, so size filtering and
+profit estimates used to run on defaults (``moq=1``, no weight). The
+enricher keeps a queue of offer ids, fetches detail pages with a bounded
+number of tabs in one shared browser, and writes weight, dimensions, MOQ,
+price tiers and specifications back to ``suppliers_1688`` (migration 008).
+Rows older than ``settings.supplier_details_ttl_hours`` are fetched again,
+so request handlers only ever read the cached columns.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional
+
+from app.config import settings
+from app.database import get_db
+from app.log import SAMPLED, get_logger
+from app.services import alibaba1688_service
+from app.services.alibaba1688_service import Alibaba1688Scraper
+from app.services.supplier_index import current_supplier_index
+
+logger = get_logger(__name__)
+
+
+def details_to_row(details: dict) -> dict:
+    """suppliers_1688 column values for a parsed detail page."""
+    return {
+        "weight_kg": details.get("weight"),
+        "dimensions": details.get("dimensions"),
+        "moq": details.get("moq"),
+        "price_tiers": details.get("price_tiers") or [],
+        "specifications": details.get("specifications") or {},
+        "details_fetched_at": datetime.now(timezone.utc).isoformat(),
+        "details_error": None,
+    }
+
+
+def is_fresh(row: dict, ttl_hours: float, now: Optional[datetime] = None) -> bool:
+    """Whether a row's details were fetched within the TTL."""
+    fetched = row.get("details_fetched_at")
+    if not fetched:
+        return False
+    try:
+        fetched_at = datetime.fromisoformat(str(fetched).replace("Z", "+00:00"))
+    except ValueError:
+        return False
+    if fetched_at.tzinfo is None:
+        fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+    return (now or datetime.now(timezone.utc)) - fetched_at < timedelta(hours=ttl_hours)
+
+
+def get_cached_offer(db, offer_id: str) -> Optional[dict]:
+    """The suppliers_1688 row for an offer, or None."""
+    try:
+        result = db.table("suppliers_1688").select("*").eq("offer_id", offer_id).limit(1).execute()
+    except Exception as e:
+        logger.warning("Cache lookup failed for %s: %s", offer_id, e)
+        return None
+    return result.data[0] if result.data else None
+
+
+class SupplierEnricher:
+    """Queue of offers whose detail pages should be (re)fetched."""
+
+    TABLE = "suppliers_1688"
+
+    def __init__(
+        self,
+        db=None,
+        scraper: Optional[Alibaba1688Scraper] = None,
+        concurrency: Optional[int] = None,
+        ttl_hours: Optional[float] = None,
+    ):
+        self._db = db
+        self._scraper = scraper
+        self.concurrency = max(1, concurrency or settings.supplier_enrichment_concurrency)
+        self.ttl_hours = ttl_hours if ttl_hours is not None else settings.supplier_details_ttl_hours
+        self._queued: Dict[str, None] = {}  # insertion-ordered set
+        self._task: Optional[asyncio.Task] = None
+        # Offers fetched by this process, so stale snapshots don't re-queue them
+        self._completed: Dict[str, datetime] = {}
+        self.enriched = 0
+        self.failed = 0
+
+    def _get_db(self):
+        """Resolve the database lazily; None when Supabase isn't configured."""
+        if self._db is None:
+            try:
+                self._db = get_db()
+            except Exception:
+                self._db = False
+        return self._db or None
+
+    def cached_offer(self, offer_id: str) -> Optional[dict]:
+        """The cached row for an offer; None when missing or without a database."""
+        db = self._get_db()
+        return get_cached_offer(db, offer_id) if db is not None else None
+
+    def save_details(self, offer_id: str, details: dict) -> None:
+        """Write parsed detail-page data back to the offer's row."""
+        db = self._get_db()
+        if db is None:
+            return
+        try:
+            db.table(self.TABLE).update(details_to_row(details)).eq("offer_id", offer_id).execute()
+        except Exception as e:
+            logger.warning("Failed to save %s: %s", offer_id, e)
+
+    # ---------- queue ----------
+
+    def needs_details(self, row: dict) -> bool:
+        """Whether an offer row should be queued: not queued, not just fetched, and stale."""
+        offer_id = row.get("offer_id")
+        if not offer_id or offer_id in self._queued:
+            return False
+        completed = self._completed.get(offer_id)
+        if completed and datetime.now(timezone.utc) - completed < timedelta(hours=self.ttl_hours):
+            return False
+        return not is_fresh(row, self.ttl_hours)
+
+    def enqueue(self, offer_ids: Iterable[str]) -> int:
+        """Queue offers for enrichment; returns how many were new to the queue."""
+        added = 0
+        for offer_id in offer_ids:
+            if offer_id and offer_id not in self._queued:
+                self._queued[offer_id] = None
+                added += 1
+        return added
+
+    def submit(self, offer_ids: Iterable[str]) -> int:
+        """Queue offers and make sure a background drain is running."""
+        added = self.enqueue(offer_ids)
+        if self._queued and alibaba1688_service.PLAYWRIGHT_AVAILABLE and (self._task is None or self._task.done()):
+            self._task = asyncio.get_running_loop().create_task(self.drain())
+        return added
+
+    def enqueue_stale(self, limit: int = 100) -> int:
+        """Queue the offers whose details are missing or older than the TTL."""
+        db = self._get_db()
+        if db is None:
+            return 0
+        cutoff = (datetime.now(timezone.utc) - timedelta(hours=self.ttl_hours)).isoformat()
+        result = db.table(self.TABLE)\
+            .select("offer_id")\
+            .or_(f"details_fetched_at.is.null,details_fetched_at.lt.{cutoff}")\
+            .order("details_fetched_at", desc=False, nullsfirst=True)\
+            .limit(limit)\
+            .execute()
+        return self.enqueue(row["offer_id"] for row in result.data or [])
+
+    # ---------- worker ----------
+
+    async def drain(self) -> Dict[str, int]:
+        """
+        Fetch every queued offer with ``concurrency`` tabs in one browser.
+
+        Returns:
+            Counts of enriched and failed offers for this drain
+        """
+        counts = {"enriched": 0, "failed": 0}
+        if not self._queued:
+            return counts
+
+        scraper = self._scraper or Alibaba1688Scraper()
+        browser = await scraper._get_browser()
+        if browser is None:
+            return counts
+        context = await scraper.new_context(browser)
+
+        async def worker():
+            page = await scraper.new_page(context)
+            try:
+                while self._queued:
+                    offer_id = next(iter(self._queued))
+                    del self._queued[offer_id]
+                    ok = await self._enrich_one(scraper, page, offer_id)
+                    counts["enriched" if ok else "failed"] += 1
+            finally:
+                await page.close()
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(self._queued)))))
+        finally:
+            await context.close()
+            if self._scraper is None:
+                await scraper.close()
+
+        self.enriched += counts["enriched"]
+        self.failed += counts["failed"]
+        logger.info("Enriched %d offers (%d failed)", counts["enriched"], counts["failed"])
+        return counts
+
+    async def _enrich_one(self, scraper: Alibaba1688Scraper, page, offer_id: str) -> bool:
+        try:
+            row = details_to_row(await scraper.read_detail_page(page, offer_id))
+            ok = True
+        except Exception as e:
+            logger.debug("%s: %s", offer_id, e, extra=SAMPLED)
+            # Stamp the attempt so a broken page waits a TTL instead of looping
+            row = {
+                "details_fetched_at": datetime.now(timezone.utc).isoformat(),
+                "details_error": str(e)[:500],
+            }
+            ok = False
+
+        # Matches read the in-memory index, so it sees the details without a rebuild
+        self._completed[offer_id] = datetime.now(timezone.utc)
+        index = current_supplier_index()
+        if index is not None:
+            index.update_details(offer_id, row)
+
+        db = self._get_db()
+        if db is not None:
+            try:
+                await asyncio.to_thread(
+                    lambda: db.table(self.TABLE).update(row).eq("offer_id", offer_id).execute()
+                )
+            except Exception as e:
+                logger.warning("Failed to save %s: %s", offer_id, e)
+                return False
+        return ok
+
+    async def run(self, limit: int = 100) -> Dict[str, int]:
+        """
+        Queue up to ``limit`` stale offers and fetch them.
+
+        When a drain is already running it picks up the new offers; no
+        second drain (and browser) is started.
+        """
+        self.enqueue_stale(limit)
+        if self._task is not None and not self._task.done():
+            return {"enriched": 0, "failed": 0}
+        self._task = asyncio.get_running_loop().create_task(self.drain())
+        return await self._task
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self._queued),
+            "running": self._task is not None and not self._task.done(),
+            "enriched": self.enriched,
+            "failed": self.failed,
+            "concurrency": self.concurrency,
+            "ttl_hours": self.ttl_hours,
+        }
+
+
+_enricher: Optional[SupplierEnricher] = None
+
+
+def get_supplier_enricher() -> SupplierEnricher:
+    """Process-wide enricher shared by the API routes."""
+    global _enricher
+    if _enricher is None:
+        _enricher = SupplierEnricher()
+    return _enricher
@@ -0,0 +1,392 @@
+"""Local similarity index over cached 1688 supplier titles.
+
+Supplier titles are embedded as character n-gram TF-IDF vectors (1-3 grams,
+which suits Chinese text without a word segmenter) and kept in a
+term-major inverted index, so a query only touches suppliers that share an
+n-gram with it. Very common n-grams are dropped from queries, which makes
+the lookup approximate but keeps it fast at millions of titles.
+
+AU/NZ product titles are queried through their Chinese keywords (from the
+translation cache) only: English words in a listing title ("LED", "case",
+"wireless") match Latin n-grams in unrelated offers and would outweigh the
+product type. The English title is the query only when nothing translated.
+
+The index is built offline from ``suppliers_1688`` and saved as one ``.npz``
+file::
+
+    python -m app.services.supplier_index
+
+The API loads that file (or builds from the database when there is none) in
+a background thread at startup, and rebuilds it every
+``settings.supplier_index_refresh_hours``.
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.database import get_db
+from app.log import get_logger
+
+logger = get_logger(__name__)
+
+NGRAM_RANGE = (1, 3)
+
+# Query n-grams found in more than this share of titles are skipped
+# (only once the index is large enough for that to matter)
+MAX_DF_RATIO = 0.2
+MAX_DF_MIN_DOCS = 1000
+
+# Minimum cosine similarity for a supplier to count as a match
+MIN_SIMILARITY = 0.2
+
+# Supplier columns kept in the index for answering matches without a query
+BASE_ROW_FIELDS = (
+    "offer_id", "title", "price", "product_url", "image_url", "sold_count",
+    "supplier_name", "location", "search_keyword",
+)
+# Detail-page columns from migration 008 (size filtering, enrichment freshness)
+DETAIL_ROW_FIELDS = ("weight_kg", "dimensions", "moq", "details_fetched_at")
+ROW_FIELDS = BASE_ROW_FIELDS + DETAIL_ROW_FIELDS
+
+# Rows per page when reading suppliers_1688
+BUILD_PAGE_SIZE = 1000
+
+_SPLIT_PATTERN = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def analyze(text: str) -> Counter:
+    """Character n-gram counts of a text (NFKC, lowercased, per segment)."""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    grams: Counter = Counter()
+    low, high = NGRAM_RANGE
+    for segment in _SPLIT_PATTERN.split(text):
+        for n in range(low, high + 1):
+            for i in range(len(segment) - n + 1):
+                grams[segment[i:i + n]] += 1
+    return grams
+
+
+class SupplierIndex:
+    """Inverted TF-IDF index of supplier titles."""
+
+    def __init__(
+        self,
+        vocabulary: Dict[str, int],
+        idf: np.ndarray,
+        postings_ptr: np.ndarray,
+        postings_doc: np.ndarray,
+        postings_weight: np.ndarray,
+        rows: List[dict],
+        built_at: Optional[float] = None,
+    ):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self._ptr = postings_ptr
+        self._doc = postings_doc
+        self._weight = postings_weight
+        self.rows = rows
+        self._prices = np.array([float(row.get("price") or 0) for row in rows], dtype=np.float64)
+        self.built_at = built_at or time.time()
+        self._by_offer: Optional[Dict[str, dict]] = None  # built on first update
+        self._max_df = len(rows) if len(rows) < MAX_DF_MIN_DOCS else int(len(rows) * MAX_DF_RATIO)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    # ---------- Build ----------
+
+    @classmethod
+    def build(cls, rows: Iterable[dict]) -> "SupplierIndex":
+        """
+        Build an index from supplier rows (need at least ``title``).
+
+        Args:
+            rows: suppliers_1688 rows
+
+        Returns:
+            SupplierIndex
+        """
+        kept: List[dict] = []
+        vocabulary: Dict[str, int] = {}
+        term_ids: List[np.ndarray] = []
+        term_counts: List[np.ndarray] = []
+
+        for row in rows:
+            grams = analyze(row.get("title", ""))
+            if not grams:
+                continue
+            ids = np.fromiter(
+                (vocabulary.setdefault(g, len(vocabulary)) for g in grams),
+                dtype=np.int32, count=len(grams),
+            )
+            term_ids.append(ids)
+            term_counts.append(np.fromiter(grams.values(), dtype=np.float32, count=len(grams)))
+            kept.append({field: row.get(field) for field in ROW_FIELDS})
+
+        n_docs = len(kept)
+        if n_docs == 0:
+            empty = np.zeros(0, dtype=np.int32)
+            return cls({}, np.zeros(0, dtype=np.float32), np.zeros(1, dtype=np.int64),
+                       empty, np.zeros(0, dtype=np.float32), [])
+
+        lengths = np.fromiter((ids.size for ids in term_ids), dtype=np.int64, count=n_docs)
+        doc_of = np.repeat(np.arange(n_docs, dtype=np.int32), lengths)
+        terms = np.concatenate(term_ids)
+        tf = 1.0 + np.log(np.concatenate(term_counts))
+
+        df = np.bincount(terms, minlength=len(vocabulary))
+        idf = (np.log((1.0 + n_docs) / (1.0 + df)) + 1.0).astype(np.float32)
+        weights = tf * idf[terms]
+
+        # L2-normalise each document
+        norms = np.sqrt(np.bincount(doc_of, weights=weights * weights, minlength=n_docs))
+        weights = (weights / norms[doc_of]).astype(np.float32)
+
+        # Regroup by term (inverted index)
+        order = np.argsort(terms, kind="stable")
+        ptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(df, out=ptr[1:])
+        return cls(vocabulary, idf, ptr, doc_of[order], weights[order], kept)
+
+    # ---------- Query ----------
+
+    def search(
+        self,
+        text: str,
+        limit: int = 20,
+        min_similarity: float = MIN_SIMILARITY,
+        max_price: Optional[float] = None,
+    ) -> List[Tuple[dict, float]]:
+        """
+        Find the suppliers whose titles are most similar to ``text``.
+
+        Args:
+            text: Query text (Chinese keywords and/or title)
+            limit: Maximum results
+            min_similarity: Cosine similarity cut-off (0-1)
+            max_price: Optional CNY price ceiling
+
+        Returns:
+            List of (supplier row, similarity) sorted by similarity
+        """
+        grams = analyze(text)
+        ids, weights = [], []
+        for gram, count in grams.items():
+            term = self.vocabulary.get(gram)
+            if term is not None:
+                ids.append(term)
+                weights.append((1.0 + math.log(count)) * self.idf[term])
+        if not ids:
+            return []
+
+        # Normalise over every known n-gram, then skip the very common ones
+        weights = np.asarray(weights, dtype=np.float32)
+        weights /= np.sqrt((weights * weights).sum())
+        ids = np.asarray(ids)
+        starts, ends = self._ptr[ids], self._ptr[ids + 1]
+        keep = (ends - starts) <= self._max_df
+        if not keep.any():
+            return []
+
+        scores = np.zeros(len(self.rows), dtype=np.float32)
+        for start, end, weight in zip(starts[keep], ends[keep], weights[keep]):
+            scores[self._doc[start:end]] += weight * self._weight[start:end]
+
+        candidates = np.flatnonzero(scores >= min_similarity)
+        if max_price is not None:
+            candidates = candidates[self._prices[candidates] <= max_price]
+        if candidates.size > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self.rows[i], float(scores[i])) for i in candidates]
+
+    def similarity(self, text_a: str, text_b: str) -> float:
+        """Cosine similarity of two texts under this index's IDF weights."""
+        unseen_idf = math.log(1.0 + len(self.rows)) + 1.0
+
+        def vector(text: str) -> Dict[str, float]:
+            return {
+                gram: (1.0 + math.log(count)) * float(
+                    self.idf[self.vocabulary[gram]] if gram in self.vocabulary else unseen_idf
+                )
+                for gram, count in analyze(text).items()
+            }
+
+        a, b = vector(text_a), vector(text_b)
+        if not a or not b:
+            return 0.0
+        dot = sum(weight * b[gram] for gram, weight in a.items() if gram in b)
+        norm = math.sqrt(sum(w * w for w in a.values())) * math.sqrt(sum(w * w for w in b.values()))
+        return dot / norm
+
+    def update_details(self, offer_id: str, values: dict) -> bool:
+        """Merge freshly fetched detail columns into an offer's row."""
+        if self._by_offer is None:
+            self._by_offer = {row.get("offer_id"): row for row in self.rows}
+        row = self._by_offer.get(offer_id)
+        if row is None:
+            return False
+        row.update({field: values[field] for field in DETAIL_ROW_FIELDS if field in values})
+        return True
+
+    # ---------- Persistence ----------
+
+    def save(self, path: str) -> None:
+        """Write the index to a compressed ``.npz`` file."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        terms = sorted(self.vocabulary, key=self.vocabulary.__getitem__)
+        np.savez_compressed(
+            path,
+            terms=np.array(terms, dtype=str),
+            idf=self.idf,
+            ptr=self._ptr,
+            doc=self._doc,
+            weight=self._weight,
+            rows=np.array(json.dumps(self.rows, ensure_ascii=False, default=str)),
+            built_at=np.array(self.built_at),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "SupplierIndex":
+        """Read an index written by ``save``."""
+        with np.load(path) as data:
+            vocabulary = {term: i for i, term in enumerate(data["terms"].tolist())}
+            return cls(
+                vocabulary,
+                data["idf"],
+                data["ptr"],
+                data["doc"],
+                data["weight"],
+                json.loads(str(data["rows"])),
+                float(data["built_at"]),
+            )
+
+
+def fetch_supplier_rows(db=None, page_size: int = BUILD_PAGE_SIZE) -> List[dict]:
+    """Read every suppliers_1688 row needed for the index, page by page."""
+    db = db or get_db()
+    rows: List[dict] = []
+    offset = 0
+    fields = ROW_FIELDS
+    while True:
+        try:
+            result = db.table("suppliers_1688")\
+                .select(", ".join(fields))\
+                .order("offer_id")\
+                .range(offset, offset + page_size - 1)\
+                .execute()
+        except Exception as e:
+            # Databases without migration 008 have no detail columns
+            if fields is BASE_ROW_FIELDS or "42703" not in str(e):
+                raise
+            fields = BASE_ROW_FIELDS
+            continue
+        page = result.data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        offset += page_size
+
+
+# Singleton index. Loading and building run in a background thread (started
+# by the app lifespan); requests use whatever index is loaded, or none yet.
+_index: Optional[SupplierIndex] = None
+_index_lock = threading.Lock()
+_loader: Optional[threading.Thread] = None
+_failed_at: Optional[float] = None  # monotonic time of the last failed load
+
+
+def _refresh_due(index: SupplierIndex) -> bool:
+    hours = settings.supplier_index_refresh_hours
+    return hours > 0 and time.time() - index.built_at >= hours * 3600
+
+
+def _load_in_background() -> None:
+    """Load the index file, then rebuild from the database if it's missing or due."""
+    global _index, _loader, _failed_at
+    try:
+        path = settings.supplier_index_path
+        if _index is None and path and os.path.exists(path):
+            index = SupplierIndex.load(path)
+            with _index_lock:
+                _index = index
+            logger.info("Loaded %d supplier titles", len(index))
+        if _index is None or _refresh_due(_index):
+            index = rebuild_supplier_index()
+            logger.info("Built index of %d supplier titles", len(index))
+        _failed_at = None
+    except Exception as e:
+        _failed_at = time.monotonic()
+        logger.warning("Could not build index (retrying in %.0fs): %s", settings.supplier_index_retry_seconds, e)
+    finally:
+        with _index_lock:
+            _loader = None
+
+
+def start_supplier_index() -> bool:
+    """
+    Load, build or refresh the index in a background thread.
+
+    Returns:
+        True if a load started; False when one is running, the index is
+        current, or the last attempt failed within ``supplier_index_retry_seconds``
+    """
+    global _loader
+    with _index_lock:
+        if _loader is not None:
+            return False
+        if _index is not None and not _refresh_due(_index):
+            return False
+        if _failed_at is not None and time.monotonic() - _failed_at < settings.supplier_index_retry_seconds:
+            return False
+        _loader = threading.Thread(target=_load_in_background, name="supplier-index", daemon=True)
+        _loader.start()
+        return True
+
+
+def get_supplier_index() -> Optional[SupplierIndex]:
+    """
+    Get the process-wide supplier index without waiting for it.
+
+    An index that is due for a refresh keeps serving while the rebuild runs.
+
+    Returns:
+        The index, or None while it is loading or when it can't be built
+    """
+    start_supplier_index()
+    return _index
+
+
+def current_supplier_index() -> Optional[SupplierIndex]:
+    """The index if one is loaded, without loading or building it."""
+    return _index
+
+
+def rebuild_supplier_index(db=None) -> SupplierIndex:
+    """Rebuild the index from the database, save it and swap it in."""
+    global _index
+    index = SupplierIndex.build(fetch_supplier_rows(db))
+    if settings.supplier_index_path:
+        index.save(settings.supplier_index_path)
+    with _index_lock:
+        _index = index
+    return index
+
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    built = rebuild_supplier_index()
+    print(
+        f"[SupplierIndex] Indexed {len(built)} titles, {len(built.vocabulary)} n-grams "
+        f"in {time.perf_counter() - started:.1f}s -> {settings.supplier_index_path}"
+    )
@@ -0,0 +1,256 @@
+"""Indexed keyword search over the suppliers_1688 cache.
+
+``title ILIKE '%关键词%'`` can't use an index, and pg_trgm extracts no
+complete trigram from a two-character Chinese keyword. Migration 005 stores
+every title as an array of single characters and bigrams
+(``title_grams``) with a GIN index, and the ``search_suppliers_1688`` RPC
+finds titles containing all of a keyword's grams, ordered by relevance.
+
+``cjk_grams`` mirrors the SQL function so the same tokenisation can be
+tested and benchmarked locally.
+
+Cache statistics come from ``suppliers_1688_keyword_stats`` (migration 006),
+a per-keyword rollup kept current by statement-level triggers on
+``suppliers_1688``.
+"""
+
+import re
+from typing import Dict, List, Optional, Set
+
+from app.log import get_logger
+
+logger = get_logger(__name__)
+
+SEARCH_RPC = "search_suppliers_1688"
+
+_SEGMENT_PATTERN = re.compile(r"[\s\W_]+", re.UNICODE)
+
+# Set once the RPC is known to be missing (migration 005 not applied)
+_rpc_unavailable = False
+
+
+def cjk_grams(text: str) -> Set[str]:
+    """Single characters and bigrams of each whitespace/punctuation segment."""
+    grams: Set[str] = set()
+    for segment in _SEGMENT_PATTERN.split((text or "").lower()):
+        grams.update(segment)
+        grams.update(segment[i:i + 2] for i in range(len(segment) - 1))
+    return grams
+
+
+def _is_missing_function(error: Exception) -> bool:
+    """PostgREST reports unknown RPCs as PGRST202."""
+    message = str(error)
+    return "PGRST202" in message or "Could not find the function" in message
+
+
+def search_cached_suppliers(
+    db,
+    keyword: str,
+    max_price: Optional[float] = None,
+    limit: int = 20,
+) -> List[dict]:
+    """
+    Find cached suppliers by keyword, most relevant first.
+
+    Uses the indexed RPC; falls back to the unindexed ILIKE query on
+    databases without migration 005.
+
+    Args:
+        db: Supabase client
+        keyword: Chinese (or English) keyword
+        max_price: Optional CNY price ceiling
+        limit: Maximum rows
+
+    Returns:
+        suppliers_1688 rows
+    """
+    global _rpc_unavailable
+
+    if not _rpc_unavailable:
+        try:
+            result = db.rpc(
+                SEARCH_RPC,
+                {"q": keyword, "max_price": max_price, "result_limit": limit},
+            ).execute()
+            return result.data or []
+        except Exception as e:
+            if _is_missing_function(e):
+                _rpc_unavailable = True
+            logger.warning("%s failed (%s); falling back to ILIKE scan", SEARCH_RPC, e)
+
+    query = db.table("suppliers_1688").select("*")
+    query = query.or_(f"search_keyword.eq.{keyword},title.ilike.%{keyword}%")
+    if max_price:
+        query = query.lte("price", max_price)
+    result = query.order("sold_count", desc=True).limit(limit).execute()
+    return result.data or []
+
+
+STATS_TABLE = "suppliers_1688_keyword_stats"
+STATS_FIELDS = (
+    "search_keyword,offer_count,oldest_scraped_at,newest_scraped_at,"
+    "min_price,p25_price,median_price,p75_price,p90_price,max_price,avg_price"
+)
+
+
+def _is_missing_table(error: Exception) -> bool:
+    """PostgREST reports unknown tables as PGRST205 (42P01 from Postgres)."""
+    message = str(error)
+    return "PGRST205" in message or "42P01" in message or "does not exist" in message
+
+
+def summarize_keyword_stats(rows: List[dict]) -> dict:
+    """Fold per-keyword rollup rows into the cache-stats payload."""
+    keyword_stats = {}
+    for row in rows:
+        keyword = row.get("search_keyword") or "unknown"
+        keyword_stats[keyword] = {
+            "count": row.get("offer_count") or 0,
+            "oldest_scraped_at": row.get("oldest_scraped_at"),
+            "newest_scraped_at": row.get("newest_scraped_at"),
+            "price": {
+                field: row.get(f"{field}_price")
+                for field in ("min", "p25", "median", "p75", "p90", "max", "avg")
+            },
+        }
+    newest = [s["newest_scraped_at"] for s in keyword_stats.values() if s["newest_scraped_at"]]
+    return {
+        "total_cached": sum(s["count"] for s in keyword_stats.values()),
+        "keywords": {kw: s["count"] for kw, s in keyword_stats.items()},
+        "keyword_stats": keyword_stats,
+        # ISO-8601 timestamps in one timezone sort lexically
+        "last_updated": max(newest) if newest else None,
+    }
+
+
+def _legacy_cache_stats(db) -> dict:
+    """Count keywords client-side (databases without migration 006)."""
+    count_result = db.table("suppliers_1688").select("id", count="exact").execute()
+    total_count = count_result.count if getattr(count_result, "count", None) is not None else len(count_result.data)
+
+    keywords_result = db.table("suppliers_1688").select("search_keyword").execute()
+    keyword_counts = {}
+    for row in keywords_result.data:
+        kw = row.get("search_keyword") or "unknown"
+        keyword_counts[kw] = keyword_counts.get(kw, 0) + 1
+
+    latest_result = db.table("suppliers_1688").select("scraped_at").order("scraped_at", desc=True).limit(1).execute()
+    return {
+        "total_cached": total_count,
+        "keywords": keyword_counts,
+        "last_updated": latest_result.data[0]["scraped_at"] if latest_result.data else None,
+    }
+
+
+def get_cache_stats(db) -> dict:
+    """
+    Per-keyword cache statistics from the trigger-maintained rollup.
+
+    One read of ``suppliers_1688_keyword_stats`` (one row per keyword), so
+    the cost doesn't grow with the number of cached offers. Falls back to
+    counting client-side when migration 006 isn't applied.
+
+    Returns:
+        Dict with total_cached, keywords (keyword -> count), keyword_stats
+        (freshness and price percentiles per keyword) and last_updated
+    """
+    try:
+        result = db.table(STATS_TABLE).select(STATS_FIELDS).execute()
+    except Exception as e:
+        if not _is_missing_table(e):
+            raise
+        logger.warning("%s missing (%s); counting suppliers_1688 directly", STATS_TABLE, e)
+        return _legacy_cache_stats(db)
+    return summarize_keyword_stats(result.data or [])
+
+
+SUMMARY_RPC = "supplier_price_summary"
+
+# Set once the summary RPC is known to be missing (migration 007 not applied)
+_summary_unavailable = False
+
+
+def empty_price_summary() -> dict:
+    return {
+        "count": 0,
+        "min_price": 0,
+        "max_price": 0,
+        "avg_price": 0,
+        "median_price": 0,
+        "products": [],
+    }
+
+
+def summarize_rows(rows: List[dict], top_n: int = 5) -> dict:
+    """Price summary of rows already sorted cheapest first."""
+    prices = sorted(
+        float(row["price"]) for row in rows
+        if row.get("price") is not None and float(row["price"]) > 0
+    )
+    if not rows:
+        return empty_price_summary()
+    mid = len(prices) // 2
+    median = (prices[mid] if len(prices) % 2 else (prices[mid - 1] + prices[mid]) / 2) if prices else 0
+    return {
+        "count": len(rows),
+        "min_price": prices[0] if prices else 0,
+        "max_price": prices[-1] if prices else 0,
+        "avg_price": sum(prices) / len(prices) if prices else 0,
+        "median_price": median,
+        "products": rows[:top_n],
+    }
+
+
+def summarize_supplier_prices(db, keywords: List[str], top_n: int = 5) -> Dict[str, dict]:
+    """
+    Price summary per search keyword in one round trip.
+
+    Calls ``supplier_price_summary``, which aggregates count, min, max, mean
+    and median (positive prices only) and the ``top_n`` cheapest offers for
+    every keyword in the database. Without migration 007 it falls back to
+    one query per keyword over the 20 cheapest rows.
+
+    Args:
+        db: Supabase client
+        keywords: Chinese search keywords as stored in suppliers_1688
+        top_n: Cheapest offers to return per keyword
+
+    Returns:
+        Dict keyword -> {count, min_price, max_price, avg_price,
+        median_price, products}; keywords without offers are empty summaries
+    """
+    global _summary_unavailable
+
+    keywords = list(dict.fromkeys(keywords))
+    summaries = {keyword: empty_price_summary() for keyword in keywords}
+    if not keywords:
+        return summaries
+
+    if not _summary_unavailable:
+        try:
+            result = db.rpc(SUMMARY_RPC, {"keywords": keywords, "top_n": top_n}).execute()
+            for row in result.data or []:
+                summaries[row["search_keyword"]] = {
+                    "count": row.get("offer_count") or 0,
+                    "min_price": float(row.get("min_price") or 0),
+                    "max_price": float(row.get("max_price") or 0),
+                    "avg_price": float(row.get("avg_price") or 0),
+                    "median_price": float(row.get("median_price") or 0),
+                    "products": row.get("top_offers") or [],
+                }
+            return summaries
+        except Exception as e:
+            if _is_missing_function(e):
+                _summary_unavailable = True
+            logger.warning("%s failed (%s); querying keywords one by one", SUMMARY_RPC, e)
+
+    for keyword in keywords:
+        result = db.table("suppliers_1688")\
+            .select("*")\
+            .eq("search_keyword", keyword)\
+            .order("price", desc=False)\
+            .limit(20)\
+            .execute()
+        summaries[keyword] = summarize_rows(result.data or [], top_n)
+    return summaries
@@ -5,6 +5,12 @@ import re
 from typing import List, Optional
 from playwright.async_api import async_playwright, Browser, Page
 
+from app.log import SAMPLED, get_logger
+from app.services.platforms import block_heavy_resources, probe_result, probe_sample_size
+from app.services.tracing import instrument_page
+
+logger = get_logger(__name__)
+
 
 class TemuScraper:
     """Scraper for Temu (supports AU and NZ markets)."""
@@ -13,6 +19,7 @@ class TemuScraper:
         "AU": "https://www.temu.com/au",
         "NZ": "https://www.temu.com/nz",
     }
+    USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 
     def __init__(self):
         self._browser: Optional[Browser] = None
@@ -51,7 +58,7 @@ class TemuScraper:
             Dictionary with products and stats
         """
         browser = await self._get_browser()
-        page = await browser.new_page()
+        page = instrument_page(await browser.new_page(), "temu")
 
         base_url = self.BASE_URLS.get(region, self.BASE_URLS["AU"])
         currency = "AUD" if region == "AU" else "NZD"
@@ -59,7 +66,7 @@ class TemuScraper:
         try:
             # Set user agent
             await page.set_extra_http_headers({
-                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+                "User-Agent": self.USER_AGENT
             })
 
             # Build search URL
@@ -93,7 +100,7 @@ class TemuScraper:
             }
 
         except Exception as e:
-            print(f"Temu scraping error: {e}")
+            logger.error("Temu scraping error: %s", e)
             return {
                 "platform": f"temu_{region.lower()}",
                 "region": region,
@@ -107,6 +114,46 @@ class TemuScraper:
         finally:
             await page.close()
 
+    async def probe(self, keyword: str, region: str = "AU", sample_size: Optional[int] = None) -> dict:
+        """
+        Result count from the search header plus a few card prices.
+
+        Heavy resources are blocked, the page is read as soon as the header
+        renders instead of after a fixed delay, and prices are sampled in a
+        single page evaluation.
+
+        Returns:
+            ``probe_result`` dict (with ``error`` on failure)
+        """
+        browser = await self._get_browser()
+        page = instrument_page(await browser.new_page(), "temu")
+        currency = "AUD" if region == "AU" else "NZD"
+
+        try:
+            await block_heavy_resources(page)
+            await page.set_extra_http_headers({"User-Agent": self.USER_AGENT})
+            base_url = self.BASE_URLS.get(region, self.BASE_URLS["AU"])
+            await page.goto(f"{base_url}/search_result.html?search_key={keyword}", wait_until="domcontentloaded", timeout=30000)
+            try:
+                await page.wait_for_selector("[class*='SearchResultHeader']", timeout=5000)
+            except Exception:
+                pass
+
+            total_results = await self._get_results_count(page)
+            price_texts = await page.eval_on_selector_all(
+                "[class*='ProductCard'] [class*='price'], [class*='product-card'] [class*='price']",
+                "(els, n) => els.slice(0, n).map(e => e.textContent)",
+                probe_sample_size(sample_size),
+            )
+
+            return probe_result(total_results, [self._parse_price(t) for t in price_texts], currency)
+
+        except Exception as e:
+            logger.error("Temu probe error: %s", e)
+            return {**probe_result(0, [], currency), "error": str(e)}
+        finally:
+            await page.close()
+
     async def _get_results_count(self, page: Page) -> int:
         """Extract total results count from page."""
         try:
@@ -178,7 +225,7 @@ class TemuScraper:
                     })
 
             except Exception as e:
-                print(f"Error extracting Temu product: {e}")
+                logger.debug("Error extracting Temu product: %s", e, extra=SAMPLED)
                 continue
 
         return products
@@ -0,0 +1,490 @@
+"""Request tracing and hot-path timing.
+
+``span(name)`` times a block. The spans feed three places:
+
+- Prometheus: every span, inside a request or not, lands in the
+  ``app_span_duration_seconds`` histogram (labels: span name and kind),
+  served by ``/metrics`` together with the upstream resilience counters
+- per-request traces: ``TracingMiddleware`` starts a trace for each HTTP
+  request (continuing an incoming W3C ``traceparent``), returns its id in
+  ``X-Trace-Id`` and, when the request carries the debug header, a
+  ``Server-Timing`` breakdown per span name
+- OpenTelemetry: finished traces are batched and POSTed as OTLP/HTTP JSON
+  to ``settings.otel_exporter_endpoint`` (a local collector listens on
+  ``http://localhost:4318/v1/traces``)
+
+Span names are metric labels, so keep them low-cardinality
+("upstream api.trademe.co.nz", "db products", "ranking.scoring") and put
+keywords, URLs and ids in attributes instead.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import functools
+import math
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+from app.config import settings
+from app.log import get_logger
+
+logger = get_logger(__name__)
+
+# Histogram buckets in seconds (Prometheus defaults plus longer tails for scrapers)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# OTLP span kinds
+KIND_CODES = {"internal": 1, "server": 2, "client": 3}
+
+TRACEPARENT = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+def _new_id(n_bytes: int) -> str:
+    return os.urandom(n_bytes).hex()
+
+
+class Span:
+    """One timed operation."""
+
+    __slots__ = ("name", "kind", "span_id", "parent_id", "attributes", "start_ns", "_start", "duration", "error")
+
+    def __init__(self, name: str, kind: str = "internal", parent_id: Optional[str] = None, attributes=None):
+        self.name = name
+        self.kind = kind
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.attributes: Dict[str, Any] = attributes or {}
+        self.start_ns = time.time_ns()
+        self._start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def finish(self, duration: Optional[float] = None) -> None:
+        self.duration = duration if duration is not None else time.perf_counter() - self._start
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "ms": round((self.duration or 0) * 1000, 2),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class Trace:
+    """Spans of one request."""
+
+    def __init__(self, trace_id: Optional[str] = None, max_spans: Optional[int] = None):
+        self.trace_id = trace_id or _new_id(16)
+        self.max_spans = max_spans if max_spans is not None else settings.tracing_max_spans
+        self.spans: List[Span] = []
+        self.dropped = 0
+
+    def add(self, span: Span) -> None:
+        if len(self.spans) < self.max_spans:
+            self.spans.append(span)
+        else:
+            self.dropped += 1
+
+    def breakdown(self) -> Dict[str, Tuple[int, float]]:
+        """Span name -> (count, total seconds), slowest first."""
+        totals: Dict[str, List[float]] = {}
+        for span in self.spans:
+            entry = totals.setdefault(span.name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += span.duration or 0.0
+        return dict(sorted(((k, (int(c), t)) for k, (c, t) in totals.items()), key=lambda kv: -kv[1][1]))
+
+    def server_timing(self, total: Optional[float] = None, limit: int = 30) -> str:
+        """``Server-Timing`` header value aggregating spans by name."""
+        parts = [f"total;dur={total * 1000:.1f}"] if total is not None else []
+        for name, (count, total) in list(self.breakdown().items())[:limit]:
+            metric = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+            parts.append(f'{metric};dur={total * 1000:.1f};desc="{count}x"')
+        return ", ".join(parts)
+
+
+_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("trace", default=None)
+_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("span", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _trace.get()
+
+
+def current_trace_id() -> Optional[str]:
+    trace = _trace.get()
+    return trace.trace_id if trace is not None else None
+
+
+# ---------- metrics ----------
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    # Counters are written exactly; ``:g`` would round 1234567 to 1.23457e+06
+    if isinstance(value, int):
+        return str(int(value))  # bools too
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+def format_metric(name: str, labels: Dict[str, Any], value: float) -> str:
+    """One Prometheus exposition line."""
+    if labels:
+        label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+        return f"{name}{{{label_text}}} {_format_value(value)}"
+    return f"{name} {_format_value(value)}"
+
+
+class SpanMetrics:
+    """Duration histogram and error count per (span name, kind)."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # (name, kind) -> [bucket counts..., sum, count, errors]
+        self._series: Dict[Tuple[str, str], List[float]] = {}
+
+    def observe(self, span: Span) -> None:
+        duration = span.duration or 0.0
+        with self._lock:
+            series = self._series.get((span.name, span.kind))
+            if series is None:
+                series = self._series[(span.name, span.kind)] = [0] * (len(self.buckets) + 3)
+            for i, bound in enumerate(self.buckets):
+                if duration <= bound:
+                    series[i] += 1
+            series[-3] += duration
+            series[-2] += 1
+            if span.error:
+                series[-1] += 1
+
+    def snapshot(self) -> Dict[Tuple[str, str], List[float]]:
+        with self._lock:
+            return {key: list(values) for key, values in self._series.items()}
+
+    def render(self) -> List[str]:
+        lines = [
+            "# HELP app_span_duration_seconds Duration of traced operations.",
+            "# TYPE app_span_duration_seconds histogram",
+        ]
+        errors = []
+        for (name, kind), series in sorted(self.snapshot().items()):
+            labels = {"span": name, "kind": kind}
+            for bound, count in zip(self.buckets, series):
+                lines.append(format_metric("app_span_duration_seconds_bucket", {**labels, "le": f"{bound:g}"}, count))
+            lines.append(format_metric("app_span_duration_seconds_bucket", {**labels, "le": "+Inf"}, series[-2]))
+            lines.append(format_metric("app_span_duration_seconds_sum", labels, series[-3]))
+            lines.append(format_metric("app_span_duration_seconds_count", labels, series[-2]))
+            errors.append(format_metric("app_span_errors_total", labels, series[-1]))
+        lines += ["# HELP app_span_errors_total Traced operations that raised.", "# TYPE app_span_errors_total counter"]
+        return lines + errors
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+METRICS = SpanMetrics()
+
+
+def _record(span: Span, trace: Optional[Trace]) -> None:
+    METRICS.observe(span)
+    if trace is not None:
+        trace.add(span)
+
+
+# ---------- spans ----------
+
+@contextlib.contextmanager
+def span(name: str, kind: str = "internal", **attributes) -> Iterator[Span]:
+    """
+    Time the enclosed block as a child of the current span.
+
+    Works in sync and async code; tasks started inside inherit the span
+    as their parent.
+    """
+    parent = _span.get()
+    current = Span(name, kind, parent.span_id if parent else None, attributes)
+    token = _span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = type(e).__name__
+        raise
+    finally:
+        current.finish()
+        _span.reset(token)
+        _record(current, _trace.get())
+
+
+def traced(name: Optional[str] = None, kind: str = "internal") -> Callable:
+    """Decorator form of ``span`` for sync and async functions."""
+    def decorator(func):
+        span_name = name or func.__qualname__
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, kind):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextlib.contextmanager
+def start_trace(name: str, traceparent: Optional[str] = None, **attributes) -> Iterator[Span]:
+    """
+    Root span of a new trace (one per request or background job).
+
+    ``traceparent`` continues a W3C trace context from the caller.
+    """
+    trace_id, parent_id = None, None
+    match = TRACEPARENT.match(traceparent or "")
+    if match:
+        trace_id, parent_id = match.groups()
+    trace = Trace(trace_id)
+    token = _trace.set(trace)
+    span_token = _span.set(None)
+    try:
+        with span(name, "server", **attributes) as root:
+            root.parent_id = parent_id
+            yield root
+    finally:
+        _span.reset(span_token)
+        _trace.reset(token)
+        exporter = get_otlp_exporter()
+        if exporter is not None:
+            exporter.submit(trace)
+
+
+# ---------- instrumentation helpers ----------
+
+def instrument_httpx(client: httpx.Client, name: Callable[[httpx.Request], str], kind: str = "client") -> None:
+    """
+    Record a span per request of a sync httpx client (e.g. the PostgREST
+    session) via event hooks. The span ends when response headers arrive.
+    """
+    def on_request(request: httpx.Request) -> None:
+        request.extensions["trace_span"] = Span(
+            name(request), kind, getattr(_span.get(), "span_id", None), {"method": request.method},
+        )
+
+    def on_response(response: httpx.Response) -> None:
+        current = response.request.extensions.pop("trace_span", None)
+        if current is None:
+            return
+        current.finish()
+        current.set(status=response.status_code)
+        if response.status_code >= 400:
+            current.error = f"HTTP {response.status_code}"
+        _record(current, _trace.get())
+
+    client.event_hooks["request"].append(on_request)
+    client.event_hooks["response"].append(on_response)
+
+
+def postgrest_span_name(request: httpx.Request) -> str:
+    """"db <table>" / "db rpc <function>" from a PostgREST URL."""
+    parts = [p for p in request.url.path.split("/") if p]
+    if "rpc" in parts and parts.index("rpc") + 1 < len(parts):
+        return f"db rpc {parts[parts.index('rpc') + 1]}"
+    return f"db {parts[-1]}" if parts else "db"
+
+
+PAGE_METHODS = ("goto", "evaluate", "eval_on_selector_all", "query_selector_all", "wait_for_selector", "content")
+
+
+def instrument_page(page, scraper: str):
+    """Wrap a Playwright page's navigation and evaluate calls in spans."""
+    for method in PAGE_METHODS:
+        original = getattr(page, method, None)
+        if original is None:
+            continue
+
+        def wrap(original=original, method=method):
+            @functools.wraps(original)
+            async def wrapper(*args, **kwargs):
+                attributes = {"scraper": scraper}
+                if method == "goto" and args:
+                    attributes["url"] = str(args[0])[:200]
+                with span(f"browser.{method}", "client", **attributes):
+                    return await original(*args, **kwargs)
+            return wrapper
+
+        setattr(page, method, wrap())
+    return page
+
+
+# ---------- OTLP export ----------
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_span(trace_id: str, span: Span) -> dict:
+    """A span in OTLP/JSON form."""
+    end_ns = span.start_ns + int((span.duration or 0) * 1e9)
+    data = {
+        "traceId": trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": KIND_CODES.get(span.kind, 1),
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(end_ns),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()],
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_id:
+        data["parentSpanId"] = span.parent_id
+    return data
+
+
+def otlp_payload(traces: List[Trace], service_name: str) -> dict:
+    """``ExportTraceServiceRequest`` body for ``/v1/traces``."""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{
+                "scope": {"name": "app.services.tracing"},
+                "spans": [otlp_span(trace.trace_id, s) for trace in traces for s in trace.spans],
+            }],
+        }],
+    }
+
+
+class OTLPExporter:
+    """Batches finished traces and POSTs them to an OTLP/HTTP collector."""
+
+    def __init__(
+        self,
+        endpoint: str,
+        service_name: str,
+        interval_seconds: float = 5.0,
+        max_batch: int = 200,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.interval_seconds = interval_seconds
+        self.max_batch = max_batch
+        self._transport = transport
+        self._pending: List[Trace] = []
+        self._task: Optional[asyncio.Task] = None
+        self.exported = 0
+        self.failed = 0
+
+    def submit(self, trace: Trace) -> None:
+        """Queue a finished trace; the flush runs on the current event loop."""
+        self._pending.append(trace)
+        if len(self._pending) > self.max_batch * 10:
+            # Collector down for a while: keep the newest traces only
+            del self._pending[: len(self._pending) - self.max_batch * 10]
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.interval_seconds)
+        await self.flush()
+
+    async def flush(self) -> None:
+        while self._pending:
+            batch, self._pending = self._pending[: self.max_batch], self._pending[self.max_batch:]
+            try:
+                async with httpx.AsyncClient(timeout=5.0, transport=self._transport) as client:
+                    response = await client.post(self.endpoint, json=otlp_payload(batch, self.service_name))
+                response.raise_for_status()
+                self.exported += len(batch)
+            except Exception as e:
+                self.failed += len(batch)
+                logger.warning("OTLP export to %s failed: %s", self.endpoint, e)
+                return
+
+
+_exporter: Optional[OTLPExporter] = None
+
+
+def get_otlp_exporter() -> Optional[OTLPExporter]:
+    """Process-wide exporter; None unless ``settings.otel_exporter_endpoint`` is set."""
+    global _exporter
+    if _exporter is None and settings.otel_exporter_endpoint:
+        _exporter = OTLPExporter(
+            settings.otel_exporter_endpoint,
+            settings.otel_service_name,
+            settings.otel_export_interval_seconds,
+        )
+    return _exporter
+
+
+# ---------- ASGI middleware ----------
+
+class TracingMiddleware:
+    """
+    Starts a trace per HTTP request.
+
+    Adds ``X-Trace-Id`` to every response; requests sending the debug
+    header (``settings.tracing_debug_header: 1``) also get ``Server-Timing``
+    with the time spent per span name.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.tracing_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        debug = headers.get(settings.tracing_debug_header.lower(), "") in ("1", "true", "yes")
+
+        with start_trace("http.request", headers.get("traceparent"), method=scope["method"]) as root:
+            trace = current_trace()
+
+            async def send_with_trace(message):
+                if message["type"] == "http.response.start":
+                    route = scope.get("route")
+                    root.name = f"{scope['method']} {getattr(route, 'path', 'unmatched')}"
+                    root.set(status=message["status"])
+                    extra = [(b"x-trace-id", trace.trace_id.encode())]
+                    if debug:
+                        timing = trace.server_timing(total=time.perf_counter() - root._start)
+                        extra.append((b"server-timing", timing.encode("latin-1", "replace")))
+                    message = {**message, "headers": list(message.get("headers", [])) + extra}
+                await send(message)
+
+            await self.app(scope, receive, send_with_trace)
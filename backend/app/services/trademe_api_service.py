@@ -3,16 +3,102 @@
 TradeMe API Documentation: https://developer.trademe.co.nz/
 """
 
+import asyncio
 import httpx
 import hashlib
 import hmac
 import base64
+import math
+import secrets
 import time
 import urllib.parse
-from typing import List, Optional, Dict
+from functools import lru_cache
+from typing import AsyncIterator, List, Optional, Dict, Tuple
 from datetime import datetime
 
 from app.config import settings
+from app.log import get_logger
+from app.services.platforms import probe_result, probe_sample_size
+from app.services.resilience import HostGuard, RetryableError, ServerError, get_host_guard, retry_after_seconds
+
+logger = get_logger(__name__)
+
+# TradeMe's maximum page size for search endpoints
+MAX_ROWS_PER_PAGE = 500
+
+# Attempts per request when TradeMe answers 429/503
+MAX_RETRIES = 3
+
+
+def listing_price(item: Dict) -> Optional[float]:
+    """Buy Now price of a search listing, else its start price."""
+    if item.get("BuyNowPrice"):
+        return float(item["BuyNowPrice"])
+    if item.get("StartPrice"):
+        return float(item["StartPrice"])
+    return None
+
+
+@lru_cache(maxsize=1024)
+def _quote(value: str) -> str:
+    """RFC 3986 percent-encoding as OAuth 1.0a requires."""
+    return urllib.parse.quote(value, safe="")
+
+
+class RateLimitPacer:
+    """
+    Spreads requests using TradeMe's rate-limit response headers.
+
+    ``X-RateLimit-Remaining`` and ``X-RateLimit-Reset`` (seconds until the
+    window resets, or an epoch timestamp) are recorded after every response.
+    Once the remaining allowance falls to ``reserve`` the remaining requests
+    are spaced evenly across the rest of the window; 429 responses pause
+    everyone for ``Retry-After`` seconds.
+    """
+
+    def __init__(self, reserve: int = 2, clock=time.monotonic, sleep=asyncio.sleep):
+        self.reserve = reserve
+        self._clock = clock
+        self._sleep = sleep
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self._not_before = 0.0
+
+    def update(self, headers) -> None:
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        try:
+            if remaining is not None:
+                self.remaining = int(float(remaining))
+            if reset is not None:
+                reset = float(reset)
+                # Large values are epoch seconds, small ones a countdown
+                seconds = reset - time.time() if reset > 1e9 else reset
+                self.reset_at = self._clock() + max(0.0, seconds)
+        except ValueError:
+            pass
+
+    def backoff(self, seconds: float) -> None:
+        self._not_before = max(self._not_before, self._clock() + seconds)
+
+    def delay(self) -> float:
+        """Seconds to wait before the next request."""
+        now = self._clock()
+        wait = max(0.0, self._not_before - now)
+        if self.remaining is not None and self.reset_at is not None and self.reset_at > now:
+            window = self.reset_at - now
+            if self.remaining <= 0:
+                wait = max(wait, window)
+            elif self.remaining <= self.reserve:
+                wait = max(wait, window / (self.remaining + 1))
+        return wait
+
+    async def wait(self) -> None:
+        delay = self.delay()
+        if delay > 0:
+            await self._sleep(delay)
+        if self.remaining is not None:
+            self.remaining -= 1
 
 
 class TradeMeAPIService:
@@ -21,7 +107,13 @@ class TradeMeAPIService:
     PRODUCTION_URL = "https://api.trademe.co.nz/v1"
     SANDBOX_URL = "https://api.tmsandbox.co.nz/v1"
 
-    def __init__(self, sandbox: bool = None):
+    def __init__(
+        self,
+        sandbox: bool = None,
+        max_concurrency: Optional[int] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        guard: Optional[HostGuard] = None,
+    ):
         if sandbox is None:
             sandbox = settings.trademe_sandbox
         self.base_url = self.SANDBOX_URL if sandbox else self.PRODUCTION_URL
@@ -29,6 +121,27 @@ class TradeMeAPIService:
         self.consumer_secret = settings.trademe_consumer_secret
         self.oauth_token = settings.trademe_oauth_token
         self.oauth_token_secret = settings.trademe_oauth_token_secret
+        self.max_concurrency = max(1, max_concurrency or settings.trademe_max_concurrency)
+
+        # Signing key and the request-independent OAuth parameters, encoded once
+        signing_key = f"{_quote(self.consumer_secret)}&{_quote(self.oauth_token_secret or '')}"
+        self._hmac = hmac.new(signing_key.encode("utf-8"), digestmod=hashlib.sha1)
+        static = {
+            "oauth_consumer_key": self.consumer_key,
+            "oauth_signature_method": "HMAC-SHA1",
+            "oauth_version": "1.0",
+        }
+        if self.oauth_token:
+            static["oauth_token"] = self.oauth_token
+        self._static_oauth = static
+        self._static_pairs = [(_quote(k), _quote(v)) for k, v in static.items()]
+
+        self.pacer = RateLimitPacer(reserve=self.max_concurrency)
+        self.guard = guard or get_host_guard(urllib.parse.urlsplit(self.base_url).hostname)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
 
     def _generate_oauth_signature(
         self,
@@ -38,65 +151,121 @@ class TradeMeAPIService:
         oauth_params: Dict[str, str],
     ) -> str:
         """Generate OAuth 1.0a signature."""
-        # Combine all parameters
-        all_params = {**params, **oauth_params}
-
-        # Sort and encode parameters
-        sorted_params = sorted(all_params.items())
-        param_string = "&".join(
-            f"{urllib.parse.quote(k, safe='')}={urllib.parse.quote(str(v), safe='')}"
-            for k, v in sorted_params
+        # Static OAuth pairs are pre-encoded; only per-request values are quoted here
+        pairs = list(self._static_pairs)
+        pairs.extend(
+            (_quote(k), _quote(str(v)))
+            for k, v in oauth_params.items() if k not in self._static_oauth
         )
+        pairs.extend((_quote(k), _quote(str(v))) for k, v in params.items())
+        pairs.sort()
+        param_string = "&".join(f"{k}={v}" for k, v in pairs)
 
         # Create signature base string
-        base_string = "&".join([
-            method.upper(),
-            urllib.parse.quote(url, safe=''),
-            urllib.parse.quote(param_string, safe=''),
-        ])
-
-        # Create signing key
-        signing_key = "&".join([
-            urllib.parse.quote(self.consumer_secret, safe=''),
-            urllib.parse.quote(self.oauth_token_secret or '', safe=''),
-        ])
-
-        # Generate signature
-        signature = hmac.new(
-            signing_key.encode('utf-8'),
-            base_string.encode('utf-8'),
-            hashlib.sha1
-        ).digest()
+        base_string = f"{method.upper()}&{_quote(url)}&{_quote(param_string)}"
 
-        return base64.b64encode(signature).decode('utf-8')
+        # Precomputed HMAC state keyed with the signing key
+        mac = self._hmac.copy()
+        mac.update(base_string.encode("utf-8"))
+        return base64.b64encode(mac.digest()).decode("utf-8")
 
     def _get_oauth_header(self, method: str, url: str, params: Dict[str, str] = None) -> str:
         """Generate OAuth Authorization header."""
         params = params or {}
 
         oauth_params = {
-            "oauth_consumer_key": self.consumer_key,
-            "oauth_nonce": str(int(time.time() * 1000)),
-            "oauth_signature_method": "HMAC-SHA1",
+            **self._static_oauth,
+            # Random nonce: concurrent requests in the same millisecond must differ
+            "oauth_nonce": secrets.token_hex(8),
             "oauth_timestamp": str(int(time.time())),
-            "oauth_version": "1.0",
         }
 
-        if self.oauth_token:
-            oauth_params["oauth_token"] = self.oauth_token
-
         # Generate signature
         signature = self._generate_oauth_signature(method, url, params, oauth_params)
         oauth_params["oauth_signature"] = signature
 
         # Build header
         header_params = ", ".join(
-            f'{k}="{urllib.parse.quote(str(v), safe="")}"'
+            f'{k}="{_quote(str(v))}"'
             for k, v in sorted(oauth_params.items())
         )
 
         return f"OAuth {header_params}"
 
+    # ---------- HTTP ----------
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Pooled client, recreated if the event loop changed."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                transport=self._transport,
+                timeout=30.0,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+            self._client_loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def _get(
+        self,
+        path: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> httpx.Response:
+        """
+        Signed, paced GET with retries on 429/503.
+
+        Retries go through the host's resilience guard (circuit breaker and
+        retry budget); the pacer still does the waiting so a ``Retry-After``
+        holds back every concurrent request, not just this one. When the
+        retries run out the last 429/503 response is returned as before;
+        other 5xx responses are returned at once but count against the host.
+        """
+        url = f"{self.base_url}{path}"
+        params = params or {}
+        client = self._get_client()
+
+        async def attempt() -> httpx.Response:
+            async with self._semaphore:
+                await self.pacer.wait()
+                response = await client.get(
+                    url,
+                    params=params,
+                    headers={**(headers or {}), "Authorization": self._get_oauth_header("GET", url, params)},
+                )
+            self.pacer.update(response.headers)
+            if response.status_code in (429, 503):
+                retry_after = retry_after_seconds(response.headers)
+                raise RetryableError(f"TradeMe {response.status_code} on {path}", retry_after, response)
+            if response.is_server_error:
+                raise ServerError(f"TradeMe {response.status_code} on {path}", response)
+            return response
+
+        def backoff(attempt_no: int, error: BaseException) -> float:
+            retry_after = getattr(error, "retry_after", None)
+            retry_after = 2.0 ** attempt_no if retry_after is None else retry_after
+            self.pacer.backoff(retry_after)
+            return 0.0
+
+        try:
+            return await self.guard.call(attempt, backoff=backoff, max_retries=MAX_RETRIES)
+        except (RetryableError, ServerError) as e:
+            if e.response is None:
+                raise
+            return e.response
+
+    async def close(self):
+        """Close the pooled HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # ---------- endpoints ----------
+
     async def search_general(
         self,
         keyword: str,
@@ -118,38 +287,98 @@ class TradeMeAPIService:
         Returns:
             Dict with TotalCount, Page, PageSize, List of items
         """
-        url = f"{self.base_url}/Search/General.json"
-
         params = {
-            "search_string": keyword,
-            "rows": min(rows, 500),
+            "rows": min(rows, MAX_ROWS_PER_PAGE),
             "page": page,
             "sort_order": sort_order,
         }
 
+        if keyword:
+            params["search_string"] = keyword
+
         if category:
             params["category"] = category
 
-        auth_header = self._get_oauth_header("GET", url, params)
+        response = await self._get("/Search/General.json", params)
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url,
-                params=params,
-                headers={"Authorization": auth_header},
-                timeout=30.0,
-            )
+        if response.status_code != 200:
+            raise Exception(f"TradeMe search failed: {response.status_code} - {response.text}")
+
+        return response.json()
+
+    async def iter_search_pages(
+        self,
+        keyword: str,
+        category: str = "",
+        max_results: int = 5000,
+        rows: int = MAX_ROWS_PER_PAGE,
+        sort_order: str = "Default",
+    ) -> AsyncIterator[Dict]:
+        """
+        Yield search result pages, fetching pages after the first concurrently.
+
+        The first page gives ``TotalCount``; the remaining pages needed for
+        ``min(TotalCount, max_results)`` listings are requested in parallel
+        (bounded by the client's concurrency and rate-limit pacing) and
+        yielded as they arrive, so not necessarily in page order.
+
+        Args:
+            keyword: Search string
+            category: Category number
+            max_results: Listings wanted at most
+            rows: Page size (max 500)
+            sort_order: TradeMe sort order
 
-            if response.status_code != 200:
-                raise Exception(f"TradeMe search failed: {response.status_code} - {response.text}")
+        Yields:
+            Raw search response dicts (TotalCount, Page, PageSize, List)
+        """
+        rows = max(1, min(rows, MAX_ROWS_PER_PAGE, max_results))
+        first = await self.search_general(keyword, category, rows=rows, page=1, sort_order=sort_order)
+        yield first
+
+        total = min(int(first.get("TotalCount") or 0), max_results)
+        pages = math.ceil(total / rows)
+        if pages <= 1:
+            return
+
+        tasks = [
+            asyncio.ensure_future(self.search_general(keyword, category, rows=rows, page=page, sort_order=sort_order))
+            for page in range(2, pages + 1)
+        ]
+        try:
+            for next_page in asyncio.as_completed(tasks):
+                yield await next_page
+        finally:
+            for task in tasks:
+                task.cancel()
 
-            return response.json()
+    async def search_all(
+        self,
+        keyword: str,
+        category: str = "",
+        max_results: int = 5000,
+        sort_order: str = "Default",
+    ) -> Tuple[int, List[Dict]]:
+        """
+        Up to ``max_results`` listings for a search, in page order.
+
+        Returns:
+            (TotalCount, listings)
+        """
+        total = 0
+        pages: Dict[int, List[Dict]] = {}
+        async for data in self.iter_search_pages(keyword, category, max_results, sort_order=sort_order):
+            total = total or int(data.get("TotalCount") or 0)
+            pages[int(data.get("Page") or len(pages) + 1)] = data.get("List", [])
+        listings = [item for page in sorted(pages) for item in pages[page]]
+        return total, listings[:max_results]
 
     async def search_products(
         self,
         keyword: str,
         limit: int = 50,
         page: int = 1,
+        category: str = "",
     ) -> Dict:
         """
         Search TradeMe and return formatted results.
@@ -158,12 +387,13 @@ class TradeMeAPIService:
             keyword: Search keyword
             limit: Number of results
             page: Page number
+            category: Category number to scope the search to
 
         Returns:
             Dict with total_results, products list, price_stats
         """
         try:
-            data = await self.search_general(keyword, rows=limit, page=page)
+            data = await self.search_general(keyword, category, rows=limit, page=page)
 
             items = data.get("List", [])
             total_count = data.get("TotalCount", 0)
@@ -172,11 +402,7 @@ class TradeMeAPIService:
             prices = []
 
             for item in items:
-                price = None
-                if item.get("BuyNowPrice"):
-                    price = float(item["BuyNowPrice"])
-                elif item.get("StartPrice"):
-                    price = float(item["StartPrice"])
+                price = listing_price(item)
 
                 if price:
                     prices.append(price)
@@ -205,7 +431,7 @@ class TradeMeAPIService:
             }
 
         except Exception as e:
-            print(f"[TradeMe API] Error: {e}")
+            logger.error("TradeMe API error: %s", e)
             return {
                 "total_results": 0,
                 "products": [],
@@ -215,39 +441,69 @@ class TradeMeAPIService:
 
     async def get_categories(self) -> List[Dict]:
         """Get TradeMe category tree."""
-        url = f"{self.base_url}/Categories.json"
+        categories, _ = await self.fetch_categories()
+        return categories
 
-        auth_header = self._get_oauth_header("GET", url)
+    async def fetch_categories(self, etag: Optional[str] = None) -> Tuple[Optional[List[Dict]], Optional[str]]:
+        """
+        Conditionally download the category tree.
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url,
-                headers={"Authorization": auth_header},
-                timeout=30.0,
-            )
+        Args:
+            etag: ETag of the copy already held
+
+        Returns:
+            (top-level categories, ETag), or (None, etag) when unchanged (304)
+        """
+        headers = {"If-None-Match": etag} if etag else None
+        response = await self._get("/Categories.json", headers=headers)
+
+        if response.status_code == 304:
+            return None, etag
+        if response.status_code != 200:
+            raise Exception(f"Failed to get categories: {response.text}")
+
+        return response.json().get("Subcategories", []), response.headers.get("ETag")
 
-            if response.status_code != 200:
-                raise Exception(f"Failed to get categories: {response.text}")
+    async def count_listings(self, keyword: str = "", category: str = "") -> int:
+        """``TotalCount`` for a search without downloading a page of listings."""
+        data = await self.search_general(keyword, category, rows=1)
+        return int(data.get("TotalCount") or 0)
 
-            return response.json().get("Subcategories", [])
+    async def probe(self, keyword: str, category: str = "", sample_size: Optional[int] = None) -> Dict:
+        """
+        ``TotalCount`` and a small price sample for a keyword.
+
+        Args:
+            keyword: Search keyword
+            category: Category number to scope the count to
+            sample_size: Listings to sample (default ``settings.platform_probe_sample_size``)
+
+        Returns:
+            ``probe_result`` dict
+        """
+        data = await self.search_general(keyword, category, rows=probe_sample_size(sample_size))
+        prices = [listing_price(item) for item in data.get("List", [])]
+        return probe_result(data.get("TotalCount", 0), prices, "NZD")
 
     async def get_listing_details(self, listing_id: int) -> Dict:
         """Get detailed information about a listing."""
-        url = f"{self.base_url}/Listings/{listing_id}.json"
+        response = await self._get(f"/Listings/{listing_id}.json")
 
-        auth_header = self._get_oauth_header("GET", url)
+        if response.status_code != 200:
+            raise Exception(f"Failed to get listing: {response.text}")
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url,
-                headers={"Authorization": auth_header},
-                timeout=30.0,
-            )
+        return response.json()
+
+
+_trademe_api: Optional[TradeMeAPIService] = None
 
-            if response.status_code != 200:
-                raise Exception(f"Failed to get listing: {response.text}")
 
-            return response.json()
+def get_trademe_api_service() -> TradeMeAPIService:
+    """Process-wide TradeMe client sharing one connection pool and rate-limit state."""
+    global _trademe_api
+    if _trademe_api is None:
+        _trademe_api = TradeMeAPIService()
+    return _trademe_api
 
 
 # Convenience function to check if API is configured
@@ -0,0 +1,264 @@
+"""Local copy of the TradeMe category tree with an in-memory index.
+
+``/Categories.json`` is a few megabytes and changes rarely, yet it used to
+be downloaded on every ``get_categories`` call. ``CategoryCache`` keeps the
+tree in a JSON file with its ETag and revalidates it with ``If-None-Match``
+once ``settings.trademe_category_ttl_hours`` have passed; an unchanged tree
+costs one 304 response.
+
+``CategoryTree`` indexes the nodes by number and by path and maps name
+tokens to categories, so a ranking keyword like ``"yoga mat"`` resolves to
+``Sports > Fitness > Yoga & pilates`` and TradeMe can be searched (or just
+counted) inside that category instead of across the whole site.
+"""
+
+import asyncio
+import json
+import math
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.config import settings
+from app.log import get_logger
+from app.services.keyword_index import normalize_phrase
+
+logger = get_logger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Words that say nothing about what a category holds
+_STOPWORDS = {"and", "for", "the", "of", "other", "with", "in", "a", "to", "accessories", "parts"}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with a naive plural strip (``mats`` -> ``mat``)."""
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(normalize_phrase(text or "")):
+        if token in _STOPWORDS:
+            continue
+        if len(token) > 4 and token.endswith("ies"):
+            token = token[:-3] + "y"
+        elif len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class CategoryTree:
+    """Category nodes indexed by number, path and name token."""
+
+    def __init__(self, categories: List[Dict]):
+        # number -> {number, name, path, depth, parent, is_leaf}
+        self.by_number: Dict[str, Dict] = {}
+        self.by_path: Dict[str, Dict] = {}
+        self._tokens: Dict[str, List[str]] = {}  # token -> category numbers
+        self._walk(categories, parent=None, depth=1)
+
+        total = max(1, len(self.by_number))
+        # Rare tokens ("yoga") say more about a keyword than common ones ("light")
+        self._idf = {token: math.log(1 + total / len(numbers)) for token, numbers in self._tokens.items()}
+
+    def _walk(self, categories: List[Dict], parent: Optional[str], depth: int) -> None:
+        for category in categories or []:
+            number = category.get("Number")
+            if not number:
+                continue
+            children = category.get("Subcategories") or []
+            node = {
+                "number": number,
+                "name": category.get("Name", ""),
+                "path": (category.get("Path") or "").strip("/"),
+                "depth": depth,
+                "parent": parent,
+                "is_leaf": category.get("IsLeaf", not children),
+            }
+            self.by_number[number] = node
+            if node["path"]:
+                self.by_path[node["path"].lower()] = node
+            for token in set(tokenize(node["name"])):
+                self._tokens.setdefault(token, []).append(number)
+            self._walk(children, number, depth + 1)
+
+    def __len__(self) -> int:
+        return len(self.by_number)
+
+    def get(self, number: str) -> Optional[Dict]:
+        return self.by_number.get(number)
+
+    def find_path(self, path: str) -> Optional[Dict]:
+        """Node for a path like ``"Sports/Fitness"`` (case-insensitive)."""
+        return self.by_path.get(path.strip("/").lower())
+
+    def ancestors(self, number: str) -> List[Dict]:
+        """Nodes from the root down to (and including) ``number``."""
+        chain = []
+        node = self.by_number.get(number)
+        while node is not None:
+            chain.append(node)
+            node = self.by_number.get(node["parent"]) if node["parent"] else None
+        return chain[::-1]
+
+    def candidates(self, keyword: str, limit: int = 5) -> List[Dict]:
+        """
+        Categories whose names share tokens with a keyword, best first.
+
+        A category scores the IDF weight of each keyword token in its own
+        name, plus half that weight for tokens matched by an ancestor's
+        name. Ties go to the deeper (narrower) category.
+
+        Returns:
+            Nodes with an added ``score``
+        """
+        tokens = set(tokenize(keyword))
+        scores: Dict[str, float] = {}
+        for token in tokens:
+            for number in self._tokens.get(token, ()):
+                scores[number] = scores.get(number, 0.0) + self._idf[token]
+
+        ranked = []
+        for number, score in scores.items():
+            node = self.by_number[number]
+            ancestor_tokens = {
+                token
+                for ancestor in self.ancestors(number)[:-1]
+                for token in tokenize(ancestor["name"])
+            }
+            own_tokens = set(tokenize(node["name"]))
+            score += 0.5 * sum(self._idf[t] for t in (tokens & ancestor_tokens) - own_tokens)
+            ranked.append({**node, "score": round(score, 3)})
+
+        ranked.sort(key=lambda n: (-n["score"], -n["depth"], n["number"]))
+        return ranked[:limit]
+
+    def best(self, keyword: str) -> Optional[Dict]:
+        """Single best category for a keyword, or None when no name matches."""
+        found = self.candidates(keyword, limit=1)
+        return found[0] if found else None
+
+
+class CategoryCache:
+    """TradeMe category tree persisted to disk and revalidated by ETag."""
+
+    def __init__(
+        self,
+        api=None,
+        path: Optional[str] = None,
+        ttl_hours: Optional[float] = None,
+    ):
+        self._api = api
+        self.path = Path(path or settings.trademe_category_cache_path)
+        self.ttl_hours = ttl_hours if ttl_hours is not None else settings.trademe_category_ttl_hours
+        self.etag: Optional[str] = None
+        self.fetched_at: float = 0.0
+        self._categories: Optional[List[Dict]] = None
+        self._tree: Optional[CategoryTree] = None
+        self._lock = asyncio.Lock()
+        self.downloads = 0
+        self.revalidations = 0
+        self._load()
+
+    def _get_api(self):
+        if self._api is None:
+            from app.services.trademe_api_service import get_trademe_api_service
+            self._api = get_trademe_api_service()
+        return self._api
+
+    # ---------- persistence ----------
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable %s: %s", self.path, e)
+            return
+        self._categories = data.get("categories") or []
+        self.etag = data.get("etag")
+        self.fetched_at = float(data.get("fetched_at") or 0)
+
+    def _save(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(
+                json.dumps({"etag": self.etag, "fetched_at": self.fetched_at, "categories": self._categories}),
+                encoding="utf-8",
+            )
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning("Failed to save %s: %s", self.path, e)
+
+    # ---------- access ----------
+
+    def is_stale(self, now: Optional[float] = None) -> bool:
+        return self._categories is None or (now or time.time()) - self.fetched_at >= self.ttl_hours * 3600
+
+    async def get_categories(self) -> List[Dict]:
+        """
+        Top-level categories, revalidating the local copy when it's stale.
+
+        A failed revalidation keeps serving the stale copy; without any copy
+        the error propagates.
+        """
+        async with self._lock:
+            if self.is_stale():
+                try:
+                    await self._refresh()
+                except Exception as e:
+                    if self._categories is None:
+                        raise
+                    logger.warning("Revalidation failed, serving cached tree: %s", e)
+        return self._categories
+
+    async def _refresh(self) -> None:
+        categories, etag = await self._get_api().fetch_categories(self.etag if self._categories is not None else None)
+        self.fetched_at = time.time()
+        if categories is None:
+            self.revalidations += 1
+        else:
+            self._categories = categories
+            self.etag = etag
+            self._tree = None
+            self.downloads += 1
+            logger.info("Downloaded category tree (etag %s)", etag)
+        self._save()
+
+    async def get_tree(self) -> CategoryTree:
+        categories = await self.get_categories()
+        if self._tree is None:
+            self._tree = CategoryTree(categories)
+        return self._tree
+
+    async def resolve(self, keyword: str) -> Optional[Dict]:
+        """Best category for a keyword; None when nothing matches or the tree is unavailable."""
+        try:
+            tree = await self.get_tree()
+        except Exception as e:
+            logger.warning("Category tree unavailable: %s", e)
+            return None
+        return tree.best(keyword)
+
+    def stats(self) -> dict:
+        return {
+            "categories": len(self._tree) if self._tree is not None else None,
+            "etag": self.etag,
+            "fetched_at": self.fetched_at or None,
+            "downloads": self.downloads,
+            "revalidations": self.revalidations,
+            "ttl_hours": self.ttl_hours,
+        }
+
+
+_category_cache: Optional[CategoryCache] = None
+
+
+def get_trademe_category_cache() -> CategoryCache:
+    """Process-wide category cache shared by the ranking service."""
+    global _category_cache
+    if _category_cache is None:
+        _category_cache = CategoryCache()
+    return _category_cache
@@ -5,6 +5,11 @@ from typing import List, Optional
 from playwright.async_api import async_playwright, Browser, Page
 import re
 
+from app.log import SAMPLED, get_logger
+from app.services.tracing import instrument_page
+
+logger = get_logger(__name__)
+
 
 class TradeMeScraper:
     """Scraper for TradeMe (New Zealand marketplace)."""
@@ -49,7 +54,7 @@ class TradeMeScraper:
             limit: Number of results to fetch
         """
         browser = await self._get_browser()
-        page = await browser.new_page()
+        page = instrument_page(await browser.new_page(), "trademe")
         
         try:
             # Build search URL
@@ -71,7 +76,7 @@ class TradeMeScraper:
             return products
             
         except Exception as e:
-            print(f"TradeMe scraping error: {e}")
+            logger.error("TradeMe scraping error: %s", e)
             return []
         finally:
             await page.close()
@@ -122,7 +127,7 @@ class TradeMeScraper:
                 })
                 
             except Exception as e:
-                print(f"Error extracting product: {e}")
+                logger.debug("Error extracting product: %s", e, extra=SAMPLED)
                 continue
         
         return products
@@ -146,7 +151,7 @@ class TradeMeScraper:
     async def get_product_details(self, listing_id: str) -> Optional[dict]:
         """Get detailed product information."""
         browser = await self._get_browser()
-        page = await browser.new_page()
+        page = instrument_page(await browser.new_page(), "trademe")
         
         try:
             url = f"{self.BASE_URL}/listing/{listing_id}"
@@ -172,7 +177,7 @@ class TradeMeScraper:
             }
             
         except Exception as e:
-            print(f"Error getting product details: {e}")
+            logger.error("Error getting product details: %s", e)
             return None
         finally:
             await page.close()
@@ -180,7 +185,7 @@ class TradeMeScraper:
     async def get_trending_categories(self) -> List[dict]:
         """Get trending categories from TradeMe."""
         browser = await self._get_browser()
-        page = await browser.new_page()
+        page = instrument_page(await browser.new_page(), "trademe")
         
         try:
             await page.goto(self.BASE_URL, wait_until="networkidle")
@@ -204,7 +209,7 @@ class TradeMeScraper:
             return categories
             
         except Exception as e:
-            print(f"Error getting categories: {e}")
+            logger.error("Error getting categories: %s", e)
             return []
         finally:
             await page.close()
@@ -0,0 +1,234 @@
+"""Persistent cache of product title -> (English keywords, Chinese keywords).
+
+Supplier matching translates the same product titles over and over. Results
+are stored in the ``product_title_translations`` table keyed by a hash of
+the normalised title, with the hottest entries held in an in-process LRU.
+Rows written with a different keyword map version are recomputed.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from app.database import get_db
+from app.log import get_logger
+from app.services.alibaba1688_service import extract_keywords, translate_to_chinese
+from app.services.keyword_index import get_keyword_index, normalize_phrase
+
+logger = get_logger(__name__)
+
+DEFAULT_LRU_SIZE = 4096
+
+# Rows per page when pre-translating the products table
+PRETRANSLATE_BATCH_SIZE = 500
+
+
+def title_hash(title: str) -> str:
+    """Stable key for a product title (case and whitespace insensitive)."""
+    return hashlib.sha1(normalize_phrase(title).encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    """LRU in front of the product_title_translations table."""
+
+    TABLE = "product_title_translations"
+
+    def __init__(self, db=None, maxsize: int = DEFAULT_LRU_SIZE):
+        self._db = db
+        self.maxsize = maxsize
+        self._lru: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def _get_db(self):
+        """Resolve the database lazily; None when Supabase isn't configured."""
+        if self._db is None:
+            try:
+                self._db = get_db()
+            except Exception:
+                self._db = False
+        return self._db or None
+
+    # ---------- LRU ----------
+
+    def _lru_get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                self._lru.move_to_end(key)
+            return entry
+
+    def _lru_put(self, key: str, entry: dict) -> None:
+        with self._lock:
+            self._lru[key] = entry
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.maxsize:
+                self._lru.popitem(last=False)
+
+    # ---------- Lookups ----------
+
+    def get(self, title: str) -> dict:
+        """
+        Get keywords for one title.
+
+        Returns:
+            Dictionary with ``keywords`` and ``chinese_keywords``
+        """
+        return self.get_many([title])[title]
+
+    def get_many(self, titles: List[str]) -> Dict[str, dict]:
+        """
+        Get keywords for many titles: LRU, then one database query, then compute.
+
+        Args:
+            titles: Product titles
+
+        Returns:
+            Title -> dictionary with ``keywords`` and ``chinese_keywords``
+        """
+        version = get_keyword_index().version
+        keys = {title: title_hash(title) for title in titles}
+        entries: Dict[str, dict] = {}
+
+        for key in set(keys.values()):
+            entry = self._lru_get(key)
+            if entry is not None:
+                entries[key] = entry
+        self.hits += len(entries)
+
+        missing = [key for key in set(keys.values()) if key not in entries]
+        if missing:
+            for key, entry in self._load(missing, version).items():
+                entries[key] = entry
+                self._lru_put(key, entry)
+                self.db_hits += 1
+
+        computed = []
+        for title, key in keys.items():
+            if key in entries:
+                continue
+            keywords = extract_keywords(title)
+            entry = {
+                "keywords": keywords,
+                "chinese_keywords": translate_to_chinese(keywords),
+            }
+            entries[key] = entry
+            self._lru_put(key, entry)
+            computed.append((key, title, entry))
+        self.misses += len(computed)
+
+        if computed:
+            self._persist(computed, version)
+
+        return {title: entries[key] for title, key in keys.items()}
+
+    def _load(self, keys: List[str], version: str) -> Dict[str, dict]:
+        db = self._get_db()
+        if db is None:
+            return {}
+        try:
+            result = db.table(self.TABLE)\
+                .select("title_hash, keywords, chinese_keywords, map_version")\
+                .in_("title_hash", keys)\
+                .execute()
+        except Exception as e:
+            logger.warning("Failed to load translations: %s", e)
+            return {}
+
+        return {
+            row["title_hash"]: {
+                "keywords": row.get("keywords") or [],
+                "chinese_keywords": row.get("chinese_keywords") or [],
+            }
+            for row in result.data or []
+            if row.get("map_version") == version
+        }
+
+    def _persist(self, computed: List[tuple], version: str) -> None:
+        db = self._get_db()
+        if db is None:
+            return
+        rows = [
+            {
+                "title_hash": key,
+                "title": title,
+                "keywords": entry["keywords"],
+                "chinese_keywords": entry["chinese_keywords"],
+                "map_version": version,
+            }
+            for key, title, entry in computed
+        ]
+        try:
+            db.table(self.TABLE).upsert(rows, on_conflict="title_hash").execute()
+        except Exception as e:
+            logger.warning("Failed to persist %d translations: %s", len(rows), e)
+
+    def stats(self) -> dict:
+        """Hit counters and LRU size."""
+        return {
+            "lru_size": len(self._lru),
+            "lru_maxsize": self.maxsize,
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+        }
+
+    def clear(self) -> None:
+        """Empty the in-process LRU (the table is left alone)."""
+        with self._lock:
+            self._lru.clear()
+
+
+def pretranslate_products(
+    cache: Optional["TranslationCache"] = None,
+    db=None,
+    batch_size: int = PRETRANSLATE_BATCH_SIZE,
+) -> int:
+    """
+    Translate every product title in the database ahead of matching.
+
+    Args:
+        cache: Translation cache (defaults to the shared one)
+        db: Database client (defaults to the shared one)
+        batch_size: Products per page
+
+    Returns:
+        Number of product titles processed
+    """
+    cache = cache or get_translation_cache()
+    db = db or get_db()
+    processed = 0
+    offset = 0
+
+    while True:
+        result = db.table("products")\
+            .select("title")\
+            .order("id")\
+            .range(offset, offset + batch_size - 1)\
+            .execute()
+        rows = result.data or []
+        titles = [row["title"] for row in rows if row.get("title")]
+        if titles:
+            cache.get_many(titles)
+            processed += len(titles)
+        if len(rows) < batch_size:
+            break
+        offset += batch_size
+
+    logger.info("Pre-translated %d product titles", processed)
+    return processed
+
+
+# Singleton cache shared by the match endpoints
+_cache: Optional[TranslationCache] = None
+
+
+def get_translation_cache() -> TranslationCache:
+    """Get the process-wide translation cache."""
+    global _cache
+    if _cache is None:
+        _cache = TranslationCache()
+    return _cache
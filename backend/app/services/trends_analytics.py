@@ -0,0 +1,222 @@
+"""Trend analytics over stored Google Trends series.
+
+Computes, for many keywords in one vectorised pass:
+
+- ``slope_per_week``: least-squares slope over the window
+- ``momentum_z``: how far the last four weeks sit above the rest of the
+  window, in standard deviations
+- ``yoy_change``: last four weeks against the same four weeks a year earlier
+- ``seasonality``: share of variance explained by month of year (full history)
+- ``direction``: up / down / stable from the slope relative to the mean
+
+Results are cached per (keyword, region, window) and recomputed only when
+the underlying series changes in the store.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.trends_store import (
+    TrendsSeriesStore,
+    get_trends_store,
+    masked_slope,
+    round_or_none,
+    seasonality_strength,
+    to_dates,
+)
+
+# Window name -> length in days
+WINDOWS = {"1m": 30, "3m": 91, "12m": 365, "5y": 1826}
+
+# Matching pytrends timeframe for each window
+WINDOW_TIMEFRAMES = {
+    "1m": "today 1-m",
+    "3m": "today 3-m",
+    "12m": "today 12-m",
+    "5y": "today 5-y",
+}
+
+# "Recent" period used for momentum and year-over-year change
+RECENT_DAYS = 28
+
+# Change over the window (relative to its mean) that counts as up/down
+DIRECTION_THRESHOLD = 0.1
+
+MOMENTUM_MIN_STD = 1.0  # Floor for the baseline std so flat series don't explode
+
+
+def _nan_stat(func, matrix: np.ndarray) -> np.ndarray:
+    """Row-wise nan-aware statistic that returns NaN for empty rows silently."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        present = (~np.isnan(matrix)).any(axis=1)
+        result = np.full(matrix.shape[0], np.nan)
+        if present.any():
+            result[present] = func(matrix[present], axis=1)
+        return result
+
+
+def compute(dates: np.ndarray, matrix: np.ndarray, window_days: int) -> Dict[str, np.ndarray]:
+    """
+    Compute trend metrics for every row of a (keywords x dates) matrix.
+
+    Each row's window ends at its own last data point, so a keyword's
+    result doesn't depend on which other keywords it was computed with.
+
+    Args:
+        dates: datetime64[D] array, one per column
+        matrix: 2-D float array with NaN gaps
+        window_days: Length of the analysis window
+
+    Returns:
+        Dictionary of per-row arrays (NaN where not computable) plus
+        ``direction`` as a list of strings
+    """
+    rows = matrix.shape[0]
+    if dates.size == 0:
+        raise ValueError("No dates to analyze")
+    mask = ~np.isnan(matrix)
+    has_data = mask.any(axis=1)
+
+    # Last date with data in each row, and every column's age relative to it
+    last_index = dates.size - 1 - mask[:, ::-1].argmax(axis=1)
+    age = (dates[last_index][:, None] - dates[None, :]).astype(np.int64)
+
+    in_window = (age >= 0) & (age < window_days)
+    recent = (age >= 0) & (age < RECENT_DAYS)
+    year_ago = (age >= 364) & (age < 364 + RECENT_DAYS)
+
+    windowed = np.where(in_window, matrix, np.nan)
+    mean = _nan_stat(np.nanmean, windowed)
+    current = np.where(has_data, matrix[np.arange(rows), last_index], np.nan)
+    slope = masked_slope(dates, windowed)
+
+    recent_mean = _nan_stat(np.nanmean, np.where(recent, matrix, np.nan))
+    baseline = np.where(in_window & ~recent, matrix, np.nan)
+    baseline_std = np.maximum(_nan_stat(np.nanstd, baseline), MOMENTUM_MIN_STD)
+    momentum = (recent_mean - _nan_stat(np.nanmean, baseline)) / baseline_std
+
+    year_ago_mean = _nan_stat(np.nanmean, np.where(year_ago, matrix, np.nan))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        yoy = np.where(year_ago_mean > 0, (recent_mean - year_ago_mean) / year_ago_mean, np.nan)
+
+    seasonality = seasonality_strength(dates, matrix)
+
+    # Total change across the window relative to its mean
+    with np.errstate(invalid="ignore", divide="ignore"):
+        relative_change = slope * (window_days / 7.0) / np.maximum(mean, 1.0)
+    direction = np.full(rows, "stable", dtype=object)
+    direction[relative_change > DIRECTION_THRESHOLD] = "up"
+    direction[relative_change < -DIRECTION_THRESHOLD] = "down"
+
+    return {
+        "mean": mean,
+        "current": current,
+        "slope_per_week": slope,
+        "momentum_z": momentum,
+        "yoy_change": yoy,
+        "seasonality": seasonality,
+        "points": (mask & in_window).sum(axis=1),
+        "direction": direction.tolist(),
+    }
+
+
+def _row(metrics: Dict[str, np.ndarray], i: int) -> dict:
+    return {
+        "mean": round_or_none(metrics["mean"][i]),
+        "current": round_or_none(metrics["current"][i]),
+        "slope_per_week": round_or_none(metrics["slope_per_week"][i], 4),
+        "momentum_z": round_or_none(metrics["momentum_z"][i], 3),
+        "yoy_change": round_or_none(metrics["yoy_change"][i], 4),
+        "seasonality": round_or_none(metrics["seasonality"][i], 3),
+        "points": int(metrics["points"][i]),
+        "direction": metrics["direction"][i],
+    }
+
+
+def analyze_series(dates: List[str], series: Dict[str, list], window: str = "12m") -> Dict[str, dict]:
+    """
+    Analyze series that aren't in the store (e.g. a batch engine result).
+
+    Args:
+        dates: ISO dates shared by every series
+        series: Keyword -> values aligned with ``dates``
+        window: Key of WINDOWS
+
+    Returns:
+        Keyword -> metrics dictionary (not cached)
+    """
+    window_days = _window_days(window)
+    keywords = [kw for kw, values in series.items() if len(values) == len(dates) and values]
+    if not keywords:
+        return {}
+    matrix = np.asarray([series[kw] for kw in keywords], dtype=np.float64)
+    metrics = compute(to_dates(dates), matrix, window_days)
+    return {kw: _row(metrics, i) for i, kw in enumerate(keywords)}
+
+
+def _window_days(window: str) -> int:
+    if window not in WINDOWS:
+        raise ValueError(f"Unsupported window: {window} (use one of {', '.join(WINDOWS)})")
+    return WINDOWS[window]
+
+
+class TrendsAnalytics:
+    """Cached trend metrics over the Trends series store."""
+
+    def __init__(self, store: Optional[TrendsSeriesStore] = None):
+        self.store = store or get_trends_store()
+        # (keyword, region, window) -> (store version, metrics)
+        self._cache: Dict[Tuple[str, str, str], Tuple[int, dict]] = {}
+
+    def analyze(self, keywords: List[str], region: str, window: str = "12m") -> Dict[str, dict]:
+        """
+        Get trend metrics for keywords with stored series.
+
+        Args:
+            keywords: Keywords to analyze
+            region: AU or NZ
+            window: Key of WINDOWS
+
+        Returns:
+            Keyword -> metrics dictionary; keywords without stored data are omitted
+        """
+        window_days = _window_days(window)
+        self.store.load(keywords, region)
+
+        stale = [
+            kw for kw in keywords
+            if self.store.version(kw, region) > 0
+            and self._cache.get((kw, region, window), (None,))[0] != self.store.version(kw, region)
+        ]
+
+        if stale:
+            versions = {kw: self.store.version(kw, region) for kw in stale}
+            dates, matrix, found = self.store.matrix(stale, region)
+            if found:
+                metrics = compute(dates, matrix, window_days)
+                for i, kw in enumerate(found):
+                    self._cache[(kw, region, window)] = (versions[kw], _row(metrics, i))
+
+        results = {}
+        for kw in keywords:
+            entry = self._cache.get((kw, region, window))
+            if entry is not None:
+                results[kw] = entry[1]
+        return results
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        self._cache.clear()
+
+
+# Singleton engine shared by ranking and the API
+_analytics: Optional[TrendsAnalytics] = None
+
+
+def get_trends_analytics() -> TrendsAnalytics:
+    """Get the process-wide trend analytics engine."""
+    global _analytics
+    if _analytics is None:
+        _analytics = TrendsAnalytics()
+    return _analytics
@@ -0,0 +1,249 @@
+"""Batched Google Trends fetching with anchor-keyword normalisation.
+
+Google Trends scales every payload so its own peak is 100, which means
+values from two payloads cannot be compared. The engine here packs keywords
+into 5-slot payloads that all contain the same anchor keyword, expresses
+every series relative to the anchor's mean in its own payload, and then
+rescales the combined result back to 0-100. N keywords cost about N/4
+requests instead of N, and scores from different batches line up.
+
+A payload in which the anchor has no interest at all can't be put on that
+shared scale. Its series keep the payload's own 0-100 scale and are listed
+under ``unanchored`` in the result.
+
+Relative series are cached per (region, timeframe, anchor, keyword), and
+concurrent requests for the same keyword share a single fetch.
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.log import get_logger
+from app.services.google_trends_service import GoogleTrendsService
+from app.services.trends_scheduler import PRIORITY_INTERACTIVE
+
+logger = get_logger(__name__)
+
+# pytrends accepts at most 5 keywords per payload
+PAYLOAD_SIZE = 5
+
+# How long relative series stay reusable (seconds)
+CACHE_TTL_SECONDS = 3600
+
+SeriesKey = Tuple[str, str, str, str]  # (region, timeframe, anchor, keyword)
+
+
+def unique_keywords(keywords: List[str]) -> List[str]:
+    """Strip, drop empties and deduplicate while preserving order."""
+    seen = set()
+    result = []
+    for kw in keywords:
+        kw = kw.strip()
+        if kw and kw not in seen:
+            seen.add(kw)
+            result.append(kw)
+    return result
+
+
+def plan_batches(keywords: List[str], anchor: str) -> List[List[str]]:
+    """
+    Pack keywords into payloads that each start with the anchor.
+
+    Args:
+        keywords: Keywords to fetch (the anchor may or may not be included)
+        anchor: Keyword shared by every payload
+
+    Returns:
+        List of payloads, each at most PAYLOAD_SIZE keywords long
+    """
+    others = [kw for kw in unique_keywords(keywords) if kw != anchor]
+    slots = PAYLOAD_SIZE - 1
+    if not others:
+        return [[anchor]]
+    return [[anchor] + others[i:i + slots] for i in range(0, len(others), slots)]
+
+
+class TrendsBatchEngine:
+    """Fetches any number of keywords on one comparable scale."""
+
+    def __init__(self, trends_service: Optional[GoogleTrendsService] = None):
+        self.trends = trends_service or GoogleTrendsService()
+        # key -> (expires_at, dates, values relative to anchor mean, is_mock, anchored)
+        self._cache: Dict[SeriesKey, Tuple[float, List[str], np.ndarray, bool, bool]] = {}
+        self._inflight: Dict[SeriesKey, asyncio.Future] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def fetch(
+        self,
+        keywords: List[str],
+        region: str = "AU",
+        timeframe: str = "today 12-m",
+        anchor: Optional[str] = None,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> dict:
+        """
+        Fetch interest over time for any number of keywords.
+
+        Args:
+            keywords: Keywords to fetch (no 5-keyword limit)
+            region: AU or NZ
+            timeframe: Time range (e.g., 'today 12-m', 'today 3-m')
+            anchor: Keyword shared by every payload (defaults to the first keyword)
+            priority: Scheduler priority
+
+        Returns:
+            Dictionary with ``dates``, ``series`` (0-100, comparable across
+            keywords), ``anchor``, ``unanchored`` (keywords from payloads
+            where the anchor had no interest, on their payload's own scale),
+            ``requests`` made and ``is_mock``
+        """
+        keywords = unique_keywords(keywords)
+        if not keywords:
+            return {"dates": [], "series": {}, "keywords": [], "unanchored": [], "requests": 0}
+
+        anchor = (anchor or keywords[0]).strip()
+        wanted = [anchor] + [kw for kw in keywords if kw != anchor]
+        self._evict_expired()
+
+        # Only fetch keywords that are neither cached nor already being fetched
+        missing = [
+            kw for kw in wanted
+            if self._key(region, timeframe, anchor, kw) not in self._cache
+            and self._key(region, timeframe, anchor, kw) not in self._inflight
+        ]
+
+        batches = []
+        if missing:
+            batches = plan_batches(missing, anchor)
+            loop = asyncio.get_running_loop()
+            for batch in batches:
+                for kw in batch:
+                    key = self._key(region, timeframe, anchor, kw)
+                    if key not in self._inflight:
+                        self._inflight[key] = loop.create_future()
+                task = loop.create_task(
+                    self._fetch_batch(batch, region, timeframe, anchor, priority)
+                )
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+        entries = {}
+        for kw in wanted:
+            key = self._key(region, timeframe, anchor, kw)
+            if key in self._cache:
+                entries[kw] = self._cache[key][1:]
+            else:
+                entries[kw] = await asyncio.shield(self._inflight[key])
+
+        return self._combine(keywords, entries, anchor, region, timeframe, len(batches))
+
+    def _key(self, region: str, timeframe: str, anchor: str, keyword: str) -> SeriesKey:
+        return (region, timeframe, anchor, keyword)
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        expired = [key for key, entry in self._cache.items() if entry[0] <= now]
+        for key in expired:
+            del self._cache[key]
+
+    async def _fetch_batch(
+        self,
+        batch: List[str],
+        region: str,
+        timeframe: str,
+        anchor: str,
+        priority: int,
+    ) -> None:
+        """Fetch one payload and resolve the futures of its keywords."""
+        keys = [self._key(region, timeframe, anchor, kw) for kw in batch]
+        try:
+            result = await self.trends.get_interest_series(
+                batch, region=region, timeframe=timeframe, priority=priority,
+            )
+            dates = result.get("dates", [])
+            series = result.get("series", {})
+            is_mock = result.get("is_mock", False)
+
+            anchor_values = np.asarray(series.get(anchor, []), dtype=np.float64)
+            anchor_mean = float(anchor_values.mean()) if anchor_values.size else 0.0
+            anchored = anchor_mean > 0
+            if not anchored:
+                logger.warning(
+                    "Anchor %r has no interest in %s/%s; %s stay on their own scale",
+                    anchor, region, timeframe, [kw for kw in batch if kw != anchor],
+                )
+
+            expires_at = time.monotonic() + CACHE_TTL_SECONDS
+            for kw, key in zip(batch, keys):
+                values = np.asarray(series.get(kw, [0] * len(dates)), dtype=np.float64)
+                entry = (dates, values / anchor_mean if anchored else values, is_mock, anchored)
+                self._cache[key] = (expires_at,) + entry
+                fut = self._inflight.pop(key, None)
+                if fut is not None and not fut.done():
+                    fut.set_result(entry)
+
+        except Exception as e:
+            for key in keys:
+                fut = self._inflight.pop(key, None)
+                if fut is not None and not fut.done():
+                    fut.set_exception(e)
+
+    def _combine(
+        self,
+        keywords: List[str],
+        entries: Dict[str, tuple],
+        anchor: str,
+        region: str,
+        timeframe: str,
+        requests: int,
+    ) -> dict:
+        """Align series on the union of their dates and rescale the anchored ones to 0-100."""
+        dates = entries[anchor][0]
+        if any(entry[0] != dates for entry in entries.values()):
+            # ISO dates sort chronologically
+            dates = sorted(set().union(*(entry[0] for entry in entries.values())))
+        date_index = {d: i for i, d in enumerate(dates)}
+        matrix = np.zeros((len(keywords), len(dates)), dtype=np.float64)
+
+        for row, kw in enumerate(keywords):
+            kw_dates, values = entries[kw][:2]
+            if kw_dates == dates:
+                matrix[row] = values
+            else:
+                for d, v in zip(kw_dates, values):
+                    i = date_index.get(d)
+                    if i is not None:
+                        matrix[row, i] = v
+
+        # Unanchored rows are already on their payload's 0-100 scale
+        anchored = np.array([entries[kw][3] for kw in keywords], dtype=bool)
+        peak = matrix[anchored].max() if matrix[anchored].size else 0.0
+        if peak > 0:
+            matrix[anchored] *= 100.0 / peak
+
+        return {
+            "dates": dates,
+            "series": {kw: np.round(matrix[row], 2).tolist() for row, kw in enumerate(keywords)},
+            "keywords": keywords,
+            "anchor": anchor,
+            "unanchored": [kw for kw, ok in zip(keywords, anchored) if not ok],
+            "region": region,
+            "timeframe": timeframe,
+            "requests": requests,
+            "is_mock": any(entries[kw][2] for kw in keywords),
+        }
+
+
+# Singleton engine so concurrent callers share the cache and in-flight fetches
+_engine: Optional[TrendsBatchEngine] = None
+
+
+def get_trends_batch_engine() -> TrendsBatchEngine:
+    """Get the process-wide Trends batch engine."""
+    global _engine
+    if _engine is None:
+        _engine = TrendsBatchEngine()
+    return _engine
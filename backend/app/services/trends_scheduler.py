@@ -0,0 +1,227 @@
+"""Request scheduler for Google Trends calls.
+
+pytrends is synchronous, so every call has to run in a thread. Running them
+on the loop's default executor lets sleeping retries starve every other
+``run_in_executor`` user, so Trends gets its own small pool here. Requests
+are admitted in priority order (interactive API calls before batch ranking
+jobs), paced by a global token bucket and retried on 429 and network errors
+with async backoff.
+The bucket, circuit breaker and retry budget belong to the ``trends.google.com``
+host guard from ``app.services.resilience``.
+"""
+
+import asyncio
+import heapq
+import itertools
+import random
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+from app.config import settings
+from app.services.tracing import span
+from app.services.resilience import (
+    DeadlineExceeded,
+    HostGuard,
+    TokenBucket,
+    get_host_guard,
+    is_server_error,
+    is_transient,
+    sleep_within_deadline,
+)
+
+# Lower value is served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+# Backoff after a 429: base * 2^attempt seconds (capped) plus up to 1s jitter
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 30.0
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """Check whether an exception is Google's 429 response."""
+    error_str = str(error)
+    return "429" in error_str or "Too Many Requests" in error_str
+
+
+class PriorityGate:
+    """Concurrency limiter that admits waiters by (priority, arrival order)."""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self._active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def pending(self) -> int:
+        return sum(1 for _, _, fut in self._waiters if not fut.done())
+
+    async def acquire(self, priority: int = PRIORITY_INTERACTIVE) -> None:
+        """Wait for a free slot."""
+        if self._waiters:
+            # Drop waiters that were cancelled while queued
+            self._waiters = [w for w in self._waiters if not w[2].done()]
+            heapq.heapify(self._waiters)
+
+        if self._active < self.limit and not self._waiters:
+            self._active += 1
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # The slot was handed over just as we were cancelled - pass it on
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Free a slot, handing it straight to the best waiter if any."""
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if fut.done():
+                continue
+            try:
+                fut.set_result(None)
+            except RuntimeError:
+                # Waiter's event loop is gone
+                continue
+            return
+        self._active -= 1
+
+
+class TrendsScheduler:
+    """Runs blocking pytrends calls on a dedicated, rate-limited executor."""
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        requests_per_minute: float = 10.0,
+        burst: int = 2,
+        max_retries: int = 3,
+        guard: Optional[HostGuard] = None,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max(1, max_retries)
+        self.guard = guard or HostGuard("trends.google.com", bucket=TokenBucket(requests_per_minute / 60.0, burst))
+        self.bucket = self.guard.bucket
+        self._gate = PriorityGate(self.max_workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Dedicated thread pool, created on first use."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="trends",
+            )
+        return self._executor
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt))
+        return delay + random.uniform(0, 1)
+
+    async def run(
+        self,
+        func: Callable[[], Any],
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> Any:
+        """
+        Run a blocking function through the scheduler.
+
+        Args:
+            func: Zero-argument callable doing one pytrends request
+            priority: PRIORITY_INTERACTIVE or PRIORITY_BATCH
+
+        Returns:
+            Whatever ``func`` returns
+        """
+        loop = asyncio.get_running_loop()
+
+        for attempt in range(self.max_retries):
+            # Fails fast while Google is refusing us
+            self.guard.before_attempt()
+            try:
+                await self._gate.acquire(priority)
+            except asyncio.CancelledError:
+                self.guard.breaker.release()
+                raise
+            try:
+                await self.guard.pace()
+                with span("upstream trends.google.com", "client", attempt=attempt):
+                    result = await loop.run_in_executor(self.executor, func)
+            except (DeadlineExceeded, asyncio.CancelledError):
+                self.guard.breaker.release()
+                raise
+            except Exception as e:
+                rate_limited = is_rate_limited(e)
+                if not rate_limited and not is_transient(e):
+                    if is_server_error(e):
+                        self.guard.on_failure()
+                    else:
+                        self.guard.breaker.record_success()
+                    raise
+                self.guard.on_failure()
+                if attempt == self.max_retries - 1 or not self.guard.can_retry():
+                    raise
+                delay = self._backoff(attempt)
+                if rate_limited:
+                    # Slow every caller down, not just this one
+                    self.bucket.penalize(delay)
+            else:
+                self.guard.on_success()
+                return result
+            finally:
+                self._gate.release()
+
+            # Back off without holding a slot or a thread
+            await sleep_within_deadline(delay)
+
+    def stats(self) -> dict:
+        """Current scheduler load."""
+        return {
+            "active": self._gate.active,
+            "pending": self._gate.pending,
+            "max_workers": self.max_workers,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the executor threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Singleton scheduler shared by every GoogleTrendsService instance
+_scheduler: Optional[TrendsScheduler] = None
+
+
+def get_trends_scheduler() -> TrendsScheduler:
+    """Get the process-wide Trends scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = TrendsScheduler(
+            max_workers=settings.trends_max_workers,
+            requests_per_minute=settings.trends_requests_per_minute,
+            burst=settings.trends_burst,
+            max_retries=settings.trends_max_retries,
+            guard=get_host_guard(
+                "trends.google.com",
+                bucket=TokenBucket(settings.trends_requests_per_minute / 60.0, settings.trends_burst),
+            ),
+        )
+    return _scheduler
+
+
+def shutdown_trends_scheduler() -> None:
+    """Stop the process-wide scheduler's threads, if it was ever built."""
+    if _scheduler is not None:
+        _scheduler.shutdown()
@@ -0,0 +1,376 @@
+"""Columnar time-series store for Google Trends interest.
+
+Each (keyword, region) series is kept as two numpy arrays - dates as
+``datetime64[D]`` and interest as ``float32`` - instead of lists of
+``{date, kw: value}`` dicts. A series is first stored on its own peak (the
+scale Google uses when a keyword is fetched alone) and later windows are
+stitched onto that scale over their overlap, so data from any payload can
+be merged into one history.
+
+The in-memory arrays are backed by the ``google_trends_series`` table,
+which stores one row per (keyword, region) with ``DATE[]``/``SMALLINT[]``
+columns. Range queries, downsampling and aggregates all work on arrays.
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.database import get_db
+from app.log import get_logger
+
+logger = get_logger(__name__)
+
+Series = Tuple[np.ndarray, np.ndarray]  # (dates datetime64[D], values float32)
+
+# Supported output frequencies
+FREQ_WEEKLY = "W"
+FREQ_MONTHLY = "M"
+
+
+def to_dates(values) -> np.ndarray:
+    """Convert ISO date strings (or datetimes) to a datetime64[D] array."""
+    return np.asarray(values, dtype="datetime64[D]")
+
+
+def date_strings(dates: np.ndarray) -> List[str]:
+    """Convert a datetime64 array back to ISO date strings."""
+    return np.datetime_as_string(dates.astype("datetime64[D]"), unit="D").tolist()
+
+
+def downsample(dates: np.ndarray, matrix: np.ndarray, freq: str = FREQ_MONTHLY) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Average a (keywords x dates) matrix into coarser buckets.
+
+    NaN cells (no data for that keyword/date) are ignored.
+
+    Args:
+        dates: datetime64[D] array, one per column
+        matrix: 2-D float array
+        freq: FREQ_WEEKLY (unchanged) or FREQ_MONTHLY
+
+    Returns:
+        Tuple of (bucket start dates, downsampled matrix)
+    """
+    if freq == FREQ_WEEKLY or dates.size == 0:
+        return dates, matrix
+    if freq != FREQ_MONTHLY:
+        raise ValueError(f"Unsupported frequency: {freq}")
+
+    buckets, inverse = np.unique(dates.astype("datetime64[M]"), return_inverse=True)
+    mask = ~np.isnan(matrix)
+    sums = np.zeros((matrix.shape[0], buckets.size))
+    counts = np.zeros((matrix.shape[0], buckets.size))
+    np.add.at(sums.T, inverse, np.where(mask, matrix, 0.0).T)
+    np.add.at(counts.T, inverse, mask.T)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        result = sums / counts
+    return buckets.astype("datetime64[D]"), result
+
+
+def masked_slope(dates: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """
+    Least-squares slope of each row, in interest points per week.
+
+    NaN cells are left out of the fit; rows with fewer than two points get NaN.
+    """
+    x = (dates - dates[0]).astype(np.float64) / 7.0 if dates.size else dates.astype(np.float64)
+    mask = ~np.isnan(matrix)
+    y = np.where(mask, matrix, 0.0)
+    xm = np.where(mask, x, 0.0)
+
+    n = mask.sum(axis=1)
+    sx = xm.sum(axis=1)
+    sy = y.sum(axis=1)
+    sxx = (xm * xm).sum(axis=1)
+    sxy = (xm * y).sum(axis=1)
+
+    denom = n * sxx - sx * sx
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = (n * sxy - sx * sy) / denom
+    slope[(n < 2) | (denom == 0)] = np.nan
+    return slope
+
+
+def seasonality_strength(dates: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """
+    Share of each row's variance explained by month-of-year means (0-1).
+
+    Needs at least a year of data to mean anything; shorter rows return NaN.
+    """
+    mask = ~np.isnan(matrix)
+    result = np.full(matrix.shape[0], np.nan)
+    if dates.size == 0:
+        return result
+
+    months = dates.astype("datetime64[M]").astype(np.int64) % 12
+    onehot = np.zeros((dates.size, 12))
+    onehot[np.arange(dates.size), months] = 1.0
+
+    y = np.where(mask, matrix, 0.0)
+    counts = mask.astype(np.float64) @ onehot
+    with np.errstate(invalid="ignore", divide="ignore"):
+        month_means = (y @ onehot) / counts
+        seasonal_var = np.nanvar(np.where(counts > 0, month_means, np.nan), axis=1)
+        total_var = np.nanvar(matrix, axis=1)
+        strength = seasonal_var / total_var
+
+    # Calendar span covered by each row's first and last data point
+    first = mask.argmax(axis=1)
+    last = dates.size - 1 - mask[:, ::-1].argmax(axis=1)
+    span_days = (dates[last] - dates[first]).astype(np.int64)
+    span_days[~mask.any(axis=1)] = 0
+
+    valid = (span_days >= 364) & (total_var > 0)
+    result[valid] = np.clip(strength[valid], 0.0, 1.0)
+    return result
+
+
+class TrendsSeriesStore:
+    """In-memory columnar series backed by the google_trends_series table."""
+
+    TABLE = "google_trends_series"
+
+    def __init__(self, db=None):
+        self._series: Dict[Tuple[str, str], Series] = {}
+        self._versions: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self._db = db
+
+    def _get_db(self):
+        """Resolve the database lazily; None when Supabase isn't configured."""
+        if self._db is None:
+            try:
+                self._db = get_db()
+            except Exception:
+                self._db = False
+        return self._db or None
+
+    # ---------- Writes ----------
+
+    def put(
+        self,
+        keyword: str,
+        region: str,
+        dates: np.ndarray,
+        values: np.ndarray,
+        persist: bool = True,
+    ) -> None:
+        """
+        Merge a series into the store (new points override old ones).
+
+        A persisted write first loads the stored series when it isn't in
+        memory yet, so a short fetched window never replaces the history.
+
+        Args:
+            keyword: Search keyword
+            region: AU or NZ
+            dates: datetime64[D] array
+            values: Interest values, same length as dates
+            persist: Also write the merged series to the database
+        """
+        dates = to_dates(dates)
+        values = np.asarray(values, dtype=np.float32)
+        key = (keyword, region)
+        if persist and key not in self._series:
+            self.load([keyword], region)
+
+        with self._lock:
+            existing = self._series.get(key)
+            if existing is not None:
+                old_dates, old_values = existing
+                # Windows fetched separately are each scaled to their own peak;
+                # stitch the new one onto the stored scale over the overlap
+                overlap_old = np.isin(old_dates, dates)
+                overlap_new = np.isin(dates, old_dates)
+                if overlap_old.any():
+                    old_mean = float(old_values[overlap_old].mean())
+                    new_mean = float(values[overlap_new].mean())
+                    if old_mean > 0 and new_mean > 0:
+                        values = values * np.float32(old_mean / new_mean)
+                keep = ~overlap_old
+                dates = np.concatenate([old_dates[keep], dates])
+                values = np.concatenate([old_values[keep], values])
+            order = np.argsort(dates, kind="stable")
+            merged = (dates[order], values[order])
+            self._series[key] = merged
+            self._versions[key] = self._versions.get(key, 0) + 1
+
+        if persist:
+            self._persist(keyword, region, *merged)
+
+    def ingest(self, dates, columns: Dict[str, np.ndarray], region: str) -> None:
+        """
+        Store every column of a Trends payload, rescaled to its own peak.
+
+        Values in a multi-keyword payload are relative to the payload's peak,
+        so each column is rescaled to 0-100 before merging.
+        """
+        dates = to_dates(dates)
+        # One query for the stored history of every column
+        self.load(list(columns), region)
+        for keyword, values in columns.items():
+            values = np.asarray(values, dtype=np.float32)
+            peak = values.max() if values.size else 0
+            if peak > 0:
+                values = values * (100.0 / peak)
+            self.put(keyword, region, dates, values)
+
+    def _persist(self, keyword: str, region: str, dates: np.ndarray, values: np.ndarray) -> None:
+        db = self._get_db()
+        if db is None:
+            return
+        try:
+            db.table(self.TABLE).upsert(
+                {
+                    "keyword": keyword,
+                    "region": region,
+                    "dates": date_strings(dates),
+                    "interest": np.rint(values).astype(np.int16).tolist(),
+                },
+                on_conflict="keyword,region",
+            ).execute()
+        except Exception as e:
+            logger.warning("Failed to persist %r (%s): %s", keyword, region, e)
+
+    # ---------- Reads ----------
+
+    def load(self, keywords: List[str], region: str) -> None:
+        """Load series that aren't in memory yet from the database (one query)."""
+        missing = [kw for kw in keywords if (kw, region) not in self._series]
+        db = self._get_db()
+        if not missing or db is None:
+            return
+        try:
+            result = db.table(self.TABLE)\
+                .select("keyword, dates, interest")\
+                .eq("region", region)\
+                .in_("keyword", missing)\
+                .execute()
+        except Exception as e:
+            logger.warning("Failed to load series: %s", e)
+            return
+
+        for row in result.data or []:
+            self.put(
+                row["keyword"],
+                region,
+                to_dates(row.get("dates") or []),
+                np.asarray(row.get("interest") or [], dtype=np.float32),
+                persist=False,
+            )
+
+    def get(
+        self,
+        keyword: str,
+        region: str,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> Optional[Series]:
+        """
+        Get a series, optionally limited to [start, end] (inclusive).
+
+        Returns:
+            Tuple of (dates, values) arrays, or None if the series is unknown
+        """
+        series = self._series.get((keyword, region))
+        if series is None:
+            return None
+        dates, values = series
+        lo = np.searchsorted(dates, np.datetime64(start, "D"), side="left") if start else 0
+        hi = np.searchsorted(dates, np.datetime64(end, "D"), side="right") if end else dates.size
+        return dates[lo:hi], values[lo:hi]
+
+    def version(self, keyword: str, region: str) -> int:
+        """Counter bumped on every write to a series (0 if unknown)."""
+        return self._versions.get((keyword, region), 0)
+
+    def keywords(self, region: Optional[str] = None) -> List[str]:
+        """Keywords with stored series."""
+        return sorted({kw for kw, r in self._series if region is None or r == region})
+
+    def matrix(
+        self,
+        keywords: List[str],
+        region: str,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        freq: str = FREQ_WEEKLY,
+    ) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        """
+        Align several series on one date grid.
+
+        Returns:
+            Tuple of (dates, keywords x dates matrix with NaN gaps, keywords found)
+        """
+        found = []
+        parts = []
+        for kw in keywords:
+            series = self.get(kw, region, start, end)
+            if series is not None and series[0].size:
+                found.append(kw)
+                parts.append(series)
+
+        if not parts:
+            return np.array([], dtype="datetime64[D]"), np.empty((0, 0)), []
+
+        grid = np.unique(np.concatenate([d for d, _ in parts]))
+        matrix = np.full((len(parts), grid.size), np.nan)
+        for row, (dates, values) in enumerate(parts):
+            matrix[row, np.searchsorted(grid, dates)] = values
+
+        grid, matrix = downsample(grid, matrix, freq)
+        return grid, matrix, found
+
+    def aggregates(
+        self,
+        keywords: List[str],
+        region: str,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> Dict[str, dict]:
+        """Mean, least-squares slope and seasonality strength per keyword."""
+        dates, matrix, found = self.matrix(keywords, region, start, end)
+        if not found:
+            return {}
+
+        with np.errstate(invalid="ignore"):
+            means = np.nanmean(matrix, axis=1)
+        slopes = masked_slope(dates, matrix)
+        seasonality = seasonality_strength(dates, matrix)
+        points = (~np.isnan(matrix)).sum(axis=1)
+
+        return {
+            kw: {
+                "mean": round_or_none(means[i]),
+                "slope_per_week": round_or_none(slopes[i], 4),
+                "seasonality": round_or_none(seasonality[i], 3),
+                "points": int(points[i]),
+            }
+            for i, kw in enumerate(found)
+        }
+
+
+def round_or_none(value: float, digits: int = 2) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def rows_with_nulls(matrix: np.ndarray, digits: int = 2) -> List[list]:
+    """Matrix rows as lists with NaN replaced by None (for JSON)."""
+    rounded = np.round(matrix, digits).astype(object)
+    rounded[np.isnan(matrix)] = None
+    return rounded.tolist()
+
+
+# Singleton store shared by the Trends service and routes
+_store: Optional[TrendsSeriesStore] = None
+
+
+def get_trends_store() -> TrendsSeriesStore:
+    """Get the process-wide Trends series store."""
+    global _store
+    if _store is None:
+        _store = TrendsSeriesStore()
+    return _store
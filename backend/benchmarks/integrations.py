@@ -0,0 +1,272 @@
+"""Benchmark end-to-end flows against recorded upstream traffic.
+
+Cases:
+
+- ``ranking``: ``RankingService.calculate_rankings`` over the default
+  categories, with TradeMe, eBay and Google Trends replayed
+- ``suppliers``: ``match_suppliers_for_products`` for a few titles; live
+  1688 searches read saved HTML when Playwright is installed
+- ``report``: ``ReportGenerator.generate_report`` for a keyword (database)
+- ``products_search``: ``GET /api/products/search`` through the ASGI app
+  (database)
+
+Upstream calls come from the cassette directory (see ``benchmarks.replay``),
+so runs need no network and are comparable over time. The committed
+``benchmarks/cassettes`` set is a small synthetic sample (see
+``benchmarks.sample_cassettes``); record real traffic for realistic
+payloads. A case that asks for anything not recorded times failures, not
+the flow: it is reported with its miss count, rejected by ``--compare``
+and makes the run exit non-zero. Database cases use
+whatever ``SUPABASE_URL``/``SUPABASE_KEY`` point at - for a local Postgres,
+``supabase start`` with ``supabase/migrations`` applied - and are skipped
+when no database is configured.
+
+``--save`` writes the timings as JSON; ``--compare`` checks the medians
+against a saved run and exits non-zero on a regression beyond
+``--tolerance``.
+
+Usage (from backend/):
+    python -m benchmarks.integrations --record        # once, with API credentials
+    python -m benchmarks.integrations --save baseline.json
+    python -m benchmarks.integrations --compare baseline.json --tolerance 0.25
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from app.config import settings
+from app.services.ebay_service import EbayService
+from app.services.google_trends_service import GoogleTrendsService
+from app.services.platform_registry import EbayAdapter, PlatformRegistry, TradeMeAdapter
+from app.services.trademe_api_service import TradeMeAPIService
+from app.services.trademe_categories import CategoryCache
+from app.services.trends_batch import TrendsBatchEngine
+from app.services.trends_scheduler import TrendsScheduler
+from benchmarks.replay import DEFAULT_DIR, RECORD, REPLAY, FixtureBrowser, HtmlFixtures, ReplayTransport, ReplayTrends
+
+SUPPLIER_PRODUCTS = [
+    {"id": "bench-1", "title": "Wireless Bluetooth Earbuds", "price": 39.99, "currency": "AUD"},
+    {"id": "bench-2", "title": "Non Slip Yoga Mat 6mm", "price": 45.0, "currency": "NZD"},
+    {"id": "bench-3", "title": "Stainless Steel Water Bottle", "price": 29.95, "currency": "AUD"},
+]
+REPORT_KEYWORD = "yoga mat"
+SEARCH_KEYWORD = "phone case"
+
+
+class Upstreams:
+    """Recorded (or recording) upstream clients shared by every case."""
+
+    def __init__(
+        self,
+        directory: Path,
+        mode: str,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        trends_factory: Optional[Callable[[dict], Any]] = None,
+    ):
+        self.mode = mode
+        self.http = ReplayTransport(directory, mode, transport=transport)
+        self.trends = ReplayTrends(directory, mode, factory=trends_factory)
+        self.html = HtmlFixtures(directory, mode, match="*1688.com*")
+        self._tmp = tempfile.TemporaryDirectory(prefix="bench-")
+
+    def registry(self) -> PlatformRegistry:
+        """TradeMe and eBay adapters on the replay transport (fresh category cache)."""
+        api = TradeMeAPIService(transport=self.http)
+        categories = CategoryCache(api, path=str(Path(self._tmp.name) / f"categories-{time.monotonic_ns()}.json"))
+        return PlatformRegistry(adapters=[
+            TradeMeAdapter(api=api, categories=categories),
+            EbayAdapter(EbayService(transport=self.http)),
+        ])
+
+    def trends_service(self) -> GoogleTrendsService:
+        # Replayed calls needn't be paced like Google; recording keeps the real limits
+        scheduler = None if self.mode == RECORD else TrendsScheduler(requests_per_minute=1e6, burst=1000)
+        return GoogleTrendsService(scheduler=scheduler, client_factory=self.trends)
+
+    async def scraper(self):
+        from app.services.alibaba1688_service import Alibaba1688Scraper
+
+        scraper = Alibaba1688Scraper()
+        browser = await scraper._get_browser()
+        if browser is not None:
+            scraper._browser = FixtureBrowser(browser, self.html)
+        return scraper
+
+    async def close(self) -> None:
+        await self.http.aclose()
+        self.trends.save()
+        self.html.save()
+        self._tmp.cleanup()
+
+    def misses(self) -> Dict[str, int]:
+        return {
+            "http": self.http.cassette.misses,
+            "trends": self.trends.cassette.misses,
+            "html": self.html.misses,
+        }
+
+    def miss_count(self) -> int:
+        return sum(self.misses().values())
+
+
+def database_configured() -> bool:
+    return bool(settings.supabase_url and settings.supabase_key)
+
+
+async def bench_ranking(up: Upstreams) -> None:
+    from app.services.ranking_service import RankingService
+
+    service = RankingService()
+    service.platforms = up.registry()
+    service.google_trends = up.trends_service()
+    service.trends_batch = TrendsBatchEngine(service.google_trends)
+    await service.calculate_rankings("NZ")
+
+
+async def bench_suppliers(up: Upstreams) -> None:
+    from app.services.alibaba1688_service import match_suppliers_for_products
+
+    scraper = await up.scraper()
+    try:
+        await match_suppliers_for_products(SUPPLIER_PRODUCTS, limit_per_product=5, scraper=scraper)
+    finally:
+        await scraper.close()
+
+
+async def bench_report(up: Upstreams) -> None:
+    from app.database import get_db
+    from app.services.report_generator import ReportGenerator
+
+    generator = ReportGenerator(get_db())
+    generator.platforms = up.registry()
+    generator.trends_service = up.trends_service()
+    # No reports row: the progress updates match nothing, the work is the same
+    await generator.generate_report("00000000-0000-0000-0000-000000000000", "full", "keyword", REPORT_KEYWORD, {})
+
+
+async def bench_products_search(up: Upstreams) -> None:
+    from app.main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        response = await client.get("/api/products/search", params={"keyword": SEARCH_KEYWORD, "page_size": 50})
+        response.raise_for_status()
+
+
+CASES: Dict[str, Callable[[Upstreams], Awaitable[None]]] = {
+    "ranking": bench_ranking,
+    "suppliers": bench_suppliers,
+    "report": bench_report,
+    "products_search": bench_products_search,
+}
+DATABASE_CASES = {"report", "products_search"}
+
+
+async def time_case(func: Callable[[Upstreams], Awaitable[None]], up: Upstreams, repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func(up)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(timings: List[float]) -> dict:
+    ordered = sorted(timings)
+    return {
+        "runs": len(ordered),
+        "median": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+        "min": ordered[0],
+    }
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """
+    Cases whose median got slower than the baseline by more than ``tolerance``,
+    plus cases with cassette misses on either side (their timings aren't comparable).
+    """
+    regressions = []
+    for name, result in results.items():
+        missed = result.get("misses") or baseline.get(name, {}).get("misses")
+        if missed:
+            side = "this run" if result.get("misses") else "baseline"
+            regressions.append(f"{name}: {missed} cassette misses in {side}")
+            continue
+        before = baseline.get(name, {}).get("median")
+        if before and result["median"] > before * (1 + tolerance):
+            regressions.append(f"{name}: {before * 1000:.1f} ms -> {result['median'] * 1000:.1f} ms")
+    return regressions
+
+
+async def run(cases: List[str], directory: Path, mode: str, repeat: int, warmup: int) -> Dict[str, dict]:
+    up = Upstreams(directory, mode)
+    results = {}
+    try:
+        for name in cases:
+            if name in DATABASE_CASES and not database_configured():
+                print(f"{name:<16} skipped (no database configured)")
+                continue
+            missed = up.miss_count()
+            await time_case(CASES[name], up, 1 if mode == RECORD else warmup)
+            if mode == RECORD:
+                print(f"{name:<16} recorded")
+                continue
+            results[name] = summary = summarize(await time_case(CASES[name], up, repeat))
+            missed = up.miss_count() - missed
+            if missed:
+                summary["misses"] = missed
+            print(
+                f"{name:<16} median {summary['median'] * 1000:8.1f} ms   "
+                f"p95 {summary['p95'] * 1000:8.1f} ms   min {summary['min'] * 1000:8.1f} ms"
+                + (f"   {missed} cassette misses" if missed else "")
+            )
+    finally:
+        await up.close()
+
+    misses = {k: v for k, v in up.misses().items() if v}
+    if misses:
+        print(f"Cassette misses (not recorded, served as failures): {misses}")
+    return results
+
+
+def has_misses(results: Dict[str, dict]) -> bool:
+    return any(result.get("misses") for result in results.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--case", dest="cases", action="append", choices=list(CASES), help="Run only this case (repeatable)")
+    parser.add_argument("--cassettes", type=Path, default=DEFAULT_DIR, help="Recorded traffic directory")
+    parser.add_argument("--record", action="store_true", help="Call the real upstreams and save the traffic")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--save", type=Path, help="Write timings as JSON")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON from --save")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed median slowdown vs the baseline")
+    args = parser.parse_args()
+
+    mode = RECORD if args.record else REPLAY
+    results = asyncio.run(run(args.cases or list(CASES), args.cassettes, mode, max(1, args.repeat), args.warmup))
+
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2))
+    regressions = []
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+    if regressions or has_misses(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
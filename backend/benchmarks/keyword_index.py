@@ -0,0 +1,119 @@
+"""Benchmark keyword extraction + translation over 100k product titles.
+
+Compares the previous linear scan over PRODUCT_KEYWORD_MAP with the token
+trie index, on the bundled map and on a synthetic 20k-term map.
+
+Usage (from backend/):
+    python -m benchmarks.keyword_index [--titles 100000] [--terms 20000]
+"""
+
+import argparse
+import random
+import re
+import time
+from typing import Dict, List
+
+from app.services.alibaba1688_service import (
+    NOISE_WORDS,
+    PRODUCT_KEYWORD_MAP,
+    extract_keywords,
+    translate_to_chinese,
+)
+from app.services import keyword_index
+from app.services.keyword_index import KeywordIndex
+
+FILLER = [
+    "premium", "portable", "waterproof", "mini", "large", "black", "white",
+    "women", "men", "kids", "outdoor", "home", "travel", "with", "for", "new",
+    "compatible", "adjustable", "rechargeable", "stainless", "steel", "case",
+]
+
+
+def make_titles(count: int, phrases: List[str], seed: int = 0) -> List[str]:
+    """Random titles mixing map phrases with filler words."""
+    rng = random.Random(seed)
+    titles = []
+    for _ in range(count):
+        words = rng.sample(FILLER, 4) + rng.choice(phrases).split() + rng.sample(FILLER, 3)
+        titles.append(" ".join(words).title())
+    return titles
+
+
+def make_map(terms: int, seed: int = 0) -> Dict[str, List[str]]:
+    """Synthetic two-word terms followed by the bundled map."""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    mapping = {}
+    while len(mapping) < terms - len(PRODUCT_KEYWORD_MAP):
+        phrase = " ".join("".join(rng.choices(letters, k=rng.randint(4, 9))) for _ in range(2))
+        mapping.setdefault(phrase, ["产品"])
+    mapping.update(PRODUCT_KEYWORD_MAP)
+    return mapping
+
+
+def linear_pipeline(title: str, mapping: Dict[str, List[str]]) -> List[str]:
+    """The pre-index implementation, kept here for comparison."""
+    title = title.lower()
+    for pattern in [r'\b[A-Z][a-z]+\s+(?:brand|official)\b', r'\b(?:genuine|original|authentic)\b']:
+        title = re.sub(pattern, '', title, flags=re.IGNORECASE)
+    words = [w for w in re.findall(r'\b[a-z]+\b', title) if w not in list(NOISE_WORDS) and len(w) > 2]
+    keywords = []
+    for i in range(len(words) - 1):
+        two_word = f"{words[i]} {words[i+1]}"
+        if two_word in mapping:
+            keywords.append(two_word)
+    for word in words[:5]:
+        if word not in [k.split()[0] for k in keywords]:
+            keywords.append(word)
+    keywords = keywords[:3] if keywords else words[:3]
+
+    chinese = []
+    for keyword in keywords:
+        if keyword in mapping:
+            chinese.extend(mapping[keyword])
+        else:
+            for eng, chi_list in mapping.items():
+                if keyword in eng or eng in keyword:
+                    chinese.extend(chi_list[:1])
+                    break
+    return list(dict.fromkeys(chinese))[:5] or ["产品"]
+
+
+def indexed_pipeline(title: str) -> List[str]:
+    return translate_to_chinese(extract_keywords(title))
+
+
+def timed(label: str, func, titles: List[str]) -> float:
+    start = time.perf_counter()
+    for title in titles:
+        func(title)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<8} {elapsed:8.3f}s  {len(titles) / elapsed:>10,.0f} titles/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--titles", type=int, default=100_000)
+    parser.add_argument("--terms", type=int, default=20_000)
+    parser.add_argument("--linear-sample", type=int, default=2_000,
+                        help="Titles to run through the slow linear scan on the large map")
+    args = parser.parse_args()
+
+    for label, mapping in (("bundled", dict(PRODUCT_KEYWORD_MAP)), ("synthetic", make_map(args.terms))):
+        start = time.perf_counter()
+        keyword_index._index = KeywordIndex(mapping)
+        build = time.perf_counter() - start
+        titles = make_titles(args.titles, list(PRODUCT_KEYWORD_MAP))
+        print(f"{label} map: {len(mapping):,} terms (index built in {build * 1000:.1f} ms)")
+
+        sample = titles if label == "bundled" else titles[:args.linear_sample]
+        linear = timed("linear", lambda t: linear_pipeline(t, mapping), sample) / len(sample)
+        indexed = timed("indexed", indexed_pipeline, titles) / len(titles)
+        print(f"  speedup  {linear / indexed:8.1f}x per title\n")
+
+    keyword_index._index = None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""Record/replay of upstream traffic, so integrations run without network.
+
+Three recorders share one on-disk layout (a cassette directory):
+
+- ``ReplayTransport``: an httpx transport for ``TradeMeAPIService`` and
+  ``EbayService`` (both take ``transport=``). Interactions are keyed by
+  method and URL with sorted query parameters, so OAuth nonces and
+  signatures in headers don't matter. Saved to ``http.json``.
+- ``ReplayTrends``: a ``client_factory`` for ``GoogleTrendsService`` that
+  records pytrends results (DataFrames included) per payload. Saved to
+  ``trends.json``.
+- ``HtmlFixtures``: Playwright routing that saves document responses to
+  ``html/`` and serves them back; wrap a browser in ``FixtureBrowser`` and
+  hand it to a scraper.
+
+Mode "record" calls the real upstream and saves what came back; "replay"
+never touches the network and raises ``CassetteMiss`` (HTML: aborts the
+request) for anything not recorded. Access tokens in JSON responses are
+redacted before saving.
+
+Record once with credentials configured, commit the cassette, then
+benchmarks and tests replay it offline:
+
+    python -m benchmarks.integrations --record
+
+Until then the committed ``cassettes/`` directory holds a synthetic sample
+from ``benchmarks.sample_cassettes``.
+"""
+
+import base64
+import hashlib
+import io
+import json
+import re
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+import pandas as pd
+
+RECORD = "record"
+REPLAY = "replay"
+
+DEFAULT_DIR = Path(__file__).parent / "cassettes"
+
+# Response headers not worth keeping (or not safe to commit)
+DROP_HEADERS = {"set-cookie", "date", "content-encoding", "content-length", "transfer-encoding", "connection"}
+SECRET_FIELDS = re.compile(r'("(?:access_token|refresh_token)"\s*:\s*)"[^"]*"')
+
+
+class CassetteMiss(LookupError):
+    """A replayed call that was never recorded."""
+
+
+def _check_mode(mode: str) -> str:
+    if mode not in (RECORD, REPLAY):
+        raise ValueError(f"mode must be {RECORD!r} or {REPLAY!r}, not {mode!r}")
+    return mode
+
+
+class Cassette:
+    """
+    Recorded responses per request key, saved as one JSON file.
+
+    A key can hold several responses (e.g. a value that changed between
+    calls); replay returns them in order and then keeps repeating the last.
+    """
+
+    def __init__(self, path: Path, load: bool = True):
+        self.path = Path(path)
+        self._entries: Dict[str, List[Any]] = {}
+        self._served: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        if load and self.path.exists():
+            self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, key: str, value: Any) -> None:
+        self._entries.setdefault(key, []).append(value)
+
+    def next(self, key: str) -> Any:
+        values = self._entries.get(key)
+        if not values:
+            self.misses += 1
+            raise CassetteMiss(f"not recorded in {self.path.name}: {key}")
+        index = self._served.get(key, 0)
+        self._served[key] = index + 1
+        self.hits += 1
+        return values[min(index, len(values) - 1)]
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._entries, ensure_ascii=False, indent=1, sort_keys=True), encoding="utf-8")
+        tmp.replace(self.path)
+
+
+# ---------- httpx ----------
+
+def request_key(request: httpx.Request) -> str:
+    """Method plus URL with sorted query parameters."""
+    url = urlsplit(str(request.url))
+    query = urlencode(sorted(parse_qsl(url.query, keep_blank_values=True)))
+    key = f"{request.method} {urlunsplit((url.scheme, url.netloc, url.path, query, ''))}"
+    if request.method != "GET" and request.content:
+        # Form/JSON bodies without secrets would be fine, but a hash is enough
+        key += f" #{hashlib.sha1(request.content).hexdigest()[:12]}"
+    return key
+
+
+def _encode_body(content: bytes) -> dict:
+    try:
+        return {"text": SECRET_FIELDS.sub(r'\1"REDACTED"', content.decode("utf-8"))}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(content).decode("ascii")}
+
+
+def _decode_body(body: dict) -> bytes:
+    if "base64" in body:
+        return base64.b64decode(body["base64"])
+    return body.get("text", "").encode("utf-8")
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """httpx transport that records to, or replays from, ``http.json``."""
+
+    def __init__(
+        self,
+        directory: Path = DEFAULT_DIR,
+        mode: str = REPLAY,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.mode = _check_mode(mode)
+        # Recording starts a fresh cassette
+        self.cassette = Cassette(Path(directory) / "http.json", load=mode == REPLAY)
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = request_key(request)
+        if self.mode == REPLAY:
+            saved = self.cassette.next(key)
+            return httpx.Response(
+                saved["status"],
+                headers=saved["headers"],
+                content=_decode_body(saved["body"]),
+                request=request,
+            )
+
+        if self._transport is None:
+            self._transport = httpx.AsyncHTTPTransport()
+        response = await self._transport.handle_async_request(request)
+        content = await response.aread()
+        self.cassette.add(key, {
+            "status": response.status_code,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in DROP_HEADERS},
+            "body": _encode_body(content),
+        })
+        return httpx.Response(response.status_code, headers=response.headers, content=content, request=request)
+
+    async def aclose(self) -> None:
+        if self.mode == RECORD:
+            self.cassette.save()
+        if self._transport is not None:
+            await self._transport.aclose()
+
+
+# ---------- pytrends ----------
+
+def _encode_value(value: Any) -> Any:
+    """JSON-safe form of pytrends results (DataFrames, dicts of them, lists)."""
+    if isinstance(value, pd.DataFrame):
+        return {
+            "__frame__": value.to_json(orient="split", date_format="iso"),
+            "index_name": value.index.name,
+            "datetime_index": isinstance(value.index, pd.DatetimeIndex),
+        }
+    if isinstance(value, dict):
+        return {"__dict__": {k: _encode_value(v) for k, v in value.items()}}
+    if isinstance(value, (list, tuple)):
+        return [_encode_value(v) for v in value]
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "__frame__" in value:
+        frame = pd.read_json(io.StringIO(value["__frame__"]), orient="split", convert_dates=False)
+        if value.get("datetime_index"):
+            frame.index = pd.to_datetime(frame.index).tz_localize(None)
+        frame.index.name = value.get("index_name")
+        return frame
+    if isinstance(value, dict) and "__dict__" in value:
+        return {k: _decode_value(v) for k, v in value["__dict__"].items()}
+    if isinstance(value, list):
+        return [_decode_value(v) for v in value]
+    return value
+
+
+class _ReplayTrendReq:
+    """Stand-in for ``TrendReq`` exposing the calls ``GoogleTrendsService`` makes."""
+
+    def __init__(self, owner: "ReplayTrends", kwargs: dict):
+        self._owner = owner
+        self._kwargs = {k: v for k, v in kwargs.items() if k in ("hl", "tz")}
+        self._payload: dict = {}
+        self._real = None
+
+    def _client(self):
+        if self._real is None:
+            self._real = self._owner.factory(self._owner.client_kwargs(self._kwargs))
+        return self._real
+
+    def build_payload(self, **payload) -> None:
+        self._payload = payload
+        if self._owner.mode == RECORD:
+            self._client().build_payload(**payload)
+
+    def _call(self, method: str, *args, **kwargs):
+        key = json.dumps(
+            {"client": self._kwargs, "payload": self._payload, "call": method, "args": args, "kwargs": kwargs},
+            sort_keys=True,
+            default=str,
+        )
+        if self._owner.mode == REPLAY:
+            return _decode_value(self._owner.cassette.next(key))
+        value = getattr(self._client(), method)(*args, **kwargs)
+        self._owner.cassette.add(key, _encode_value(value))
+        return value
+
+    def interest_over_time(self):
+        return self._call("interest_over_time")
+
+    def interest_by_region(self, **kwargs):
+        return self._call("interest_by_region", **kwargs)
+
+    def related_queries(self):
+        return self._call("related_queries")
+
+    def suggestions(self, keyword: str):
+        self._payload = {}
+        return self._call("suggestions", keyword)
+
+
+class ReplayTrends:
+    """``GoogleTrendsService`` client factory recording to ``trends.json``."""
+
+    def __init__(
+        self,
+        directory: Path = DEFAULT_DIR,
+        mode: str = REPLAY,
+        factory: Optional[Callable[[dict], Any]] = None,
+    ):
+        self.mode = _check_mode(mode)
+        self.cassette = Cassette(Path(directory) / "trends.json", load=mode == REPLAY)
+        if factory is None:
+            from pytrends.request import TrendReq
+
+            factory = lambda kwargs: TrendReq(**kwargs)
+        self.factory = factory
+
+    @staticmethod
+    def client_kwargs(kwargs: dict) -> dict:
+        # Recording is a one-off run; give Google time to answer
+        return {**kwargs, "timeout": (10, 30)}
+
+    def __call__(self, kwargs: dict) -> _ReplayTrendReq:
+        return _ReplayTrendReq(self, kwargs)
+
+    def save(self) -> None:
+        if self.mode == RECORD:
+            self.cassette.save()
+
+
+# ---------- Playwright ----------
+
+class HtmlFixtures:
+    """
+    Saved documents for Playwright scrapers under ``html/``.
+
+    Documents are stored per URL hash with an ``index.json`` mapping hashes
+    back to URLs. In replay, sub-resources (scripts, images, XHR) are
+    aborted, so scrapers see exactly the saved markup.
+    """
+
+    def __init__(self, directory: Path = DEFAULT_DIR, mode: str = REPLAY, match: str = "*"):
+        self.mode = _check_mode(mode)
+        self.directory = Path(directory) / "html"
+        self.match = match
+        index_path = self.directory / "index.json"
+        self._index: Dict[str, str] = json.loads(index_path.read_text("utf-8")) if index_path.exists() else {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _name(url: str) -> str:
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()[:16] + ".html"
+
+    async def handle(self, route) -> None:
+        """``page.route("**/*", fixtures.handle)`` handler."""
+        request = route.request
+        is_document = request.resource_type == "document" and fnmatch(request.url, self.match)
+        path = self.directory / self._name(request.url)
+
+        if self.mode == REPLAY:
+            if is_document and path.exists():
+                self.hits += 1
+                await route.fulfill(status=200, content_type="text/html; charset=utf-8", body=path.read_text("utf-8"))
+            else:
+                if is_document:
+                    self.misses += 1
+                await route.abort("internetdisconnected")
+            return
+
+        if not is_document:
+            await route.continue_()
+            return
+        response = await route.fetch()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path.write_text(await response.text(), encoding="utf-8")
+        self._index[path.name] = request.url
+        await route.fulfill(response=response)
+
+    def save(self) -> None:
+        if self.mode == RECORD and self._index:
+            (self.directory / "index.json").write_text(json.dumps(self._index, indent=1, sort_keys=True), "utf-8")
+
+
+class FixtureBrowser:
+    """Browser proxy whose new pages and contexts route through ``HtmlFixtures``."""
+
+    def __init__(self, browser, fixtures: HtmlFixtures):
+        self._browser = browser
+        self._fixtures = fixtures
+
+    async def new_context(self, **kwargs):
+        context = await self._browser.new_context(**kwargs)
+        await context.route("**/*", self._fixtures.handle)
+        return context
+
+    async def new_page(self, **kwargs):
+        page = await self._browser.new_page(**kwargs)
+        await page.route("**/*", self._fixtures.handle)
+        return page
+
+    def __getattr__(self, name):
+        return getattr(self._browser, name)
@@ -0,0 +1,200 @@
+"""Generate the committed sample cassette from synthetic upstreams.
+
+``benchmarks/cassettes`` ships with a small sample so the integration
+benchmarks and their tests run offline on a fresh checkout. It is not real
+traffic: the ``ranking`` case is recorded (through the normal ``--record``
+path) against the deterministic fake TradeMe, eBay and Google Trends
+upstreams below, and the ``suppliers`` case gets generated 1688 search
+pages for the first results page of each keyword it searches. Payloads
+are shaped like the real APIs, so the timings cover the same parsing and
+ranking code, but absolute numbers say nothing about production data.
+
+Regenerate after changing what a case requests (from backend/):
+
+    python -m benchmarks.sample_cassettes
+
+Record real traffic instead with ``python -m benchmarks.integrations --record``.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from pathlib import Path
+from typing import List
+from urllib.parse import parse_qs, quote, urlsplit
+
+import httpx
+import pandas as pd
+
+from benchmarks.integrations import SUPPLIER_PRODUCTS, Upstreams, bench_ranking
+from benchmarks.replay import DEFAULT_DIR, RECORD, HtmlFixtures
+
+# Last week of the synthetic Trends series
+TRENDS_END = "2026-10-11"
+OFFERS_PER_PAGE = 12
+
+CATEGORIES = {
+    "Subcategories": [
+        {"Number": "0002-", "Name": "Computers", "Path": "/Computers", "Subcategories": [
+            {"Number": "0002-0356-", "Name": "Cables & adaptors", "Path": "/Computers/Cables-adaptors", "IsLeaf": True},
+        ]},
+        {"Number": "0005-", "Name": "Sports", "Path": "/Sports", "Subcategories": [
+            {"Number": "0005-0170-", "Name": "Cycling", "Path": "/Sports/Cycling", "IsLeaf": True},
+        ]},
+    ],
+}
+
+
+def _rng(*parts) -> random.Random:
+    # String seeds are hashed deterministically, unlike hash()
+    return random.Random("|".join(str(p) for p in parts))
+
+
+def fake_upstream(request: httpx.Request) -> httpx.Response:
+    """TradeMe and eBay responses derived from the request alone."""
+    url = urlsplit(str(request.url))
+    params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+    if url.path.endswith("/Categories.json"):
+        return httpx.Response(200, json=CATEGORIES)
+
+    if url.path.endswith("/Search/General.json"):
+        rng = _rng("trademe", params.get("search_string"), params.get("category"))
+        rows = int(params.get("rows", 10))
+        return httpx.Response(200, json={
+            "TotalCount": rng.randint(40, 4000),
+            "Page": int(params.get("page", 1)),
+            "PageSize": rows,
+            "List": [
+                {
+                    "ListingId": rng.randint(4_000_000_000, 4_999_999_999),
+                    "Title": f"{params.get('search_string', '')} #{i + 1}",
+                    "StartPrice": round(rng.uniform(5, 120), 2),
+                    "BuyNowPrice": round(rng.uniform(10, 150), 2) if rng.random() < 0.7 else None,
+                }
+                for i in range(rows)
+            ],
+        })
+
+    if url.path.endswith("/oauth2/token"):
+        return httpx.Response(200, json={"access_token": "sample", "expires_in": 7200, "token_type": "Application Access Token"})
+
+    if url.path.endswith("/item_summary/search"):
+        rng = _rng("ebay", params.get("q"))
+        limit = int(params.get("limit", 10))
+        return httpx.Response(200, json={
+            "total": rng.randint(100, 50000),
+            "limit": limit,
+            "offset": int(params.get("offset", 0)),
+            "itemSummaries": [
+                {
+                    "itemId": f"v1|{rng.randint(10**11, 10**12 - 1)}|0",
+                    "title": f"{params.get('q', '')} #{i + 1}",
+                    "price": {"value": f"{rng.uniform(5, 150):.2f}", "currency": "AUD"},
+                    "itemWebUrl": "https://www.ebay.com.au/itm/sample",
+                }
+                for i in range(limit)
+            ],
+        })
+
+    return httpx.Response(404, json={"error": f"no sample for {url.path}"})
+
+
+class FakeTrendReq:
+    """pytrends stand-in returning weekly interest for the payload's keywords."""
+
+    def __init__(self, **kwargs):
+        self._payload: dict = {}
+
+    def build_payload(self, **payload) -> None:
+        self._payload = payload
+
+    def interest_over_time(self) -> pd.DataFrame:
+        keywords = self._payload.get("kw_list", [])
+        weeks = 13 if "3-m" in self._payload.get("timeframe", "") else 52
+        index = pd.date_range(end=TRENDS_END, periods=weeks, freq="7D", name="date")
+        columns = {}
+        for keyword in keywords:
+            rng = _rng("trends", keyword)
+            level, slope = rng.uniform(20, 80), rng.uniform(-1.5, 1.5)
+            columns[keyword] = [max(0, min(100, round(level + slope * i + rng.uniform(-5, 5)))) for i in range(weeks)]
+        frame = pd.DataFrame(columns, index=index)
+        frame["isPartial"] = [False] * (weeks - 1) + [True]
+        return frame
+
+
+def search_page(keyword: str) -> str:
+    """A 1688 results page in the markup ``Alibaba1688Scraper`` parses."""
+    rng = _rng("1688", keyword)
+    items = []
+    for i in range(OFFERS_PER_PAGE):
+        offer_id = rng.randint(600_000_000_000, 799_999_999_999)
+        items.append(
+            f'<div class="sm-offer-item" data-offer-id="{offer_id}">'
+            f'<a href="https://detail.1688.com/offer/{offer_id}.html"><img src="//cbu01.alicdn.com/img/{offer_id}.jpg"></a>'
+            f'<div class="title-text">{keyword} 款式{i + 1}</div>'
+            f'<div class="price">¥{rng.uniform(3, 120):.2f}</div>'
+            f'<div class="sold">已售{rng.randint(0, 5000)}件</div>'
+            f'<div class="company-name">义乌样例{i % 4 + 1}号工厂</div>'
+            f'<div class="location">浙江 金华</div>'
+            "</div>"
+        )
+    return (
+        f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{keyword} - 阿里巴巴</title></head>"
+        f"<body><div class=\"sm-offer-list\">{''.join(items)}</div></body></html>"
+    )
+
+
+def supplier_keywords() -> List[str]:
+    """Keywords ``bench_suppliers`` searches live (top two per product)."""
+    from app.services.translation_cache import get_translation_cache
+
+    translations = get_translation_cache().get_many([p["title"] for p in SUPPLIER_PRODUCTS])
+    keywords = [kw for p in SUPPLIER_PRODUCTS for kw in translations[p["title"]]["chinese_keywords"][:2]]
+    return list(dict.fromkeys(keywords))
+
+
+def write_html(directory: Path) -> int:
+    """Save generated search pages under the URLs Chromium requests."""
+    from app.services.alibaba1688_service import Alibaba1688Scraper
+
+    fixtures = HtmlFixtures(directory, RECORD)
+    fixtures.directory.mkdir(parents=True, exist_ok=True)
+    scraper = Alibaba1688Scraper()
+    index = {}
+    for keyword in supplier_keywords():
+        # The browser percent-encodes the Chinese keyword before routing
+        url = quote(scraper.search_url(keyword, max_price=500), safe=":/?&=%")
+        name = fixtures._name(url)
+        (fixtures.directory / name).write_text(search_page(keyword), encoding="utf-8")
+        index[name] = url
+    (fixtures.directory / "index.json").write_text(json.dumps(index, indent=1, sort_keys=True), "utf-8")
+    return len(index)
+
+
+async def record(directory: Path) -> None:
+    up = Upstreams(
+        directory,
+        RECORD,
+        transport=httpx.MockTransport(fake_upstream),
+        trends_factory=lambda kwargs: FakeTrendReq(**kwargs),
+    )
+    try:
+        await bench_ranking(up)
+    finally:
+        await up.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cassettes", type=Path, default=DEFAULT_DIR, help="Cassette directory to write")
+    args = parser.parse_args()
+
+    asyncio.run(record(args.cassettes))
+    pages = write_html(args.cassettes)
+    print(f"Wrote sample cassette to {args.cassettes} ({pages} 1688 pages)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Benchmark keyword search over the suppliers_1688 cache.
+
+Two modes:
+
+- in-memory (default): simulates the GIN gram index from migration 005 with
+  sorted posting arrays and compares it with a full substring scan, the
+  equivalent of ``title ILIKE '%keyword%'``
+- ``--dsn``: times the ``search_suppliers_1688`` function on a real Postgres
+  with the migrations applied; ``--seed`` first inserts synthetic offers
+  (offer_id ``bench-*``, removed again with ``--cleanup``)
+
+Usage (from backend/):
+    python -m benchmarks.supplier_search --offers 1000000
+    python -m benchmarks.supplier_search --dsn postgresql://... --seed 1000000
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from app.services.supplier_search import cjk_grams
+
+KEYWORDS = [
+    "无线耳机", "蓝牙耳机", "充电宝", "手机壳", "数据线", "智能手表", "瑜伽垫",
+    "收纳盒", "保温杯", "宠物窝", "化妆刷", "遥控车", "毛绒玩具", "太阳镜",
+]
+FILLER = "新款 爆款 批发 厂家 直销 便携 迷你 加厚 防水 韩版 男女 儿童 户外 家用 大容量 高清".split()
+
+
+def make_titles(count: int, seed: int = 0) -> List[str]:
+    """Titles with one catalogue keyword, filler words and a random model name."""
+    rng = random.Random(seed)
+    chars = [chr(c) for c in range(0x4E00, 0x4E00 + 3000)]
+    return [
+        " ".join(
+            rng.sample(FILLER, 3) + [rng.choice(KEYWORDS)] + rng.sample(FILLER, 2)
+            + ["".join(rng.choices(chars, k=6))]
+        )
+        for _ in range(count)
+    ]
+
+
+def build_postings(titles: List[str]):
+    """Gram -> sorted array of title ids (what the GIN index holds)."""
+    vocab: Dict[str, int] = {}
+    gram_ids, doc_ids = [], []
+    for doc, title in enumerate(titles):
+        for gram in cjk_grams(title):
+            gram_ids.append(vocab.setdefault(gram, len(vocab)))
+            doc_ids.append(doc)
+    grams = np.asarray(gram_ids, dtype=np.int32)
+    docs = np.asarray(doc_ids, dtype=np.int32)
+    order = np.lexsort((docs, grams))
+    ptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(grams, minlength=len(vocab)), out=ptr[1:])
+    return vocab, ptr, docs[order]
+
+
+def indexed_search(vocab, ptr, docs, titles, keyword: str, limit: int = 20) -> List[int]:
+    lists = []
+    for gram in cjk_grams(keyword):
+        gid = vocab.get(gram)
+        if gid is None:
+            return []
+        lists.append(docs[ptr[gid]:ptr[gid + 1]])
+    lists.sort(key=len)
+    hits = lists[0]
+    for postings in lists[1:]:
+        hits = np.intersect1d(hits, postings, assume_unique=True)
+    # Rank a bounded candidate set like the SQL function does
+    candidates = hits[:5000]
+    ranked = sorted(candidates, key=lambda i: (keyword not in titles[i], len(titles[i])))
+    return ranked[:limit]
+
+
+def scan_search(titles: List[str], keyword: str, limit: int = 20) -> List[int]:
+    return [i for i, title in enumerate(titles) if keyword in title][:limit]
+
+
+def percentiles(samples: List[float]) -> str:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1] if len(samples) >= 20 else samples[-1]
+    return f"p50 {statistics.median(samples):7.2f} ms  p95 {p95:7.2f} ms"
+
+
+def run_in_memory(args):
+    titles = make_titles(args.offers)
+    start = time.perf_counter()
+    vocab, ptr, docs = build_postings(titles)
+    print(f"{len(titles):,} titles, {len(vocab):,} grams (index built in {time.perf_counter() - start:.1f}s)")
+
+    rng = random.Random(1)
+    queries = [rng.choice(KEYWORDS) for _ in range(args.queries)]
+    for label, func in (
+        ("indexed", lambda q: indexed_search(vocab, ptr, docs, titles, q)),
+        ("scan", lambda q: scan_search(titles, q)),
+    ):
+        timings = []
+        for q in queries[: args.queries if label == "indexed" else max(3, args.queries // 10)]:
+            t = time.perf_counter()
+            func(q)
+            timings.append((time.perf_counter() - t) * 1000)
+        print(f"  {label:<8} {percentiles(timings)}")
+
+
+def run_postgres(args):
+    import psycopg2
+    import psycopg2.extras
+
+    conn = psycopg2.connect(args.dsn)
+    conn.autocommit = True
+    cur = conn.cursor()
+
+    if args.seed:
+        titles = make_titles(args.seed)
+        rows = [
+            (f"bench-{i}", title, round(random.uniform(5, 300), 2), KEYWORDS[i % len(KEYWORDS)], i % 5000)
+            for i, title in enumerate(titles)
+        ]
+        start = time.perf_counter()
+        psycopg2.extras.execute_values(
+            cur,
+            "INSERT INTO suppliers_1688 (offer_id, title, price, search_keyword, sold_count) VALUES %s "
+            "ON CONFLICT (offer_id) DO NOTHING",
+            rows,
+            page_size=5000,
+        )
+        cur.execute("ANALYZE suppliers_1688")
+        print(f"Seeded {len(rows):,} offers in {time.perf_counter() - start:.1f}s")
+
+    cur.execute("SELECT count(*) FROM suppliers_1688")
+    print(f"suppliers_1688 rows: {cur.fetchone()[0]:,}")
+
+    rng = random.Random(1)
+    timings = []
+    for _ in range(args.queries):
+        keyword = rng.choice(KEYWORDS)
+        t = time.perf_counter()
+        cur.execute("SELECT * FROM search_suppliers_1688(%s, NULL, 20)", (keyword,))
+        cur.fetchall()
+        timings.append((time.perf_counter() - t) * 1000)
+    print(f"  rpc      {percentiles(timings)}")
+
+    if args.cleanup:
+        cur.execute("DELETE FROM suppliers_1688 WHERE offer_id LIKE 'bench-%'")
+        print(f"Removed {cur.rowcount:,} benchmark offers")
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--offers", type=int, default=200_000, help="In-memory titles")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dsn", help="Postgres DSN with migrations applied")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic offers to insert first")
+    parser.add_argument("--cleanup", action="store_true", help="Delete seeded offers afterwards")
+    args = parser.parse_args()
+
+    if args.dsn:
+        run_postgres(args)
+    else:
+        run_in_memory(args)
+
+
+if __name__ == "__main__":
+    main()
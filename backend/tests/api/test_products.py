@@ -3,7 +3,7 @@ Tests for the Products API endpoints.
 """
 
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 
 class TestProductSearch:
@@ -170,3 +170,30 @@ class TestProductById:
         response = client.get("/api/products/invalid-uuid")
 
         assert response.status_code == 422
+
+
+class TestFetchProducts:
+    """Test fetching products from eBay."""
+
+    def test_snapshot_keeps_ebay_total(self, client, mock_db, monkeypatch):
+        """Test that the platform snapshot records eBay's total, not the page length."""
+        from app.api.routes import products
+
+        page = {
+            "total_results": 48213,
+            "products": [{"platform_id": "1", "title": "Phone Case", "price": 12.5, "currency": "AUD"}],
+            "currency": "AUD",
+        }
+        service = MagicMock()
+        service.search_results = AsyncMock(return_value=page)
+        store = MagicMock()
+        monkeypatch.setattr(products, "EbayService", lambda: service)
+        monkeypatch.setattr(products, "get_platform_snapshot_store", lambda: store)
+        monkeypatch.setattr(products, "get_translation_cache", MagicMock)
+
+        response = client.post("/api/products/fetch?keyword=phone%20case&platform=ebay_au&limit=1")
+
+        assert response.status_code == 200
+        platform, market, keyword, result = store.record.call_args.args
+        assert (platform, market, keyword) == ("ebay", "AU", "phone case")
+        assert result["total_results"] == 48213
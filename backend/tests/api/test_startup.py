@@ -0,0 +1,75 @@
+"""
+Tests for API cold start: import cost and the app lifespan.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# Seconds to import app.main in a fresh interpreter (about 0.7s locally;
+# the margin is for slow CI machines, not for new eager imports)
+IMPORT_BUDGET_SECONDS = 3.0
+
+# Loaded on first use, never by importing the app
+LAZY_MODULES = ("pandas", "pytrends", "supabase", "playwright", "playwright_stealth")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "modules": sorted(m for m in sys.modules if "." not in m)}))
+"""
+
+
+def import_profile() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", PROBE],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestImportProfile:
+    """Test what importing app.main costs."""
+
+    def test_heavy_dependencies_stay_lazy(self):
+        """Test that the app imports within budget without the heavy dependencies."""
+        profile = import_profile()
+
+        assert not set(LAZY_MODULES) & set(profile["modules"])
+        assert profile["elapsed"] < IMPORT_BUDGET_SECONDS
+
+
+class TestLifespan:
+    """Test startup and shutdown of the shared services."""
+
+    def test_builds_and_releases_services(self, monkeypatch):
+        """Test that startup builds the ranking service and shutdown closes the registry."""
+        from app import main
+        from app.services import ranking_service
+
+        closed = []
+
+        async def close_registry():
+            closed.append("registry")
+
+        monkeypatch.setattr(ranking_service, "_ranking_service", None)
+        monkeypatch.setattr(main, "close_platform_registry", close_registry)
+        monkeypatch.setattr(main, "shutdown_trends_scheduler", lambda: closed.append("scheduler"))
+
+        with TestClient(main.app) as client:
+            assert ranking_service._ranking_service is not None
+            assert client.get("/health").status_code == 200
+            assert closed == []
+
+        assert closed == ["registry", "scheduler"]
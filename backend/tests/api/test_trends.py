@@ -0,0 +1,32 @@
+"""
+Tests for the Trends API endpoints.
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+
+class TestTrendAnalytics:
+    """Test the trend analytics endpoint."""
+
+    def test_missing_keywords_analyzed_from_fetch(self, client, monkeypatch):
+        """Test that freshly fetched keywords are analyzed without waiting for the store."""
+        from app.api.routes import trends
+
+        analytics = MagicMock()
+        analytics.analyze.return_value = {}
+        engine = MagicMock()
+        engine.fetch = AsyncMock(return_value={
+            "dates": ["2026-01-04", "2026-01-11", "2026-01-18", "2026-01-25"],
+            "series": {"phone case": [10, 20, 30, 40]},
+        })
+        monkeypatch.setattr(trends, "get_trends_analytics", lambda: analytics)
+        monkeypatch.setattr(trends, "get_trends_batch_engine", lambda: engine)
+
+        response = client.get("/api/trends/analytics?keywords=phone%20case&region=AU&window=3m")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["missing"] == []
+        assert body["analytics"]["phone case"]["direction"] == "up"
+        assert body["analytics"]["phone case"]["points"] == 4
+        analytics.analyze.assert_called_once_with(["phone case"], "AU", "3m")
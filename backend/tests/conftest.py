@@ -8,6 +8,15 @@ from fastapi.testclient import TestClient
 
 from app.main import app
 from app.database import get_db
+from app.services.resilience import reset_host_guards
+
+
+@pytest.fixture(autouse=True)
+def fresh_host_guards():
+    """Give every test its own circuit breakers and retry budgets."""
+    reset_host_guards()
+    yield
+    reset_host_guards()
 
 
 # Mock database client fixture
@@ -469,6 +469,196 @@ class TestAlibaba1688Scraper:
         assert scraper._browser is None
 
 
+def make_paged_scraper(monkeypatch, pages):
+    """Scraper whose result pages come from ``pages`` (one list of suppliers per page)."""
+    from app.services import alibaba1688_service
+
+    monkeypatch.setattr(alibaba1688_service, "PLAYWRIGHT_AVAILABLE", True)
+    monkeypatch.setattr(alibaba1688_service, "STEALTH_AVAILABLE", False)
+    scraper = Alibaba1688Scraper()
+    context = MagicMock()
+    context.new_page = AsyncMock(return_value=MagicMock(close=AsyncMock()))
+    context.close = AsyncMock()
+    scraper._get_browser = AsyncMock(return_value=MagicMock())
+    scraper.new_context = AsyncMock(return_value=context)
+    scraper.loaded = []
+
+    async def load(page, keyword, max_price, page_no):
+        scraper.loaded.append(page_no)
+        return True
+
+    async def extract(page, limit, source_price, source_currency):
+        return pages[scraper.loaded[-1] - 1] if scraper.loaded[-1] <= len(pages) else pages[-1]
+
+    scraper._load_search_page = load
+    scraper._extract_suppliers = extract
+    return scraper, context
+
+
+def offers(start, count, price=10.0):
+    return [
+        Supplier1688(offer_id=str(i), title=f"offer {i}", price=price, product_url="", supplier_name="s")
+        for i in range(start, start + count)
+    ]
+
+
+class TestPagination:
+    """Tests for page-by-page supplier search."""
+
+    def test_search_url_pages(self):
+        """Test that only later pages carry beginPage."""
+        scraper = Alibaba1688Scraper()
+        assert "beginPage" not in scraper.search_url("耳机", 100, 1)
+        assert "beginPage=3" in scraper.search_url("耳机", 100, 3)
+        assert "e_price=100" in scraper.search_url("耳机", 100, 3)
+
+    @pytest.mark.asyncio
+    async def test_stops_once_enough_pass_filters(self, monkeypatch):
+        """Test that a full first page saves the next navigation."""
+        scraper, context = make_paged_scraper(monkeypatch, [offers(0, 10), offers(10, 10)])
+        results = await scraper.search_suppliers("耳机", limit=5, max_pages=3)
+        assert len(results) == 5
+        assert scraper.loaded == [1]
+        context.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_ranks_the_whole_last_page(self, monkeypatch):
+        """Test that the best offers on a page win, not the first ``limit`` of it."""
+        page = offers(0, 10)
+        for i, supplier in enumerate(page):
+            supplier.match_score = float(i)
+        scraper, _ = make_paged_scraper(monkeypatch, [page, offers(10, 10)])
+        results = await scraper.search_suppliers("耳机", limit=3, max_pages=3)
+        assert [s.offer_id for s in results] == ["9", "8", "7"]
+        assert scraper.loaded == [1]
+
+    @pytest.mark.asyncio
+    async def test_walks_pages_when_filters_reject(self, monkeypatch):
+        """Test that pages are walked until enough candidates pass."""
+        pages = [offers(0, 4, price=900), offers(4, 4), offers(8, 4)]
+        scraper, _ = make_paged_scraper(monkeypatch, pages)
+        results = await scraper.search_suppliers("耳机", max_price=500, limit=6, max_pages=3)
+        assert scraper.loaded == [1, 2, 3]
+        assert len(results) == 6
+        assert all(s.price <= 500 for s in results)
+
+    @pytest.mark.asyncio
+    async def test_stops_on_repeated_page(self, monkeypatch):
+        """Test that a page with no new offers ends the walk."""
+        scraper, _ = make_paged_scraper(monkeypatch, [offers(0, 3)])
+        yielded = [s.offer_id async for s in scraper.iter_suppliers("耳机", max_pages=5)]
+        assert yielded == ["0", "1", "2"]
+        assert scraper.loaded == [1, 2]
+
+
+class TestOfferCapture:
+    """Tests for capturing offers from search API responses."""
+
+    def test_parse_json_and_jsonp(self):
+        """Test plain JSON and JSONP bodies."""
+        from app.services.alibaba1688_service import parse_json_body
+
+        assert parse_json_body('{"a": 1}') == {"a": 1}
+        assert parse_json_body('mtopjsonp3({"a": [1]});') == {"a": [1]}
+        assert parse_json_body("<html></html>") is None
+        assert parse_json_body("") is None
+
+    def test_find_offers_nested(self):
+        """Test offers found under offerList or as a list of offer-like dicts."""
+        from app.services.alibaba1688_service import find_offers
+
+        payload = {"data": {"data": {"offerList": [{"offerId": 1, "subject": "耳机"}]}}}
+        assert find_offers(payload) == [{"offerId": 1, "subject": "耳机"}]
+        items = [
+            {"id": 7, "title": "a", "price": "9.5", "detailUrl": "https://detail.1688.com/offer/7.html"},
+            {"offerId": 8, "subject": "b", "priceInfo": {"price": "3"}},
+        ]
+        payload = {"data": {"items": items, "meta": [1, 2]}}
+        assert [o.get("id") or o.get("offerId") for o in find_offers(payload)] == [7, 8]
+        assert find_offers({"data": [{"name": "not an offer"}]}) == []
+
+    def test_id_and_title_are_not_enough(self):
+        """Test that lists of non-offers with ids and titles (categories, ads) are ignored."""
+        from app.services.alibaba1688_service import find_offers
+
+        assert find_offers({"nav": [{"id": 1, "title": "女装"}, {"id": 2, "title": "男装"}]}) == []
+        assert find_offers({"ads": [{"id": 1, "title": "a", "price": 5, "url": "https://ad.1688.com/x"}]}) == []
+
+    def test_extract_offer_list_with_nested_arrays(self):
+        """Test that nested arrays don't truncate the embedded offer list."""
+        from app.services.alibaba1688_service import extract_offer_list
+
+        script = 'window.data = {"offerList": [{"offerId": 1, "tags": ["a", "b"]}, {"offerId": 2}], "x": 1};'
+        assert [o["offerId"] for o in extract_offer_list(script)] == [1, 2]
+        assert extract_offer_list("var x = 1;") == []
+
+    def test_candidate_responses(self):
+        """Test that only 1688 JSON/JSONP responses are read."""
+        from app.services.alibaba1688_service import OfferCapture
+
+        assert OfferCapture.is_candidate("https://h5api.m.1688.com/h5/mtop.x/1.0/", "script", "application/javascript")
+        assert OfferCapture.is_candidate("https://search.1688.com/service/x", "xhr", "application/json;charset=UTF-8")
+        assert not OfferCapture.is_candidate("https://cdn.example.com/a.json", "xhr", "application/json")
+        assert not OfferCapture.is_candidate("https://s.1688.com/img.png", "image", "image/png")
+        assert OfferCapture.is_candidate("https://1688.com/api", "fetch", "application/json")
+        assert not OfferCapture.is_candidate("https://x1688.com/api", "xhr", "application/json")
+        assert not OfferCapture.is_candidate("https://1688.com.evil.net/api", "xhr", "application/json")
+
+    @pytest.mark.asyncio
+    async def test_capture_dedupes_and_resets(self):
+        """Test offers accumulate per navigation without duplicates."""
+        from app.services.alibaba1688_service import OfferCapture
+
+        capture = OfferCapture()
+        assert capture.add_payload({"offerList": [{"offerId": 1}, {"offerId": 1}, {"offerId": 2}]}) == 2
+        assert len(await capture.offers()) == 2
+        capture.reset()
+        assert await capture.offers() == []
+
+    @pytest.mark.asyncio
+    async def test_reset_drops_pending_reads(self):
+        """Test that a response from the previous page can't land after reset."""
+        import asyncio
+
+        from app.services.alibaba1688_service import OfferCapture
+
+        release = asyncio.Event()
+
+        class SlowResponse:
+            url = "https://h5api.m.1688.com/h5/mtop.search/1.0/"
+            headers = {"content-type": "application/json"}
+            request = type("Request", (), {"resource_type": "xhr"})()
+
+            async def text(self):
+                await release.wait()
+                return '{"offerList": [{"offerId": 1}]}'
+
+        capture = OfferCapture()
+        capture._on_response(SlowResponse())
+        capture.reset()
+        release.set()
+        await asyncio.sleep(0)
+        assert await capture.offers() == []
+
+    @pytest.mark.asyncio
+    async def test_search_prefers_captured_offers(self, monkeypatch):
+        """Test that captured offers skip DOM parsing."""
+        from app.services import alibaba1688_service
+
+        scraper, _ = make_paged_scraper(monkeypatch, [[]])
+
+        async def no_dom(*args):
+            raise AssertionError("DOM parsed despite captured offers")
+
+        async def captured(self):
+            return [{"offerId": str(i), "subject": f"耳机 {i}", "price": "12.5"} for i in range(5)]
+
+        scraper._extract_suppliers = no_dom
+        monkeypatch.setattr(alibaba1688_service.OfferCapture, "offers", captured)
+        results = await scraper.search_suppliers("耳机", limit=3, max_pages=1)
+        assert len(results) == 3 and results[0].price == 12.5
+
+
 class TestMatchSuppliersForProducts:
     """Tests for the main matching function."""
 
@@ -0,0 +1,72 @@
+"""Unit tests for the keyword translation index."""
+
+import json
+
+from app.services.alibaba1688_service import NOISE_WORDS, PRODUCT_KEYWORD_MAP, extract_keywords
+from app.services.keyword_index import KeywordIndex, load_keyword_map
+
+
+MAPPING = {
+    "wireless earbuds": ["无线耳机"],
+    "earbuds": ["耳机"],
+    "phone case": ["手机壳"],
+    "iphone phone case": ["苹果手机壳"],
+    "ring": ["戒指"],
+}
+
+
+class TestLoadKeywordMap:
+    """Tests for loading the data file."""
+
+    def test_bundled_map_loads(self):
+        """Test that the bundled map is flattened from categories."""
+        assert PRODUCT_KEYWORD_MAP["wireless earbuds"][0] == "无线耳机"
+        assert "Electronics" not in PRODUCT_KEYWORD_MAP
+
+    def test_flat_file_and_normalisation(self, tmp_path):
+        """Test flat files and phrase normalisation."""
+        path = tmp_path / "map.json"
+        path.write_text(json.dumps({"  Yoga   Mat ": ["瑜伽垫"]}), encoding="utf-8")
+        assert load_keyword_map(path) == {"yoga mat": ["瑜伽垫"]}
+
+
+class TestKeywordIndex:
+    """Tests for trie and fragment lookups."""
+
+    def test_find_phrases(self):
+        """Test that every phrase in a token run is found, left to right."""
+        index = KeywordIndex(MAPPING)
+        tokens = "black iphone phone case wireless earbuds".split()
+        assert list(index.find_phrases(tokens)) == [
+            "iphone phone case", "phone case", "wireless earbuds", "earbuds",
+        ]
+        assert list(index.find_phrases(tokens, min_tokens=2)) == [
+            "iphone phone case", "phone case", "wireless earbuds",
+        ]
+
+    def test_best_match_prefers_file_order(self):
+        """Test that the earliest listed phrase wins."""
+        index = KeywordIndex(MAPPING)
+        assert index.best_match("cheap wireless earbuds") == "wireless earbuds"
+        assert index.best_match("wireless") == "wireless earbuds"
+        assert index.best_match("case") == "phone case"
+
+    def test_best_match_is_word_based(self):
+        """Test that phrases only match whole words."""
+        index = KeywordIndex(MAPPING)
+        assert index.best_match("string lights") is None
+        assert index.best_match("") is None
+
+
+class TestExtractWithIndex:
+    """Tests for phrase detection in titles."""
+
+    def test_detects_map_phrases(self):
+        """Test that known two-word phrases are returned first."""
+        keywords = extract_keywords("Genuine Waterproof Yoga Mat for Home")
+        assert keywords[0] == "yoga mat"
+        assert "yoga" not in keywords
+
+    def test_noise_words_are_frozen(self):
+        """Test that the noise word set cannot be mutated."""
+        assert isinstance(NOISE_WORDS, frozenset)
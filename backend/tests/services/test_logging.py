@@ -0,0 +1,103 @@
+"""Unit tests for queued, sampled application logging."""
+
+import io
+import json
+import logging
+import queue
+
+import pytest
+
+from app.log import SAMPLED, NonBlockingQueueHandler, get_logger, setup_logging, shutdown_logging
+from app.services.tracing import current_trace_id, start_trace
+
+
+@pytest.fixture
+def stream():
+    """Log output captured as JSON lines; the handler is detached afterwards."""
+    out = io.StringIO()
+    setup_logging(level="DEBUG", fmt="json", stream=out, sample_every=3)
+    yield out
+    shutdown_logging()
+
+
+def read_lines(out: io.StringIO) -> list:
+    shutdown_logging()  # drains the queue
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+class TestJsonOutput:
+    """Tests for the JSON line format."""
+
+    def test_fields_and_extras(self, stream):
+        """Test that level, logger, message and extra fields are written."""
+        get_logger("app.services.example").warning("Failed %d of %s", 2, "offers", extra={"offer_id": "42"})
+
+        (entry,) = read_lines(stream)
+        assert entry["level"] == "warning"
+        assert entry["logger"] == "app.services.example"
+        assert entry["msg"] == "Failed 2 of offers"
+        assert entry["offer_id"] == "42"
+
+    def test_trace_id_from_caller(self, stream):
+        """Test that the request's trace id is captured before the record is queued."""
+        with start_trace("GET /test"):
+            trace_id = current_trace_id()
+            get_logger(__name__).info("inside")
+        get_logger(__name__).info("outside")
+
+        inside, outside = read_lines(stream)
+        assert inside["trace_id"] == trace_id
+        assert "trace_id" not in outside
+
+    def test_exception_text(self, stream):
+        """Test that tracebacks are rendered in the caller and written as ``exc``."""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            get_logger(__name__).exception("Report generation failed")
+
+        (entry,) = read_lines(stream)
+        assert "ValueError: boom" in entry["exc"]
+
+
+class TestSampling:
+    """Tests for per-item line sampling."""
+
+    def test_keeps_first_and_every_nth(self, stream):
+        """Test that sampled lines are thinned per call site and others are not."""
+        logger = get_logger(__name__)
+        for i in range(7):
+            logger.debug("item %d", i, extra=SAMPLED)
+        logger.debug("summary")
+
+        messages = [entry["msg"] for entry in read_lines(stream)]
+        assert messages == ["item 0", "item 3", "item 6", "summary"]
+
+
+class TestQueue:
+    """Tests for the non-blocking queue handler."""
+
+    def test_drops_when_full(self):
+        """Test that a full queue drops and counts records instead of blocking."""
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=2))
+        logger = logging.getLogger("app.tests.queue")
+        logger.addHandler(handler)
+        logger.propagate = False
+        try:
+            for i in range(5):
+                logger.warning("line %d", i)
+        finally:
+            logger.removeHandler(handler)
+            logger.propagate = True
+
+        assert handler.queue.qsize() == 2
+        assert handler.dropped == 3
+        assert handler.queue.get_nowait().getMessage() == "line 0"
+
+    def test_below_level_is_not_queued(self, stream):
+        """Test that debug lines cost nothing at the default level."""
+        setup_logging(level="INFO", fmt="json", stream=stream)
+        get_logger(__name__).debug("skipped")
+        get_logger(__name__).info("kept")
+
+        assert [entry["msg"] for entry in read_lines(stream)] == ["kept"]
@@ -0,0 +1,209 @@
+"""Unit tests for platform adapters and the registry."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.platform_registry import PlatformRegistry
+from app.services.platforms import PlatformAdapter, PlatformResult
+
+
+class FakeAdapter(PlatformAdapter):
+    """Adapter answering from a dict of keyword -> total."""
+
+    def __init__(self, name, totals, markets=("AU", "NZ"), delay=0.0, available=True, **kwargs):
+        self.name = name
+        self.markets = frozenset(markets)
+        super().__init__(**kwargs)
+        self.totals = totals
+        self.delay = delay
+        self.available = available
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+
+    def is_available(self):
+        return self.available
+
+    async def _answer(self, method, keyword, market):
+        self.calls.append((method, keyword, market))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.totals.get(keyword) is None:
+                raise RuntimeError("blocked")
+            return self.result(market, keyword, {"total_results": self.totals[keyword], "price_stats": {"avg": 20.0}})
+        finally:
+            self.active -= 1
+
+    async def search(self, keyword, market, limit=50):
+        return await self._answer("search", keyword, market)
+
+    async def probe(self, keyword, market):
+        return await self._answer("probe", keyword, market)
+
+
+def make_snapshots(found=None):
+    snapshots = MagicMock()
+    snapshots.latest.side_effect = lambda name, market, keywords: (found or {}).get(name, {})
+    return snapshots
+
+
+class TestPlatformResult:
+    """Tests for result normalisation."""
+
+    def test_from_list(self):
+        """Test that a bare product list is counted and priced."""
+        result = PlatformResult.from_data("ebay", "AU", "drone", [{"price": 10.0}, {"price": 30.0}, {"price": None}])
+        assert result.total_results == 3
+        assert result.price_stats["avg"] == 20.0
+        assert result.ok and not result.total_known
+
+    def test_from_none(self):
+        """Test that a missing payload becomes an error result."""
+        assert not PlatformResult.from_data("ebay", "AU", "drone", None).ok
+
+    def test_slotted(self):
+        """Test that results don't carry a per-instance dict."""
+        result = PlatformResult("ebay", "AU", "drone")
+        assert not hasattr(result, "__dict__")
+        with pytest.raises(AttributeError):
+            result.extra = 1
+
+    def test_stats(self):
+        """Test the ranking stats entry, with staleness only for snapshots."""
+        live = PlatformResult("trademe", "NZ", "drone", total_results=5, price_stats={"avg": 9.0}, category={"path": "Toys"})
+        snap = PlatformResult("trademe", "NZ", "drone", total_results=5, source="snapshot", stale=True, fetched_at="2026-01-01")
+        assert live.stats() == {"listings": 5, "price_range": {"avg": 9.0}, "category": {"path": "Toys"}}
+        assert snap.stats()["stale"] is True
+        assert snap.stats()["fetched_at"] == "2026-01-01"
+
+
+class TestPlatformRegistry:
+    """Tests for fan-out, limits and snapshot fallback."""
+
+    @pytest.mark.asyncio
+    async def test_fans_out_over_market_adapters(self):
+        """Test that only adapters serving the market are called, in probe mode by default."""
+        trademe = FakeAdapter("trademe", {"drone": 900}, markets=("NZ",))
+        ebay = FakeAdapter("ebay", {"drone": 40})
+        snapshots = make_snapshots()
+        registry = PlatformRegistry([trademe, ebay], snapshots=snapshots)
+
+        data = await registry.collect(["drone"], "AU")
+        assert set(data["drone"]) == {"ebay"}
+        assert ebay.calls == [("probe", "drone", "AU")]
+        assert trademe.calls == []
+
+        data = await registry.collect(["drone"], "NZ", mode="search")
+        assert data["drone"]["trademe"].total_results == 900
+        assert trademe.calls == [("search", "drone", "NZ")]
+        rows = snapshots.record_many.call_args.args[0]
+        assert sorted((r["platform"], r["market"]) for r in rows) == [("ebay", "NZ"), ("trademe", "NZ")]
+
+    @pytest.mark.asyncio
+    async def test_snapshot_fallback(self):
+        """Test that failed or unavailable platforms fall back to snapshots."""
+        trademe = FakeAdapter("trademe", {}, markets=("NZ",), available=False)
+        ebay = FakeAdapter("ebay", {"kayak": 12})
+        snapshots = make_snapshots({
+            "trademe": {"drone": {"total_results": 77, "price_stats": {}, "stale": True}},
+            "ebay": {"drone": {"total_results": 5, "price_stats": {}}, "kayak": {"total_results": 1}},
+        })
+        registry = PlatformRegistry([trademe, ebay], snapshots=snapshots)
+
+        data = await registry.collect(["drone", "kayak"], "NZ")
+        assert trademe.calls == []
+        assert data["drone"]["trademe"].source == "snapshot"
+        assert data["drone"]["trademe"].stale is True
+        assert data["drone"]["ebay"].total_results == 5  # live call failed
+        assert data["kayak"]["ebay"].total_results == 12  # live result wins
+        assert data["kayak"]["ebay"].source == "api"
+        assert "trademe" not in data["kayak"]
+        # one snapshot query per platform, covering every keyword
+        assert sorted(c.args for c in snapshots.latest.call_args_list) == [
+            ("ebay", "NZ", ["drone", "kayak"]), ("trademe", "NZ", ["drone", "kayak"]),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_page_counts_not_recorded(self):
+        """Test that a result counted from its own page is returned but not saved as a snapshot."""
+        ebay = FakeAdapter("ebay", {})
+
+        async def search(keyword, market, limit=50):
+            return ebay.result(market, keyword, [{"price": 10.0}, {"price": 20.0}])
+
+        ebay.search = search
+        snapshots = make_snapshots()
+        registry = PlatformRegistry([ebay], snapshots=snapshots)
+
+        data = await registry.collect(["drone"], "AU", mode="search")
+        assert data["drone"]["ebay"].total_results == 2
+        snapshots.record_many.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self):
+        """Test that an adapter never runs more calls than its limit."""
+        ebay = FakeAdapter("ebay", {f"kw{i}": i for i in range(8)}, delay=0.01, concurrency=2)
+        registry = PlatformRegistry([ebay], snapshots=make_snapshots())
+        data = await registry.collect([f"kw{i}" for i in range(8)], "AU")
+        assert len(data) == 8
+        assert ebay.peak == 2
+
+    @pytest.mark.asyncio
+    async def test_timeout_becomes_error(self):
+        """Test that a slow adapter times out without failing the others."""
+        slow = FakeAdapter("temu", {"drone": 1}, delay=1.0, timeout=0.01)
+        fast = FakeAdapter("ebay", {"drone": 2})
+        registry = PlatformRegistry([slow, fast], snapshots=make_snapshots())
+
+        result = await registry.call(slow, "probe", "drone", "AU")
+        assert "timed out" in result.error
+        data = await registry.collect(["drone"], "AU")
+        assert set(data["drone"]) == {"ebay"}
+
+    def test_enabled_from_config(self, monkeypatch):
+        """Test that settings choose the adapters."""
+        from app.services import platform_registry
+
+        monkeypatch.setattr(platform_registry.settings, "platform_adapters", ["ebay", "temu", "unknown"])
+        registry = PlatformRegistry(snapshots=make_snapshots())
+        assert registry.names() == ["ebay", "temu"]
+        assert registry.get("temu").timeout == platform_registry.settings.platform_timeouts["temu"]
+
+
+class TestGenericScoring:
+    """Tests for ranking over arbitrary platforms."""
+
+    def test_new_platform_scores_without_code_changes(self):
+        """Test that any adapter's results feed demand, price and competition."""
+        from app.services.ranking_service import RankingService
+
+        service = RankingService.__new__(RankingService)
+        service.platforms = PlatformRegistry([FakeAdapter("ebay", {}), FakeAdapter("kogan", {})], snapshots=make_snapshots())
+        service.platforms.get("kogan").demand_scale = 10.0
+        platform_data = {
+            "ebay": PlatformResult("ebay", "AU", "drone", total_results=2500, price_stats={"avg": 30.0}),
+            "kogan": PlatformResult("kogan", "AU", "drone", total_results=500, price_stats={"avg": 50.0}),
+        }
+        score = service._calculate_category_score("drone", platform_data, {}, {"avg_price": 40.0}, "AU")
+        assert score["scores"]["demand"] == 37.5  # (25 + 50) / 2
+        assert score["platform_stats"]["kogan"]["listings"] == 500
+        assert score["profit_analysis"]["market_price_local"] == 40.0
+        assert score["scores"]["competition"] == 80  # 3000 listings
+
+    def test_profit_weighted_by_supplier_relevance(self):
+        """Test that costs from loosely similar titles pull the profit score toward neutral."""
+        from app.services.ranking_service import RankingService
+
+        service = RankingService.__new__(RankingService)
+        service.platforms = PlatformRegistry([FakeAdapter("ebay", {})], snapshots=make_snapshots())
+        platform_data = {"ebay": PlatformResult("ebay", "AU", "drone", total_results=100, price_stats={"avg": 40.0})}
+
+        exact = service._calculate_category_score("drone", platform_data, {}, {"avg_price": 40.0, "relevance": 1.0}, "AU")
+        similar = service._calculate_category_score("drone", platform_data, {}, {"avg_price": 40.0, "relevance": 0.5}, "AU")
+        assert exact["scores"]["profit"] == 100
+        assert similar["scores"]["profit"] == 75
+        assert similar["profit_analysis"] == exact["profit_analysis"]
@@ -0,0 +1,103 @@
+"""Unit tests for the platform snapshot store."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+from app.services.platform_snapshots import PlatformSnapshotStore, row_to_result, snapshot_row
+
+NOW = datetime(2026, 1, 10, tzinfo=timezone.utc)
+
+
+def make_db(rows=None):
+    db = MagicMock()
+    table = db.table.return_value
+    for method in ("select", "eq", "in_", "upsert"):
+        getattr(table, method).return_value = table
+    table.execute.return_value.data = rows or []
+    return db
+
+
+def hours_ago(hours):
+    return (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
+
+
+class TestSnapshotRows:
+    """Tests for row conversion."""
+
+    def test_row_from_live_result(self):
+        """Test that keywords normalise and the median comes from products."""
+        row = snapshot_row("trademe", "NZ", "  Yoga  Mat", {
+            "total_results": 1165,
+            "products": [{"price": 20.0}, {"price": 40.0}, {"price": None}, {"price": 30.0}],
+            "price_stats": {"min": 20.0, "max": 40.0, "avg": 30.0},
+            "category": {"number": "0004-", "path": "Sports/Fitness"},
+            "currency": "NZD",
+        })
+        assert row["keyword"] == "yoga mat"
+        assert row["median_price"] == 30.0
+        assert row["category"] == "Sports/Fitness"
+        assert (row["platform"], row["market"], row["source"]) == ("trademe", "NZ", "api")
+
+    def test_stats_derived_from_products(self):
+        """Test that results without price_stats get them from products."""
+        row = snapshot_row("ebay", "AU", "backpack", {"total_results": 2, "products": [{"price": 10}, {"price": 30}]})
+        assert (row["min_price"], row["max_price"], row["avg_price"]) == (10, 30, 20)
+
+    def test_stale_flag(self):
+        """Test that snapshots past max age are flagged stale."""
+        fresh = row_to_result({"total_results": 5, "fetched_at": (NOW - timedelta(hours=1)).isoformat()}, 24, NOW)
+        old = row_to_result({"total_results": 5, "fetched_at": "2025-01-01T00:00:00+00:00"}, 24, NOW)
+        assert fresh["stale"] is False
+        assert old["stale"] is True
+        assert old["price_stats"]["median"] is None
+
+
+class TestSnapshotStore:
+    """Tests for reading and writing snapshots."""
+
+    def test_latest_is_one_query(self):
+        """Test that all keywords are read with a single IN query and mapped back."""
+        db = make_db([
+            {"keyword": "led strip light", "total_results": 5200, "avg_price": 30, "fetched_at": hours_ago(1)},
+            {"keyword": "yoga mat", "total_results": 1165, "avg_price": 35, "fetched_at": hours_ago(500)},
+        ])
+        store = PlatformSnapshotStore(db=db, max_age_hours=168, drop_after_hours=0)
+
+        snapshots = store.latest("trademe", "NZ", ["LED strip light", "yoga mat", "power bank"])
+        db.table.return_value.in_.assert_called_once_with("keyword", ["led strip light", "yoga mat", "power bank"])
+        assert db.table.return_value.execute.call_count == 1
+        assert snapshots["LED strip light"]["total_results"] == 5200
+        assert snapshots["LED strip light"]["stale"] is False
+        assert snapshots["yoga mat"]["stale"] is True
+        assert "power bank" not in snapshots
+
+    def test_drop_after(self):
+        """Test that snapshots beyond the drop limit are ignored."""
+        db = make_db([{"keyword": "yoga mat", "total_results": 1165, "fetched_at": hours_ago(500)}])
+        store = PlatformSnapshotStore(db=db, max_age_hours=24, drop_after_hours=240)
+        assert store.latest("trademe", "NZ", ["yoga mat"]) == {}
+
+    def test_record_skips_failed_results(self):
+        """Test that error results and missing counts aren't saved."""
+        db = make_db()
+        store = PlatformSnapshotStore(db=db)
+        assert store.record("amazon", "AU", "backpack", {"total_results": 0, "error": "blocked"}) == 0
+        assert store.record("amazon", "AU", "backpack", None) == 0
+        assert store.record("amazon", "AU", "backpack", {"total_results": 12}, "scraper") == 1
+        saved = db.table.return_value.upsert.call_args
+        assert saved.kwargs["on_conflict"] == "platform,market,keyword"
+        assert saved.args[0][0]["source"] == "scraper"
+
+    def test_record_many_dedupes(self):
+        """Test that one upsert never carries the same key twice."""
+        db = make_db()
+        store = PlatformSnapshotStore(db=db)
+        rows = [snapshot_row("ebay", "NZ", kw, {"total_results": n}) for kw, n in (("Yoga mat", 1), ("yoga mat", 2))]
+        assert store.record_many(rows) == 1
+        assert db.table.return_value.upsert.call_args.args[0][0]["total_results"] == 2
+
+    def test_without_database(self):
+        """Test that an unconfigured database reads and writes nothing."""
+        store = PlatformSnapshotStore(db=False)
+        assert store.latest("trademe", "NZ", ["yoga mat"]) == {}
+        assert store.record("trademe", "NZ", "yoga mat", {"total_results": 3}) == 0
@@ -0,0 +1,99 @@
+"""Unit tests for count-only platform probes."""
+
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+
+from app.services.ebay_service import EbayService
+from app.services.platforms import probe_result, probe_sample_size
+from app.services.trademe_api_service import TradeMeAPIService
+
+
+class TestProbeResult:
+    """Tests for the shared probe payload."""
+
+    def test_stats_over_sample(self):
+        """Test that empty prices are skipped and the median is computed."""
+        result = probe_result(20648, [30.0, None, 10.0, 0, 20.0, 40.0], "NZD")
+        assert result["total_results"] == 20648
+        assert result["price_stats"] == {"min": 10.0, "max": 40.0, "avg": 25.0, "median": 25.0}
+        assert result["sample_size"] == 4
+        assert result["products"] == []
+        assert result["probe"] is True
+
+    def test_empty_sample(self):
+        """Test a count with no usable prices."""
+        result = probe_result(3, [])
+        assert result["price_stats"] == {"min": 0, "max": 0, "avg": 0, "median": 0}
+
+    def test_sample_size_floor(self, monkeypatch):
+        """Test that the sample size never drops below one listing."""
+        from app.services import platforms
+
+        monkeypatch.setattr(platforms.settings, "platform_probe_sample_size", 0)
+        assert probe_sample_size() == 1
+        assert probe_sample_size(25) == 25
+
+
+class TestTradeMeProbe:
+    """Tests for the TradeMe probe."""
+
+    @pytest.mark.asyncio
+    async def test_reads_total_and_small_page(self):
+        """Test that the probe requests a small page and returns TotalCount."""
+        requests = []
+
+        def handler(request):
+            requests.append(dict(request.url.params))
+            return httpx.Response(200, json={
+                "TotalCount": 1165,
+                "List": [{"BuyNowPrice": 30}, {"StartPrice": 10}, {}],
+            })
+
+        service = TradeMeAPIService(sandbox=True, transport=httpx.MockTransport(handler))
+        service.consumer_key = "key"
+        result = await service.probe("yoga mat", category="0004-", sample_size=3)
+        await service.close()
+
+        assert requests[0]["rows"] == "3"
+        assert requests[0]["category"] == "0004-"
+        assert result["total_results"] == 1165
+        assert result["price_stats"]["avg"] == 20.0
+        assert result["currency"] == "NZD"
+
+
+class TestEbayProbe:
+    """Tests for the eBay probe."""
+
+    @pytest.mark.asyncio
+    async def test_uses_total_not_page_length(self):
+        """Test that eBay's ``total`` is reported rather than the sample length."""
+        service = EbayService()
+        service._browse_search = AsyncMock(return_value={
+            "total": 48213,
+            "itemSummaries": [
+                {"price": {"value": "12.50", "currency": "AUD"}},
+                {"price": {"value": "17.50", "currency": "AUD"}},
+            ],
+        })
+        result = await service.probe("phone case", "AU", sample_size=2)
+
+        service._browse_search.assert_awaited_once_with("phone case", "AU", limit=2)
+        assert result["total_results"] == 48213
+        assert result["price_stats"]["avg"] == 15.0
+        assert result["currency"] == "AUD"
+
+    @pytest.mark.asyncio
+    async def test_search_results_carry_total(self):
+        """Test that a full search page keeps the API's total next to the products."""
+        service = EbayService()
+        service._browse_search = AsyncMock(return_value={
+            "total": 48213,
+            "itemSummaries": [{"itemId": "1", "title": "Case", "price": {"value": "12.50", "currency": "AUD"}}],
+        })
+        result = await service.search_results("phone case", "AU", limit=1)
+
+        assert result["total_results"] == 48213
+        assert [p["platform_id"] for p in result["products"]] == ["1"]
+        assert await service.search_products("phone case", "AU", limit=1) == result["products"]
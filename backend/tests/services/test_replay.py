@@ -0,0 +1,129 @@
+"""Unit tests for the record/replay harness used by the integration benchmarks."""
+
+import json
+
+import httpx
+import pandas as pd
+import pytest
+
+from benchmarks.integrations import compare, run
+from benchmarks.replay import (
+    DEFAULT_DIR,
+    RECORD,
+    REPLAY,
+    CassetteMiss,
+    HtmlFixtures,
+    ReplayTransport,
+    ReplayTrends,
+    request_key,
+)
+
+
+class TestReplayTransport:
+    """Tests for httpx record/replay."""
+
+    @pytest.mark.asyncio
+    async def test_record_then_replay(self, tmp_path):
+        """Test that recorded responses replay offline, keyed independently of query order."""
+        def upstream(request):
+            return httpx.Response(200, json={"access_token": "secret", "q": request.url.params["q"]})
+
+        recorder = ReplayTransport(tmp_path, RECORD, transport=httpx.MockTransport(upstream))
+        async with httpx.AsyncClient(transport=recorder) as client:
+            await client.get("https://api.example.com/search", params={"q": "mat", "rows": 1})
+        await recorder.aclose()
+
+        player = ReplayTransport(tmp_path, REPLAY)
+        async with httpx.AsyncClient(transport=player) as client:
+            response = await client.get("https://api.example.com/search", params={"rows": 1, "q": "mat"})
+            assert response.json() == {"access_token": "REDACTED", "q": "mat"}
+            with pytest.raises(CassetteMiss):
+                await client.get("https://api.example.com/search", params={"q": "other"})
+        assert (player.cassette.hits, player.cassette.misses) == (1, 1)
+
+    def test_post_bodies_are_part_of_the_key(self):
+        """Test that different POST bodies don't share a recording."""
+        first = httpx.Request("POST", "https://api.example.com/token", data={"scope": "a"})
+        second = httpx.Request("POST", "https://api.example.com/token", data={"scope": "b"})
+        assert request_key(first) != request_key(second)
+
+
+class TestReplayTrends:
+    """Tests for pytrends record/replay."""
+
+    def test_frames_round_trip(self, tmp_path):
+        """Test that interest_over_time frames come back with their datetime index."""
+        frame = pd.DataFrame(
+            {"yoga mat": [40, 55], "isPartial": [False, True]},
+            index=pd.DatetimeIndex(["2026-01-04", "2026-01-11"], name="date"),
+        )
+
+        class FakeTrendReq:
+            def __init__(self, **kwargs):
+                self.payload = None
+
+            def build_payload(self, **payload):
+                self.payload = payload
+
+            def interest_over_time(self):
+                return frame
+
+        recorder = ReplayTrends(tmp_path, RECORD, factory=lambda kwargs: FakeTrendReq(**kwargs))
+        client = recorder({"hl": "en-NZ", "tz": 720, "timeout": (3, 5)})
+        client.build_payload(kw_list=["yoga mat"], timeframe="today 3-m", geo="NZ")
+        client.interest_over_time()
+        recorder.save()
+
+        player = ReplayTrends(tmp_path, REPLAY, factory=lambda kwargs: pytest.fail("replay must not build a client"))
+        client = player({"hl": "en-NZ", "tz": 720, "timeout": (3, 5)})
+        client.build_payload(kw_list=["yoga mat"], timeframe="today 3-m", geo="NZ")
+        replayed = client.interest_over_time()
+        pd.testing.assert_frame_equal(replayed, frame, check_freq=False)
+
+        client.build_payload(kw_list=["yoga mat"], timeframe="today 12-m", geo="NZ")
+        with pytest.raises(CassetteMiss):
+            client.interest_over_time()
+
+
+class TestCompare:
+    """Tests for baseline comparison."""
+
+    def test_flags_slow_medians_only(self):
+        """Test that only slowdowns beyond the tolerance are reported."""
+        baseline = {"ranking": {"median": 0.100}, "suppliers": {"median": 0.200}}
+        results = {"ranking": {"median": 0.119}, "suppliers": {"median": 0.300}, "report": {"median": 1.0}}
+        assert compare(results, baseline, tolerance=0.2) == ["suppliers: 200.0 ms -> 300.0 ms"]
+
+    def test_rejects_cases_with_misses(self):
+        """Test that a fast median made of cassette misses doesn't pass."""
+        baseline = {"ranking": {"median": 0.100}, "suppliers": {"median": 0.200, "misses": 2}}
+        results = {"ranking": {"median": 0.030, "misses": 33}, "suppliers": {"median": 0.200}}
+        assert compare(results, baseline, tolerance=0.2) == [
+            "ranking: 33 cassette misses in this run",
+            "suppliers: 2 cassette misses in baseline",
+        ]
+
+
+class TestSampleCassette:
+    """Tests for the committed offline cassette."""
+
+    @pytest.mark.asyncio
+    async def test_ranking_replays_without_misses(self):
+        """Test that the ranking case is fully covered by the sample."""
+        results = await run(["ranking"], DEFAULT_DIR, REPLAY, repeat=1, warmup=0)
+        assert "misses" not in results["ranking"]
+
+    @pytest.mark.asyncio
+    async def test_empty_cassette_reports_misses(self, tmp_path):
+        """Test that an unrecorded case carries its miss count."""
+        results = await run(["ranking"], tmp_path, REPLAY, repeat=1, warmup=0)
+        assert results["ranking"]["misses"] > 0
+
+    def test_html_index_matches_files(self):
+        """Test that every saved 1688 page is indexed under its URL's name."""
+        fixtures = HtmlFixtures(DEFAULT_DIR, REPLAY)
+        index = json.loads((fixtures.directory / "index.json").read_text("utf-8"))
+        assert index
+        for name, url in index.items():
+            assert name == fixtures._name(url)
+            assert (fixtures.directory / name).exists()
@@ -0,0 +1,293 @@
+"""Unit tests for the shared resilience layer."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceeded,
+    HostGuard,
+    RetryableError,
+    RetryBudget,
+    ServerError,
+    deadline,
+    get_host_guard,
+    raise_for_retryable_status,
+    remaining,
+    resilience_stats,
+)
+
+
+def no_backoff(attempt, error):
+    return 0.0
+
+
+class TestCircuitBreaker:
+    """Tests for breaker state transitions."""
+
+    def test_opens_after_threshold(self):
+        """Test that consecutive failures open the circuit and a success resets the count."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=lambda: 0.0)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+        assert breaker.trips == 1
+
+    def test_half_open_probe(self):
+        """Test that one probe is let through after the reset and its outcome decides."""
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10, clock=lambda: now[0])
+        breaker.record_failure()
+        now[0] = 10.0
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()
+
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.retry_in() == pytest.approx(10)
+
+        now[0] = 20.0
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_lost_probe_reopens(self):
+        """Test that a probe that never reports back re-opens the circuit instead of blocking it."""
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10, clock=lambda: now[0])
+        breaker.record_failure()
+        now[0] = 10.0
+        assert breaker.allow()
+
+        now[0] = 20.0
+        assert breaker.state == CircuitBreaker.OPEN
+        now[0] = 30.0
+        assert breaker.allow()
+
+
+class TestRetryBudget:
+    """Tests for the retry budget."""
+
+    def test_reserve_then_ratio(self):
+        """Test that retries past the reserve are earned by new requests."""
+        budget = RetryBudget(ratio=0.5, reserve=1)
+        assert budget.try_spend()
+        assert not budget.try_spend()
+        budget.record_request()
+        budget.record_request()
+        assert budget.try_spend()
+
+
+class TestDeadline:
+    """Tests for deadline propagation."""
+
+    @pytest.mark.asyncio
+    async def test_nested_deadlines_only_shorten(self):
+        """Test that an inner deadline can't extend the outer one."""
+        assert remaining() is None
+        with deadline(1.0):
+            with deadline(30.0):
+                assert remaining() <= 1.0
+            with deadline(0.5):
+                assert remaining() <= 0.5
+        assert remaining() is None
+
+    @pytest.mark.asyncio
+    async def test_deadline_reaches_spawned_tasks(self):
+        """Test that spawned tasks see the caller's deadline."""
+        with deadline(5.0):
+            left = await asyncio.create_task(self._remaining())
+        assert 0 < left <= 5.0
+
+    @staticmethod
+    async def _remaining():
+        return remaining()
+
+
+class TestHostGuard:
+    """Tests for guarded calls."""
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_errors(self):
+        """Test that transient errors are retried and counted."""
+        guard = HostGuard("example.com", max_retries=3)
+        calls = []
+
+        async def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise RetryableError("503")
+            return "ok"
+
+        assert await guard.call(flaky, backoff=no_backoff) == "ok"
+        stats = guard.stats()
+        assert (stats["requests"], stats["failures"], stats["retries"], stats["successes"]) == (3, 2, 2, 1)
+        assert stats["state"] == "closed"
+
+    @pytest.mark.asyncio
+    async def test_other_errors_propagate(self):
+        """Test that non-transient errors are neither retried nor held against the host."""
+        guard = HostGuard("example.com", failure_threshold=1)
+        calls = []
+
+        async def broken():
+            calls.append(1)
+            raise ValueError("bad payload")
+
+        with pytest.raises(ValueError):
+            await guard.call(broken)
+        assert len(calls) == 1
+        assert guard.breaker.state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast(self):
+        """Test that a down host is not called again until the reset."""
+        guard = HostGuard("example.com", failure_threshold=2, reset_seconds=60, max_retries=5)
+        calls = []
+
+        async def down():
+            calls.append(1)
+            raise ConnectionError("refused")
+
+        with pytest.raises(CircuitOpenError):
+            await guard.call(down, backoff=no_backoff)
+        assert len(calls) == 2
+
+        with pytest.raises(CircuitOpenError):
+            await guard.call(down, backoff=no_backoff)
+        assert len(calls) == 2
+        assert guard.stats()["rejected"] == 2
+
+    @pytest.mark.asyncio
+    async def test_server_errors_count_against_host(self):
+        """Test that a 500 is not retried but still opens the circuit."""
+        guard = HostGuard("example.com", failure_threshold=2, max_retries=3)
+        request = httpx.Request("GET", "https://example.com/x")
+        calls = []
+
+        async def failing():
+            calls.append(1)
+            return raise_for_retryable_status(httpx.Response(500, request=request))
+
+        for _ in range(2):
+            with pytest.raises(ServerError):
+                await guard.call(failing, backoff=no_backoff)
+        assert len(calls) == 2
+        assert guard.stats()["failures"] == 2
+        assert guard.breaker.state == "open"
+
+    @pytest.mark.asyncio
+    async def test_ebay_500_returns_response_and_opens_circuit(self):
+        """Test that eBay callers still get the 500 while the breaker counts it."""
+        from app.services.ebay_service import EbayService
+
+        service = EbayService(transport=httpx.MockTransport(lambda request: httpx.Response(500, text="oops")))
+        service.guard = HostGuard("api.ebay.com", failure_threshold=1)
+
+        response = await service._request("GET", "https://api.ebay.com/buy/browse/v1/item_summary/search")
+        assert response.status_code == 500
+        assert service.guard.breaker.state == "open"
+
+    @pytest.mark.asyncio
+    async def test_budget_limits_retries(self):
+        """Test that an exhausted retry budget stops retrying."""
+        guard = HostGuard("example.com", failure_threshold=100, retry_ratio=0, retry_reserve=1, max_retries=5)
+        calls = []
+
+        async def down():
+            calls.append(1)
+            raise RetryableError("503")
+
+        with pytest.raises(RetryableError):
+            await guard.call(down, backoff=no_backoff)
+        assert len(calls) == 2
+        assert guard.stats()["budget_exhausted"] == 1
+
+    @pytest.mark.asyncio
+    async def test_deadline_bounds_backoff(self):
+        """Test that a backoff longer than the deadline fails immediately."""
+        guard = HostGuard("example.com")
+
+        async def limited():
+            raise RetryableError("429", retry_after=30)
+
+        with deadline(0.5):
+            with pytest.raises(DeadlineExceeded):
+                await guard.call(limited)
+        assert guard.stats()["deadline_exceeded"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_releases_slot(self):
+        """Test that a half-open probe cancelled by ``wait_for`` lets the next call probe."""
+        guard = HostGuard("example.com", failure_threshold=1, reset_seconds=0.05, max_retries=1)
+
+        async def down():
+            raise ConnectionError("refused")
+
+        with pytest.raises(ConnectionError):
+            await guard.call(down)
+        await asyncio.sleep(0.06)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(guard.call(lambda: asyncio.sleep(5)), 0.01)
+        assert guard.breaker.state == "half_open"
+
+        assert await guard.call(lambda: asyncio.sleep(0, "ok")) == "ok"
+        assert guard.breaker.state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_deadline_bounds_slow_call(self):
+        """Test that a hanging call is cut off at the deadline without blaming the host."""
+        guard = HostGuard("example.com", failure_threshold=1)
+
+        with deadline(0.05):
+            with pytest.raises(DeadlineExceeded):
+                await guard.call(lambda: asyncio.sleep(5))
+        assert guard.breaker.state == "closed"
+
+
+class TestRegistry:
+    """Tests for per-host guards and their settings."""
+
+    def test_host_overrides(self, monkeypatch):
+        """Test that per-host settings override the defaults."""
+        from app.services import resilience
+
+        monkeypatch.setattr(resilience.settings, "resilience_hosts", {"slow.example": {"rate_per_second": 2.0}})
+        assert get_host_guard("slow.example").bucket.rate == 2.0
+        assert get_host_guard("fast.example").bucket is None
+        assert get_host_guard("slow.example") is get_host_guard("slow.example")
+        assert set(resilience_stats()) == {"fast.example", "slow.example"}
+
+    def test_retryable_status(self):
+        """Test that 503 raises with Retry-After, 500 raises and 404 passes through."""
+        request = httpx.Request("GET", "https://api.example.com/x")
+        with pytest.raises(RetryableError) as info:
+            raise_for_retryable_status(httpx.Response(503, headers={"Retry-After": "7"}, request=request))
+        assert info.value.retry_after == 7.0
+        with pytest.raises(ServerError):
+            raise_for_retryable_status(httpx.Response(500, request=request))
+        response = httpx.Response(404, request=request)
+        assert raise_for_retryable_status(response) is response
+
+
+class TestUpstreamsEndpoint:
+    """Tests for the metrics endpoint."""
+
+    def test_reports_open_circuit(self, client):
+        """Test that an open circuit marks the upstreams degraded."""
+        guard = get_host_guard("api.example.com")
+        for _ in range(guard.breaker.failure_threshold):
+            guard.on_failure()
+
+        data = client.get("/health/upstreams").json()
+        assert data["status"] == "degraded"
+        assert data["hosts"]["api.example.com"]["state"] == "open"
@@ -0,0 +1,108 @@
+"""Unit tests for the local 1688 crawler's checkpoint and database writes."""
+
+import importlib.util
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+TOOL_PATH = Path(__file__).resolve().parents[3] / "tools" / "scrape_1688.py"
+
+spec = importlib.util.spec_from_file_location("scrape_1688", TOOL_PATH)
+scrape_1688 = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(scrape_1688)
+CrawlState = scrape_1688.CrawlState
+
+
+def offer(offer_id):
+    return {"offer_id": offer_id, "title": f"offer {offer_id}", "price": 9.9}
+
+
+@pytest.fixture
+def scraper(monkeypatch, tmp_path):
+    """Scraper with no Supabase and a throwaway selector cache."""
+    monkeypatch.delenv("SUPABASE_URL", raising=False)
+    monkeypatch.setattr(scrape_1688, "SELECTOR_CACHE_FILE", tmp_path / "selectors.json")
+    return scrape_1688.Local1688Scraper(headless=True)
+
+
+class TestCrawlState:
+    """Tests for the crawl checkpoint file."""
+
+    def test_mark_done_survives_reload(self, tmp_path):
+        """Test that finished pages are written and read back."""
+        path = tmp_path / "state.json"
+        state = CrawlState.load(path)
+        state.mark_done("蓝牙耳机", 2, 20)
+        state.mark_done("蓝牙耳机", 1, 18)
+
+        loaded = CrawlState.load(path)
+        assert loaded.done == {"蓝牙耳机": [1, 2]}
+        assert loaded.offers == {"蓝牙耳机": 38}
+        assert loaded.is_done("蓝牙耳机", 1)
+        assert not loaded.is_done("蓝牙耳机", 3)
+
+    def test_expired_state_starts_over(self, tmp_path):
+        """Test that a checkpoint older than max_age_hours is ignored."""
+        path = tmp_path / "state.json"
+        updated_at = (datetime.now() - timedelta(hours=30)).isoformat()
+        path.write_text(json.dumps({"done": {"瑜伽垫": [1]}, "offers": {}, "updated_at": updated_at}))
+
+        assert CrawlState.load(path, max_age_hours=24).done == {}
+        assert CrawlState.load(path, max_age_hours=0).done == {"瑜伽垫": [1]}
+        assert CrawlState.load(path, fresh=True).done == {}
+
+    def test_clear_removes_file(self, tmp_path):
+        """Test that clearing drops the progress and the file."""
+        path = tmp_path / "state.json"
+        state = CrawlState.load(path)
+        state.mark_done("瑜伽垫", 1, 5)
+        state.clear()
+        state.clear()
+
+        assert not path.exists()
+        assert state.done == {}
+
+
+class TestCrawlPage:
+    """Tests for scraping and saving one page of a batch crawl."""
+
+    @pytest.mark.asyncio
+    async def test_saved_page_is_marked_done(self, scraper, tmp_path):
+        """Test that a page is checkpointed once its rows are saved."""
+        scraper.supabase = MagicMock()
+        scraper._scrape_page = AsyncMock(return_value=[offer("1"), offer("2"), offer("1")])
+        state = CrawlState.load(tmp_path / "state.json")
+
+        products = await scraper._crawl_page(None, state, "蓝牙耳机", 1, 500, 20)
+
+        assert len(products) == 3
+        assert state.is_done("蓝牙耳机", 1)
+        rows = scraper.supabase.table.return_value.upsert.call_args.args[0]
+        assert [row["offer_id"] for row in rows] == ["1", "2"]
+
+    @pytest.mark.asyncio
+    async def test_failed_save_keeps_page_pending(self, scraper, tmp_path):
+        """Test that a database failure raises and leaves the page for the next run."""
+        scraper.supabase = MagicMock()
+        scraper.supabase.table.return_value.upsert.return_value.execute.side_effect = Exception("timeout")
+        scraper._scrape_page = AsyncMock(return_value=[offer("1")])
+        path = tmp_path / "state.json"
+        state = CrawlState.load(path)
+
+        with pytest.raises(RuntimeError, match="timeout"):
+            await scraper._crawl_page(None, state, "蓝牙耳机", 1, 500, 20)
+
+        assert not state.is_done("蓝牙耳机", 1)
+        assert not path.exists()
+
+    @pytest.mark.asyncio
+    async def test_save_returns_row_count(self, scraper):
+        """Test that the save reports deduplicated rows across chunks."""
+        scraper.supabase = MagicMock()
+        saved = await scraper._save_to_database([offer(str(i)) for i in range(250)] + [offer("0")], "瑜伽垫")
+
+        assert saved == 250
+        assert scraper.supabase.table.return_value.upsert.call_count == 2
@@ -0,0 +1,99 @@
+"""Unit tests for the adaptive selector cache."""
+
+import pytest
+
+from app.services.selector_cache import SelectorCache
+
+SELECTORS = (".a", ".b", ".c")
+
+
+class FakePage:
+    """Page whose matching selectors can change between calls."""
+
+    def __init__(self, matching):
+        self.matching = set(matching)
+        self.queries = []
+
+    async def query_selector_all(self, selector):
+        self.queries.append(selector)
+        if selector == ".boom":
+            raise RuntimeError("bad selector")
+        return ["el"] if selector in self.matching else []
+
+
+class TestSelectorCache:
+    """Tests for winner reuse, re-probing and metrics."""
+
+    @pytest.mark.asyncio
+    async def test_winner_tried_first(self):
+        """Test that later lookups go straight to the last winner."""
+        cache = SelectorCache()
+        page = FakePage({".c"})
+        assert (await cache.query_all(page, "1688", "search", SELECTORS))[0] == ".c"
+        page.queries.clear()
+        assert (await cache.query_all(page, "1688", "search", SELECTORS))[0] == ".c"
+        assert page.queries == [".c"]
+
+    @pytest.mark.asyncio
+    async def test_reprobe_when_winner_stops_matching(self):
+        """Test that a layout change re-probes and records a new winner."""
+        cache = SelectorCache()
+        page = FakePage({".a"})
+        await cache.query_all(page, "1688", "search", SELECTORS)
+        page.matching = {".b"}
+        selector, items = await cache.query_all(page, "1688", "search", SELECTORS)
+        assert selector == ".b" and items == ["el"]
+        assert cache.winner("1688", "search") == ".b"
+        stats = cache.stats()["1688/search"]
+        assert stats["reprobes"] == 1
+        assert stats["selectors"][".a"] == {"tries": 2, "hits": 1, "hit_rate": 0.5}
+
+    @pytest.mark.asyncio
+    async def test_no_match_and_errors(self):
+        """Test that errors count as misses and nothing matching returns empty."""
+        cache = SelectorCache()
+        selector, items = await cache.query_all(FakePage(set()), "1688", "search", (".boom", ".a"))
+        assert selector is None and items == []
+        assert cache.stats()["1688/search"]["selectors"][".boom"]["hits"] == 0
+
+    @pytest.mark.asyncio
+    async def test_hit_rate(self):
+        """Test the winner hit rate across lookups."""
+        cache = SelectorCache()
+        page = FakePage({".b"})
+        for _ in range(4):
+            await cache.query_all(page, "1688", "search", SELECTORS)
+        assert cache.stats()["1688/search"]["winner_hit_rate"] == 0.75
+
+    @pytest.mark.asyncio
+    async def test_keys_are_independent(self):
+        """Test that page types keep separate winners."""
+        cache = SelectorCache()
+        await cache.query_all(FakePage({".a"}), "1688", "search", SELECTORS)
+        await cache.query_all(FakePage({".b"}), "1688", "detail", SELECTORS)
+        assert cache.winner("1688", "search") == ".a"
+        assert cache.winner("1688", "detail") == ".b"
+
+    @pytest.mark.asyncio
+    async def test_persisted_winners(self, tmp_path):
+        """Test that winners survive a new process via the JSON file."""
+        path = str(tmp_path / "selectors.json")
+        await SelectorCache(path).query_all(FakePage({".c"}), "1688", "search", SELECTORS)
+        page = FakePage({".c"})
+        await SelectorCache(path).query_all(page, "1688", "search", SELECTORS)
+        assert page.queries == [".c"]
+
+    @pytest.mark.asyncio
+    async def test_fallback_never_becomes_winner(self):
+        """Test that a broad fallback is used but specific selectors keep being tried first."""
+        cache = SelectorCache()
+        page = FakePage({".card"})
+        selector, items = await cache.query_all(page, "1688", "search", SELECTORS, (".card",))
+        assert selector == ".card" and items == ["el"]
+        assert cache.winner("1688", "search") is None
+
+        page.matching = {".b", ".card"}
+        page.queries.clear()
+        assert (await cache.query_all(page, "1688", "search", SELECTORS, (".card",)))[0] == ".b"
+        assert page.queries == [".a", ".b"]
+        assert cache.stats()["1688/search"]["selectors"][".card"] == {"tries": 1, "hits": 1, "hit_rate": 1.0}
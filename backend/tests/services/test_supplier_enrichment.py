@@ -0,0 +1,169 @@
+"""Unit tests for detail-page enrichment of cached suppliers."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.alibaba1688_service import (
+    filter_by_size,
+    parse_dimensions_spec,
+    parse_price_tiers,
+    parse_weight_kg,
+    supplier_from_row,
+    tier_price,
+)
+from app.services import supplier_enrichment
+from app.services.supplier_enrichment import SupplierEnricher, details_to_row, is_fresh
+from app.services.supplier_index import SupplierIndex
+
+
+class TestDetailParsing:
+    """Tests for detail page parsing helpers."""
+
+    def test_weight_units(self):
+        """Test kg and gram weights (kg must not be read as grams)."""
+        assert parse_weight_kg({"重量": "1.5kg"}) == 1.5
+        assert parse_weight_kg({"净重": "250克"}) == 0.25
+        assert parse_weight_kg({"Weight": "300 g"}) == 0.3
+        assert parse_weight_kg({"颜色": "黑色"}) is None
+
+    def test_dimensions(self):
+        """Test that the first size-like spec is used."""
+        assert parse_dimensions_spec({"材质": "塑料", "产品尺寸": "30x20x10cm"}) == "30x20x10cm"
+        assert parse_dimensions_spec({}) is None
+
+    def test_price_tiers(self):
+        """Test tier quantity and price extraction in both text orders."""
+        tiers = parse_price_tiers(["≥100个 ¥10.00", "¥12.50 2-99件", "no price"])
+        assert tiers == [{"min_qty": 2, "price": 12.5}, {"min_qty": 100, "price": 10.0}]
+
+    def test_tier_price(self):
+        """Test that the largest tier within the quantity applies."""
+        tiers = [{"min_qty": 2, "price": 12.5}, {"min_qty": 100, "price": 10.0}]
+        assert tier_price(tiers, 50, 99) == 12.5
+        assert tier_price(tiers, 500, 99) == 10.0
+        assert tier_price(tiers, 1, 99) == 12.5
+        assert tier_price(None, 10, 99) == 99
+
+
+class TestCachedDetails:
+    """Tests for using enriched columns."""
+
+    def test_supplier_from_row_uses_details(self):
+        """Test that cached weight/size feed the size filter."""
+        row = {"offer_id": "1", "title": "t", "price": 5, "weight_kg": "12.5", "moq": 20, "dimensions": "10x10x10cm"}
+        supplier = supplier_from_row(row)
+        assert supplier.weight == 12.5 and supplier.moq == 20
+        assert not filter_by_size(supplier)
+        assert filter_by_size(supplier_from_row({**row, "weight_kg": None}))
+
+    def test_is_fresh(self):
+        """Test the freshness TTL."""
+        now = datetime(2026, 3, 1, tzinfo=timezone.utc)
+        assert is_fresh({"details_fetched_at": (now - timedelta(hours=1)).isoformat()}, 24, now)
+        assert not is_fresh({"details_fetched_at": (now - timedelta(hours=25)).isoformat()}, 24, now)
+        assert is_fresh({"details_fetched_at": "2026-02-28T12:00:00Z"}, 24, now)
+        assert not is_fresh({"details_fetched_at": None}, 24, now)
+        assert not is_fresh({}, 24, now)
+
+    def test_details_to_row(self):
+        """Test column mapping and the freshness stamp."""
+        row = details_to_row({"weight": 0.3, "moq": 2, "price_tiers": [{"min_qty": 2, "price": 1.0}]})
+        assert row["weight_kg"] == 0.3 and row["moq"] == 2
+        assert row["details_error"] is None
+        assert is_fresh(row, 1)
+
+
+def make_db(stale_ids=()):
+    db = MagicMock()
+    table = db.table.return_value
+    for method in ("select", "or_", "order", "limit", "update", "eq"):
+        getattr(table, method).return_value = table
+    table.execute.return_value.data = [{"offer_id": i} for i in stale_ids]
+    return db
+
+
+class TestSupplierEnricher:
+    """Tests for the enrichment queue and worker."""
+
+    def test_enqueue_dedupes(self):
+        """Test that an offer is queued once."""
+        enricher = SupplierEnricher(db=make_db())
+        assert enricher.enqueue(["1", "2", "1", ""]) == 2
+        assert enricher.enqueue(["2"]) == 0
+        assert enricher.stats()["queued"] == 2
+
+    def test_enqueue_stale(self):
+        """Test that missing or expired rows are selected oldest first."""
+        db = make_db(["a", "b"])
+        enricher = SupplierEnricher(db=db, ttl_hours=24)
+        assert enricher.enqueue_stale(limit=10) == 2
+        table = db.table.return_value
+        assert table.or_.call_args[0][0].startswith("details_fetched_at.is.null,details_fetched_at.lt.")
+        table.limit.assert_called_with(10)
+
+    @pytest.mark.asyncio
+    async def test_drain_writes_details(self):
+        """Test bounded workers fetch every queued offer and store results."""
+        db = make_db()
+        scraper = MagicMock()
+        scraper._get_browser = AsyncMock(return_value=MagicMock())
+        context = MagicMock(close=AsyncMock())
+        scraper.new_context = AsyncMock(return_value=context)
+        scraper.new_page = AsyncMock(side_effect=lambda ctx: MagicMock(close=AsyncMock()))
+
+        async def read(page, offer_id):
+            if offer_id == "bad":
+                raise RuntimeError("captcha")
+            return {"offer_id": offer_id, "weight": 1.0, "moq": 3}
+
+        scraper.read_detail_page = read
+        enricher = SupplierEnricher(db=db, scraper=scraper, concurrency=2)
+        enricher.enqueue(["1", "2", "bad"])
+        counts = await enricher.drain()
+
+        assert counts == {"enriched": 2, "failed": 1}
+        assert scraper.new_page.await_count == 2
+        updates = [c.args[0] for c in db.table.return_value.update.call_args_list]
+        assert sum(1 for u in updates if u.get("weight_kg") == 1.0) == 2
+        assert any(u.get("details_error") == "captcha" for u in updates)
+        assert enricher.stats()["queued"] == 0
+        context.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_drain_updates_loaded_index(self, monkeypatch):
+        """Test that enriched details reach the index rows and stop re-queueing."""
+        index = SupplierIndex.build([{"offer_id": "1", "title": "无线耳机", "price": 20}])
+        monkeypatch.setattr(supplier_enrichment, "current_supplier_index", lambda: index)
+        scraper = MagicMock()
+        scraper._get_browser = AsyncMock(return_value=MagicMock())
+        scraper.new_context = AsyncMock(return_value=MagicMock(close=AsyncMock()))
+        scraper.new_page = AsyncMock(side_effect=lambda ctx: MagicMock(close=AsyncMock()))
+        scraper.read_detail_page = AsyncMock(return_value={"weight": 0.4, "moq": 5})
+
+        enricher = SupplierEnricher(db=make_db(), scraper=scraper, ttl_hours=24)
+        stale = {"offer_id": "1", "details_fetched_at": None}
+        assert enricher.needs_details(stale)
+        enricher.enqueue(["1"])
+        assert not enricher.needs_details(stale)
+        await enricher.drain()
+
+        row = index.rows[0]
+        assert row["weight_kg"] == 0.4 and row["moq"] == 5
+        assert is_fresh(row, 24)
+        # A snapshot taken before the fetch doesn't queue it again
+        assert not enricher.needs_details(stale)
+
+    @pytest.mark.asyncio
+    async def test_run_joins_running_drain(self):
+        """Test that run() queues offers for a running drain instead of starting another."""
+        enricher = SupplierEnricher(db=make_db(["a", "b"]))
+        enricher.drain = AsyncMock()
+        enricher._task = asyncio.get_running_loop().create_future()
+
+        assert await enricher.run(limit=10) == {"enriched": 0, "failed": 0}
+        enricher.drain.assert_not_called()
+        assert enricher.stats()["queued"] == 2
+        enricher._task.cancel()
@@ -0,0 +1,195 @@
+"""Unit tests for the local supplier similarity index."""
+
+import time
+
+import pytest
+
+from app.services import alibaba1688_service, supplier_index
+from app.services.alibaba1688_service import calculate_supplier_score, supplier_from_row
+from app.services.supplier_index import SupplierIndex, analyze
+
+
+ROWS = [
+    {"offer_id": "1", "title": "TWS无线蓝牙耳机 降噪运动", "price": 35},
+    {"offer_id": "2", "title": "头戴式耳机 有线 游戏", "price": 80},
+    {"offer_id": "3", "title": "瑜伽垫 加厚 防滑 健身垫", "price": 25},
+    {"offer_id": "4", "title": "宠物窝 狗窝 猫窝 冬季保暖", "price": 45},
+    {"offer_id": "5", "title": "", "price": 10},
+]
+
+
+class TestAnalyze:
+    def test_character_ngrams(self):
+        """Test 1-3 character grams per segment."""
+        grams = analyze("耳机 TWS")
+        assert grams["耳"] == 1 and grams["耳机"] == 1
+        assert grams["tws"] == 1
+        assert "机 t" not in grams
+
+
+class TestSupplierIndex:
+    """Tests for build, search and persistence."""
+
+    def test_build_skips_empty_titles(self):
+        """Test that rows without a title are left out."""
+        assert len(SupplierIndex.build(ROWS)) == 4
+
+    def test_search_ranks_by_similarity(self):
+        """Test that the closest title comes first."""
+        index = SupplierIndex.build(ROWS)
+        results = index.search("无线耳机 蓝牙耳机 wireless earbuds")
+        assert results[0][0]["offer_id"] == "1"
+        assert all(0 < sim <= 1.0001 for _, sim in results)
+        assert [row["offer_id"] for row, _ in results][:2] == ["1", "2"]
+
+    def test_search_filters(self):
+        """Test the similarity cut-off and price ceiling."""
+        index = SupplierIndex.build(ROWS)
+        assert index.search("完全无关的查询词") == []
+        assert index.search("耳机", max_price=50, min_similarity=0.01)[0][0]["offer_id"] == "1"
+        assert all(row["price"] <= 50 for row, _ in index.search("耳机", max_price=50, min_similarity=0.01))
+
+    def test_search_limit(self):
+        """Test that at most ``limit`` results come back."""
+        index = SupplierIndex.build(ROWS)
+        assert len(index.search("耳机 垫 窝", limit=2, min_similarity=0.0)) == 2
+
+    def test_similarity(self):
+        """Test pairwise similarity under the index IDF."""
+        index = SupplierIndex.build(ROWS)
+        assert index.similarity("瑜伽垫", "瑜伽垫") == pytest.approx(1.0)
+        assert index.similarity("瑜伽垫", "狗窝") == 0.0
+
+    def test_save_and_load(self, tmp_path):
+        """Test that a saved index answers the same way."""
+        index = SupplierIndex.build(ROWS)
+        path = str(tmp_path / "index.npz")
+        index.save(path)
+        loaded = SupplierIndex.load(path)
+        assert loaded.search("瑜伽垫") == index.search("瑜伽垫")
+
+    def test_update_details(self):
+        """Test that detail columns are merged into an offer's row, other columns kept."""
+        index = SupplierIndex.build(ROWS)
+        assert index.update_details("1", {"weight_kg": 0.3, "price": 1, "details_error": None})
+        row = index.search("无线耳机")[0][0]
+        assert row["weight_kg"] == 0.3 and row["price"] == ROWS[0]["price"]
+        assert not index.update_details("missing", {"weight_kg": 1})
+
+    def test_empty_index(self):
+        """Test that an empty index returns nothing."""
+        assert SupplierIndex.build([]).search("耳机") == []
+
+
+@pytest.fixture
+def no_index(monkeypatch, tmp_path):
+    """Module index state reset, with the index file in a temporary directory."""
+    monkeypatch.setattr(supplier_index, "_index", None)
+    monkeypatch.setattr(supplier_index, "_failed_at", None)
+    monkeypatch.setattr(supplier_index.settings, "supplier_index_path", str(tmp_path / "index.npz"))
+    yield
+    wait_for_loader()
+
+
+def wait_for_loader(timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while supplier_index._loader is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+class TestBackgroundLoading:
+    """Tests for loading the process-wide index off the request path."""
+
+    def test_builds_in_background(self, monkeypatch, no_index):
+        """Test that the first call returns at once and the built index is saved and served."""
+        monkeypatch.setattr(supplier_index, "fetch_supplier_rows", lambda db=None: ROWS)
+        assert supplier_index.get_supplier_index() is None
+        wait_for_loader()
+
+        index = supplier_index.get_supplier_index()
+        assert len(index) == 4
+        assert supplier_index.SupplierIndex.load(supplier_index.settings.supplier_index_path).rows == index.rows
+
+    def test_failure_backs_off(self, monkeypatch, no_index):
+        """Test that a failed build isn't retried on every call."""
+        calls = []
+
+        def failing(db=None):
+            calls.append(1)
+            raise RuntimeError("no database")
+
+        monkeypatch.setattr(supplier_index, "fetch_supplier_rows", failing)
+        assert supplier_index.start_supplier_index()
+        wait_for_loader()
+        assert supplier_index.get_supplier_index() is None
+        assert not supplier_index.start_supplier_index()
+        assert len(calls) == 1
+
+        monkeypatch.setattr(supplier_index.settings, "supplier_index_retry_seconds", 0.0)
+        assert supplier_index.start_supplier_index()
+
+    def test_stale_index_serves_while_rebuilding(self, monkeypatch, no_index):
+        """Test that an index past the refresh interval is rebuilt and swapped in."""
+        stale = SupplierIndex.build(ROWS[:1])
+        stale.built_at -= 2 * 3600
+        monkeypatch.setattr(supplier_index, "_index", stale)
+        monkeypatch.setattr(supplier_index.settings, "supplier_index_refresh_hours", 1.0)
+        monkeypatch.setattr(supplier_index, "fetch_supplier_rows", lambda db=None: ROWS)
+
+        assert supplier_index.get_supplier_index() is stale
+        wait_for_loader()
+        assert len(supplier_index.get_supplier_index()) == 4
+        assert not supplier_index.start_supplier_index()
+
+
+class TestMatchingWithIndex:
+    """Tests for index-backed supplier matching."""
+
+    def test_relevance_feeds_score(self):
+        """Test that title similarity replaces the fixed relevance."""
+        supplier = supplier_from_row(ROWS[0])
+        low = calculate_supplier_score(supplier, 50, "AUD", relevance=0.0)
+        high = calculate_supplier_score(supplier, 50, "AUD", relevance=1.0)
+        assert high - low == pytest.approx(10)
+
+    @pytest.mark.asyncio
+    async def test_match_answers_from_index(self, monkeypatch):
+        """Test that a full index answer skips live scraping."""
+        index = SupplierIndex.build(ROWS)
+        monkeypatch.setattr(alibaba1688_service, "get_supplier_index", lambda: index)
+        monkeypatch.setattr(supplier_index, "_index", index)
+
+        async def no_scrape(self, **kwargs):
+            raise AssertionError("should not scrape")
+
+        monkeypatch.setattr(alibaba1688_service.Alibaba1688Scraper, "search_suppliers", no_scrape)
+        results = await alibaba1688_service.match_suppliers_for_products(
+            [{"id": "p1", "title": "Thick Yoga Mat", "price": 30}],
+            limit_per_product=1,
+        )
+        assert results[0]["matched_suppliers"][0]["offer_id"] == "3"
+
+    @pytest.mark.asyncio
+    async def test_english_words_do_not_drive_matches(self, monkeypatch):
+        """Test that Latin words in the source title don't pull in unrelated offers."""
+        index = SupplierIndex.build([
+            {"offer_id": "1", "title": "TWS无线蓝牙耳机 入耳式 降噪", "price": 35},
+            {"offer_id": "2", "title": "iPhone手机壳 Case 硅胶 防摔 Charging", "price": 8},
+            {"offer_id": "3", "title": "LED灯带 Wireless RGB Charging", "price": 20},
+        ])
+        monkeypatch.setattr(alibaba1688_service, "get_supplier_index", lambda: index)
+        monkeypatch.setattr(supplier_index, "_index", index)
+
+        async def no_scrape(self, **kwargs):
+            return []
+
+        async def no_sleep(seconds):
+            pass
+
+        monkeypatch.setattr(alibaba1688_service.Alibaba1688Scraper, "search_suppliers", no_scrape)
+        monkeypatch.setattr(alibaba1688_service.asyncio, "sleep", no_sleep)
+        results = await alibaba1688_service.match_suppliers_for_products(
+            [{"id": "p1", "title": "Wireless Bluetooth Earbuds with LED Charging Case", "price": 30}],
+            limit_per_product=3,
+        )
+        assert [s["offer_id"] for s in results[0]["matched_suppliers"]] == ["1"]
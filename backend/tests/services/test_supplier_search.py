@@ -0,0 +1,192 @@
+"""Unit tests for indexed supplier keyword search."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services import supplier_search
+from app.services.supplier_search import cjk_grams, search_cached_suppliers
+
+
+@pytest.fixture(autouse=True)
+def reset_rpc_flag(monkeypatch):
+    monkeypatch.setattr(supplier_search, "_rpc_unavailable", False)
+
+
+def make_db(rpc_error=None):
+    db = MagicMock()
+    if rpc_error:
+        db.rpc.return_value.execute.side_effect = rpc_error
+    else:
+        db.rpc.return_value.execute.return_value.data = [{"title": "蓝牙耳机", "relevance": 1.5}]
+    table = db.table.return_value
+    for method in ("select", "or_", "lte", "order", "limit"):
+        getattr(table, method).return_value = table
+    table.execute.return_value.data = [{"title": "fallback"}]
+    return db
+
+
+class TestCjkGrams:
+    def test_unigrams_and_bigrams(self):
+        """Test grams per segment, lowercased."""
+        assert cjk_grams("耳机 TW") == {"耳", "机", "耳机", "t", "w", "tw"}
+
+    def test_segments_do_not_join(self):
+        """Test that grams never span punctuation or spaces."""
+        assert "机蓝" not in cjk_grams("耳机，蓝牙")
+
+    def test_empty(self):
+        assert cjk_grams("") == set()
+
+
+class TestSearchCachedSuppliers:
+    def test_uses_rpc(self):
+        """Test that the indexed RPC is called with the filters."""
+        db = make_db()
+        rows = search_cached_suppliers(db, "蓝牙耳机", max_price=100, limit=5)
+        assert rows[0]["relevance"] == 1.5
+        db.rpc.assert_called_once_with(
+            "search_suppliers_1688", {"q": "蓝牙耳机", "max_price": 100, "result_limit": 5},
+        )
+        db.table.assert_not_called()
+
+    def test_missing_rpc_falls_back_for_good(self):
+        """Test that a missing function switches to the ILIKE query permanently."""
+        db = make_db(Exception("PGRST202 Could not find the function"))
+        assert search_cached_suppliers(db, "耳机") == [{"title": "fallback"}]
+        search_cached_suppliers(db, "耳机")
+        assert db.rpc.call_count == 1
+
+    def test_transient_error_retries_rpc(self):
+        """Test that other errors fall back once but keep using the RPC."""
+        db = make_db(Exception("timeout"))
+        search_cached_suppliers(db, "耳机")
+        search_cached_suppliers(db, "耳机")
+        assert db.rpc.call_count == 2
+
+
+STATS_ROWS = [
+    {
+        "search_keyword": "蓝牙耳机", "offer_count": 120,
+        "oldest_scraped_at": "2026-01-02T00:00:00+00:00", "newest_scraped_at": "2026-02-01T00:00:00+00:00",
+        "min_price": 8.5, "p25_price": 15.0, "median_price": 22.0, "p75_price": 35.0,
+        "p90_price": 60.0, "max_price": 199.0, "avg_price": 28.4,
+    },
+    {
+        "search_keyword": "瑜伽垫", "offer_count": 30,
+        "oldest_scraped_at": "2026-01-05T00:00:00+00:00", "newest_scraped_at": "2026-01-20T00:00:00+00:00",
+        "min_price": 10.0, "p25_price": 12.0, "median_price": 18.0, "p75_price": 25.0,
+        "p90_price": 30.0, "max_price": 45.0, "avg_price": 19.0,
+    },
+]
+
+
+class TestCacheStats:
+    def test_reads_rollup(self):
+        """Test that stats come from one read of the rollup table."""
+        db = MagicMock()
+        db.table.return_value.select.return_value.execute.return_value.data = STATS_ROWS
+        stats = supplier_search.get_cache_stats(db)
+        db.table.assert_called_once_with("suppliers_1688_keyword_stats")
+        assert stats["total_cached"] == 150
+        assert stats["keywords"] == {"蓝牙耳机": 120, "瑜伽垫": 30}
+        assert stats["last_updated"] == "2026-02-01T00:00:00+00:00"
+        assert stats["keyword_stats"]["瑜伽垫"]["price"]["median"] == 18.0
+        assert stats["keyword_stats"]["蓝牙耳机"]["oldest_scraped_at"].startswith("2026-01-02")
+
+    def test_empty_rollup(self):
+        """Test an empty cache."""
+        assert supplier_search.summarize_keyword_stats([]) == {
+            "total_cached": 0, "keywords": {}, "keyword_stats": {}, "last_updated": None,
+        }
+
+    def test_falls_back_without_rollup_table(self):
+        """Test client-side counting when migration 006 isn't applied."""
+        db = MagicMock()
+        stats_query = MagicMock()
+        stats_query.select.return_value.execute.side_effect = Exception(
+            "{'code': 'PGRST205', 'message': 'Could not find the table'}"
+        )
+        legacy = MagicMock()
+        for method in ("select", "order", "limit"):
+            getattr(legacy, method).return_value = legacy
+        legacy.execute.return_value.count = 3
+        legacy.execute.return_value.data = [
+            {"search_keyword": "a", "scraped_at": "2026-01-01"},
+            {"search_keyword": "a", "scraped_at": "2026-01-01"},
+            {"search_keyword": None, "scraped_at": "2026-01-01"},
+        ]
+        db.table.side_effect = lambda name: stats_query if name == "suppliers_1688_keyword_stats" else legacy
+        stats = supplier_search.get_cache_stats(db)
+        assert stats["total_cached"] == 3
+        assert stats["keywords"] == {"a": 2, "unknown": 1}
+
+    def test_other_errors_propagate(self):
+        """Test that non-schema errors aren't masked by the fallback."""
+        db = MagicMock()
+        db.table.return_value.select.return_value.execute.side_effect = Exception("timeout")
+        with pytest.raises(Exception, match="timeout"):
+            supplier_search.get_cache_stats(db)
+
+
+class TestSupplierPriceSummary:
+    @pytest.fixture(autouse=True)
+    def reset_summary_flag(self, monkeypatch):
+        monkeypatch.setattr(supplier_search, "_summary_unavailable", False)
+
+    def test_one_rpc_for_all_keywords(self):
+        """Test that every keyword is summarised by a single RPC call."""
+        db = MagicMock()
+        db.rpc.return_value.execute.return_value.data = [
+            {
+                "search_keyword": "瑜伽垫", "offer_count": 42, "min_price": "9.50",
+                "max_price": "88", "avg_price": "21.3", "median_price": "18",
+                "top_offers": [{"offer_id": "1", "price": 9.5}],
+            },
+        ]
+        summaries = supplier_search.summarize_supplier_prices(db, ["瑜伽垫", "狗窝", "瑜伽垫"])
+        db.rpc.assert_called_once_with("supplier_price_summary", {"keywords": ["瑜伽垫", "狗窝"], "top_n": 5})
+        assert summaries["瑜伽垫"]["count"] == 42
+        assert summaries["瑜伽垫"]["min_price"] == 9.5
+        assert summaries["瑜伽垫"]["median_price"] == 18.0
+        assert summaries["瑜伽垫"]["products"][0]["offer_id"] == "1"
+        assert summaries["狗窝"] == supplier_search.empty_price_summary()
+        db.table.assert_not_called()
+
+    def test_falls_back_per_keyword(self):
+        """Test per-keyword queries when migration 007 isn't applied."""
+        db = make_db(rpc_error=Exception("PGRST202 Could not find the function"))
+        table = db.table.return_value
+        table.eq.return_value = table
+        table.execute.return_value.data = [{"price": 0}, {"price": 10}, {"price": 20}, {"price": 40}]
+        summaries = supplier_search.summarize_supplier_prices(db, ["a", "b"], top_n=2)
+        assert table.eq.call_count == 2
+        assert summaries["a"]["count"] == 4
+        assert summaries["a"]["min_price"] == 10 and summaries["a"]["median_price"] == 20
+        assert len(summaries["a"]["products"]) == 2
+        assert supplier_search._summary_unavailable
+
+    def test_summarize_rows_ignores_zero_prices(self):
+        """Test that unpriced offers count but don't skew the statistics."""
+        summary = supplier_search.summarize_rows([{"price": 0}, {"price": None}, {"price": 5}, {"price": 7}])
+        assert summary["count"] == 4
+        assert summary["avg_price"] == 6 and summary["median_price"] == 6
+
+    @pytest.mark.asyncio
+    async def test_ranking_collects_suppliers_in_one_query(self, monkeypatch):
+        """Test that ranking supplier collection is one RPC for all categories."""
+        from app.services import ranking_service
+
+        db = MagicMock()
+        db.rpc.return_value.execute.return_value.data = [
+            {"search_keyword": "瑜伽垫", "offer_count": 3, "min_price": 10, "max_price": 30,
+             "avg_price": 20, "median_price": 20, "top_offers": [{"offer_id": "1"}]},
+        ]
+        monkeypatch.setattr(ranking_service, "get_db", lambda: db)
+        monkeypatch.setattr(ranking_service, "get_supplier_index", lambda: None)
+
+        service = ranking_service.RankingService.__new__(ranking_service.RankingService)
+        data = await service._get_supplier_data(["yoga mat", "dog bed"])
+        assert db.rpc.call_count == 1
+        assert data["yoga mat"]["avg_price"] == 20 and data["yoga mat"]["relevance"] == 1.0
+        assert data["dog bed"]["count"] == 0 and data["dog bed"]["relevance"] == 0.0
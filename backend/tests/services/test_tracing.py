@@ -0,0 +1,144 @@
+"""Unit tests for request tracing and span metrics."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.services.tracing import (
+    METRICS,
+    OTLPExporter,
+    SpanMetrics,
+    Span,
+    current_trace,
+    format_metric,
+    instrument_httpx,
+    postgrest_span_name,
+    span,
+    start_trace,
+)
+
+
+class TestSpans:
+    """Tests for span nesting and trace collection."""
+
+    @pytest.mark.asyncio
+    async def test_children_attach_to_parent(self):
+        """Test that spans in gathered tasks get the enclosing span as parent."""
+        async def child(name):
+            with span(name, "client"):
+                await asyncio.sleep(0)
+
+        with start_trace("GET /api/ranking/calculate") as root:
+            with span("ranking.platforms") as platforms:
+                await asyncio.gather(child("upstream api.ebay.com"), child("upstream api.trademe.co.nz"))
+            trace = current_trace()
+
+        by_name = {s.name: s for s in trace.spans}
+        assert by_name["upstream api.ebay.com"].parent_id == platforms.span_id
+        assert by_name["ranking.platforms"].parent_id == root.span_id
+        assert trace.spans[-1] is root
+        assert current_trace() is None
+
+    def test_traceparent_is_continued(self):
+        """Test that an incoming W3C traceparent sets the trace and parent ids."""
+        with start_trace("GET /", "00-" + "a" * 32 + "-" + "b" * 16 + "-01") as root:
+            assert current_trace().trace_id == "a" * 32
+        assert root.parent_id == "b" * 16
+
+    def test_errors_are_recorded(self):
+        """Test that a raising block marks its span as failed."""
+        with start_trace("job"):
+            with pytest.raises(ValueError):
+                with span("ranking.scoring"):
+                    raise ValueError("boom")
+            assert current_trace().spans[0].error == "ValueError"
+
+
+class TestMetrics:
+    """Tests for the Prometheus histogram."""
+
+    def test_histogram_lines(self):
+        """Test cumulative buckets, sum, count and errors per span."""
+        metrics = SpanMetrics(buckets=(0.1, 1.0))
+        for duration, error in ((0.05, None), (0.5, "TimeoutError")):
+            s = Span("db products", "client")
+            s.finish(duration)
+            s.error = error
+            metrics.observe(s)
+
+        text = "\n".join(metrics.render())
+        assert 'app_span_duration_seconds_bucket{span="db products",kind="client",le="0.1"} 1' in text
+        assert 'app_span_duration_seconds_bucket{span="db products",kind="client",le="1"} 2' in text
+        assert 'app_span_duration_seconds_count{span="db products",kind="client"} 2' in text
+        assert 'app_span_errors_total{span="db products",kind="client"} 1' in text
+
+    def test_large_values_keep_full_precision(self):
+        """Test that counters and sums aren't rounded to six significant digits."""
+        assert format_metric("app_requests_total", {"host": "api.ebay.com"}, 1234567) == \
+            'app_requests_total{host="api.ebay.com"} 1234567'
+        assert format_metric("app_seconds_sum", {}, 12345678.901234) == "app_seconds_sum 12345678.901234"
+        assert format_metric("app_open", {}, True) == "app_open 1"
+        assert format_metric("app_gauge", {}, float("inf")) == "app_gauge +Inf"
+
+
+class TestInstrumentation:
+    """Tests for the httpx hooks and OTLP export."""
+
+    def test_postgrest_requests_become_db_spans(self):
+        """Test that PostgREST calls are timed per table inside the request trace."""
+        client = httpx.Client(transport=httpx.MockTransport(lambda r: httpx.Response(200, json=[])))
+        instrument_httpx(client, postgrest_span_name)
+
+        with start_trace("GET /api/products/search"):
+            client.get("http://db.local/rest/v1/products", params={"select": "*"})
+            client.post("http://db.local/rest/v1/rpc/search_suppliers_1688", json={})
+            names = [s.name for s in current_trace().spans]
+        assert names == ["db products", "db rpc search_suppliers_1688"]
+
+    @pytest.mark.asyncio
+    async def test_otlp_export(self):
+        """Test that finished traces are POSTed as OTLP/JSON."""
+        bodies = []
+
+        def collector(request):
+            bodies.append(json.loads(request.content))
+            return httpx.Response(200)
+
+        exporter = OTLPExporter("http://collector:4318/v1/traces", "test", transport=httpx.MockTransport(collector))
+        with start_trace("GET /health"):
+            with span("db products", "client", rows=3):
+                pass
+            trace = current_trace()
+        exporter.submit(trace)
+        await exporter.flush()
+
+        spans = bodies[0]["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        assert [s["name"] for s in spans] == ["db products", "GET /health"]
+        assert spans[0]["traceId"] == trace.trace_id
+        assert spans[0]["parentSpanId"] == spans[1]["spanId"]
+        assert spans[0]["kind"] == 3
+        assert spans[0]["attributes"] == [{"key": "rows", "value": {"intValue": "3"}}]
+        assert exporter.exported == 1
+
+
+class TestEndpoints:
+    """Tests for the middleware and /metrics."""
+
+    def test_debug_header_returns_breakdown(self, client):
+        """Test that every response has a trace id and the debug header adds Server-Timing."""
+        plain = client.get("/health")
+        assert len(plain.headers["x-trace-id"]) == 32
+        assert "server-timing" not in plain.headers
+
+        debug = client.get("/health", headers={"X-Debug-Trace": "1"})
+        assert debug.headers["server-timing"].startswith("total;dur=")
+
+    def test_metrics_endpoint(self, client):
+        """Test that request spans show up in the Prometheus output by route."""
+        METRICS.reset()
+        client.get("/health")
+        text = client.get("/metrics").text
+        assert 'app_span_duration_seconds_count{span="GET /health",kind="server"} 1' in text
+        assert "# TYPE app_upstream_calls_total counter" in text
@@ -0,0 +1,136 @@
+"""Unit tests for the pooled TradeMe API client."""
+
+import base64
+import hashlib
+import hmac
+import urllib.parse
+
+import httpx
+import pytest
+
+from app.services.trademe_api_service import RateLimitPacer, TradeMeAPIService
+
+
+def reference_signature(service, method, url, params, oauth_params):
+    """Straightforward OAuth 1.0a HMAC-SHA1 signature for comparison."""
+    quote = lambda v: urllib.parse.quote(str(v), safe="")
+    pairs = sorted((quote(k), quote(v)) for k, v in {**params, **oauth_params}.items())
+    param_string = "&".join(f"{k}={v}" for k, v in pairs)
+    base_string = "&".join([method, quote(url), quote(param_string)])
+    key = f"{quote(service.consumer_secret)}&{quote(service.oauth_token_secret or '')}"
+    return base64.b64encode(hmac.new(key.encode(), base_string.encode(), hashlib.sha1).digest()).decode()
+
+
+def make_service(handler, **kwargs):
+    service = TradeMeAPIService(sandbox=True, transport=httpx.MockTransport(handler), **kwargs)
+    service.consumer_key = "key"
+    return service
+
+
+class TestOAuthSigning:
+    """Tests for the precomputed OAuth signer."""
+
+    def test_matches_reference(self, monkeypatch):
+        """Test that the cached key and pre-encoded pairs sign identically."""
+        from app.services import trademe_api_service
+
+        monkeypatch.setattr(trademe_api_service.settings, "trademe_consumer_secret", "s3cr3t&/+")
+        monkeypatch.setattr(trademe_api_service.settings, "trademe_oauth_token", "tok")
+        monkeypatch.setattr(trademe_api_service.settings, "trademe_oauth_token_secret", "tok secret")
+        service = TradeMeAPIService(sandbox=True)
+        url = f"{service.base_url}/Search/General.json"
+        params = {"search_string": "yoga mat ü", "rows": 500, "page": 2, "category": "0001-"}
+        oauth = {**service._static_oauth, "oauth_nonce": "abc", "oauth_timestamp": "1700000000"}
+        assert service._generate_oauth_signature("GET", url, params, oauth) == reference_signature(
+            service, "GET", url, params, oauth,
+        )
+
+    def test_nonces_are_unique(self):
+        """Test that back-to-back headers never reuse a nonce."""
+        service = TradeMeAPIService(sandbox=True)
+        headers = {service._get_oauth_header("GET", "https://x") for _ in range(50)}
+        assert len(headers) == 50
+
+
+class TestRateLimitPacer:
+    """Tests for header-driven pacing."""
+
+    def test_no_wait_with_allowance(self):
+        """Test that requests run freely while allowance remains."""
+        now = [100.0]
+        pacer = RateLimitPacer(reserve=2, clock=lambda: now[0])
+        pacer.update({"X-RateLimit-Remaining": "50", "X-RateLimit-Reset": "60"})
+        assert pacer.delay() == 0
+
+    def test_spreads_last_requests(self):
+        """Test even spacing once the allowance reaches the reserve."""
+        now = [100.0]
+        pacer = RateLimitPacer(reserve=2, clock=lambda: now[0])
+        pacer.update({"X-RateLimit-Remaining": "1", "X-RateLimit-Reset": "60"})
+        assert pacer.delay() == pytest.approx(30)
+        pacer.update({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "60"})
+        assert pacer.delay() == pytest.approx(60)
+
+    def test_backoff(self):
+        """Test Retry-After pauses."""
+        now = [100.0]
+        pacer = RateLimitPacer(clock=lambda: now[0])
+        pacer.backoff(5)
+        assert pacer.delay() == pytest.approx(5)
+        now[0] = 106
+        assert pacer.delay() == 0
+
+
+class TestPagination:
+    """Tests for concurrent multi-page search."""
+
+    @pytest.mark.asyncio
+    async def test_search_all_pages(self):
+        """Test that 1,200 listings take three 500-row pages in order."""
+        requested = []
+
+        def handler(request):
+            page = int(request.url.params["page"])
+            rows = int(request.url.params["rows"])
+            requested.append((page, rows))
+            assert request.headers["Authorization"].startswith("OAuth ")
+            start = (page - 1) * rows
+            items = [{"ListingId": i} for i in range(start, min(start + rows, 1200))]
+            return httpx.Response(200, json={"TotalCount": 1200, "Page": page, "PageSize": rows, "List": items})
+
+        service = make_service(handler)
+        total, listings = await service.search_all("yoga mat", max_results=5000)
+        await service.close()
+        assert total == 1200
+        assert [item["ListingId"] for item in listings] == list(range(1200))
+        assert sorted(requested) == [(1, 500), (2, 500), (3, 500)]
+
+    @pytest.mark.asyncio
+    async def test_max_results_caps_pages(self):
+        """Test that only the pages needed for max_results are requested."""
+        requested = []
+
+        def handler(request):
+            requested.append(int(request.url.params["page"]))
+            return httpx.Response(200, json={"TotalCount": 100000, "Page": 1, "List": [{}] * 500})
+
+        service = make_service(handler)
+        pages = [page async for page in service.iter_search_pages("x", max_results=1000)]
+        await service.close()
+        assert len(pages) == 2 and sorted(requested) == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_retries_429(self):
+        """Test that a 429 is retried after Retry-After."""
+        calls = []
+
+        def handler(request):
+            calls.append(1)
+            if len(calls) == 1:
+                return httpx.Response(429, headers={"Retry-After": "0"})
+            return httpx.Response(200, json={"TotalCount": 0, "List": []})
+
+        service = make_service(handler)
+        data = await service.search_general("x")
+        await service.close()
+        assert data["TotalCount"] == 0 and len(calls) == 2
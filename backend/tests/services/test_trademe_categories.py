@@ -0,0 +1,183 @@
+"""Unit tests for the TradeMe category cache and index."""
+
+import json
+import time
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+
+from app.services.platform_registry import TradeMeAdapter
+from app.services.trademe_api_service import TradeMeAPIService
+from app.services.trademe_categories import CategoryCache, CategoryTree, tokenize
+
+CATEGORIES = [
+    {
+        "Name": "Sports", "Number": "0004-", "Path": "/Sports",
+        "Subcategories": [
+            {
+                "Name": "Fitness", "Number": "0004-0100-", "Path": "/Sports/Fitness",
+                "Subcategories": [
+                    {"Name": "Yoga & pilates", "Number": "0004-0100-0200-", "Path": "/Sports/Fitness/Yoga-pilates", "IsLeaf": True},
+                    {"Name": "Mats", "Number": "0004-0100-0300-", "Path": "/Sports/Fitness/Mats", "IsLeaf": True},
+                ],
+            },
+        ],
+    },
+    {
+        "Name": "Home & living", "Number": "0005-", "Path": "/Home-living",
+        "Subcategories": [
+            {"Name": "Bathroom mats", "Number": "0005-0100-", "Path": "/Home-living/Bathroom-mats", "IsLeaf": True},
+            {"Name": "Outdoor lights", "Number": "0005-0200-", "Path": "/Home-living/Outdoor-lights", "IsLeaf": True},
+        ],
+    },
+]
+
+
+class TestCategoryTree:
+    """Tests for the in-memory category index."""
+
+    def test_tokenize(self):
+        """Test that stopwords drop and plurals fold to the singular."""
+        assert tokenize("Yoga & Pilates Mats") == ["yoga", "pilate", "mat"]
+        assert tokenize("Batteries and glass") == ["battery", "glass"]
+
+    def test_lookups(self):
+        """Test lookups by number, path and ancestry."""
+        tree = CategoryTree(CATEGORIES)
+        assert len(tree) == 7
+        assert tree.get("0004-0100-")["name"] == "Fitness"
+        assert tree.find_path("/sports/fitness/mats")["number"] == "0004-0100-0300-"
+        assert [n["name"] for n in tree.ancestors("0004-0100-0200-")] == ["Sports", "Fitness", "Yoga & pilates"]
+        assert tree.get("0004-0100-0200-")["is_leaf"] is True
+        assert tree.get("0004-")["is_leaf"] is False
+
+    def test_rare_token_wins(self):
+        """Test that the rarer keyword token decides the category."""
+        tree = CategoryTree(CATEGORIES)
+        assert tree.best("yoga mat")["number"] == "0004-0100-0200-"
+        names = [n["name"] for n in tree.candidates("yoga mat")]
+        assert set(names) == {"Yoga & pilates", "Mats", "Bathroom mats"}
+
+    def test_ancestor_tokens_break_ties(self):
+        """Test that a matching parent name favours its child."""
+        tree = CategoryTree(CATEGORIES)
+        assert tree.best("fitness mats")["number"] == "0004-0100-0300-"
+
+    def test_no_match(self):
+        """Test that unrelated keywords resolve to nothing."""
+        assert CategoryTree(CATEGORIES).best("power bank") is None
+
+
+def make_api(handler):
+    service = TradeMeAPIService(sandbox=True, transport=httpx.MockTransport(handler))
+    service.consumer_key = "key"
+    return service
+
+
+class TestCategoryCache:
+    """Tests for ETag revalidation and persistence."""
+
+    @pytest.mark.asyncio
+    async def test_download_then_revalidate(self, tmp_path):
+        """Test that a stale copy is revalidated with If-None-Match and kept on 304."""
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json={"Subcategories": CATEGORIES}, headers={"ETag": '"v1"'})
+
+        api = make_api(handler)
+        path = tmp_path / "categories.json"
+        cache = CategoryCache(api=api, path=str(path), ttl_hours=0)
+
+        assert len(await cache.get_tree()) == 7
+        tree = await cache.get_tree()
+        assert len(tree) == 7
+        assert seen == [None, '"v1"']
+        assert (cache.downloads, cache.revalidations) == (1, 1)
+        assert json.loads(path.read_text())["etag"] == '"v1"'
+        await api.close()
+
+    @pytest.mark.asyncio
+    async def test_fresh_copy_from_disk(self, tmp_path):
+        """Test that a fresh file on disk is used without any request."""
+        path = tmp_path / "categories.json"
+        path.write_text(json.dumps({"etag": '"v1"', "fetched_at": time.time(), "categories": CATEGORIES}))
+        api = AsyncMock()
+        cache = CategoryCache(api=api, path=str(path), ttl_hours=24)
+
+        assert (await cache.resolve("yoga mat"))["path"] == "Sports/Fitness/Yoga-pilates"
+        api.fetch_categories.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failed_revalidation_serves_stale(self, tmp_path):
+        """Test that a revalidation error keeps the stale tree."""
+        path = tmp_path / "categories.json"
+        path.write_text(json.dumps({"etag": '"v1"', "fetched_at": 0, "categories": CATEGORIES}))
+        api = AsyncMock()
+        api.fetch_categories.side_effect = Exception("503")
+        cache = CategoryCache(api=api, path=str(path), ttl_hours=1)
+
+        assert len(await cache.get_tree()) == 7
+
+    @pytest.mark.asyncio
+    async def test_resolve_without_tree(self, tmp_path):
+        """Test that resolve returns None when no tree can be loaded."""
+        api = AsyncMock()
+        api.fetch_categories.side_effect = Exception("offline")
+        cache = CategoryCache(api=api, path=str(tmp_path / "missing.json"))
+        assert await cache.resolve("yoga mat") is None
+
+
+class TestCategoryScopedSearch:
+    """Tests for category-scoped TradeMe queries."""
+
+    @pytest.mark.asyncio
+    async def test_count_listings_reads_total_only(self):
+        """Test that counting asks for a single row in the category."""
+        requests = []
+
+        def handler(request):
+            requests.append(dict(request.url.params))
+            return httpx.Response(200, json={"TotalCount": 1165, "List": [{}]})
+
+        api = make_api(handler)
+        assert await api.count_listings(category="0004-0100-0200-") == 1165
+        assert requests[0]["rows"] == "1"
+        assert requests[0]["category"] == "0004-0100-0200-"
+        assert "search_string" not in requests[0]
+        await api.close()
+
+    @pytest.mark.asyncio
+    async def test_adapter_scopes_probe_to_category(self):
+        """Test that the TradeMe adapter probes inside the resolved category and reports it."""
+        categories = AsyncMock()
+        categories.resolve.return_value = {"number": "0004-0100-0200-", "path": "Sports/Fitness/Yoga-pilates"}
+        api = AsyncMock()
+        api.probe.return_value = {"total_results": 40, "products": [], "price_stats": {}}
+        adapter = TradeMeAdapter(api=api, categories=categories)
+
+        result = await adapter.probe("yoga mat", "NZ")
+        api.probe.assert_awaited_once_with("yoga mat", category="0004-0100-0200-")
+        assert result.category["path"] == "Sports/Fitness/Yoga-pilates"
+        assert result.total_results == 40
+
+    @pytest.mark.asyncio
+    async def test_adapter_falls_back_to_site_wide(self):
+        """Test that an empty category search retries without the category."""
+        categories = AsyncMock()
+        categories.resolve.return_value = {"number": "0005-0100-", "path": "Home-living/Bathroom-mats"}
+        api = AsyncMock()
+        api.search_products.side_effect = [
+            {"total_results": 0, "products": [], "price_stats": {}},
+            {"total_results": 900, "products": [], "price_stats": {}},
+        ]
+        adapter = TradeMeAdapter(api=api, categories=categories)
+
+        result = await adapter.search("yoga mat", "NZ", limit=50)
+        assert api.search_products.await_args_list[-1].kwargs == {"limit": 50, "category": ""}
+        assert result.total_results == 900
+        assert result.category is None
@@ -0,0 +1,135 @@
+"""Unit tests for the persistent keyword translation cache."""
+
+from app.services import translation_cache
+from app.services.keyword_index import get_keyword_index
+from app.services.translation_cache import TranslationCache, pretranslate_products, title_hash
+
+
+class FakeQuery:
+    """Minimal Supabase builder over a dict of rows keyed by title_hash."""
+
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+        self.keys = None
+        self.bounds = None
+        self.selecting = False
+
+    def select(self, columns):
+        self.selecting = True
+        return self
+
+    def order(self, column):
+        return self
+
+    def in_(self, column, values):
+        self.keys = set(values)
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end)
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        for row in rows:
+            self.db.rows[row["title_hash"]] = row
+        self.db.upserts += 1
+        return self
+
+    def execute(self):
+        if self.name == "products":
+            start, end = self.bounds
+            data = self.db.products[start:end + 1]
+        else:
+            self.db.queries += self.selecting
+            data = [row for key, row in self.db.rows.items() if self.keys is None or key in self.keys]
+        return type("Result", (), {"data": data})()
+
+
+class FakeDB:
+    def __init__(self, products=None):
+        self.rows = {}
+        self.products = products or []
+        self.queries = 0
+        self.upserts = 0
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+class TestTitleHash:
+    def test_case_and_whitespace_insensitive(self):
+        """Test that cosmetic title differences share a key."""
+        assert title_hash("Yoga  Mat ") == title_hash("yoga mat")
+
+
+class TestTranslationCache:
+    """Tests for the LRU, the table and computation."""
+
+    def test_computes_and_persists(self):
+        """Test that a new title is translated and written once."""
+        db = FakeDB()
+        cache = TranslationCache(db=db)
+        entry = cache.get("Waterproof Yoga Mat")
+        assert entry["keywords"][0] == "yoga mat"
+        assert entry["chinese_keywords"] == ["瑜伽垫"]
+        row = db.rows[title_hash("Waterproof Yoga Mat")]
+        assert row["map_version"] == get_keyword_index().version
+        assert cache.stats()["misses"] == 1
+
+    def test_lru_hit_skips_database(self):
+        """Test that hot titles never reach the database."""
+        db = FakeDB()
+        cache = TranslationCache(db=db)
+        cache.get("Yoga Mat")
+        queries = db.queries
+        cache.get("yoga mat")
+        assert db.queries == queries
+        assert cache.stats()["hits"] == 1
+
+    def test_loads_from_database(self, monkeypatch):
+        """Test that rows from another process are reused without extraction."""
+        db = FakeDB()
+        TranslationCache(db=db).get("Yoga Mat")
+
+        def fail(title):
+            raise AssertionError("extract_keywords should not run")
+
+        monkeypatch.setattr(translation_cache, "extract_keywords", fail)
+        cache = TranslationCache(db=db)
+        assert cache.get("Yoga Mat")["chinese_keywords"] == ["瑜伽垫"]
+        assert cache.stats()["db_hits"] == 1
+
+    def test_stale_map_version_is_recomputed(self):
+        """Test that rows from an older keyword map are ignored."""
+        db = FakeDB()
+        TranslationCache(db=db).get("Yoga Mat")
+        db.rows[title_hash("Yoga Mat")]["map_version"] = "old"
+        cache = TranslationCache(db=db)
+        cache.get("Yoga Mat")
+        assert cache.stats()["misses"] == 1
+        assert db.rows[title_hash("Yoga Mat")]["map_version"] == get_keyword_index().version
+
+    def test_get_many_batches_io(self):
+        """Test one query and one upsert for a batch of new titles."""
+        db = FakeDB()
+        cache = TranslationCache(db=db)
+        result = cache.get_many(["Yoga Mat", "Pet Bed", "Yoga Mat"])
+        assert set(result) == {"Yoga Mat", "Pet Bed"}
+        assert db.queries == 1
+        assert db.upserts == 1
+
+    def test_lru_evicts_oldest(self):
+        """Test the LRU size bound."""
+        cache = TranslationCache(db=False, maxsize=2)
+        cache.get_many(["a title", "b title", "c title"])
+        assert cache.stats()["lru_size"] == 2
+
+
+class TestPretranslate:
+    def test_pages_through_products(self):
+        """Test that every product title is translated."""
+        db = FakeDB(products=[{"title": f"Yoga Mat {i}"} for i in range(5)] + [{"title": None}])
+        cache = TranslationCache(db=db)
+        assert pretranslate_products(cache=cache, db=db, batch_size=2) == 5
+        assert len(db.rows) == 5
@@ -0,0 +1,94 @@
+"""Unit tests for the trend analytics engine."""
+
+import numpy as np
+import pytest
+
+from app.services.trends_analytics import TrendsAnalytics, analyze_series, compute
+from app.services.trends_store import TrendsSeriesStore, date_strings
+
+
+def weekly_dates(start, count):
+    return np.datetime64(start, "D") + np.arange(count) * 7
+
+
+class TestCompute:
+    """Tests for the vectorised metrics."""
+
+    def test_direction_from_slope(self):
+        """Test up, down and stable rows in one pass."""
+        dates = weekly_dates("2026-01-04", 13)
+        matrix = np.vstack([
+            np.linspace(20, 80, 13),
+            np.linspace(80, 20, 13),
+            np.full(13, 50.0),
+        ])
+        metrics = compute(dates, matrix, 91)
+        assert metrics["direction"] == ["up", "down", "stable"]
+        assert metrics["slope_per_week"][0] == pytest.approx(5.0)
+
+    def test_momentum_spike(self):
+        """Test that a jump in the last four weeks gives a high z-score."""
+        dates = weekly_dates("2026-01-04", 13)
+        values = np.r_[np.tile([48.0, 52.0], 5)[:9], [90.0, 90.0, 90.0, 90.0]]
+        metrics = compute(dates, values[None, :], 91)
+        assert metrics["momentum_z"][0] > 10
+
+    def test_year_over_year(self):
+        """Test recent weeks against the same weeks a year earlier."""
+        dates = weekly_dates("2025-01-05", 57)
+        values = np.full(57, 40.0)
+        values[-4:] = 60.0
+        metrics = compute(dates, values[None, :], 365)
+        assert metrics["yoy_change"][0] == pytest.approx(0.5)
+
+    def test_year_over_year_needs_history(self):
+        """Test that short rows get no year-over-year change."""
+        dates = weekly_dates("2026-01-04", 10)
+        metrics = compute(dates, np.ones((1, 10)), 91)
+        assert np.isnan(metrics["yoy_change"][0])
+
+    def test_rows_use_their_own_window(self):
+        """Test that a row's result doesn't depend on its neighbours."""
+        dates = weekly_dates("2026-01-04", 20)
+        short = np.full(20, np.nan)
+        short[:5] = [10, 20, 30, 40, 50]
+        together = compute(dates, np.vstack([short, np.ones(20)]), 28)
+        alone = compute(dates[:5], short[None, :5], 28)
+        assert together["slope_per_week"][0] == pytest.approx(alone["slope_per_week"][0])
+        assert together["current"][0] == 50
+
+
+class TestTrendsAnalytics:
+    """Tests for the cached engine."""
+
+    def test_analyze_from_store(self):
+        """Test metrics for stored keywords; unknown keywords are omitted."""
+        store = TrendsSeriesStore(db=False)
+        store.put("a", "AU", weekly_dates("2026-01-04", 13), np.linspace(20, 80, 13), persist=False)
+        results = TrendsAnalytics(store=store).analyze(["a", "b"], "AU", "3m")
+        assert list(results) == ["a"]
+        assert results["a"]["direction"] == "up"
+        assert results["a"]["points"] == 13
+
+    def test_cache_invalidated_on_write(self):
+        """Test that results are reused until the series changes."""
+        store = TrendsSeriesStore(db=False)
+        analytics = TrendsAnalytics(store=store)
+        store.put("a", "AU", weekly_dates("2026-01-04", 4), [10, 20, 30, 40], persist=False)
+        first = analytics.analyze(["a"], "AU", "3m")["a"]
+        assert analytics.analyze(["a"], "AU", "3m")["a"] is first
+
+        store.put("a", "AU", weekly_dates("2026-02-01", 1), [80], persist=False)
+        assert analytics.analyze(["a"], "AU", "3m")["a"]["points"] == 5
+
+    def test_unknown_window(self):
+        """Test that unsupported windows raise."""
+        with pytest.raises(ValueError):
+            TrendsAnalytics(store=TrendsSeriesStore(db=False)).analyze(["a"], "AU", "2w")
+
+    def test_analyze_series(self):
+        """Test analysis of unstored batch results."""
+        dates = date_strings(weekly_dates("2026-01-04", 3))
+        results = analyze_series(dates, {"a": [30, 20, 10], "b": []}, window="3m")
+        assert list(results) == ["a"]
+        assert results["a"]["direction"] == "down"
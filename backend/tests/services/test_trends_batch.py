@@ -0,0 +1,130 @@
+"""Unit tests for the batched Google Trends engine."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services.trends_batch import TrendsBatchEngine, plan_batches, unique_keywords
+
+
+class FakeTrendsService:
+    """Returns payload-relative data the way Google Trends does."""
+
+    # Absolute popularity of each keyword
+    POPULARITY = {
+        "anchor": 40, "a": 10, "b": 20, "c": 30, "d": 50,
+        "e": 60, "f": 70, "g": 80, "h": 90,
+    }
+
+    def __init__(self):
+        self.calls = []
+
+    async def get_interest_series(self, keywords, region="AU", timeframe="today 12-m", priority=0):
+        self.calls.append(list(keywords))
+        await asyncio.sleep(0)
+        # Each payload is scaled so its own peak is 100
+        peak = max(self.POPULARITY[kw] for kw in keywords)
+        return {
+            "dates": ["2026-01-04", "2026-01-11"],
+            "series": {
+                kw: [round(self.POPULARITY[kw] * 100 / peak)] * 2 for kw in keywords
+            },
+        }
+
+
+class TestPlanning:
+    """Tests for payload packing."""
+
+    def test_unique_keywords(self):
+        """Test that duplicates and blanks are dropped in order."""
+        assert unique_keywords([" a", "b", "a", "", "c "]) == ["a", "b", "c"]
+
+    def test_batches_share_anchor(self):
+        """Test that every payload starts with the anchor."""
+        batches = plan_batches(["a", "b", "c", "d", "e", "f"], "anchor")
+        assert batches == [["anchor", "a", "b", "c", "d"], ["anchor", "e", "f"]]
+
+    def test_anchor_only(self):
+        """Test a request for just the anchor."""
+        assert plan_batches(["anchor"], "anchor") == [["anchor"]]
+
+
+class TestTrendsBatchEngine:
+    """Tests for fetching and normalisation."""
+
+    @pytest.mark.asyncio
+    async def test_request_count(self):
+        """Test that N keywords cost about N/4 requests."""
+        fake = FakeTrendsService()
+        engine = TrendsBatchEngine(trends_service=fake)
+        result = await engine.fetch(["anchor", "a", "b", "c", "d", "e", "f", "g", "h"])
+        assert result["requests"] == 2
+        assert len(fake.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_scores_comparable_across_batches(self):
+        """Test that values from different payloads share one scale."""
+        engine = TrendsBatchEngine(trends_service=FakeTrendsService())
+        result = await engine.fetch(["anchor", "a", "b", "c", "d", "e", "f", "g", "h"])
+        series = result["series"]
+        assert series["h"][0] == 100
+        # "a" and "e" land in different payloads but keep their true ratio
+        assert series["e"][0] / series["a"][0] == pytest.approx(6, rel=0.05)
+        assert series["a"][0] < series["b"][0] < series["g"][0]
+
+    @pytest.mark.asyncio
+    async def test_cached_keywords_not_refetched(self):
+        """Test that overlapping requests reuse cached series."""
+        fake = FakeTrendsService()
+        engine = TrendsBatchEngine(trends_service=fake)
+        await engine.fetch(["anchor", "a", "b"])
+        result = await engine.fetch(["anchor", "b", "c"])
+        assert fake.calls == [["anchor", "a", "b"], ["anchor", "c"]]
+        assert result["requests"] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_fetch(self):
+        """Test that concurrent identical requests make one call."""
+        fake = FakeTrendsService()
+        engine = TrendsBatchEngine(trends_service=fake)
+        first, second = await asyncio.gather(
+            engine.fetch(["anchor", "a"]),
+            engine.fetch(["anchor", "a"]),
+        )
+        assert len(fake.calls) == 1
+        assert first["series"] == second["series"]
+
+    @pytest.mark.asyncio
+    async def test_empty_request(self):
+        """Test that no keywords means no calls."""
+        fake = FakeTrendsService()
+        engine = TrendsBatchEngine(trends_service=fake)
+        result = await engine.fetch([" ", ""])
+        assert result["series"] == {}
+        assert fake.calls == []
+
+    @pytest.mark.asyncio
+    async def test_anchor_without_interest(self):
+        """Test that a zero-interest anchor leaves series on their own scale and says so."""
+        fake = FakeTrendsService()
+        fake.POPULARITY = {**FakeTrendsService.POPULARITY, "anchor": 0}
+        engine = TrendsBatchEngine(trends_service=fake)
+        result = await engine.fetch(["anchor", "a", "b"])
+        assert result["unanchored"] == ["anchor", "a", "b"]
+        assert result["series"]["b"] == [100, 100]
+        assert result["series"]["a"] == [50, 50]
+
+    def test_dates_aligned_on_union(self):
+        """Test that an anchor without dates doesn't empty the other series."""
+        engine = TrendsBatchEngine(trends_service=FakeTrendsService())
+        entries = {
+            "anchor": ([], np.array([]), False, True),
+            "a": (["2026-01-04", "2026-01-11"], np.array([1.0, 2.0]), False, True),
+            "b": (["2026-01-11", "2026-01-18"], np.array([4.0, 2.0]), False, True),
+        }
+        result = engine._combine(["anchor", "a", "b"], entries, "anchor", "AU", "today 3-m", 0)
+        assert result["dates"] == ["2026-01-04", "2026-01-11", "2026-01-18"]
+        assert result["series"]["a"] == [25, 50, 0]
+        assert result["series"]["b"] == [0, 100, 50]
+        assert result["unanchored"] == []
@@ -0,0 +1,215 @@
+"""Unit tests for the Google Trends request scheduler."""
+
+import asyncio
+import threading
+
+import pytest
+import requests
+from pytrends.exceptions import ResponseError
+
+from app.services import trends_scheduler
+from app.services.resilience import HostGuard
+from app.services.trends_scheduler import (
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    PriorityGate,
+    TokenBucket,
+    TrendsScheduler,
+    is_rate_limited,
+)
+
+
+class TestTokenBucket:
+    """Tests for the token bucket."""
+
+    def test_burst_is_free(self):
+        """Test that burst tokens need no wait."""
+        bucket = TokenBucket(rate_per_second=1.0, burst=2)
+        assert bucket.reserve() == 0.0
+        assert bucket.reserve() == 0.0
+
+    def test_reservations_queue_up(self):
+        """Test that reservations past the burst wait in order."""
+        bucket = TokenBucket(rate_per_second=10.0, burst=1)
+        bucket.reserve()
+        first = bucket.reserve()
+        second = bucket.reserve()
+        assert first == pytest.approx(0.1, abs=0.01)
+        assert second == pytest.approx(0.2, abs=0.01)
+
+    def test_penalize_delays_next_reservation(self):
+        """Test that a penalty pushes back later reservations."""
+        bucket = TokenBucket(rate_per_second=10.0, burst=5)
+        bucket.penalize(1.0)
+        assert bucket.reserve() >= 1.0
+
+
+class TestPriorityGate:
+    """Tests for priority admission."""
+
+    @pytest.mark.asyncio
+    async def test_interactive_jumps_queue(self):
+        """Test that interactive waiters are admitted before batch waiters."""
+        gate = PriorityGate(limit=1)
+        await gate.acquire(PRIORITY_BATCH)
+        order = []
+
+        async def waiter(name, priority):
+            await gate.acquire(priority)
+            order.append(name)
+            gate.release()
+
+        batch = asyncio.create_task(waiter("batch", PRIORITY_BATCH))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(waiter("interactive", PRIORITY_INTERACTIVE))
+        await asyncio.sleep(0)
+
+        gate.release()
+        await asyncio.gather(batch, interactive)
+        assert order == ["interactive", "batch"]
+        assert gate.active == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_is_skipped(self):
+        """Test that cancelled waiters do not leak slots."""
+        gate = PriorityGate(limit=1)
+        await gate.acquire()
+        task = asyncio.create_task(gate.acquire())
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        gate.release()
+        assert gate.active == 0
+        await asyncio.wait_for(gate.acquire(), timeout=1)
+
+
+class TestTrendsScheduler:
+    """Tests for the scheduler itself."""
+
+    def test_is_rate_limited(self):
+        """Test 429 detection."""
+        assert is_rate_limited(Exception("Google returned a response with code 429"))
+        assert not is_rate_limited(Exception("timeout"))
+
+    @pytest.mark.asyncio
+    async def test_runs_on_dedicated_executor(self):
+        """Test that calls run on the scheduler's own threads."""
+        scheduler = TrendsScheduler(max_workers=1, requests_per_minute=6000, burst=5)
+        name = await scheduler.run(lambda: threading.current_thread().name)
+        assert name.startswith("trends")
+        scheduler.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_retries_429_without_sleeping_thread(self, monkeypatch):
+        """Test that 429s are retried with async backoff."""
+        monkeypatch.setattr(trends_scheduler, "BACKOFF_BASE_SECONDS", 0.0)
+        monkeypatch.setattr(trends_scheduler.random, "uniform", lambda a, b: 0.0)
+        scheduler = TrendsScheduler(max_workers=1, requests_per_minute=6000, burst=5)
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise Exception("429 Too Many Requests")
+            return "ok"
+
+        assert await scheduler.run(flaky) == "ok"
+        assert len(calls) == 3
+        assert scheduler.stats()["active"] == 0
+        scheduler.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_other_errors_are_not_retried(self):
+        """Test that non-429 errors propagate immediately."""
+        scheduler = TrendsScheduler(max_workers=1, requests_per_minute=6000, burst=5)
+        calls = []
+
+        def broken():
+            calls.append(1)
+            raise ValueError("bad payload")
+
+        with pytest.raises(ValueError):
+            await scheduler.run(broken)
+        assert len(calls) == 1
+        scheduler.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_connection_errors_open_circuit(self, monkeypatch):
+        """Test that requests' network errors are retried and held against Google."""
+        monkeypatch.setattr(trends_scheduler, "BACKOFF_BASE_SECONDS", 0.0)
+        monkeypatch.setattr(trends_scheduler.random, "uniform", lambda a, b: 0.0)
+        guard = HostGuard("trends.google.com", bucket=TokenBucket(100.0, 5), failure_threshold=3)
+        scheduler = TrendsScheduler(max_workers=1, max_retries=3, guard=guard)
+        calls = []
+
+        def down():
+            calls.append(1)
+            raise requests.ConnectTimeout("connect timeout")
+
+        with pytest.raises(requests.ConnectTimeout):
+            await scheduler.run(down)
+        assert len(calls) == 3
+        assert guard.breaker.state == "open"
+        scheduler.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_server_errors_count_without_retry(self):
+        """Test that a pytrends 500 is not retried but counts as a failure."""
+        guard = HostGuard("trends.google.com", bucket=TokenBucket(100.0, 5), failure_threshold=1)
+        scheduler = TrendsScheduler(max_workers=1, guard=guard)
+        calls = []
+
+        def failing():
+            calls.append(1)
+            raise ResponseError("Google returned a response with code 500", type("R", (), {"status_code": 500})())
+
+        with pytest.raises(ResponseError):
+            await scheduler.run(failing)
+        assert len(calls) == 1
+        assert guard.breaker.state == "open"
+        scheduler.shutdown()
+
+
+class TestSeriesStorage:
+    """Tests for persisting Trends payloads outside the scheduler."""
+
+    @pytest.mark.asyncio
+    async def test_store_runs_after_slot_is_released(self):
+        """Test that a slow store write neither delays the result nor holds a worker slot."""
+        import pandas as pd
+
+        from app.services.google_trends_service import GoogleTrendsService
+
+        frame = pd.DataFrame(
+            {"drone": [40, 80], "isPartial": [False, False]},
+            index=pd.DatetimeIndex(["2026-01-04", "2026-01-11"], name="date"),
+        )
+
+        class FakeClient:
+            def build_payload(self, **kwargs):
+                pass
+
+            def interest_over_time(self):
+                return frame
+
+        release = threading.Event()
+        ingested = []
+
+        class SlowStore:
+            def ingest(self, dates, columns, region):
+                release.wait(5)
+                ingested.append((list(columns), region))
+
+        scheduler = TrendsScheduler(max_workers=1, requests_per_minute=6000, burst=5)
+        service = GoogleTrendsService(scheduler=scheduler, store=SlowStore(), client_factory=lambda kwargs: FakeClient())
+
+        result = await service.get_interest_series(["drone"], region="NZ")
+        assert result["series"] == {"drone": [40, 80]}
+        assert scheduler.stats()["active"] == 0
+        assert ingested == []
+
+        release.set()
+        await asyncio.gather(*service._store_tasks)
+        assert ingested == [(["drone"], "NZ")]
+        scheduler.shutdown()
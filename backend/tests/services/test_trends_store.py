@@ -0,0 +1,177 @@
+"""Unit tests for the columnar Google Trends series store."""
+
+import numpy as np
+import pytest
+
+from app.services.trends_store import (
+    FREQ_MONTHLY,
+    TrendsSeriesStore,
+    downsample,
+    masked_slope,
+    rows_with_nulls,
+    seasonality_strength,
+    to_dates,
+)
+
+
+class FakeQuery:
+    """Records upserts and serves stored rows like the Supabase builder."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.filters = {}
+
+    def upsert(self, row, on_conflict=None):
+        self.rows[(row["keyword"], row["region"])] = row
+        return self
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = [value]
+        return self
+
+    def in_(self, column, values):
+        self.filters[column] = list(values)
+        return self
+
+    def execute(self):
+        data = [
+            row for row in self.rows.values()
+            if all(row[col] in values for col, values in self.filters.items())
+        ]
+        return type("Result", (), {"data": data})()
+
+
+class FakeDB:
+    def __init__(self):
+        self.rows = {}
+
+    def table(self, name):
+        return FakeQuery(self.rows)
+
+
+def weekly_dates(start, count):
+    return np.datetime64(start, "D") + np.arange(count) * 7
+
+
+class TestArrayHelpers:
+    """Tests for the vectorised helpers."""
+
+    def test_downsample_monthly_ignores_nan(self):
+        """Test that monthly buckets average only present points."""
+        dates = to_dates(["2026-01-04", "2026-01-11", "2026-02-01"])
+        matrix = np.array([[10.0, np.nan, 40.0], [20.0, 30.0, np.nan]])
+        buckets, result = downsample(dates, matrix, FREQ_MONTHLY)
+        assert buckets.tolist() == to_dates(["2026-01-01", "2026-02-01"]).tolist()
+        assert result[0].tolist() == [10.0, 40.0]
+        assert result[1, 0] == 25.0
+        assert np.isnan(result[1, 1])
+
+    def test_downsample_rejects_unknown_freq(self):
+        """Test that unsupported frequencies raise."""
+        with pytest.raises(ValueError):
+            downsample(to_dates(["2026-01-04"]), np.zeros((1, 1)), "D")
+
+    def test_masked_slope(self):
+        """Test slope per week with gaps."""
+        dates = weekly_dates("2026-01-04", 4)
+        matrix = np.array([[0.0, 2.0, np.nan, 6.0], [5.0, np.nan, np.nan, np.nan]])
+        slopes = masked_slope(dates, matrix)
+        assert slopes[0] == pytest.approx(2.0)
+        assert np.isnan(slopes[1])
+
+    def test_seasonality_strength(self):
+        """Test that a yearly cycle scores high and a flat trend scores low."""
+        dates = weekly_dates("2024-01-07", 104)
+        months = dates.astype("datetime64[M]").astype(np.int64) % 12
+        seasonal = 50 + 40 * np.cos(months * np.pi / 6)
+        trending = np.linspace(10, 90, dates.size)
+        strength = seasonality_strength(dates, np.vstack([seasonal, trending]))
+        assert strength[0] > 0.9
+        assert strength[1] < strength[0]
+
+    def test_seasonality_needs_a_year(self):
+        """Test that short series get no seasonality score."""
+        dates = weekly_dates("2026-01-04", 10)
+        assert np.isnan(seasonality_strength(dates, np.ones((1, 10)) * np.arange(10))[0])
+
+    def test_rows_with_nulls(self):
+        """Test NaN to None conversion for JSON."""
+        assert rows_with_nulls(np.array([[1.234, np.nan]])) == [[1.23, None]]
+
+
+class TestTrendsSeriesStore:
+    """Tests for merging, range queries and persistence."""
+
+    def test_ingest_rescales_each_column(self):
+        """Test that payload-relative columns are stored on their own peak."""
+        store = TrendsSeriesStore(db=False)
+        store.ingest(["2026-01-04", "2026-01-11"], {"a": [25, 50], "b": [100, 80]}, "AU")
+        assert store.get("a", "AU")[1].tolist() == [50.0, 100.0]
+        assert store.get("b", "AU")[1].tolist() == [100.0, 80.0]
+
+    def test_range_query(self):
+        """Test inclusive start/end slicing."""
+        store = TrendsSeriesStore(db=False)
+        dates = weekly_dates("2026-01-04", 5)
+        store.put("a", "AU", dates, np.arange(5), persist=False)
+        got_dates, values = store.get("a", "AU", start="2026-01-11", end="2026-01-25")
+        assert values.tolist() == [1.0, 2.0, 3.0]
+        assert got_dates[0] == np.datetime64("2026-01-11")
+
+    def test_overlapping_windows_are_stitched(self):
+        """Test that a later window is rescaled onto the stored one."""
+        store = TrendsSeriesStore(db=False)
+        store.put("a", "AU", weekly_dates("2026-01-04", 3), [10, 20, 40], persist=False)
+        # Same last two weeks at double scale, plus one new week
+        store.put("a", "AU", weekly_dates("2026-01-11", 3), [40, 80, 100], persist=False)
+        assert store.get("a", "AU")[1].tolist() == [10.0, 20.0, 40.0, 50.0]
+
+    def test_matrix_aligns_on_union_grid(self):
+        """Test that keywords with different dates share one grid."""
+        store = TrendsSeriesStore(db=False)
+        store.put("a", "AU", to_dates(["2026-01-04", "2026-01-11"]), [1, 2], persist=False)
+        store.put("b", "AU", to_dates(["2026-01-11", "2026-01-18"]), [3, 4], persist=False)
+        dates, matrix, found = store.matrix(["a", "b", "c"], "AU")
+        assert found == ["a", "b"]
+        assert dates.size == 3
+        assert rows_with_nulls(matrix) == [[1.0, 2.0, None], [None, 3.0, 4.0]]
+
+    def test_aggregates(self):
+        """Test mean, slope and point count per keyword."""
+        store = TrendsSeriesStore(db=False)
+        store.put("a", "AU", weekly_dates("2026-01-04", 4), [10, 20, 30, 40], persist=False)
+        result = store.aggregates(["a", "missing"], "AU")
+        assert list(result) == ["a"]
+        assert result["a"]["mean"] == 25.0
+        assert result["a"]["slope_per_week"] == 10.0
+        assert result["a"]["seasonality"] is None
+        assert result["a"]["points"] == 4
+
+    def test_persist_and_load_round_trip(self):
+        """Test that series written to the table load back into a new store."""
+        db = FakeDB()
+        TrendsSeriesStore(db=db).put("a", "NZ", weekly_dates("2026-01-04", 3), [10, 55.6, 100])
+        row = db.rows[("a", "NZ")]
+        assert row["dates"][0] == "2026-01-04"
+        assert row["interest"] == [10, 56, 100]
+
+        store = TrendsSeriesStore(db=db)
+        store.load(["a", "b"], "NZ")
+        assert store.keywords("NZ") == ["a"]
+        assert store.get("a", "NZ")[1].tolist() == [10.0, 56.0, 100.0]
+
+    def test_ingest_keeps_stored_history(self):
+        """Test that a fresh store merges a short fetch onto the stored series."""
+        db = FakeDB()
+        TrendsSeriesStore(db=db).put("a", "NZ", weekly_dates("2025-01-05", 52), np.full(52, 50.0))
+
+        store = TrendsSeriesStore(db=db)
+        store.ingest(weekly_dates("2025-12-28", 4), {"a": [50, 50, 100, 100]}, "NZ")
+
+        row = db.rows[("a", "NZ")]
+        assert len(row["dates"]) == 55
+        assert row["dates"][0] == "2025-01-05"
+        assert store.get("a", "NZ")[0].size == 55
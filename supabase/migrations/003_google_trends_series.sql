@@ -0,0 +1,49 @@
+-- Google Trends 时间序列表（列式存储）
+-- 每个 (关键词, 地区) 一行，日期和热度分别存为数组，替代逐点的 JSON 记录
+
+CREATE TABLE IF NOT EXISTS google_trends_series (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    keyword VARCHAR(255) NOT NULL,          -- 搜索关键词
+    region VARCHAR(10) NOT NULL,            -- AU / NZ
+    dates DATE[] NOT NULL DEFAULT '{}',     -- 按时间升序的日期
+    interest SMALLINT[] NOT NULL DEFAULT '{}',  -- 与 dates 一一对应的热度（以该关键词峰值为 100）
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE(keyword, region),
+    CHECK (cardinality(dates) = cardinality(interest))
+);
+
+-- 索引
+CREATE INDEX IF NOT EXISTS idx_google_trends_series_region ON google_trends_series(region);
+
+-- 更新时间触发器
+CREATE OR REPLACE FUNCTION update_google_trends_series_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_google_trends_series_updated_at ON google_trends_series;
+CREATE TRIGGER trigger_google_trends_series_updated_at
+    BEFORE UPDATE ON google_trends_series
+    FOR EACH ROW
+    EXECUTE FUNCTION update_google_trends_series_updated_at();
+
+ALTER TABLE google_trends_series ENABLE ROW LEVEL SECURITY;
+
+-- 允许匿名读取
+CREATE POLICY "Allow anonymous read" ON google_trends_series
+    FOR SELECT
+    TO anon
+    USING (true);
+
+-- 允许 service role 完全访问
+CREATE POLICY "Allow service role full access" ON google_trends_series
+    FOR ALL
+    TO service_role
+    USING (true)
+    WITH CHECK (true);
+
+COMMENT ON TABLE google_trends_series IS 'Google Trends 热度时间序列，列式数组存储';
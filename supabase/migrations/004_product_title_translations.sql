@@ -0,0 +1,45 @@
+-- 商品标题翻译缓存表
+-- 按规范化标题哈希存储英文关键词和中文关键词，避免每次匹配供应商时重复提取/翻译
+
+CREATE TABLE IF NOT EXISTS product_title_translations (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    title_hash CHAR(40) UNIQUE NOT NULL,    -- 规范化标题（小写、合并空白）的 SHA-1
+    title TEXT NOT NULL,                    -- 原始标题
+    keywords TEXT[] NOT NULL DEFAULT '{}',  -- 提取的英文关键词
+    chinese_keywords TEXT[] NOT NULL DEFAULT '{}',  -- 翻译后的中文关键词
+    map_version CHAR(40) NOT NULL,          -- 关键词映射版本，映射变更后重新计算
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- 更新时间触发器
+CREATE OR REPLACE FUNCTION update_product_title_translations_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_product_title_translations_updated_at ON product_title_translations;
+CREATE TRIGGER trigger_product_title_translations_updated_at
+    BEFORE UPDATE ON product_title_translations
+    FOR EACH ROW
+    EXECUTE FUNCTION update_product_title_translations_updated_at();
+
+ALTER TABLE product_title_translations ENABLE ROW LEVEL SECURITY;
+
+-- 允许匿名读取
+CREATE POLICY "Allow anonymous read" ON product_title_translations
+    FOR SELECT
+    TO anon
+    USING (true);
+
+-- 允许 service role 完全访问
+CREATE POLICY "Allow service role full access" ON product_title_translations
+    FOR ALL
+    TO service_role
+    USING (true)
+    WITH CHECK (true);
+
+COMMENT ON TABLE product_title_translations IS '商品标题 -> 关键词翻译缓存';
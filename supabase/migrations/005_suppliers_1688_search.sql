@@ -0,0 +1,74 @@
+-- 1688 供应商标题检索索引（适配中文）
+-- title ILIKE '%关键词%' 无法使用 B-tree 索引；pg_trgm 对两个汉字的关键词也提取不出完整三元组，
+-- 因此这里把标题切成单字 + 双字（bigram）数组，用 GIN 索引做包含查询，再按相关度排序。
+
+-- 标题分词：按空白/标点切段，每段生成所有单字和相邻双字
+CREATE OR REPLACE FUNCTION cjk_grams(input TEXT)
+RETURNS TEXT[]
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+AS $$
+    SELECT COALESCE(array_agg(DISTINCT gram), '{}')
+    FROM regexp_split_to_table(lower(COALESCE(input, '')), '[[:space:][:punct:]]+') AS segs(seg),
+         LATERAL generate_series(1, char_length(seg)) AS pos(i),
+         LATERAL (VALUES (substr(seg, i, 1)), (substr(seg, i, 2))) AS g(gram)
+    WHERE gram <> ''
+$$;
+
+ALTER TABLE suppliers_1688
+    ADD COLUMN IF NOT EXISTS title_grams TEXT[] GENERATED ALWAYS AS (cjk_grams(title)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_suppliers_1688_title_grams
+    ON suppliers_1688 USING gin(title_grams);
+
+-- 关键词检索：关键词精确匹配 或 标题包含关键词的全部单字/双字
+-- 排序：关键词精确匹配 > 标题包含完整关键词 > 关键词覆盖标题的比例 > 销量
+-- 命中过多时只对前 5000 条候选排序，保证常见词的查询时间有上限
+CREATE OR REPLACE FUNCTION search_suppliers_1688(
+    q TEXT,
+    max_price NUMERIC DEFAULT NULL,
+    result_limit INTEGER DEFAULT 20
+)
+RETURNS TABLE (
+    id UUID,
+    offer_id VARCHAR,
+    title TEXT,
+    price DECIMAL,
+    product_url TEXT,
+    image_url TEXT,
+    sold_count INTEGER,
+    supplier_name VARCHAR,
+    location VARCHAR,
+    search_keyword VARCHAR,
+    scraped_at TIMESTAMP WITH TIME ZONE,
+    relevance REAL
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH query AS (
+        SELECT lower(q) AS q_lower, cjk_grams(q) AS grams
+    ),
+    candidates AS (
+        SELECT s.*
+        FROM suppliers_1688 s, query
+        WHERE (s.search_keyword = q OR s.title_grams @> query.grams)
+          AND cardinality(query.grams) > 0
+          AND (max_price IS NULL OR s.price <= max_price)
+        LIMIT 5000
+    )
+    SELECT
+        c.id, c.offer_id, c.title, c.price, c.product_url, c.image_url,
+        c.sold_count, c.supplier_name, c.location, c.search_keyword, c.scraped_at,
+        (
+            CASE WHEN c.search_keyword = q THEN 1.0 ELSE 0.0 END
+            + CASE WHEN strpos(lower(c.title), query.q_lower) > 0 THEN 0.5 ELSE 0.0 END
+            + cardinality(query.grams)::REAL / GREATEST(cardinality(c.title_grams), 1)
+        )::REAL AS relevance
+    FROM candidates c, query
+    ORDER BY relevance DESC, c.sold_count DESC
+    LIMIT result_limit
+$$;
+
+COMMENT ON FUNCTION search_suppliers_1688 IS '按关键词检索 1688 供应商缓存（GIN 双字索引 + 相关度排序）';
@@ -0,0 +1,143 @@
+-- 1688 供应商缓存统计汇总表
+-- 每个搜索关键词一行：数量、最早/最新抓取时间、价格分位数
+-- 由 suppliers_1688 上的语句级触发器增量维护（每条语句只重算涉及到的关键词），
+-- /api/suppliers/cache-stats 直接读取此表，不再扫描全表。
+
+CREATE TABLE IF NOT EXISTS suppliers_1688_keyword_stats (
+    search_keyword VARCHAR(100) PRIMARY KEY,  -- 搜索关键词（空值记为 'unknown'）
+    offer_count INTEGER NOT NULL DEFAULT 0,
+    oldest_scraped_at TIMESTAMP WITH TIME ZONE,
+    newest_scraped_at TIMESTAMP WITH TIME ZONE,
+    min_price DECIMAL(10, 2),
+    p25_price DECIMAL(10, 2),
+    median_price DECIMAL(10, 2),
+    p75_price DECIMAL(10, 2),
+    p90_price DECIMAL(10, 2),
+    max_price DECIMAL(10, 2),
+    avg_price DECIMAL(10, 2),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- 重算指定关键词的统计；关键词已无数据时删除对应行
+CREATE OR REPLACE FUNCTION refresh_suppliers_1688_keyword_stats(keywords TEXT[])
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    INSERT INTO suppliers_1688_keyword_stats AS st (
+        search_keyword, offer_count, oldest_scraped_at, newest_scraped_at,
+        min_price, p25_price, median_price, p75_price, p90_price, max_price, avg_price, updated_at
+    )
+    SELECT
+        COALESCE(search_keyword, 'unknown'),
+        count(*),
+        min(scraped_at),
+        max(scraped_at),
+        min(price),
+        percentile_cont(0.25) WITHIN GROUP (ORDER BY price),
+        percentile_cont(0.5) WITHIN GROUP (ORDER BY price),
+        percentile_cont(0.75) WITHIN GROUP (ORDER BY price),
+        percentile_cont(0.9) WITHIN GROUP (ORDER BY price),
+        max(price),
+        avg(price),
+        NOW()
+    FROM suppliers_1688
+    WHERE COALESCE(search_keyword, 'unknown') = ANY(keywords)
+    GROUP BY COALESCE(search_keyword, 'unknown')
+    ON CONFLICT (search_keyword) DO UPDATE SET
+        offer_count = EXCLUDED.offer_count,
+        oldest_scraped_at = EXCLUDED.oldest_scraped_at,
+        newest_scraped_at = EXCLUDED.newest_scraped_at,
+        min_price = EXCLUDED.min_price,
+        p25_price = EXCLUDED.p25_price,
+        median_price = EXCLUDED.median_price,
+        p75_price = EXCLUDED.p75_price,
+        p90_price = EXCLUDED.p90_price,
+        max_price = EXCLUDED.max_price,
+        avg_price = EXCLUDED.avg_price,
+        updated_at = EXCLUDED.updated_at;
+
+    DELETE FROM suppliers_1688_keyword_stats st
+    WHERE st.search_keyword = ANY(keywords)
+      AND NOT EXISTS (
+          SELECT 1 FROM suppliers_1688 s
+          WHERE COALESCE(s.search_keyword, 'unknown') = st.search_keyword
+      );
+$$;
+
+-- 语句级触发器：一次批量 upsert 只按涉及的关键词重算一次
+CREATE OR REPLACE FUNCTION suppliers_1688_stats_after_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_suppliers_1688_keyword_stats(
+        ARRAY(SELECT DISTINCT COALESCE(search_keyword, 'unknown') FROM new_rows)
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION suppliers_1688_stats_after_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_suppliers_1688_keyword_stats(
+        ARRAY(
+            SELECT COALESCE(search_keyword, 'unknown') FROM new_rows
+            UNION
+            SELECT COALESCE(search_keyword, 'unknown') FROM old_rows
+        )
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION suppliers_1688_stats_after_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_suppliers_1688_keyword_stats(
+        ARRAY(SELECT DISTINCT COALESCE(search_keyword, 'unknown') FROM old_rows)
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_suppliers_1688_stats_insert ON suppliers_1688;
+CREATE TRIGGER trigger_suppliers_1688_stats_insert
+    AFTER INSERT ON suppliers_1688
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION suppliers_1688_stats_after_insert();
+
+DROP TRIGGER IF EXISTS trigger_suppliers_1688_stats_update ON suppliers_1688;
+CREATE TRIGGER trigger_suppliers_1688_stats_update
+    AFTER UPDATE ON suppliers_1688
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION suppliers_1688_stats_after_update();
+
+DROP TRIGGER IF EXISTS trigger_suppliers_1688_stats_delete ON suppliers_1688;
+CREATE TRIGGER trigger_suppliers_1688_stats_delete
+    AFTER DELETE ON suppliers_1688
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION suppliers_1688_stats_after_delete();
+
+-- 回填现有数据
+SELECT refresh_suppliers_1688_keyword_stats(
+    ARRAY(SELECT DISTINCT COALESCE(search_keyword, 'unknown') FROM suppliers_1688)
+);
+
+ALTER TABLE suppliers_1688_keyword_stats ENABLE ROW LEVEL SECURITY;
+
+-- 允许匿名读取
+CREATE POLICY "Allow anonymous read" ON suppliers_1688_keyword_stats
+    FOR SELECT
+    TO anon
+    USING (true);
+
+-- 允许 service role 完全访问
+CREATE POLICY "Allow service role full access" ON suppliers_1688_keyword_stats
+    FOR ALL
+    TO service_role
+    USING (true)
+    WITH CHECK (true);
+
+COMMENT ON TABLE suppliers_1688_keyword_stats IS '1688 供应商缓存按关键词汇总（触发器增量维护）';
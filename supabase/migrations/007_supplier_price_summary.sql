@@ -0,0 +1,50 @@
+-- 排名服务的 1688 供应商价格汇总
+-- 一次 RPC 返回多个关键词的数量、最低/最高/平均/中位价和最便宜的若干条报价，
+-- 代替每个关键词一次查询、在应用端计算统计值。
+
+-- (关键词, 价格) 复合索引：每个关键词的最低价报价直接按索引顺序读取
+CREATE INDEX IF NOT EXISTS idx_suppliers_1688_keyword_price
+    ON suppliers_1688(search_keyword, price);
+
+-- 价格统计只计入大于 0 的价格（0 表示未抓到价格）
+CREATE OR REPLACE FUNCTION supplier_price_summary(
+    keywords TEXT[],
+    top_n INTEGER DEFAULT 5
+)
+RETURNS TABLE (
+    search_keyword VARCHAR,
+    offer_count INTEGER,
+    min_price NUMERIC,
+    max_price NUMERIC,
+    avg_price NUMERIC,
+    median_price NUMERIC,
+    top_offers JSONB
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        s.search_keyword,
+        count(*)::INTEGER,
+        min(s.price) FILTER (WHERE s.price > 0),
+        max(s.price) FILTER (WHERE s.price > 0),
+        round(avg(s.price) FILTER (WHERE s.price > 0), 2),
+        round(
+            (percentile_cont(0.5) WITHIN GROUP (ORDER BY s.price) FILTER (WHERE s.price > 0))::NUMERIC, 2
+        ),
+        (
+            SELECT COALESCE(jsonb_agg((to_jsonb(t) - 'title_grams') ORDER BY t.price ASC NULLS LAST), '[]'::JSONB)
+            FROM (
+                SELECT o.*
+                FROM suppliers_1688 o
+                WHERE o.search_keyword = s.search_keyword
+                ORDER BY o.price ASC NULLS LAST
+                LIMIT top_n
+            ) t
+        )
+    FROM suppliers_1688 s
+    WHERE s.search_keyword = ANY(keywords)
+    GROUP BY s.search_keyword
+$$;
+
+COMMENT ON FUNCTION supplier_price_summary IS '按关键词批量汇总 1688 供应商价格（数量/最低/最高/平均/中位价 + 最便宜报价）';
@@ -0,0 +1,73 @@
+-- 1688 供应商详情页数据（重量 / 尺寸 / 起订量 / 阶梯价）
+-- 由后台补全任务（app/services/supplier_enrichment.py）抓取详情页后写回，
+-- details_fetched_at 超过 TTL 的记录会被重新抓取。
+
+ALTER TABLE suppliers_1688
+    ADD COLUMN IF NOT EXISTS weight_kg DECIMAL(8, 3),          -- 重量（千克）
+    ADD COLUMN IF NOT EXISTS dimensions VARCHAR(100),          -- 尺寸原文，如 "30x20x10cm"
+    ADD COLUMN IF NOT EXISTS moq INTEGER,                      -- 起订量
+    ADD COLUMN IF NOT EXISTS price_tiers JSONB,                -- 阶梯价 [{"min_qty": 2, "price": 12.5}, ...]
+    ADD COLUMN IF NOT EXISTS specifications JSONB,             -- 商品属性
+    ADD COLUMN IF NOT EXISTS details_fetched_at TIMESTAMP WITH TIME ZONE,
+    ADD COLUMN IF NOT EXISTS details_error TEXT;               -- 最近一次抓取失败原因
+
+-- 补全任务按“从未抓取 / 最久未抓取”优先取记录
+CREATE INDEX IF NOT EXISTS idx_suppliers_1688_details_fetched
+    ON suppliers_1688(details_fetched_at ASC NULLS FIRST);
+
+-- 检索结果带上详情字段，供尺寸过滤和利润估算使用（返回列变化需先删除旧函数）
+DROP FUNCTION IF EXISTS search_suppliers_1688(TEXT, NUMERIC, INTEGER);
+
+CREATE OR REPLACE FUNCTION search_suppliers_1688(
+    q TEXT,
+    max_price NUMERIC DEFAULT NULL,
+    result_limit INTEGER DEFAULT 20
+)
+RETURNS TABLE (
+    id UUID,
+    offer_id VARCHAR,
+    title TEXT,
+    price DECIMAL,
+    product_url TEXT,
+    image_url TEXT,
+    sold_count INTEGER,
+    supplier_name VARCHAR,
+    location VARCHAR,
+    search_keyword VARCHAR,
+    scraped_at TIMESTAMP WITH TIME ZONE,
+    weight_kg DECIMAL,
+    dimensions VARCHAR,
+    moq INTEGER,
+    price_tiers JSONB,
+    relevance REAL
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH query AS (
+        SELECT lower(q) AS q_lower, cjk_grams(q) AS grams
+    ),
+    candidates AS (
+        SELECT s.*
+        FROM suppliers_1688 s, query
+        WHERE (s.search_keyword = q OR s.title_grams @> query.grams)
+          AND cardinality(query.grams) > 0
+          AND (max_price IS NULL OR s.price <= max_price)
+        LIMIT 5000
+    )
+    SELECT
+        c.id, c.offer_id, c.title, c.price, c.product_url, c.image_url,
+        c.sold_count, c.supplier_name, c.location, c.search_keyword, c.scraped_at,
+        c.weight_kg, c.dimensions, c.moq, c.price_tiers,
+        (
+            CASE WHEN c.search_keyword = q THEN 1.0 ELSE 0.0 END
+            + CASE WHEN strpos(lower(c.title), query.q_lower) > 0 THEN 0.5 ELSE 0.0 END
+            + cardinality(query.grams)::REAL / GREATEST(cardinality(c.title_grams), 1)
+        )::REAL AS relevance
+    FROM candidates c, query
+    ORDER BY relevance DESC, c.sold_count DESC
+    LIMIT result_limit
+$$;
+
+COMMENT ON FUNCTION search_suppliers_1688 IS '按关键词检索 1688 供应商缓存（GIN 双字索引 + 相关度排序）';
+COMMENT ON COLUMN suppliers_1688.details_fetched_at IS '详情页最近抓取时间（补全任务按 TTL 刷新）';
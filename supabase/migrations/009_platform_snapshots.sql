@@ -0,0 +1,56 @@
+-- 平台需求快照表
+-- 每个 (平台, 市场, 关键词) 一行：最近一次采集到的结果总数和价格统计
+-- 由 TradeMe API、eBay API 和各平台爬虫写入（upsert），排名服务一次查询读取所有关键词，
+-- 取代 ranking_service 中硬编码的 TRADEME_CACHED_DATA。
+
+CREATE TABLE IF NOT EXISTS platform_snapshots (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    platform VARCHAR(30) NOT NULL,          -- trademe / ebay / amazon_au / temu
+    market VARCHAR(10) NOT NULL,            -- AU / NZ
+    keyword VARCHAR(255) NOT NULL,          -- 搜索关键词（小写、空白归一）
+    total_results INTEGER NOT NULL DEFAULT 0,
+    min_price DECIMAL(10, 2),
+    max_price DECIMAL(10, 2),
+    avg_price DECIMAL(10, 2),
+    median_price DECIMAL(10, 2),
+    currency VARCHAR(3),
+    category VARCHAR(255),                  -- 平台类目（如 TradeMe 类目路径）
+    source VARCHAR(30),                     -- 采集来源：api / scraper / seed
+    fetched_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    UNIQUE(platform, market, keyword)
+);
+
+-- 索引
+CREATE INDEX IF NOT EXISTS idx_platform_snapshots_fetched_at ON platform_snapshots(fetched_at);
+
+-- 以原硬编码数据作为初始快照（fetched_at 较早，会被标记为过期，等待实时数据覆盖）
+INSERT INTO platform_snapshots (platform, market, keyword, total_results, min_price, max_price, avg_price, currency, source, fetched_at)
+VALUES
+    ('trademe', 'NZ', 'sunglasses sport', 20648, 17.50, 70.00, 35.00, 'NZD', 'seed', '2025-01-01'),
+    ('trademe', 'NZ', 'smart watch', 17319, 44.50, 178.00, 89.00, 'NZD', 'seed', '2025-01-01'),
+    ('trademe', 'NZ', 'solar garden light', 9391, 22.50, 90.00, 45.00, 'NZD', 'seed', '2025-01-01'),
+    ('trademe', 'NZ', 'bluetooth earbuds', 4060, 27.50, 110.00, 55.00, 'NZD', 'seed', '2025-01-01'),
+    ('trademe', 'NZ', 'yoga mat', 1165, 17.50, 70.00, 35.00, 'NZD', 'seed', '2025-01-01'),
+    ('trademe', 'NZ', 'power bank', 923, 22.50, 90.00, 45.00, 'NZD', 'seed', '2025-01-01'),
+    ('trademe', 'NZ', 'phone case', 3500, 10.00, 40.00, 20.00, 'NZD', 'seed', '2025-01-01'),
+    ('trademe', 'NZ', 'led strip light', 5200, 15.00, 60.00, 30.00, 'NZD', 'seed', '2025-01-01'),
+    ('trademe', 'NZ', 'backpack', 8500, 32.50, 130.00, 65.00, 'NZD', 'seed', '2025-01-01'),
+    ('trademe', 'NZ', 'storage organizer', 4200, 12.50, 50.00, 25.00, 'NZD', 'seed', '2025-01-01')
+ON CONFLICT (platform, market, keyword) DO NOTHING;
+
+ALTER TABLE platform_snapshots ENABLE ROW LEVEL SECURITY;
+
+-- 允许匿名读取
+CREATE POLICY "Allow anonymous read" ON platform_snapshots
+    FOR SELECT
+    TO anon
+    USING (true);
+
+-- 允许 service role 完全访问
+CREATE POLICY "Allow service role full access" ON platform_snapshots
+    FOR ALL
+    TO service_role
+    USING (true)
+    WITH CHECK (true);
+
+COMMENT ON TABLE platform_snapshots IS '各平台按关键词的最新需求快照（结果数、价格统计）';
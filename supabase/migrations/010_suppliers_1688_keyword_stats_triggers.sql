@@ -0,0 +1,159 @@
+-- 1688 关键词统计触发器优化（替换 006 中的函数和触发器）
+-- 1. 按关键词筛选改为 search_keyword = ANY(...)，可以使用 idx_suppliers_1688_keyword；
+--    空关键词（记为 'unknown'）单独处理，不再用 COALESCE 表达式导致全表扫描。
+-- 2. 语句级触发器只把涉及的关键词登记到待刷新表，提交时由延迟约束触发器
+--    每个关键词只重算一次：upsert 同时触发 INSERT 和 UPDATE 触发器、
+--    同一事务里的多条语句（如 200 行一批的 upsert）都不会重复计算。
+-- 3. UPDATE 只在 search_keyword / price / scraped_at 变化时才登记关键词，
+--    详情补全（重量、尺寸、MOQ 等）的逐条更新不再触发统计重算。
+
+-- 重算指定关键词的统计；关键词已无数据时删除对应行
+CREATE OR REPLACE FUNCTION refresh_suppliers_1688_keyword_stats(keywords TEXT[])
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    INSERT INTO suppliers_1688_keyword_stats AS st (
+        search_keyword, offer_count, oldest_scraped_at, newest_scraped_at,
+        min_price, p25_price, median_price, p75_price, p90_price, max_price, avg_price, updated_at
+    )
+    SELECT
+        COALESCE(search_keyword, 'unknown'),
+        count(*),
+        min(scraped_at),
+        max(scraped_at),
+        min(price),
+        percentile_cont(0.25) WITHIN GROUP (ORDER BY price),
+        percentile_cont(0.5) WITHIN GROUP (ORDER BY price),
+        percentile_cont(0.75) WITHIN GROUP (ORDER BY price),
+        percentile_cont(0.9) WITHIN GROUP (ORDER BY price),
+        max(price),
+        avg(price),
+        NOW()
+    FROM suppliers_1688
+    WHERE search_keyword = ANY(keywords)
+       OR (search_keyword IS NULL AND 'unknown' = ANY(keywords))
+    GROUP BY COALESCE(search_keyword, 'unknown')
+    ON CONFLICT (search_keyword) DO UPDATE SET
+        offer_count = EXCLUDED.offer_count,
+        oldest_scraped_at = EXCLUDED.oldest_scraped_at,
+        newest_scraped_at = EXCLUDED.newest_scraped_at,
+        min_price = EXCLUDED.min_price,
+        p25_price = EXCLUDED.p25_price,
+        median_price = EXCLUDED.median_price,
+        p75_price = EXCLUDED.p75_price,
+        p90_price = EXCLUDED.p90_price,
+        max_price = EXCLUDED.max_price,
+        avg_price = EXCLUDED.avg_price,
+        updated_at = EXCLUDED.updated_at;
+
+    DELETE FROM suppliers_1688_keyword_stats st
+    WHERE st.search_keyword = ANY(keywords)
+      AND NOT EXISTS (
+          SELECT 1 FROM suppliers_1688 s
+          WHERE s.search_keyword = st.search_keyword
+             OR (st.search_keyword = 'unknown' AND s.search_keyword IS NULL)
+      );
+$$;
+
+-- 待刷新的关键词（事务内去重；提交时清空）
+CREATE UNLOGGED TABLE IF NOT EXISTS suppliers_1688_keyword_stats_pending (
+    search_keyword VARCHAR(100) PRIMARY KEY
+);
+
+ALTER TABLE suppliers_1688_keyword_stats_pending ENABLE ROW LEVEL SECURITY;
+
+-- 与统计表一致：写 suppliers_1688 的 service role 才会登记关键词
+CREATE POLICY "Allow service role full access" ON suppliers_1688_keyword_stats_pending
+    FOR ALL
+    TO service_role
+    USING (true)
+    WITH CHECK (true);
+
+CREATE OR REPLACE FUNCTION mark_suppliers_1688_keywords(keywords TEXT[])
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    INSERT INTO suppliers_1688_keyword_stats_pending (search_keyword)
+    SELECT DISTINCT unnest(keywords)
+    ON CONFLICT (search_keyword) DO NOTHING;
+$$;
+
+-- 提交前每个待刷新关键词执行一次
+CREATE OR REPLACE FUNCTION suppliers_1688_stats_flush_pending()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_suppliers_1688_keyword_stats(ARRAY[NEW.search_keyword::TEXT]);
+    DELETE FROM suppliers_1688_keyword_stats_pending WHERE search_keyword = NEW.search_keyword;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_suppliers_1688_stats_flush ON suppliers_1688_keyword_stats_pending;
+CREATE CONSTRAINT TRIGGER trigger_suppliers_1688_stats_flush
+    AFTER INSERT ON suppliers_1688_keyword_stats_pending
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW
+    EXECUTE FUNCTION suppliers_1688_stats_flush_pending();
+
+CREATE OR REPLACE FUNCTION suppliers_1688_stats_after_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM mark_suppliers_1688_keywords(
+        ARRAY(SELECT DISTINCT COALESCE(search_keyword, 'unknown') FROM new_rows)
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION suppliers_1688_stats_after_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- 只有影响统计的列变化时才需要重算
+    PERFORM mark_suppliers_1688_keywords(
+        ARRAY(
+            SELECT COALESCE(n.search_keyword, 'unknown')
+            FROM new_rows n JOIN old_rows o ON o.id = n.id
+            WHERE (n.search_keyword, n.price, n.scraped_at) IS DISTINCT FROM (o.search_keyword, o.price, o.scraped_at)
+            UNION
+            SELECT COALESCE(o.search_keyword, 'unknown')
+            FROM new_rows n JOIN old_rows o ON o.id = n.id
+            WHERE (n.search_keyword, n.price, n.scraped_at) IS DISTINCT FROM (o.search_keyword, o.price, o.scraped_at)
+        )
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION suppliers_1688_stats_after_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM mark_suppliers_1688_keywords(
+        ARRAY(SELECT DISTINCT COALESCE(search_keyword, 'unknown') FROM old_rows)
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 触发器定义与 006 相同（函数已替换），这里重建以保证顺序一致
+DROP TRIGGER IF EXISTS trigger_suppliers_1688_stats_insert ON suppliers_1688;
+CREATE TRIGGER trigger_suppliers_1688_stats_insert
+    AFTER INSERT ON suppliers_1688
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION suppliers_1688_stats_after_insert();
+
+DROP TRIGGER IF EXISTS trigger_suppliers_1688_stats_update ON suppliers_1688;
+CREATE TRIGGER trigger_suppliers_1688_stats_update
+    AFTER UPDATE ON suppliers_1688
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION suppliers_1688_stats_after_update();
+
+DROP TRIGGER IF EXISTS trigger_suppliers_1688_stats_delete ON suppliers_1688;
+CREATE TRIGGER trigger_suppliers_1688_stats_delete
+    AFTER DELETE ON suppliers_1688
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION suppliers_1688_stats_after_delete();
+
+COMMENT ON TABLE suppliers_1688_keyword_stats_pending IS '待重算统计的 1688 关键词（触发器登记，提交时刷新并清空）';
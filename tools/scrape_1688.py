@@ -7,6 +7,14 @@
 2. 确保已安装浏览器: playwright install chromium
 3. 运行: python tools/scrape_1688.py "蓝牙耳机" --limit 20
 
+批量刷新缓存（多个关键词 × 多页，多个标签页并发，可断点续跑）:
+    python tools/scrape_1688.py 蓝牙耳机 瑜伽垫 --pages 3 --tabs 4 --headless
+    python tools/scrape_1688.py --all-categories --pages 3 --tabs 4 --headless
+    python tools/scrape_1688.py --keywords-file keywords.txt --fresh
+
+进度保存在 .cache/scrape_1688_state.json，中断后重新运行同样的命令会跳过已完成的页。
+全部页爬完后删除进度文件；超过 --state-max-age 小时未更新的进度视为过期，从头开始。
+
 脚本会打开浏览器窗口，使用你已登录的 Chrome profile 爬取 1688 搜索结果，
 然后将数据存入 Supabase 数据库供云端 API 使用。
 """
@@ -17,9 +25,9 @@ import json
 import os
 import re
 import sys
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 # 添加项目路径
 sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
@@ -27,8 +35,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
 try:
     from playwright.async_api import async_playwright
 except ImportError:
-    print("请安装 playwright: pip install playwright && playwright install chromium")
-    sys.exit(1)
+    # 在 main() 里提示安装；断点和入库逻辑不需要浏览器，测试可以直接导入
+    async_playwright = None
 
 try:
     from playwright_stealth import stealth_async
@@ -37,6 +45,9 @@ except ImportError:
     stealth_async = None
     STEALTH_AVAILABLE = False
 
+from app.log import SAMPLED, get_logger, setup_logging
+from app.services.selector_cache import SelectorCache
+
 try:
     from supabase import create_client
 except ImportError:
@@ -50,6 +61,9 @@ except ImportError:
     sys.exit(1)
 
 
+# 进度和诊断走后端日志（main() 里 setup_logging，逐条的行用 DEBUG 并抽样）；print 只用于安装提示、人工验证提示和最终摘要
+logger = get_logger("tools.scrape_1688")
+
 # 加载环境变量
 env_path = Path(__file__).parent.parent / "backend" / ".env"
 if env_path.exists():
@@ -61,12 +75,110 @@ else:
         load_dotenv(env_path)
 
 
+# 商品列表选择器（按优先级）
+OFFER_SELECTORS = [
+    ".search-offer-item",
+    ".sm-offer-item",
+    ".offer-list-row",
+    "[data-offer-id]",
+]
+
+# 默认断点文件（项目根目录 .cache/，已在 .gitignore 中）
+DEFAULT_STATE_FILE = Path(__file__).parent.parent / ".cache" / "scrape_1688_state.json"
+
+# 断点有效期（小时）：更久之前的进度不再续跑
+DEFAULT_STATE_MAX_AGE_HOURS = 24.0
+
+# 上次命中的选择器
+SELECTOR_CACHE_FILE = Path(__file__).parent.parent / ".cache" / "scrape_1688_selectors.json"
+
+# 每次 upsert 的行数
+UPSERT_CHUNK_SIZE = 200
+
+
+class CrawlState:
+    """批量爬取进度（关键词 -> 已完成页码），每完成一页写一次文件"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.done: Dict[str, List[int]] = {}
+        self.offers: Dict[str, int] = {}
+
+    @classmethod
+    def load(cls, path: Path, fresh: bool = False, max_age_hours: float = DEFAULT_STATE_MAX_AGE_HOURS) -> "CrawlState":
+        state = cls(path)
+        if fresh or not state.path.exists():
+            return state
+        try:
+            data = json.loads(state.path.read_text(encoding="utf-8"))
+            updated_at = datetime.fromisoformat(data["updated_at"]) if data.get("updated_at") else None
+            if max_age_hours > 0 and (updated_at is None or datetime.now() - updated_at > timedelta(hours=max_age_hours)):
+                logger.warning("进度文件已超过 %g 小时未更新（%s），从头开始", max_age_hours, updated_at or "未知时间")
+                return state
+            state.done = {kw: sorted(set(pages)) for kw, pages in data.get("done", {}).items()}
+            state.offers = dict(data.get("offers", {}))
+        except (OSError, ValueError) as e:
+            logger.warning("读取进度文件失败，从头开始: %s", e)
+        return state
+
+    def is_done(self, keyword: str, page_no: int) -> bool:
+        return page_no in self.done.get(keyword, ())
+
+    def mark_done(self, keyword: str, page_no: int, offer_count: int):
+        pages = self.done.setdefault(keyword, [])
+        if page_no not in pages:
+            pages.append(page_no)
+            pages.sort()
+        self.offers[keyword] = self.offers.get(keyword, 0) + offer_count
+        self.save()
+
+    def clear(self):
+        """整轮爬完后删除进度文件，下次运行从头开始"""
+        self.done, self.offers = {}, {}
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def save(self):
+        # 先写临时文件再替换，避免中断时留下半个文件
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps(
+                {"done": self.done, "offers": self.offers, "updated_at": datetime.now().isoformat()},
+                ensure_ascii=False,
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
+
+
+def chunk_rows(products: List[dict], keyword: str, size: int = UPSERT_CHUNK_SIZE) -> List[List[dict]]:
+    """按 offer_id 去重后分块（同一条 upsert 语句里不能出现重复的冲突键）"""
+    rows = {}
+    for product in products:
+        if product.get("offer_id"):
+            rows[product["offer_id"]] = {**product, "search_keyword": keyword}
+    rows = list(rows.values())
+    return [rows[i:i + size] for i in range(0, len(rows), size)]
+
+
+def load_category_keywords() -> List[str]:
+    """排名服务中的全部中文品类关键词"""
+    from app.services.ranking_service import RankingService
+
+    return [c["zh"] for c in RankingService.CATEGORIES]
+
+
 class Local1688Scraper:
     """本地 1688 爬虫，使用用户已登录的浏览器"""
 
     def __init__(self, headless: bool = False):
         self.headless = headless
         self.supabase = None
+        self.selectors = SelectorCache(SELECTOR_CACHE_FILE)
         self._init_supabase()
 
     def _init_supabase(self):
@@ -75,15 +187,14 @@ class Local1688Scraper:
         key = os.getenv("SUPABASE_KEY") or os.getenv("SUPABASE_SERVICE_KEY")
 
         if not url or not key:
-            print("警告: 未配置 Supabase，数据将只输出到控制台")
-            print("请在 .env 文件中配置 SUPABASE_URL 和 SUPABASE_KEY")
+            logger.warning("未配置 Supabase，数据将只输出到控制台（请在 .env 文件中配置 SUPABASE_URL 和 SUPABASE_KEY）")
             return
 
         try:
             self.supabase = create_client(url, key)
-            print(f"✓ Supabase 已连接: {url[:30]}...")
+            logger.info("Supabase 已连接: %s...", url[:30])
         except Exception as e:
-            print(f"Supabase 连接失败: {e}")
+            logger.error("Supabase 连接失败: %s", e)
 
     async def scrape(
         self,
@@ -102,127 +213,253 @@ class Local1688Scraper:
         Returns:
             供应商产品列表
         """
-        print(f"\n🔍 搜索关键词: {keyword}")
-        print(f"📦 最高价格: ¥{max_price}")
-        print(f"📊 获取数量: {limit}")
+        logger.info("搜索关键词: %s（最高价格 ¥%s，获取数量 %d）", keyword, max_price, limit)
 
         async with async_playwright() as p:
-            # 使用持久化上下文（用户已登录的浏览器 profile）
-            # 这样可以使用用户的登录状态
-            user_data_dir = self._get_chrome_profile_path()
-
-            print(f"\n🌐 启动浏览器...")
+            logger.info("启动浏览器...")
             # 使用独立的浏览器实例，避免与正在运行的 Chrome 冲突
             browser = await p.chromium.launch(headless=self.headless)
-            context = await browser.new_context(
-                viewport={"width": 1920, "height": 1080},
-                locale="zh-CN",
-            )
-
-            # 尝试加载 cookies 文件
-            cookies_file = Path(__file__).parent.parent / "cookies"
-            if cookies_file.exists():
-                try:
-                    import json
-                    with open(cookies_file, "r") as f:
-                        cookies = json.load(f)
-                    # 格式化 cookies 为 Playwright 格式
-                    formatted_cookies = []
-                    for cookie in cookies:
-                        formatted_cookie = {
-                            "name": cookie.get("name", ""),
-                            "value": cookie.get("value", ""),
-                            "domain": cookie.get("domain", ".1688.com"),
-                            "path": cookie.get("path", "/"),
-                        }
-                        if cookie.get("expirationDate"):
-                            formatted_cookie["expires"] = cookie["expirationDate"]
-                        formatted_cookies.append(formatted_cookie)
-                    await context.add_cookies(formatted_cookies)
-                    print(f"   ✓ 加载了 {len(formatted_cookies)} 个 cookies")
-                except Exception as e:
-                    print(f"   ⚠️ 加载 cookies 失败: {e}")
-
-            page = await context.new_page()
-
-            # 应用 stealth 模式
-            if STEALTH_AVAILABLE and stealth_async:
-                await stealth_async(page)
-                print("   ✓ Stealth 模式已启用")
+            context = await self._new_context(browser)
+            page = await self._new_page(context)
 
             try:
-                # 构建搜索 URL
-                search_url = f"https://s.1688.com/selloffer/offer_search.htm?keywords={keyword}"
-                if max_price > 0:
-                    search_url += f"&e_price={int(max_price)}"
-
-                print(f"\n📄 访问: {search_url}")
-                # 使用 domcontentloaded 而不是 networkidle，更快加载
-                await page.goto(search_url, wait_until="domcontentloaded", timeout=30000)
-
-                # 等待页面加载
-                await asyncio.sleep(3)
-
-                # 检查是否需要登录或验证
-                page_title = await page.title()
-                print(f"   页面标题: {page_title}")
-
-                if "验证" in page_title or "登录" in page_title:
-                    print("\n⚠️  检测到验证码或登录页面")
-                    print("   请在浏览器中完成验证/登录...")
-                    # 检查是否在交互模式
-                    if sys.stdin.isatty():
-                        print("   完成后按 Enter 继续...")
-                        input()
-                    else:
-                        print("   等待 30 秒供手动操作...")
-                        await asyncio.sleep(30)
-                    await asyncio.sleep(2)
-                    # 重新检查页面标题
-                    page_title = await page.title()
-                    print(f"   当前页面: {page_title}")
-
-                # 提取产品数据
-                suppliers = await self._extract_products(page, limit)
-
-                print(f"\n✓ 提取到 {len(suppliers)} 个产品")
+                suppliers = await self._scrape_page(page, keyword, max_price, limit)
+
+                logger.info("提取到 %d 个产品", len(suppliers))
 
                 # 保存到数据库
                 if suppliers and self.supabase:
-                    await self._save_to_database(suppliers, keyword)
+                    try:
+                        await self._save_to_database(suppliers, keyword)
+                    except Exception as e:
+                        logger.error("%s", e)
 
                 return suppliers
 
             except Exception as e:
-                print(f"\n❌ 爬取错误: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("爬取错误: %s", e)
                 return []
 
             finally:
                 await context.close()
+                await browser.close()
+
+    async def crawl(
+        self,
+        keywords: List[str],
+        pages: int = 3,
+        tabs: int = 3,
+        max_price: float = 500,
+        limit: int = 60,
+        state_file: Path = DEFAULT_STATE_FILE,
+        fresh: bool = False,
+        state_max_age_hours: float = DEFAULT_STATE_MAX_AGE_HOURS,
+    ) -> Dict[str, int]:
+        """
+        批量爬取多个关键词的多页搜索结果
+
+        一个浏览器、多个标签页并发处理 (关键词, 页码) 任务；每页爬完立即
+        分块 upsert 并写入断点文件，中断后重新运行会跳过已完成的页。
+
+        Args:
+            keywords: 中文搜索关键词列表
+            pages: 每个关键词爬取的页数
+            tabs: 并发标签页数
+            max_price: 最高价格（人民币）
+            limit: 每页最多提取的产品数
+            state_file: 断点文件路径
+            fresh: 忽略已有进度，从头开始
+            state_max_age_hours: 超过这么久未更新的进度不再续跑（0 = 不过期）
+
+        Returns:
+            关键词 -> 本次运行新保存的产品数
+        """
+        state = CrawlState.load(state_file, fresh=fresh, max_age_hours=state_max_age_hours)
+        jobs: asyncio.Queue = asyncio.Queue()
+        skipped = 0
+        for keyword in dict.fromkeys(keywords):
+            for page_no in range(1, pages + 1):
+                if state.is_done(keyword, page_no):
+                    skipped += 1
+                else:
+                    jobs.put_nowait((keyword, page_no))
+
+        total = jobs.qsize()
+        logger.info("%d 个关键词 × %d 页：待爬 %d 页，已完成 %d 页（%s）", len(keywords), pages, total, skipped, state.path)
+        if not total:
+            state.clear()
+            return {}
+
+        saved: Dict[str, int] = {}
+        empty_pages: Dict[str, int] = {}
+        failed = 0
+        started = datetime.now()
+
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=self.headless)
+            context = await self._new_context(browser)
+
+            async def worker(tab_no: int):
+                nonlocal failed
+                page = await self._new_page(context)
+                try:
+                    while True:
+                        try:
+                            keyword, page_no = jobs.get_nowait()
+                        except asyncio.QueueEmpty:
+                            return
+                        # 前面的页已经没有结果时，后面的页不必再爬
+                        if empty_pages.get(keyword, pages + 1) < page_no:
+                            state.mark_done(keyword, page_no, 0)
+                            continue
+                        try:
+                            products = await self._crawl_page(page, state, keyword, page_no, max_price, limit)
+                        except Exception as e:
+                            failed += 1
+                            logger.warning("[tab %d] %s 第 %d 页失败: %s（下次运行重试）", tab_no, keyword, page_no, e)
+                            continue
+                        if not products:
+                            empty_pages[keyword] = min(empty_pages.get(keyword, page_no), page_no)
+                        saved[keyword] = saved.get(keyword, 0) + len(products)
+                        done = total - jobs.qsize()
+                        logger.info(
+                            "[tab %d] %s 第 %d 页: %d 个产品（%d/%d）", tab_no, keyword, page_no, len(products), done, total,
+                        )
+                finally:
+                    await page.close()
+
+            try:
+                await asyncio.gather(*(worker(i + 1) for i in range(max(1, min(tabs, total)))))
+            finally:
+                await context.close()
+                await browser.close()
+
+        elapsed = (datetime.now() - started).total_seconds()
+        print(f"\n✓ 完成 {total - failed} 页，保存 {sum(saved.values())} 个产品，用时 {elapsed:.0f} 秒")
+        if failed:
+            print(f"   {failed} 页失败，进度保留在 {state.path}，重新运行同样的命令续跑")
+        else:
+            # 全部完成：不保留断点（包括因空页跳过的页），下次运行重新爬取
+            state.clear()
+        return saved
+
+    async def _crawl_page(
+        self,
+        page,
+        state: CrawlState,
+        keyword: str,
+        page_no: int,
+        max_price: float,
+        limit: int,
+    ) -> List[dict]:
+        """爬一页并入库；入库成功后才记入断点，失败时抛出异常，下次运行重爬这一页"""
+        products = await self._scrape_page(page, keyword, max_price, limit, page_no)
+        if products and self.supabase:
+            await self._save_to_database(products, keyword)
+        state.mark_done(keyword, page_no, len(products))
+        return products
+
+    async def _new_context(self, browser):
+        """创建浏览器上下文并加载 cookies"""
+        context = await browser.new_context(
+            viewport={"width": 1920, "height": 1080},
+            locale="zh-CN",
+        )
+
+        # 尝试加载 cookies 文件
+        cookies_file = Path(__file__).parent.parent / "cookies"
+        if cookies_file.exists():
+            try:
+                with open(cookies_file, "r") as f:
+                    cookies = json.load(f)
+                # 格式化 cookies 为 Playwright 格式
+                formatted_cookies = []
+                for cookie in cookies:
+                    formatted_cookie = {
+                        "name": cookie.get("name", ""),
+                        "value": cookie.get("value", ""),
+                        "domain": cookie.get("domain", ".1688.com"),
+                        "path": cookie.get("path", "/"),
+                    }
+                    if cookie.get("expirationDate"):
+                        formatted_cookie["expires"] = cookie["expirationDate"]
+                    formatted_cookies.append(formatted_cookie)
+                await context.add_cookies(formatted_cookies)
+                logger.info("加载了 %d 个 cookies", len(formatted_cookies))
+            except Exception as e:
+                logger.warning("加载 cookies 失败: %s", e)
+
+        return context
+
+    async def _new_page(self, context):
+        """新建标签页（可用时启用 stealth 模式）"""
+        page = await context.new_page()
+        if STEALTH_AVAILABLE and stealth_async:
+            await stealth_async(page)
+        return page
+
+    async def _scrape_page(
+        self,
+        page,
+        keyword: str,
+        max_price: float,
+        limit: int,
+        page_no: int = 1,
+    ) -> List[dict]:
+        """打开一页搜索结果并提取产品"""
+        # 构建搜索 URL
+        search_url = f"https://s.1688.com/selloffer/offer_search.htm?keywords={keyword}"
+        if max_price > 0:
+            search_url += f"&e_price={int(max_price)}"
+        if page_no > 1:
+            search_url += f"&beginPage={page_no}"
+
+        logger.info("访问: %s", search_url)
+        # 使用 domcontentloaded 而不是 networkidle，更快加载
+        await page.goto(search_url, wait_until="domcontentloaded", timeout=30000)
+
+        # 检查是否需要登录或验证
+        page_title = await page.title()
+        if "验证" in page_title or "登录" in page_title:
+            await self._wait_for_verification(page)
+
+        # 等待商品列表出现，而不是固定等待
+        try:
+            await page.wait_for_selector(", ".join(OFFER_SELECTORS), timeout=10000)
+        except Exception:
+            pass
+
+        return await self._extract_products(page, limit)
+
+    async def _wait_for_verification(self, page, timeout: float = 30):
+        """等待手动完成验证/登录；标题恢复正常后立即继续"""
+        print("\n⚠️  检测到验证码或登录页面")
+        print("   请在浏览器中完成验证/登录...")
+        # 检查是否在交互模式
+        if sys.stdin.isatty():
+            print("   完成后按 Enter 继续...")
+            await asyncio.get_running_loop().run_in_executor(None, input)
+        else:
+            print(f"   最多等待 {timeout:.0f} 秒供手动操作...")
+            deadline = asyncio.get_running_loop().time() + timeout
+            while asyncio.get_running_loop().time() < deadline:
+                await asyncio.sleep(1)
+                title = await page.title()
+                if "验证" not in title and "登录" not in title:
+                    break
+        logger.info("当前页面: %s", await page.title())
 
     async def _extract_products(self, page, limit: int) -> List[dict]:
         """从页面提取产品数据"""
         products = []
 
-        # 尝试不同的选择器
-        selectors = [
-            ".search-offer-item",
-            ".sm-offer-item",
-            ".offer-list-row",
-            "[data-offer-id]",
-        ]
-
-        items = []
-        for selector in selectors:
-            items = await page.query_selector_all(selector)
-            if items:
-                print(f"   使用选择器: {selector} (找到 {len(items)} 个)")
-                break
+        # 优先使用上次命中的选择器，失效时才重新逐个尝试
+        selector, items = await self.selectors.query_all(page, "1688", "search", OFFER_SELECTORS)
+        if selector:
+            logger.debug("使用选择器: %s (找到 %d 个)", selector, len(items), extra=SAMPLED)
 
         if not items:
-            print("   ⚠️ 未找到产品元素，尝试从页面 JSON 提取...")
+            logger.warning("未找到产品元素，尝试从页面 JSON 提取...")
             return await self._extract_from_json(page, limit)
 
         for i, item in enumerate(items[:limit]):
@@ -230,9 +467,9 @@ class Local1688Scraper:
                 product = await self._parse_item(item)
                 if product:
                     products.append(product)
-                    print(f"   [{i+1}] {product['title'][:30]}... ¥{product['price']}")
+                    logger.debug("[%d] %s... ¥%s", i + 1, product["title"][:30], product["price"], extra=SAMPLED)
             except Exception as e:
-                print(f"   [{i+1}] 解析失败: {e}")
+                logger.debug("[%d] 解析失败: %s", i + 1, e, extra=SAMPLED)
 
         return products
 
@@ -340,7 +577,7 @@ class Local1688Scraper:
             return products
 
         except Exception as e:
-            print(f"   JSON 提取失败: {e}")
+            logger.warning("JSON 提取失败: %s", e)
             return []
 
     def _parse_price(self, price_text: str) -> float:
@@ -391,43 +628,96 @@ class Local1688Scraper:
 
         return None
 
-    async def _save_to_database(self, products: List[dict], keyword: str):
-        """保存到 Supabase 数据库"""
+    async def _save_to_database(self, products: List[dict], keyword: str) -> int:
+        """
+        分块批量 upsert 到 Supabase 数据库
+
+        Returns:
+            保存的行数
+
+        Raises:
+            RuntimeError: 某一块保存失败（已保存的块不回滚，upsert 重跑无副作用）
+        """
         if not self.supabase:
-            return
+            return 0
 
-        print(f"\n💾 保存到数据库...")
+        logger.info("保存到数据库...")
 
-        for product in products:
+        saved = 0
+        for rows in chunk_rows(products, keyword):
             try:
-                # 添加搜索关键词
-                product["search_keyword"] = keyword
+                # Upsert（插入或更新），每块一次请求
+                await asyncio.to_thread(
+                    lambda rows=rows: self.supabase.table("suppliers_1688")
+                    .upsert(rows, on_conflict="offer_id")
+                    .execute()
+                )
+            except Exception as e:
+                raise RuntimeError(f"保存失败 [{len(rows)} 条, {rows[0]['offer_id']}...]: {e}") from e
+            saved += len(rows)
 
-                # Upsert（插入或更新）
-                self.supabase.table("suppliers_1688").upsert(
-                    product,
-                    on_conflict="offer_id"
-                ).execute()
+        logger.info("已保存 %d 条记录", saved)
+        return saved
 
-            except Exception as e:
-                print(f"   保存失败 [{product['offer_id']}]: {e}")
 
-        print(f"✓ 已保存 {len(products)} 条记录")
+def resolve_keywords(args) -> List[str]:
+    """命令行关键词 + 关键词文件 + 全部品类"""
+    keywords = list(args.keywords)
+    if args.keywords_file:
+        with open(args.keywords_file, encoding="utf-8") as f:
+            keywords += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if args.all_categories:
+        keywords += load_category_keywords()
+    return list(dict.fromkeys(keywords))
 
 
 async def main():
+    if async_playwright is None:
+        print("请安装 playwright: pip install playwright && playwright install chromium")
+        sys.exit(1)
+    setup_logging(fmt="text")  # 后端模块的日志（选择器切换等）
     parser = argparse.ArgumentParser(description="本地 1688 爬虫")
-    parser.add_argument("keyword", help="搜索关键词（中文）")
-    parser.add_argument("--limit", type=int, default=20, help="获取数量 (默认: 20)")
+    parser.add_argument("keywords", nargs="*", help="搜索关键词（中文），可以多个")
+    parser.add_argument("--keywords-file", help="关键词文件（每行一个）")
+    parser.add_argument("--all-categories", action="store_true", help="爬取排名服务的全部品类关键词")
+    parser.add_argument("--limit", type=int, default=20, help="每页获取数量 (默认: 20)")
     parser.add_argument("--max-price", type=float, default=500, help="最高价格 (默认: 500)")
+    parser.add_argument("--pages", type=int, default=1, help="每个关键词爬取页数 (默认: 1)")
+    parser.add_argument("--tabs", type=int, default=3, help="并发标签页数 (默认: 3)")
+    parser.add_argument("--state-file", default=str(DEFAULT_STATE_FILE), help="断点文件路径")
+    parser.add_argument("--fresh", action="store_true", help="忽略断点，从头开始")
+    parser.add_argument(
+        "--state-max-age", type=float, default=DEFAULT_STATE_MAX_AGE_HOURS,
+        help=f"断点有效期，小时（默认: {DEFAULT_STATE_MAX_AGE_HOURS:g}，0 = 不过期）",
+    )
     parser.add_argument("--headless", action="store_true", help="无头模式运行")
-    parser.add_argument("--output", help="输出 JSON 文件路径")
+    parser.add_argument("--output", help="输出 JSON 文件路径（仅单关键词单页）")
 
     args = parser.parse_args()
+    keywords = resolve_keywords(args)
+    if not keywords:
+        parser.error("请提供关键词、--keywords-file 或 --all-categories")
 
     scraper = Local1688Scraper(headless=args.headless)
+
+    if len(keywords) > 1 or args.pages > 1:
+        saved = await scraper.crawl(
+            keywords=keywords,
+            pages=args.pages,
+            tabs=args.tabs,
+            max_price=args.max_price,
+            limit=args.limit,
+            state_file=Path(args.state_file),
+            fresh=args.fresh,
+            state_max_age_hours=args.state_max_age,
+        )
+        for keyword, count in saved.items():
+            print(f"   {keyword}: {count}")
+        return
+
+    keyword = keywords[0]
     products = await scraper.scrape(
-        keyword=args.keyword,
+        keyword=keyword,
         max_price=args.max_price,
         limit=args.limit,
     )
@@ -441,7 +731,7 @@ async def main():
     # 打印摘要
     if products:
         print(f"\n{'='*50}")
-        print(f"搜索关键词: {args.keyword}")
+        print(f"搜索关键词: {keyword}")
         print(f"获取产品数: {len(products)}")
         print(f"价格范围: ¥{min(p['price'] for p in products):.2f} - ¥{max(p['price'] for p in products):.2f}")
         print(f"{'='*50}")